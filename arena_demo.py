@@ -0,0 +1,382 @@
+# arena_demo.py
+#
+# AST 를 노드 객체 트리 대신 "배열 몇 개" 로 담는 아레나 표현 (struct-of-arrays)
+#
+# 노드는 0, 1, 2, ... 정수 번호이고, 노드마다의 정보는 나란한 array 에 들어 있다.
+# - kinds:   노드 종류 (NODE_TYPES 의 번호)            array('B')
+# - spans:   원본 위치 span                           array('Q')
+# - offsets: 이 노드의 필드 칸이 data 에서 시작하는 곳   array('I')
+# - data:    필드 칸. 자식 노드 번호 / 값 표 번호 / 리스트 위치   array('i')
+# - lists:   리스트 필드 [개수, 원소...] 를 이어 붙인 것          array('i')
+# - values:  이름/문자열/숫자/연산자 같은 값 표 (같은 값은 한 번만, 아레나 전체가 공유)
+#
+# 노드 번호는 전위 순회 순서로 매기므로 한 노드의 서브트리는 번호가 이어진 구간이고,
+# 자식 번호는 늘 부모보다 크다.
+# 과목 전체 제출물처럼 아주 많은 프로그램을 한 프로세스에 올려 두고 훑는 분석용이다.
+#
+# 사용 예:
+#     arena = AstArena.from_program(program)
+#     for i in arena.find(Call):
+#         func = arena.get(i, "func")
+#         if arena.type(func) is Name:
+#             print(arena.get(func, "id"))
+#     assert arena.to_program() == program
+
+from array import array
+from dataclasses import fields, is_dataclass
+from types import NoneType, UnionType
+from typing import Iterator, Union, get_args, get_origin, get_type_hints
+
+import ast_demo
+from ast_demo import Node, Program
+
+# 필드 칸의 종류 (astbin_demo 의 파일 형식도 이 분류로 필드를 읽고 쓴다)
+(FIELD_NODE,        # 자식 노드 번호
+ FIELD_OPT_NODE,    # 자식 노드 번호 또는 -1 (None)
+ FIELD_VALUE,       # values 표 번호
+ FIELD_NODE_LIST,   # lists 위치 (-1 이면 None): [개수, 노드 번호...]
+ FIELD_VALUE_LIST,  # lists 위치: [개수, values 번호...]
+ FIELD_PAIR_LIST,   # lists 위치 (-1 이면 None): [개수, (a, b) 쌍을 두 칸씩...]
+ ) = range(6)
+# 칸 종류 번호 -> 이름 (번호의 뜻까지 지문에 넣을 때 쓴다)
+FIELD_KINDS = ("node", "opt_node", "value", "node_list", "value_list", "pair_list")
+
+# 리스트 필드가 None 일 때, 선택 자식이 없을 때
+_MISSING = -1
+
+def _field_code(hint) -> tuple[int, tuple[int, ...]]:
+    """필드 타입 힌트 -> (칸 종류, 쌍 리스트면 두 원소의 칸 종류)"""
+    origin = get_origin(hint)
+    if origin is Union or origin is UnionType:
+        rest = [a for a in get_args(hint) if a is not NoneType]
+        if len(rest) != 1:
+            return FIELD_VALUE, ()  # int | float 같은 값
+        code, elems = _field_code(rest[0])
+        # 리스트 칸은 원래 None 도 담을 수 있다
+        return (FIELD_OPT_NODE, ()) if code == FIELD_NODE else (code, elems)
+    if origin is list:
+        (elem,) = get_args(hint)
+        if get_origin(elem) is tuple:
+            return FIELD_PAIR_LIST, tuple(_field_code(a)[0] for a in get_args(elem))
+        return (FIELD_NODE_LIST, ()) if _field_code(elem)[0] == FIELD_NODE else (FIELD_VALUE_LIST, ())
+    if isinstance(hint, type) and issubclass(hint, Node):
+        return FIELD_NODE, ()
+    return FIELD_VALUE, ()
+
+# 아레나가 담는 노드 클래스 (ast_demo 에 정의된 순서. 번호가 kinds 에 들어간다)
+NODE_TYPES: list[type] = [
+    cls for cls in vars(ast_demo).values()
+    if isinstance(cls, type) and issubclass(cls, Node) and is_dataclass(cls) and cls is not Program
+]
+_KIND_OF: dict[type, int] = {cls: code for code, cls in enumerate(NODE_TYPES)}
+
+# 종류 번호 -> 필드마다 (이름, 칸 종류, 쌍 원소 칸 종류). NODE_TYPES 와 같은 순서
+NODE_SCHEMAS: list[tuple[tuple[str, int, tuple[int, ...]], ...]] = []
+for _cls in NODE_TYPES:
+    _hints = get_type_hints(_cls)
+    NODE_SCHEMAS.append(tuple((f.name, *_field_code(_hints[f.name])) for f in fields(_cls) if f.init))
+# 종류 번호 -> 필드 이름 -> (칸 위치, 칸 종류)
+_SLOTS: list[dict[str, tuple[int, int]]] = [
+    {name: (k, code) for k, (name, code, _) in enumerate(schema)} for schema in NODE_SCHEMAS
+]
+# 종류 번호 -> 자식 노드가 들어갈 수 있는 필드만 (칸 위치, 칸 종류, 쌍 원소 칸 종류)
+_CHILD_FIELDS: list[tuple[tuple[int, int, tuple[int, ...]], ...]] = [
+    tuple(
+        (k, kind, elems) for k, (_, kind, elems) in enumerate(schema)
+        if kind in (FIELD_NODE, FIELD_OPT_NODE, FIELD_NODE_LIST)
+        or (kind == FIELD_PAIR_LIST and any(e != FIELD_VALUE for e in elems))
+    )
+    for schema in NODE_SCHEMAS
+]
+
+class AstArena:
+    """
+    여러 Program 의 AST 를 나란한 array 들에 담는 아레나.
+    add_program / from_program 으로 넣고, to_program / to_node 로 똑같은 노드 트리를 다시 만든다.
+    그 사이의 분석은 노드 번호(int)만 오가는 type / get / children / walk / find 로 한다.
+    """
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.spans = array("Q")
+        self.offsets = array("I")
+        self.data = array("i")
+        self.lists = array("i")
+        self.values: list = []
+        self._value_index: dict[tuple, int] = {}
+        # 넣은 Program 마다 (본문 리스트 위치, Program 의 span)
+        self.programs: list[tuple[int, int]] = []
+
+    @classmethod
+    def from_program(cls, program: Program) -> "AstArena":
+        arena = cls()
+        arena.add_program(program)
+        return arena
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    # ======================
+    #  객체 트리 -> 아레나
+    # ======================
+
+    def add_program(self, program: Program) -> int:
+        """program 을 아레나에 넣고 그 번호를 돌려준다 (미뤄 둔 함수/클래스 본문은 이때 파싱된다)"""
+        lists = self.lists
+        at = len(lists)
+        body = program.body
+        lists.append(len(body))
+        lists.extend(array("i", bytes(4 * len(body))))
+        self._encode([(stmt, lists, at + 1 + k) for k, stmt in enumerate(body)])
+        self.programs.append((at, program.span))
+        return len(self.programs) - 1
+
+    def add(self, node: Node) -> int:
+        """노드 하나(와 서브트리)를 넣고 그 노드 번호를 돌려준다"""
+        slot = array("i", [0])
+        self._encode([(node, slot, 0)])
+        return slot[0]
+
+    def _value(self, value) -> int:
+        # 1 == 1.0 == True 이고 0.0 == -0.0 이라 값만으로는 표 키가 겹친다
+        key = (type(value), value.hex() if type(value) is float else value)
+        idx = self._value_index.get(key)
+        if idx is None:
+            idx = self._value_index[key] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def _encode(self, work: list) -> None:
+        """
+        work: (노드, 번호를 적을 array, 그 위치) 들. 앞의 것부터 전위 순회로 번호를 매긴다.
+        재귀 대신 작업 목록을 쓰므로 식이 아주 깊어도 된다.
+        """
+        kinds, spans, offsets, data, lists = self.kinds, self.spans, self.offsets, self.data, self.lists
+        value = self._value
+        work.reverse()
+        while work:
+            node, target, index = work.pop()
+            code = _KIND_OF.get(type(node))
+            if code is None:
+                raise TypeError(f"아레나에 넣을 수 없는 노드입니다: {node!r}")
+            i = len(kinds)
+            target[index] = i
+            kinds.append(code)
+            spans.append(node.span)
+            base = len(data)
+            offsets.append(base)
+            schema = NODE_SCHEMAS[code]
+            data.extend(array("i", bytes(4 * len(schema))))
+            later = []  # 이 노드의 자식들 (필드 순서대로)
+            for k, (name, kind, elems) in enumerate(schema):
+                v = getattr(node, name)
+                if kind == FIELD_NODE:
+                    later.append((v, data, base + k))
+                elif kind == FIELD_VALUE:
+                    data[base + k] = value(v)
+                elif v is None:
+                    data[base + k] = _MISSING
+                elif kind == FIELD_OPT_NODE:
+                    later.append((v, data, base + k))
+                else:
+                    at = len(lists)
+                    data[base + k] = at
+                    lists.append(len(v))
+                    if kind == FIELD_VALUE_LIST:
+                        lists.extend(map(value, v))
+                        continue
+                    width = len(elems) if kind == FIELD_PAIR_LIST else 1
+                    lists.extend(array("i", bytes(4 * width * len(v))))
+                    if kind == FIELD_NODE_LIST:
+                        later += [(c, lists, at + 1 + j) for j, c in enumerate(v)]
+                        continue
+                    for j, pair in enumerate(v):
+                        for e, (ekind, ev) in enumerate(zip(elems, pair)):
+                            pos = at + 1 + 2 * j + e
+                            if ekind == FIELD_VALUE:
+                                lists[pos] = value(ev)
+                            elif ev is None:
+                                lists[pos] = _MISSING
+                            else:
+                                later.append((ev, lists, pos))
+            # 첫 자식이 다음 번호를 받도록 거꾸로 쌓는다
+            work += reversed(later)
+
+    # ======================
+    #  아레나 -> 객체 트리
+    # ======================
+
+    def to_program(self, index: int = 0) -> Program:
+        """index 번째로 넣은 Program 을 노드 객체 트리로 다시 만든다 (넣었던 것과 == 이고 span 도 같다)"""
+        at, span = self.programs[index]
+        ids = self.lists[at + 1:at + 1 + self.lists[at]]
+        if not ids:
+            program = Program(body=[])
+        else:
+            nodes = self._decode(ids[0], self.subtree_end(ids[-1]))
+            program = Program(body=[nodes[i - ids[0]] for i in ids])
+        if span:
+            program.span = span
+        return program
+
+    def to_node(self, i: int) -> Node:
+        """노드 번호 i 의 서브트리를 노드 객체로 다시 만든다"""
+        return self._decode(i, self.subtree_end(i))[0]
+
+    def _decode(self, start: int, end: int) -> list[Node]:
+        """번호 [start, end) 의 노드들을 만든다. 자식 번호가 부모보다 크므로 뒤에서부터 만들면 된다"""
+        kinds, spans, offsets, data, lists, values = (
+            self.kinds, self.spans, self.offsets, self.data, self.lists, self.values)
+        nodes: list = [None] * (end - start)
+
+        def elem(kind: int, x: int):
+            if kind == FIELD_VALUE:
+                return values[x]
+            return None if x == _MISSING else nodes[x - start]
+
+        for i in range(end - 1, start - 1, -1):
+            code = kinds[i]
+            base = offsets[i]
+            args = []
+            for k, (_, kind, elems) in enumerate(NODE_SCHEMAS[code]):
+                x = data[base + k]
+                if kind == FIELD_VALUE:
+                    args.append(values[x])
+                elif x == _MISSING:
+                    args.append(None)
+                elif kind == FIELD_NODE or kind == FIELD_OPT_NODE:
+                    args.append(nodes[x - start])
+                else:
+                    items = lists[x + 1:x + 1 + lists[x] * (len(elems) if kind == FIELD_PAIR_LIST else 1)]
+                    if kind == FIELD_NODE_LIST:
+                        args.append([nodes[c - start] for c in items])
+                    elif kind == FIELD_VALUE_LIST:
+                        args.append([values[v] for v in items])
+                    else:
+                        a, b = elems
+                        args.append([(elem(a, items[j]), elem(b, items[j + 1])) for j in range(0, len(items), 2)])
+            node = NODE_TYPES[code](*args)
+            if spans[i]:
+                node.span = spans[i]
+            nodes[i - start] = node
+        return nodes
+
+    # ======================
+    #  순회 (노드 객체를 만들지 않는다)
+    # ======================
+
+    def program_body(self, index: int = 0) -> array:
+        """index 번째 Program 의 최상위 문장 번호들"""
+        at, _ = self.programs[index]
+        return self.lists[at + 1:at + 1 + self.lists[at]]
+
+    def type(self, i: int) -> type:
+        """노드 i 의 클래스 (ast_demo 의 노드 클래스)"""
+        return NODE_TYPES[self.kinds[i]]
+
+    def span(self, i: int) -> int:
+        return self.spans[i]
+
+    def get(self, i: int, name: str):
+        """
+        노드 i 의 name 필드.
+        자식 노드는 번호(int, 없으면 None), 값은 그 값, 노드 리스트는 번호 array (lists 의 조각),
+        값 리스트는 값 리스트, 쌍 리스트는 (번호 또는 값, 번호 또는 값) 리스트로 돌려준다.
+        """
+        code = self.kinds[i]
+        k, kind = _SLOTS[code][name]
+        x = self.data[self.offsets[i] + k]
+        if kind == FIELD_VALUE:
+            return self.values[x]
+        if x == _MISSING:
+            return None
+        if kind == FIELD_NODE or kind == FIELD_OPT_NODE:
+            return x
+        lists = self.lists
+        if kind == FIELD_NODE_LIST:
+            return lists[x + 1:x + 1 + lists[x]]
+        if kind == FIELD_VALUE_LIST:
+            return [self.values[v] for v in lists[x + 1:x + 1 + lists[x]]]
+        a, b = NODE_SCHEMAS[code][k][2]
+        items = lists[x + 1:x + 1 + 2 * lists[x]]
+        pick = self._pick
+        return [(pick(a, items[j]), pick(b, items[j + 1])) for j in range(0, len(items), 2)]
+
+    def _pick(self, kind: int, x: int):
+        if kind == FIELD_VALUE:
+            return self.values[x]
+        return None if x == _MISSING else x
+
+    def children(self, i: int) -> array:
+        """노드 i 의 자식 노드 번호 array (필드 순서, 리스트는 원소 순서)"""
+        out = array("i")
+        fields = _CHILD_FIELDS[self.kinds[i]]
+        if not fields:
+            return out
+        base = self.offsets[i]
+        data, lists = self.data, self.lists
+        for k, kind, elems in fields:
+            x = data[base + k]
+            if x == _MISSING:
+                continue
+            if kind == FIELD_NODE or kind == FIELD_OPT_NODE:
+                out.append(x)
+            elif kind == FIELD_NODE_LIST:
+                out += lists[x + 1:x + 1 + lists[x]]
+            else:
+                for j in range(x + 1, x + 1 + 2 * lists[x], 2):
+                    for e, ekind in enumerate(elems):
+                        c = lists[j + e]
+                        if ekind != FIELD_VALUE and c != _MISSING:
+                            out.append(c)
+        return out
+
+    def walk(self, i: int) -> range:
+        """
+        노드 i 와 그 아래 모든 노드 번호 (전위 순회).
+        번호를 전위 순회 순서로 매겼으므로 서브트리 구간 [i, subtree_end(i)) 그대로다.
+        """
+        return range(i, self.subtree_end(i))
+
+    def subtree_end(self, i: int) -> int:
+        """
+        노드 i 서브트리 바로 다음 번호 (서브트리는 [i, subtree_end(i)) 구간이다).
+        마지막 자식의 마지막 자식 ... 을 따라 내려가면 된다.
+        """
+        while True:
+            kids = self.children(i)
+            if not kids:
+                return i + 1
+            i = kids[-1]
+
+    def find(self, cls: type, start: int = 0, end: int | None = None) -> Iterator[int]:
+        """종류가 cls 인 노드 번호들 (kinds 바이트를 C 수준 find 로 훑는다)"""
+        code = bytes([_KIND_OF[cls]])
+        raw = self.kinds.tobytes()
+        end = len(raw) if end is None else end
+        i = raw.find(code, start, end)
+        while i >= 0:
+            yield i
+            i = raw.find(code, i + 1, end)
+
+    def nbytes(self) -> int:
+        """배열들이 차지하는 바이트 (values 표의 값 객체는 뺀다)"""
+        return sum(a.itemsize * len(a) for a in (self.kinds, self.spans, self.offsets, self.data, self.lists))
+
+if __name__ == "__main__":
+    from lexer_demo import lex_with_spans
+    from parser_demo import Parser
+
+    code = """정의 더하기(x, y=1):
+    반환 x + y
+값 = [더하기(1, y=2), {"키": 참}]
+출력(값[0])
+"""
+    tokens, spans = lex_with_spans(code)
+    program = Parser(tokens, spans).parse_program()
+    arena = AstArena.from_program(program)
+    print(f"노드 {len(arena)}개, 배열 {arena.nbytes()} 바이트, 값 표 {arena.values}")
+    for i in arena.walk(arena.program_body()[0]):
+        print(" ", i, arena.type(i).__name__)
+    assert arena.to_program() == program
+    print("되돌린 Program 이 원래와 같다")
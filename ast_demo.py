@@ -3,196 +3,288 @@
 # "x = 1 + 2" 라는 코드를 AST로 표현해 보고,
 # 그 트리를 예쁘게 출력해 보는 데모.
 
-from dataclasses import dataclass
-from typing import List, Optional
+import json
+import sys
+from dataclasses import dataclass, field, fields
+from operator import attrgetter, is_ as _is
+from types import MemberDescriptorType
+from typing import Callable, List, Optional, TextIO
+from weakref import WeakValueDictionary
+
+from lexer_demo import SPAN_SHIFT, span_start
 
 # AST 노드 타입들
 
-class Expr:
+# 노드는 큰 프로그램에서 수백만 개가 생기므로 전부 __slots__ 클래스다 (@dataclass(slots=True)).
+# 인스턴스마다 __dict__ 가 없어서 노드 하나가 훨씬 작다. 대신 필드에 없는 속성은 붙일 수 없다.
+# (Expr / Stmt 처럼 필드 없는 중간 클래스도 __slots__ = () 를 둬야 __dict__ 가 다시 생기지 않는다)
+# NodeFactory 가 공유하는 노드(잎과 BinOp)만 약한 참조 슬롯(weakref_slot)을 하나 더 가진다.
+
+class Node:
+    """
+    모든 AST 노드의 부모 클래스.
+    span 은 노드가 덮는 원본 소스 구간을 (시작 위치 << 32) | 길이 로 묶은 정수
+    (lexer_demo.pack_span). 파서가 span 정보를 받았을 때만 채워지고, 없으면 0.
+    데이터클래스 필드가 아니므로 ==, repr 에는 영향을 주지 않는다.
+    """
+    __slots__ = ("span",)
+
+    def __getattr__(self, name: str):
+        # 슬롯이 비어 있을 때만 불린다: span 을 기록하지 않은 노드는 0
+        if name == "span":
+            return 0
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+def field_values(node: Node) -> list:
+    """
+    node 의 필드 값들 (필드 순서대로). 트리를 훑는 도구용.
+    미뤄 둔 본문(DeferredBody)은 파싱하지 않고 건너뛴다.
+    """
+    getters = _FIELD_GETTERS.get(type(node))
+    if getters is None:
+        cls = type(node)
+        getters = _FIELD_GETTERS[cls] = tuple(_field_getter(cls, f.name) for f in fields(cls) if f.init)
+    values = []
+    for get in getters:
+        try:
+            values.append(get(node))
+        except AttributeError:
+            pass
+    return values
+
+# 노드 클래스 -> 필드 값을 꺼내는 함수들 (field_values 가 처음 볼 때 만든다)
+_FIELD_GETTERS: dict[type, tuple] = {}
+
+def _field_getter(cls: type, name: str):
+    # 슬롯 필드의 클래스 속성은 member descriptor 다: 비어 있으면 __getattr__ 없이 AttributeError
+    slot = getattr(cls, name, None)
+    if isinstance(slot, MemberDescriptorType):
+        return slot.__get__
+    return attrgetter(name)  # Program 처럼 __dict__ 가 있는 노드
+
+class Expr(Node):
     """ 표현식(Expression)의 부모 클래스 """
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class String(Expr):
     value: str
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class Number(Expr):
     value: int | float
     raw: str | None = None
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class Name(Expr):
     id: str  # 변수 이름, 함수 이름 등
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class BinOp(Expr):
     left: Expr
     op: str
     right: Expr
 
-@dataclass
+@dataclass(slots=True)
 class Compare(Expr):
     left: Expr
     ops: List[str]
     comparators: List[Expr]
 
-@dataclass
+@dataclass(slots=True)
 class IfExpr(Expr):
     body: Expr
     test: Expr
     orelse: Expr
 
-@dataclass
+@dataclass(slots=True)
 class NamedExpr(Expr):
     target: Name
     value: Expr
 
-@dataclass
+@dataclass(slots=True)
 class Call(Expr):
     func: Expr
     args: List[Expr]
     keywords: List[tuple[str, Expr]] | None = None
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class Bool(Expr):
     value: bool
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class NoneLiteral(Expr):
     """None (없음) 리터럴"""
     pass
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(Expr):
     op: str
     operand: Expr
 
-@dataclass
+@dataclass(slots=True)
 class ListLiteral(Expr):
     elements: List[Expr]
 
-@dataclass
+@dataclass(slots=True)
 class TupleLiteral(Expr):
     elements: List[Expr]
 
-@dataclass
+@dataclass(slots=True)
 class SetLiteral(Expr):
     elements: List[Expr]
 
-@dataclass
+@dataclass(slots=True)
 class DictLiteral(Expr):
     items: List[tuple[Expr, Expr]]
 
-@dataclass
+@dataclass(slots=True)
 class Index(Expr):
     value: Expr
     index: Expr
 
-@dataclass
+@dataclass(slots=True)
 class Slice(Expr):
     value: Expr
     start: Optional[Expr]
     stop: Optional[Expr]
     step: Optional[Expr]
 
-@dataclass
+@dataclass(slots=True)
 class Attribute(Expr):
     value: Expr
     attr: str
-class Stmt:
+
+class Stmt(Node):
     """ 문장(Statement)의 부모 클래스 """
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Stmt):
     target: Expr  # 왼쪽: 대입 대상 변수
     value: Expr   # 오른쪽: 값(표현식)
 
-@dataclass
+@dataclass(slots=True)
 class ChainedAssign(Stmt):
     targets: List[Expr]
     value: Expr
 
-@dataclass
+@dataclass(slots=True)
 class AugAssign(Stmt):
     target: Expr
     op: str      # "+", "-", "*", "/"
     value: Expr
 
-@dataclass
+@dataclass(slots=True)
 class ExprStmt(Stmt):
     value: Expr   # 오른쪽: 값(표현식)
 
-@dataclass
-class Program:
+@dataclass  # 파싱마다 하나뿐이라 슬롯으로 줄일 게 없고, incremental_state 같은 속성을 붙인다
+class Program(Node):
     body: List[Stmt]  # 프로그램은 문장들의 리스트
 
-@dataclass
+@dataclass(slots=True)
 class If(Stmt):
     test: Expr
     body: List[Stmt]
     orelse: List[Stmt] | None = None
 
-@dataclass
+@dataclass(slots=True)
 class While(Stmt):
     test: Expr
     body: List[Stmt]
 
-@dataclass
+@dataclass(slots=True)
 class For(Stmt):
     target: Expr
     iter: Expr
     body: List[Stmt]
 
-@dataclass
+@dataclass(slots=True)
 class Return(Stmt):
     value: Expr | None = None
 
-@dataclass
+@dataclass(slots=True)
 class Break(Stmt):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Continue(Stmt):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Pass(Stmt):
     pass
 
-@dataclass
-class FunctionDef(Stmt):
+class DeferredBody:
+    """
+    body 를 나중에 만들 수 있는 노드 (FunctionDef / ClassDef).
+    Parser(lazy_bodies=True) 는 본문을 파싱하지 않고 defer_body 로 "본문 파싱 함수" 만 걸어 둔다.
+    .body 를 처음 읽을 때 (==, repr, 코드 생성, 출력 포함) 그 함수를 불러서 채운다.
+    본문 파싱 함수는 하위 클래스의 _parse_body 필드에 둔다 (슬롯이라 믹스인에는 둘 수 없다).
+    """
+    __slots__ = ()
+
+    def defer_body(self, parse_body) -> None:
+        try:
+            del self.body  # 비워 둔 슬롯을 읽으면 __getattr__ 로 온다
+        except AttributeError:
+            pass
+        self._parse_body = parse_body
+
+    @property
+    def body_pending(self) -> bool:
+        """본문이 아직 파싱되지 않았으면 True"""
+        return self._parse_body is not None
+
+    def __getattr__(self, name: str):
+        # 인스턴스에 body 가 없을 때만 불린다
+        if name == "body" and self._parse_body is not None:
+            body = self._parse_body()  # 문법 에러가 나면 다음에 읽을 때 다시 난다
+            self._parse_body = None
+            self.body = body
+            return body
+        return super().__getattr__(name)
+
+    def __getstate__(self):
+        # 피클(병렬 프런트엔드 등)로 넘길 때는 본문을 채워서 보낸다 (파서는 넘기지 않는다)
+        self.body
+        return super().__getstate__()
+
+@dataclass(slots=True)
+class FunctionDef(DeferredBody, Stmt):
     name: str
     args: List["Param"]
     body: List[Stmt]
+    _parse_body: object = field(default=None, init=False, repr=False, compare=False)
 
-@dataclass
-class ClassDef(Stmt):
+@dataclass(slots=True)
+class ClassDef(DeferredBody, Stmt):
     name: str
     bases: List[Expr]
     body: List[Stmt]
+    _parse_body: object = field(default=None, init=False, repr=False, compare=False)
 
-@dataclass
-class Param:
+@dataclass(slots=True)
+class Param(Node):
     name: str
     default: Expr | None = None
 
-@dataclass
+@dataclass(slots=True)
 class Import(Stmt):
     names: List[tuple[str, str | None]]
 
-@dataclass
+@dataclass(slots=True)
 class FromImport(Stmt):
     module: str
     names: List[tuple[str, str | None]]
 
-@dataclass
-class WithItem:
+@dataclass(slots=True)
+class WithItem(Node):
     context_expr: Expr
     optional_vars: Expr | None = None
 
-@dataclass
+@dataclass(slots=True)
 class With(Stmt):
     items: List[WithItem]
     body: List[Stmt]
@@ -201,260 +293,707 @@ class With(Stmt):
 # Exceptions
 # ======================
 
-@dataclass
-class ExceptHandler:
+@dataclass(slots=True)
+class ExceptHandler(Node):
     type: Expr | None
     name: str | None
     body: List[Stmt]
 
-@dataclass
+@dataclass(slots=True)
 class Try(Stmt):
     body: List[Stmt]
     handlers: List[ExceptHandler]
     orelse: List[Stmt] | None = None
     finalbody: List[Stmt] | None = None
 
-@dataclass
+@dataclass(slots=True)
 class Raise(Stmt):
     exc: Expr | None = None
 
+class NodeFactory:
+    """
+    해시 콘싱(hash-consing) 노드 팩토리: 구조가 같은 노드를 객체 하나로 공유한다 (Parser(hash_cons=...)).
+    이름/숫자/문자열/참거짓/없음 잎과, 양쪽 피연산자가 모두 공유 노드인 BinOp 가 대상이다.
+    표는 값을 약하게 잡으므로 (WeakValueDictionary) 노드를 쓰는 AST 가 사라지면 표에서도 빠진다.
+    여러 Parser 에 같은 팩토리를 넘기면 파일 사이에서도 공유된다.
+
+    공유 노드는 트리 여러 자리에 동시에 걸려 있으므로
+    - span 을 기록하지 않는다 (항상 0)
+    - 만든 뒤에 고치면 안 된다. 트리를 바꾸는 패스는 새 노드를 만들어야 한다.
+    """
+
+    def __init__(self):
+        self._table: WeakValueDictionary = WeakValueDictionary()
+        self.requests = 0  # 노드를 달라고 한 횟수
+        self.shared = 0    # 그중 이미 있던 노드를 돌려준 횟수
+
+    def __len__(self) -> int:
+        """지금 살아 있는 공유 노드 수"""
+        return len(self._table)
+
+    def _get(self, key: tuple, cls: type, *args) -> Node:
+        self.requests += 1
+        node = self._table.get(key)
+        if node is None:
+            node = cls(*args)
+            self._table[key] = node
+        else:
+            self.shared += 1
+        return node
+
+    def number(self, value: int | float, raw: str | None = None) -> Number:
+        # 1 == 1.0 == True 이므로 값의 타입도 키에 넣는다
+        return self._get((Number, type(value), value, raw), Number, value, raw)
+
+    def string(self, value: str) -> String:
+        return self._get((String, value), String, value)
+
+    def name(self, id: str) -> Name:
+        return self._get((Name, id), Name, id)
+
+    def bool(self, value: bool) -> Bool:
+        return self._get((Bool, value), Bool, value)
+
+    def none(self) -> NoneLiteral:
+        return self._get((NoneLiteral,), NoneLiteral)
+
+    def binop(self, left: Expr, op: str, right: Expr) -> BinOp | None:
+        """
+        left op right 의 공유 노드. 피연산자 중 하나라도 공유 노드가 아니면 None (호출한 쪽이 새로 만든다).
+        키에는 피연산자의 id 를 쓴다: 공유 BinOp 가 살아 있는 동안은 피연산자도 살아 있으므로 id 가 재사용되지 않는다.
+        """
+        if not (self.owns(left) and self.owns(right)):
+            return None
+        return self._get((BinOp, id(left), op, id(right)), BinOp, left, op, right)
+
+    def owns(self, node: Node) -> bool:
+        """node 가 이 팩토리의 공유 노드인지"""
+        cls = type(node)
+        if cls is Name:
+            key = (Name, node.id)
+        elif cls is Number:
+            key = (Number, type(node.value), node.value, node.raw)
+        elif cls is BinOp:
+            key = (BinOp, id(node.left), node.op, id(node.right))
+        elif cls is String:
+            key = (String, node.value)
+        elif cls is Bool:
+            key = (Bool, node.value)
+        elif cls is NoneLiteral:
+            key = (NoneLiteral,)
+        else:
+            return False
+        return self._table.get(key) is node
+
+# 방문자 (NodeVisitor / NodeTransformer)
+
+def iter_child_nodes(node: Node):
+    """
+    node 바로 아래의 자식 노드들 (필드 순서대로, 리스트와 (키, 값) 튜플 안까지).
+    field_values 와 달리 미뤄 둔 본문은 이때 파싱한다.
+    """
+    return iter(_child_nodes([getattr(node, name) for name in _field_names(type(node))]))
+
+def _child_nodes(values: list) -> list:
+    """필드 값들 안의 자식 노드들 (iter_child_nodes 와 NodeTransformer 가 같이 쓰는 순서)"""
+    kids = []
+    for value in values:
+        if isinstance(value, Node):
+            kids.append(value)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, Node):
+                    kids.append(item)
+                elif isinstance(item, tuple):
+                    kids += [x for x in item if isinstance(x, Node)]
+    return kids
+
+# 노드 클래스 -> 필드 이름들
+_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
+
+def _field_names(cls: type) -> tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls) if f.init)
+    return names
+
+class NodeVisitor:
+    """
+    노드 종류마다 visit_<클래스 이름>(node, *args) 를 부르는 방문자 (파이썬 ast.NodeVisitor 와 같은 모양).
+    부를 메서드는 type(node) 를 키로 하는 표(visit_table)에 방문자 클래스마다 한 번만 찾아 둔다.
+    노드 클래스에 맞는 메서드가 없으면 부모 클래스 이름으로 찾고, 그래도 없으면 generic_visit.
+    visit 에 준 나머지 인자는 그대로 넘긴다.
+    노드마다 도는 작업 목록 루프(출력기, 코드 생성기)는 visit 대신 visit_table 을 직접 읽어서 호출 한 단계를 아낀다.
+    """
+    visit_table: dict[type, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visit_table = {}
+
+    @classmethod
+    def visit_method(cls, node_type: type) -> Callable:
+        """node_type 을 방문할 함수 (self, node, *args)"""
+        method = cls.visit_table.get(node_type)
+        if method is None:
+            for klass in node_type.__mro__:
+                method = getattr(cls, "visit_" + klass.__name__, None)
+                if method is not None:
+                    break
+            else:
+                method = cls.generic_visit
+            cls.visit_table[node_type] = method
+        return method
+
+    def visit(self, node, *args):
+        method = self.visit_table.get(type(node))
+        if method is None:
+            method = self.visit_method(type(node))
+        return method(self, node, *args)
+
+    def generic_visit(self, node, *args):
+        """자식 노드들을 차례로 방문한다 (재귀 호출)"""
+        for child in iter_child_nodes(node):
+            self.visit(child, *args)
+
+# 자식 노드가 없는 노드 (필드에 노드가 들어올 수 없다)
+_LEAF_TYPES = frozenset({Name, Number, String, Bool, NoneLiteral})
+
+class NodeTransformer(NodeVisitor):
+    """
+    visit_<클래스 이름> 이 돌려준 값으로 그 자리의 노드를 바꾸는 방문자 (파이썬 ast.NodeTransformer 와 같은 규칙).
+    - 리스트 안에서 None 을 돌려주면 지우고, 리스트를 돌려주면 그 자리에 펼쳐 넣는다
+    - generic_visit 은 자식들을 바꾼 결과를 제자리에 쓰고 node 를 돌려준다 (바뀐 필드만 쓴다)
+    Parser(hash_cons=...) 의 공유 노드는 고치면 안 되므로, 자식이 바뀌는 공유 노드는 새 노드로 돌려줘야 한다.
+    (또는 CopyTransformer 를 쓴다)
+
+    generic_visit 은 재귀 대신 작업 목록으로 돈다: visit_<클래스 이름> 이 없는 자식은 그 자리에서 펼치므로
+    파이썬 스택은 트리 깊이가 아니라 "generic_visit 을 부르는 visit_X 노드" 가 겹친 만큼만 쓴다.
+    """
+    # True 면 후위 + 복사 (CopyTransformer)
+    _copy_on_write = False
+
+    def generic_visit(self, node):
+        return self._rewrite(node, False)
+
+    def _rewrite(self, root: Node, visit_root: bool):
+        """
+        root 아래를 후위 순서로 바꾼다 (visit_root 면 root 자신도 방문한 결과를 돌려준다).
+        작업 목록의 노드는 방문할 차례, (노드, 필드 값들, 자식들, 방문 함수) 튜플은 자식을 다 바꾸고 자기를 다시 만들 차례.
+        방문 함수가 None 이면 자식만 바꾼다 (generic_visit).
+        """
+        cls = type(self)
+        table = cls.visit_table
+        generic = NodeTransformer.generic_visit
+        postorder = self._copy_on_write
+        done: list = []  # 바꾼 결과들 (자식이 부모보다 먼저 쌓인다)
+        work: list = [root]
+        while work:
+            item = work.pop()
+            if type(item) is tuple:
+                node, values, kids, method = item
+                results = done[-len(kids):]
+                del done[-len(kids):]
+                if not all(map(_is, results, kids)):
+                    node = self._replace(node, values, iter(results))
+                done.append(node if method is None else method(self, node))
+                continue
+            kind = type(item)
+            if item is root and not visit_root:
+                method = None
+            else:
+                method = table.get(kind) or cls.visit_method(kind)
+                if method is generic:
+                    method = None
+                elif not postorder:
+                    done.append(method(self, item))  # visit_X 가 자식을 어떻게 볼지 정한다
+                    continue
+            if kind in _LEAF_TYPES:
+                kids = ()
+            else:
+                values = [getattr(item, name) for name in _field_names(kind)]
+                kids = _child_nodes(values)
+            if kids:
+                work.append((item, values, kids, method))
+                work += reversed(kids)
+            else:
+                done.append(item if method is None else method(self, item))
+        return done[0]
+
+    def _replace(self, node: Node, values: list, results) -> Node:
+        """values 안의 자식 자리에 results 를 넣는다 (제자리에 쓰거나, _copy_on_write 면 새 노드로)"""
+        new_values = []
+        for value in values:
+            if isinstance(value, Node):
+                value = next(results)
+            elif isinstance(value, (list, tuple)):
+                value = self._replace_items(value, results)
+            new_values.append(value)
+        if self._copy_on_write:
+            new = type(node)(*new_values)
+            if node.span:
+                new.span = node.span
+            return new
+        for name, old, new in zip(_field_names(type(node)), values, new_values):
+            if new is not old:
+                setattr(node, name, new)
+        return node
+
+    @staticmethod
+    def _replace_items(value, results):
+        result = []
+        for item in value:
+            if isinstance(item, Node):
+                new = next(results)
+                if type(value) is list:
+                    if new is None:
+                        continue
+                    if isinstance(new, list):
+                        result += new
+                        continue
+                item = new
+            elif isinstance(item, tuple):
+                new = tuple([next(results) if isinstance(x, Node) else x for x in item])
+                if not all(map(_is, new, item)):
+                    item = new
+            result.append(item)
+        if len(result) == len(value) and all(map(_is, result, value)):
+            return value
+        return result if type(value) is list else tuple(result)
+
+class CopyTransformer(NodeTransformer):
+    """
+    원래 트리를 고치지 않는 후위 NodeTransformer (상수 접기처럼 아래에서 위로 바꾸는 패스용).
+    - visit_<클래스 이름> 은 자식을 다 바꾼 뒤의 노드를 받는다 (generic_visit 을 부를 필요가 없다)
+    - 자식이 바뀐 노드는 span 을 물려받은 새 노드로 만들고, 안 바뀐 서브트리는 그대로 같이 쓴다
+    그래서 Parser(hash_cons=...) 의 공유 노드도 안전하고, 트리가 아무리 깊어도 재귀하지 않는다.
+    """
+    _copy_on_write = True
+
+    def visit(self, node):
+        return self._rewrite(node, True)
+
 # AST를 예쁘게 출력하는 함수들
+#
+# 재귀 호출 대신 작업 목록으로 줄을 만든다 (_ast_lines).
+# 노드 하나를 펼치면 "완성된 줄(str)" 과 "더 펼칠 자식 (종류, 노드, 들여쓰기)" 이 섞인 목록이 나오고,
+# 그걸 거꾸로 쌓아 두고 하나씩 꺼내므로 트리가 아무리 깊어도 파이썬 스택은 늘지 않는다.
+# 노드 하나를 펼치는 일은 방문자가 한다: visit_X(node, indent) -> 목록
+
+_EXPR = 0
+_STMT = 1
+
+class _ExprParts(NodeVisitor):
+    def visit_Number(self, node: Number, indent: int) -> list:
+        return [f"{' ' * indent}Number(value={node.value})"]
+
+    def visit_Name(self, node: Name, indent: int) -> list:
+        return [f"{' ' * indent}Name(id={node.id!r})"]
+
+    def visit_BinOp(self, node: BinOp, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}BinOp(op={node.op!r})",
+            f"{space} left:", (_EXPR, node.left, inner),
+            f"{space} right:", (_EXPR, node.right, inner),
+        ]
+
+    def visit_Compare(self, node: Compare, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}Compare(ops={node.ops!r})",
+            f"{space} left:", (_EXPR, node.left, inner),
+            f"{space} comparators:", *[(_EXPR, c, inner) for c in node.comparators],
+        ]
+
+    def visit_IfExpr(self, node: IfExpr, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}IfExpr",
+            f"{space} body:", (_EXPR, node.body, inner),
+            f"{space} test:", (_EXPR, node.test, inner),
+            f"{space} orelse:", (_EXPR, node.orelse, inner),
+        ]
 
-def print_expr(node: Expr, indent: int = 0):
-    space = " " * indent
-    if isinstance(node, Number):
-        print(f"{space}Number(value={node.value})")
-    elif isinstance(node, Name):
-        print(f"{space}Name(id={node.id!r})")
-    elif isinstance(node, BinOp):
-        print(f"{space}BinOp(op={node.op!r})")
-        print(f"{space} left:")
-        print_expr(node.left, indent + 2)
-        print(f"{space} right:")
-        print_expr(node.right, indent + 2)
-    elif isinstance(node, Compare):
-        print(f"{space}Compare(ops={node.ops!r})")
-        print(f"{space} left:")
-        print_expr(node.left, indent + 2)
-        print(f"{space} comparators:")
-        for c in node.comparators:
-            print_expr(c, indent + 2)
-    elif isinstance(node, IfExpr):
-        print(f"{space}IfExpr")
-        print(f"{space} body:")
-        print_expr(node.body, indent + 2)
-        print(f"{space} test:")
-        print_expr(node.test, indent + 2)
-        print(f"{space} orelse:")
-        print_expr(node.orelse, indent + 2)
-    elif isinstance(node, NamedExpr):
-        print(f"{space}NamedExpr")
-        print(f"{space} target:")
-        print_expr(node.target, indent + 2)
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-    elif isinstance(node, Call):
-        print(f"{space}Call")
-        print(f"{space} func:")
-        print_expr(node.func, indent + 2)
-        print(f"{space} args:")
-        for a in node.args:
-            print_expr(a, indent + 2)
+    def visit_NamedExpr(self, node: NamedExpr, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}NamedExpr",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+
+    def visit_Call(self, node: Call, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        parts = [
+            f"{space}Call",
+            f"{space} func:", (_EXPR, node.func, inner),
+            f"{space} args:", *[(_EXPR, a, inner) for a in node.args],
+        ]
         if node.keywords:
-            print(f"{space} keywords:")
+            parts.append(f"{space} keywords:")
             for k, v in node.keywords:
-                print(f"{space}  {k}=")
-                print_expr(v, indent + 4)
-    elif isinstance(node, String):
-        print(f"{space}String(value={node.value!r})")
-    elif isinstance(node, Bool):
-        print(f"{space}Bool(value={node.value})")
-    elif isinstance(node, NoneLiteral):
-        print(f"{space}NoneLiteral()")
-    elif isinstance(node, UnaryOp):
-        print(f"{space}UnaryOp(op={node.op!r})")
-        print(f"{space} operand:")
-        print_expr(node.operand, indent + 2)
-    elif isinstance(node, ListLiteral):
-        print(f"{space}ListLiteral")
-        for e in node.elements:
-            print_expr(e, indent + 2)
-    elif isinstance(node, TupleLiteral):
-        print(f"{space}TupleLiteral")
-        for e in node.elements:
-            print_expr(e, indent + 2)
-    elif isinstance(node, SetLiteral):
-        print(f"{space}SetLiteral")
-        for e in node.elements:
-            print_expr(e, indent + 2)
-    elif isinstance(node, DictLiteral):
-        print(f"{space}DictLiteral")
+                parts += (f"{space}  {k}=", (_EXPR, v, indent + 4))
+        return parts
+
+    def visit_String(self, node: String, indent: int) -> list:
+        return [f"{' ' * indent}String(value={node.value!r})"]
+
+    def visit_Bool(self, node: Bool, indent: int) -> list:
+        return [f"{' ' * indent}Bool(value={node.value})"]
+
+    def visit_NoneLiteral(self, node: NoneLiteral, indent: int) -> list:
+        return [f"{' ' * indent}NoneLiteral()"]
+
+    def visit_UnaryOp(self, node: UnaryOp, indent: int) -> list:
+        space = " " * indent
+        return [
+            f"{space}UnaryOp(op={node.op!r})",
+            f"{space} operand:", (_EXPR, node.operand, indent + 2),
+        ]
+
+    def visit_ListLiteral(self, node: ListLiteral, indent: int) -> list:
+        return [f"{' ' * indent}ListLiteral", *[(_EXPR, e, indent + 2) for e in node.elements]]
+
+    def visit_TupleLiteral(self, node: TupleLiteral, indent: int) -> list:
+        return [f"{' ' * indent}TupleLiteral", *[(_EXPR, e, indent + 2) for e in node.elements]]
+
+    def visit_SetLiteral(self, node: SetLiteral, indent: int) -> list:
+        return [f"{' ' * indent}SetLiteral", *[(_EXPR, e, indent + 2) for e in node.elements]]
+
+    def visit_DictLiteral(self, node: DictLiteral, indent: int) -> list:
+        space = " " * indent
+        parts = [f"{space}DictLiteral"]
         for k , v in node.items:
-            print(f"{space} key:")
-            print_expr(k, indent + 4)
-            print(f"{space} value:")
-            print_expr(v, indent + 4)
-    elif isinstance(node, Attribute):
-        print(f"{space}Attribute(attr={node.attr!r})")
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-    elif isinstance(node, Index):
-        print(f"{space}Index")
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-        print(f"{space} index:")
-        print_expr(node.index, indent + 2)
-    elif isinstance(node, Slice):
-        print(f"{space}Slice")
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-
-        def _p(label: str, n: Optional[Expr]):
-            print(f"{space} {label}:")
-            if n is None:
-                print(f"{space} None")
-            else:
-                print_expr(n, indent + 2)
-        
-        _p("start", node.start)
-        _p("stop", node.stop)
-        _p("step", node.step)
-    else:
-        print(f"{space}<Unknown Expr {node}>")
-
-def print_stmt(node: Stmt, indent: int = 0):
-    space = " " * indent
-    if isinstance(node, Assign):
-        print(f"{space}Assign")
-        print(f"{space} target:")
-        print_expr(node.target, indent + 2)
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-    elif isinstance(node, ChainedAssign):
-        print(f"{space}ChainedAssign")
-        print(f"{space} targets:")
-        for t in node.targets:
-            print_expr(t, indent + 2)
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-    elif isinstance(node, ExprStmt):
-        print(f"{space}ExprStmt")
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-    elif isinstance(node, AugAssign):
-        print(f"{space}AugAssign(op={node.op!r})")
-        print(f"{space} target:")
-        print_expr(node.target, indent + 2)
-        print(f"{space} value:")
-        print_expr(node.value, indent + 2)
-    elif isinstance(node, If):
-        print(f"{space}If")
-        print(f"{space} test:")
-        print_expr(node.test, indent + 2)
-        print(f"{space} body:")
-        for s in node.body:
-            print_stmt(s, indent + 2)
+            parts += (f"{space} key:", (_EXPR, k, indent + 4), f"{space} value:", (_EXPR, v, indent + 4))
+        return parts
+
+    def visit_Attribute(self, node: Attribute, indent: int) -> list:
+        space = " " * indent
+        return [
+            f"{space}Attribute(attr={node.attr!r})",
+            f"{space} value:", (_EXPR, node.value, indent + 2),
+        ]
+
+    def visit_Index(self, node: Index, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}Index",
+            f"{space} value:", (_EXPR, node.value, inner),
+            f"{space} index:", (_EXPR, node.index, inner),
+        ]
+
+    def visit_Slice(self, node: Slice, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        parts = [f"{space}Slice", f"{space} value:", (_EXPR, node.value, inner)]
+        for label, n in (("start", node.start), ("stop", node.stop), ("step", node.step)):
+            parts.append(f"{space} {label}:")
+            parts.append(f"{space} None" if n is None else (_EXPR, n, inner))
+        return parts
+
+    def generic_visit(self, node, indent: int) -> list:
+        return [f"{' ' * indent}<Unknown Expr {node}>"]
+
+class _StmtParts(NodeVisitor):
+    def visit_Assign(self, node: Assign, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}Assign",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+
+    def visit_ChainedAssign(self, node: ChainedAssign, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}ChainedAssign",
+            f"{space} targets:", *[(_EXPR, t, inner) for t in node.targets],
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+
+    def visit_ExprStmt(self, node: ExprStmt, indent: int) -> list:
+        space = " " * indent
+        return [f"{space}ExprStmt", f"{space} value:", (_EXPR, node.value, indent + 2)]
+
+    def visit_AugAssign(self, node: AugAssign, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}AugAssign(op={node.op!r})",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+
+    def visit_If(self, node: If, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        parts = [
+            f"{space}If",
+            f"{space} test:", (_EXPR, node.test, inner),
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
         if node.orelse:
-            print(f"{space} orelse:")
-            for s in node.orelse:
-                print_stmt(s, indent + 2)
-    elif isinstance(node, While):
-        print(f"{space}While")
-        print(f"{space} test:")
-        print_expr(node.test, indent + 2)
-        print(f"{space} body:")
-        for s in node.body:
-            print_stmt(s, indent + 2)
-    elif isinstance(node, For):
-        print(f"{space}For")
-        print(f"{space} target:")
-        print_expr(node.target, indent + 2)
-        print(f"{space} iter:")
-        print_expr(node.iter, indent + 2)
-        print(f"{space} body:")
-        for s in node.body:
-            print_stmt(s, indent + 2)
-    elif isinstance(node, With):
-        print(f"{space}With")
-        print(f"{space} items:")
+            parts.append(f"{space} orelse:")
+            parts += [(_STMT, s, inner) for s in node.orelse]
+        return parts
+
+    def visit_While(self, node: While, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}While",
+            f"{space} test:", (_EXPR, node.test, inner),
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
+
+    def visit_For(self, node: For, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        return [
+            f"{space}For",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} iter:", (_EXPR, node.iter, inner),
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
+
+    def visit_With(self, node: With, indent: int) -> list:
+        space = " " * indent
+        parts = [f"{space}With", f"{space} items:"]
         for it in node.items:
-            print(f"{space}  WithItem")
-            print(f"{space}   context_expr:")
-            print_expr(it.context_expr, indent + 4)
+            parts += (f"{space}  WithItem", f"{space}   context_expr:", (_EXPR, it.context_expr, indent + 4))
             if it.optional_vars is not None:
-                print(f"{space}   optional_vars:")
-                print_expr(it.optional_vars, indent + 4)
-        print(f"{space} body:")
-        for s in node.body:
-            print_stmt(s, indent + 2)
-    elif isinstance(node, Break):
-        print(f"{space}Break")
-    elif isinstance(node, Continue):
-        print(f"{space}Continue")
-    elif isinstance(node, Pass):
-        print(f"{space}Pass")
-    elif isinstance(node, Return):
-        print(f"{space}Return")
-        if node.value is not None:
-            print_expr(node.value, indent + 2)
-    elif isinstance(node, FunctionDef):
+                parts += (f"{space}   optional_vars:", (_EXPR, it.optional_vars, indent + 4))
+        parts.append(f"{space} body:")
+        parts += [(_STMT, s, indent + 2) for s in node.body]
+        return parts
+
+    def visit_Break(self, node: Break, indent: int) -> list:
+        return [f"{' ' * indent}Break"]
+
+    def visit_Continue(self, node: Continue, indent: int) -> list:
+        return [f"{' ' * indent}Continue"]
+
+    def visit_Pass(self, node: Pass, indent: int) -> list:
+        return [f"{' ' * indent}Pass"]
+
+    def visit_Return(self, node: Return, indent: int) -> list:
+        space = " " * indent
+        if node.value is None:
+            return [f"{space}Return"]
+        return [f"{space}Return", (_EXPR, node.value, indent + 2)]
+
+    def visit_FunctionDef(self, node: FunctionDef, indent: int) -> list:
+        space = " " * indent
         args = []
         for p in node.args:
             if p.default is None:
                 args.append(p.name)
             else:
                 args.append(f"{p.name}=...")
-        print(f"{space}FunctionDef(name={node.name!r}, args={args})")
-        print(f"{space} body:")
-        for s in node.body:
-            print_stmt(s, indent + 2)
-    elif isinstance(node, ClassDef):
+        return [
+            f"{space}FunctionDef(name={node.name!r}, args={args})",
+            f"{space} body:", *[(_STMT, s, indent + 2) for s in node.body],
+        ]
+
+    def visit_ClassDef(self, node: ClassDef, indent: int) -> list:
+        space = " " * indent
         bases = []
         for b in node.bases:
             bases.append(type(b).__name__)
-        print(f"{space}ClassDef(name={node.name!r}, bases={bases})")
-        print(f"{space} body:")
-        for s in node.body:
-            print_stmt(s, indent + 2)
-    elif isinstance(node, Import):
-        print(f"{space}Import(names={node.names})")
-    elif isinstance(node, FromImport):
-        print(f"{space}FromImport(module={node.module!r}, names={node.names})")
-    elif isinstance(node, Raise):
-        print(f"{space}Raise")
-        if node.exc is not None:
-            print_expr(node.exc, indent + 2)
-    elif isinstance(node, Try):
-        print(f"{space}Try")
-        print(f"{space} body:")
-        for s in node.body:
-            print_stmt(s, indent + 2)
-        print(f"{space} handlers:")
+        return [
+            f"{space}ClassDef(name={node.name!r}, bases={bases})",
+            f"{space} body:", *[(_STMT, s, indent + 2) for s in node.body],
+        ]
+
+    def visit_Import(self, node: Import, indent: int) -> list:
+        return [f"{' ' * indent}Import(names={node.names})"]
+
+    def visit_FromImport(self, node: FromImport, indent: int) -> list:
+        return [f"{' ' * indent}FromImport(module={node.module!r}, names={node.names})"]
+
+    def visit_Raise(self, node: Raise, indent: int) -> list:
+        space = " " * indent
+        if node.exc is None:
+            return [f"{space}Raise"]
+        return [f"{space}Raise", (_EXPR, node.exc, indent + 2)]
+
+    def visit_Try(self, node: Try, indent: int) -> list:
+        space = " " * indent
+        inner = indent + 2
+        parts = [f"{space}Try", f"{space} body:", *[(_STMT, s, inner) for s in node.body], f"{space} handlers:"]
         for h in node.handlers:
             h_type = None if h.type is None else type(h.type).__name__
-            print(f"{space}  ExceptHandler(type={h_type}, name={h.name!r})")
+            parts.append(f"{space}  ExceptHandler(type={h_type}, name={h.name!r})")
             if h.type is not None:
-                print(f"{space}   type_expr:")
-                print_expr(h.type, indent + 4)
-            print(f"{space}   body:")
-            for s in h.body:
-                print_stmt(s, indent + 4)
+                parts += (f"{space}   type_expr:", (_EXPR, h.type, indent + 4))
+            parts.append(f"{space}   body:")
+            parts += [(_STMT, s, indent + 4) for s in h.body]
         if node.orelse:
-            print(f"{space} orelse:")
-            for s in node.orelse:
-                print_stmt(s, indent + 2)
+            parts.append(f"{space} orelse:")
+            parts += [(_STMT, s, inner) for s in node.orelse]
         if node.finalbody:
-            print(f"{space} finalbody:")
-            for s in node.finalbody:
-                print_stmt(s, indent + 2)
+            parts.append(f"{space} finalbody:")
+            parts += [(_STMT, s, inner) for s in node.finalbody]
+        return parts
+
+    def generic_visit(self, node, indent: int) -> list:
+        return [f"{' ' * indent}<Unknown Stmt {node!r}>"]
+
+# _EXPR / _STMT 로 고르는 방문자와 그 표
+_PARTS = (_ExprParts(), _StmtParts())
+_PART_TABLES = (_ExprParts.visit_table, _StmtParts.visit_table)
+
+def _ast_lines(kind: int, node: Node, indent: int):
+    """node 를 출력할 줄들을 차례로 내놓는다 (kind: _EXPR 또는 _STMT)"""
+    work: list = [(kind, node, indent)]
+    while work:
+        item = work.pop()
+        if type(item) is str:
+            yield item
+            continue
+        kind, node, indent = item
+        visitor = _PARTS[kind]
+        method = _PART_TABLES[kind].get(type(node)) or visitor.visit_method(type(node))
+        work.extend(reversed(method(visitor, node, indent)))
+
+def iter_ast_lines(node: Node, indent: int = 0):
+    """
+    print_program 의 tree 형식으로 출력할 줄들을 (줄바꿈 없이) 차례로 내놓는다.
+    Program 이면 "Program" 줄 뒤에 문장들을 한 칸 들여서, 아니면 node 하나를 indent 칸 들여서.
+    """
+    if isinstance(node, Program):
+        yield "Program"
+        for stmt in node.body:
+            yield from _ast_lines(_STMT, stmt, 1)
     else:
-        print(f"{space}<Unknown Stmt {node!r}>")
-
-def print_program(prog: Program):
-    print("Program")
-    for stmt in prog.body:
-        print_stmt(stmt, indent=1)
-
+        yield from _ast_lines(_STMT if isinstance(node, Stmt) else _EXPR, node, indent)
+
+# dump_ast 가 아는 출력 형식
+AST_FORMATS = ("tree", "jsonl", "sexp")
+
+# 조각이 이만큼 모이면 file.write 한 번으로 내보낸다
+_DUMP_PIECES = 4096
+
+# jsonl 의 span 길이 (span_start 와 짝)
+_SPAN_MASK = (1 << SPAN_SHIFT) - 1
+
+def dump_ast(node: Node, file: TextIO | None = None, format: str = "tree") -> None:
+    """
+    node (Program, 문장, 식) 를 글자 싱크 file 에 쓴다 (None 이면 sys.stdout).
+    줄마다 print 하지 않고 조각을 모아 두었다가 write 한 번으로 내보낸다.
+    - tree:  print_program 의 들여쓴 트리 (노드마다 여러 줄)
+    - jsonl: 최상위 문장 하나가 JSON 한 줄. {"_type": 클래스 이름, "span": [시작, 길이], 필드: 값, ...}
+             (span 은 있을 때만. 클래스 이름 키는 필드 이름(ExceptHandler.type)과 겹치지 않게 _ 로 시작한다)
+    - sexp:  최상위 문장 하나가 S-식 한 줄. (클래스 이름 :필드 값 ...), 리스트는 (...), 쌍은 (a . b),
+             None/참/거짓은 nil/#t/#f
+    Program 이 아닌 노드는 그 노드 하나가 한 줄이다 (jsonl, sexp).
+    """
+    if format == "tree":
+        if isinstance(node, Program):
+            pieces = _tree_pieces(node.body, 1, "Program\n")
+        else:
+            pieces = _tree_pieces([node], 0, "")
+    elif format == "jsonl" or format == "sexp":
+        pieces = _line_pieces(node.body if isinstance(node, Program) else [node], format == "jsonl")
+    else:
+        raise ValueError(f"모르는 AST 출력 형식입니다: {format!r} (가능한 것: {', '.join(AST_FORMATS)})")
+    _write_pieces(pieces, file)
+
+def _tree_pieces(nodes: list, indent: int, head: str):
+    if head:
+        yield head
+    for node in nodes:
+        for line in _ast_lines(_STMT if isinstance(node, Stmt) else _EXPR, node, indent):
+            yield line
+            yield "\n"
+
+# 값 하나를 JSON 으로 (한글은 그대로)
+_json_value = json.JSONEncoder(ensure_ascii=False).encode
+
+def _sexp_value(value) -> str:
+    if value is None:
+        return "nil"
+    if value is True:
+        return "#t"
+    if value is False:
+        return "#f"
+    if type(value) is str:
+        return _json_value(value)
+    return repr(value)
+
+def _line_pieces(nodes: list, as_json: bool):
+    """노드마다 한 줄 (jsonl 또는 sexp). 재귀 대신 작업 목록이라 식이 아주 깊어도 된다"""
+    scalar = _json_value if as_json else _sexp_value
+    sep = ", " if as_json else " "
+
+    def piece(value):
+        # 노드/리스트/쌍은 작업 목록에서 펼치고, 나머지 값은 바로 글자로 (작업 목록의 str 은 완성된 조각이다)
+        return value if isinstance(value, (Node, list, tuple)) else scalar(value)
+
+    for node in nodes:
+        work: list = [node]
+        while work:
+            item = work.pop()
+            if type(item) is str:
+                yield item
+                continue
+            if isinstance(item, Node):
+                cls = type(item)
+                if as_json:
+                    parts = ['{"_type": "', cls.__name__, '"']
+                    span = item.span
+                    if span:
+                        parts.append(f', "span": [{span_start(span)}, {span & _SPAN_MASK}]')
+                    for name in _field_names(cls):
+                        parts += (f', "{name}": ', piece(getattr(item, name)))
+                    parts.append("}")
+                else:
+                    parts = ["(", cls.__name__]
+                    for name in _field_names(cls):
+                        parts += (f" :{name} ", piece(getattr(item, name)))
+                    parts.append(")")
+            elif not as_json and type(item) is tuple and len(item) == 2:
+                parts = ["(", piece(item[0]), " . ", piece(item[1]), ")"]
+            else:
+                parts = ["[" if as_json else "("]
+                for k, value in enumerate(item):
+                    if k:
+                        parts.append(sep)
+                    parts.append(piece(value))
+                parts.append("]" if as_json else ")")
+            work.extend(reversed(parts))
+        yield "\n"
+
+def _write_pieces(pieces, file: TextIO | None) -> None:
+    """조각들을 _DUMP_PIECES 개씩 이어 붙여 file (None 이면 sys.stdout) 에 쓴다"""
+    if file is None:
+        file = sys.stdout
+    buffer: list[str] = []
+    for piece in pieces:
+        buffer.append(piece)
+        if len(buffer) >= _DUMP_PIECES:
+            file.write("".join(buffer))
+            buffer.clear()
+    if buffer:
+        file.write("".join(buffer))
+
+def print_expr(node: Expr, indent: int = 0, file: TextIO | None = None):
+    _write_pieces(_tree_pieces([node], indent, ""), file)
+
+def print_stmt(node: Stmt, indent: int = 0, file: TextIO | None = None):
+    _write_pieces(_tree_pieces([node], indent, ""), file)
+
+def print_program(prog: Program, file: TextIO | None = None, format: str = "tree"):
+    dump_ast(prog, file, format)
 
 # 여기서 실제로 AST 만들어 보기
 
@@ -0,0 +1,508 @@
+# astbin_demo.py
+#
+# Program AST 를 작은 바이너리로 저장하고 다시 읽는 형식 (파싱 결과 캐시용)
+#
+# 린터, 채점기, 개요 보기처럼 같은 파일의 AST 를 여러 번 쓰는 도구가
+# 다시 렉싱/파싱하지 않고 저장해 둔 AST 를 바로 읽어 들이게 한다.
+#
+# 형식 (정수는 모두 LEB128 varint: 7비트씩, 위 비트가 1 이면 다음 바이트가 이어진다)
+#
+#     머리:   MAGIC(4) | FORMAT_VERSION(1) | 스키마 지문 crc32(4, little endian)
+#     문장:   varint n (>0) | 최상위 문장 하나를 담은 n 바이트 | 그 n 바이트의 crc32(4)
+#     끝:     0 | Program span | span 바이트의 crc32(4)
+#
+# crc32 는 캐시 파일이 깨졌을 때 다른 AST 로 조용히 읽히지 않게 한다 (바이트 하나가 바뀐 것은 늘 잡힌다).
+#
+# 문장 바이트는 노드를 후위 순회 순서로 늘어놓은 것이다. 노드 하나는
+#
+#     종류 번호(1) | span | [자식 노드 수] | 필드 칸들 (스키마 순서)
+#
+# 이고, 자식 노드들은 그 앞에 이미 나와 있다. 읽는 쪽은 스택 하나로 자식을 모아 두었다가
+# 부모를 만날 때 꺼내 쓰므로, 재귀 없이 바이트를 한 번 훑으면서 노드를 바로 만든다.
+# - span:     0 이면 없음. 아니면 varint (길이 + 1), varint (시작 - 앞 노드 시작) 의 zigzag
+# - 자식 수:  선택 자식이나 리스트 필드가 있는 종류만 적는다 (나머지는 스키마로 정해진다)
+# - 값:       값 표 번호. 처음 나오는 값이면 번호가 표 길이와 같고, 바로 뒤에 값이 따라온다
+#             (태그 1바이트 + 내용). 문자열 표가 스트림과 함께 자라므로 미리 모아 둘 필요가 없다.
+# - 선택 자식 / 쌍 리스트의 노드 칸: 있으면 1, 없으면 0
+# - 리스트:   varint (개수 + 1), None 이면 0. 값 리스트는 값 번호들이 뒤따른다
+#
+# 노드 종류와 필드 배치는 arena_demo 의 공개 스키마 (NODE_TYPES, NODE_SCHEMAS, FIELD_*) 를 그대로 쓴다.
+# ast_demo 의 노드나 칸 종류 번호가 바뀌면 스키마 지문이 달라지므로 옛 캐시는 ValueError 로 거부된다.
+#
+# 사용 예:
+#     data = dumps_program(program)
+#     assert loads_program(data) == program
+#
+#     with open("a.hast", "wb") as fp:
+#         with AstWriter(fp) as writer:
+#             for stmt in Parser(tokens, spans).iter_statements():
+#                 writer.write(stmt)
+
+from struct import Struct
+from typing import BinaryIO, Iterator
+from io import BytesIO
+from zlib import crc32
+
+from arena_demo import (
+    NODE_TYPES, NODE_SCHEMAS, FIELD_KINDS, FIELD_NODE, FIELD_OPT_NODE, FIELD_VALUE, FIELD_NODE_LIST, FIELD_VALUE_LIST,
+)
+from ast_demo import Node, Program, Stmt
+from lexer_demo import SPAN_SHIFT
+
+MAGIC = b"HAST"
+FORMAT_VERSION = 2
+
+# 종류 번호는 한 바이트에 들어가야 한다
+assert len(NODE_TYPES) < 0x80
+
+_SPAN_MASK = (1 << SPAN_SHIFT) - 1
+_FLOAT = Struct("<d")
+_CRC = Struct("<I")
+
+# 스키마 지문: 칸 종류 번호의 뜻, 노드 이름과 필드 배치가 같을 때만 같은 값
+SCHEMA_CRC = crc32(repr((
+    list(enumerate(FIELD_KINDS)),
+    [(cls.__name__, schema) for cls, schema in zip(NODE_TYPES, NODE_SCHEMAS)],
+)).encode())
+
+# 값 태그
+(_TAG_NONE, _TAG_FALSE, _TAG_TRUE, _TAG_STR, _TAG_INT, _TAG_NEG_INT, _TAG_FLOAT) = range(7)
+
+# 종류 번호 -> 그 노드에서 필드 칸만 뽑은 것 ((칸 종류, 쌍 원소 칸 종류) 들)
+_PLANS: list[tuple[tuple[int, tuple[int, ...]], ...]] = [
+    tuple((kind, elems) for _, kind, elems in schema) for schema in NODE_SCHEMAS
+]
+# 종류 번호 -> 자식 노드 수 (필드가 노드 칸뿐이면 정해져 있고, 아니면 -1 로 스트림에 적는다)
+_FIXED: list[int] = [
+    sum(1 for kind, _ in plan if kind == FIELD_NODE) if all(kind in (FIELD_NODE, FIELD_VALUE) for kind, _ in plan) else -1
+    for plan in _PLANS
+]
+_KIND_OF: dict[type, int] = {cls: code for code, cls in enumerate(NODE_TYPES)}
+
+def _put_varint(out: bytearray, v: int) -> None:
+    while v >= 0x80:
+        out.append((v & 0x7F) | 0x80)
+        v >>= 7
+    out.append(v)
+
+def _get_varint(data: bytes, pos: int, first: int) -> tuple[int, int]:
+    """first 는 이미 읽은 첫 바이트(0x80 이상). (값, 다음 위치)"""
+    v = first & 0x7F
+    shift = 7
+    while True:
+        b = data[pos]
+        pos += 1
+        v |= (b & 0x7F) << shift
+        if b < 0x80:
+            return v, pos
+        shift += 7
+
+# ======================
+#  쓰기
+# ======================
+
+class AstWriter:
+    """
+    AST 를 바이너리 싱크(fp.write 가 있는 것)에 최상위 문장 하나씩 써 나간다.
+    머리는 만들 때 쓰고, close 가 끝 표시와 Program span 을 쓴다 (with 문을 쓰면 자동).
+    """
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self._index: dict[tuple, int] = {}  # 값 -> 값 표 번호
+        self._prev = 0  # 앞 노드의 span 시작
+        fp.write(MAGIC + bytes([FORMAT_VERSION]) + _CRC.pack(SCHEMA_CRC))
+
+    def __enter__(self) -> "AstWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def write(self, stmt: Stmt) -> None:
+        """최상위 문장 하나 (미뤄 둔 함수/클래스 본문은 이때 파싱된다)"""
+        out = bytearray()
+        self._encode(stmt, out)
+        head = bytearray()
+        _put_varint(head, len(out))
+        self.fp.write(head + out + _CRC.pack(crc32(out)))
+
+    def close(self, span: int = 0) -> None:
+        """끝 표시와 Program span 을 쓴다"""
+        out = bytearray()
+        self._put_span(out, span)
+        self.fp.write(b"\0" + out + _CRC.pack(crc32(out)))
+
+    def _put_span(self, out: bytearray, span: int) -> None:
+        if not span:
+            out.append(0)
+            return
+        start = span >> SPAN_SHIFT
+        delta = start - self._prev
+        self._prev = start
+        _put_varint(out, (span & _SPAN_MASK) + 1)
+        _put_varint(out, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+
+    def _put_value(self, out: bytearray, value) -> None:
+        # 1 == 1.0 == True 이고 0.0 == -0.0 이라 값만으로는 표 키가 겹친다 (AstArena._value 와 같다)
+        kind = type(value)
+        key = (kind, value.hex() if kind is float else value)
+        index = self._index.get(key)
+        if index is not None:
+            if index < 0x80:
+                out.append(index)
+            else:
+                _put_varint(out, index)
+            return
+        index = self._index[key] = len(self._index)
+        _put_varint(out, index)
+        if value is None:
+            out.append(_TAG_NONE)
+        elif kind is bool:
+            out.append(_TAG_TRUE if value else _TAG_FALSE)
+        elif kind is str:
+            raw = value.encode("utf-8", "surrogatepass")
+            out.append(_TAG_STR)
+            _put_varint(out, len(raw))
+            out += raw
+        elif kind is int:
+            out.append(_TAG_INT if value >= 0 else _TAG_NEG_INT)
+            _put_varint(out, abs(value))
+        elif kind is float:
+            out.append(_TAG_FLOAT)
+            out += _FLOAT.pack(value)
+        else:
+            raise TypeError(f"저장할 수 없는 값입니다: {value!r}")
+
+    def _encode(self, node: Node, out: bytearray) -> None:
+        """node 서브트리를 후위 순회로 쓴다. 재귀 대신 작업 목록을 쓰므로 식이 아주 깊어도 된다"""
+        put_value, put_span = self._put_value, self._put_span
+        # (노드, None, 0) 은 펼칠 차례, (노드, 필드 값들, 자식 수) 는 자식을 다 쓰고 머리를 쓸 차례
+        work: list = [(node, None, 0)]
+        while work:
+            node, values, count = work.pop()
+            if values is None:
+                code = _KIND_OF.get(type(node))
+                if code is None:
+                    raise TypeError(f"저장할 수 없는 노드입니다: {node!r}")
+                schema = NODE_SCHEMAS[code]
+                values = [getattr(node, name) for name, _, _ in schema]
+                kids = []
+                for (_, kind, elems), v in zip(schema, values):
+                    if v is None or kind == FIELD_VALUE or kind == FIELD_VALUE_LIST:
+                        continue
+                    if kind == FIELD_NODE or kind == FIELD_OPT_NODE:
+                        kids.append(v)
+                    elif kind == FIELD_NODE_LIST:
+                        kids += v
+                    else:
+                        for pair in v:
+                            kids += [e for ekind, e in zip(elems, pair) if ekind != FIELD_VALUE and e is not None]
+                work.append((node, values, len(kids)))
+                work += [(kid, None, 0) for kid in reversed(kids)]
+                continue
+            code = _KIND_OF[type(node)]
+            out.append(code)
+            put_span(out, node.span)
+            plan = _PLANS[code]
+            if _FIXED[code] < 0:
+                _put_varint(out, count)
+            for (kind, elems), v in zip(plan, values):
+                if kind == FIELD_NODE:
+                    continue
+                if kind == FIELD_VALUE:
+                    put_value(out, v)
+                elif kind == FIELD_OPT_NODE:
+                    out.append(v is not None)
+                elif v is None:
+                    out.append(0)
+                else:
+                    _put_varint(out, len(v) + 1)
+                    if kind == FIELD_VALUE_LIST:
+                        for item in v:
+                            put_value(out, item)
+                    elif kind != FIELD_NODE_LIST:
+                        for pair in v:
+                            for ekind, e in zip(elems, pair):
+                                if ekind == FIELD_VALUE:
+                                    put_value(out, e)
+                                else:
+                                    out.append(e is not None)
+
+def dump_program(program: Program, fp: BinaryIO) -> None:
+    """program 을 fp 에 바이너리로 쓴다"""
+    writer = AstWriter(fp)
+    for stmt in program.body:
+        writer.write(stmt)
+    writer.close(program.span)
+
+def dumps_program(program: Program) -> bytes:
+    fp = BytesIO()
+    dump_program(program, fp)
+    return fp.getvalue()
+
+# ======================
+#  읽기
+# ======================
+
+class AstReader:
+    """
+    AstWriter 가 쓴 바이너리를 최상위 문장 하나씩 읽는다 (이터레이터).
+    다 읽고 나면 span 에 Program span 이 들어 있다.
+    """
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self.span = 0
+        self._values: list = []
+        self._prev = 0
+        head = fp.read(9)
+        if len(head) < 9 or head[:4] != MAGIC:
+            raise ValueError("한글 AST 바이너리 파일이 아닙니다.")
+        if head[4] != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 형식 버전입니다: {head[4]} (이 버전은 {FORMAT_VERSION})")
+        if _CRC.unpack_from(head, 5)[0] != SCHEMA_CRC:
+            raise ValueError("AST 노드 정의가 바뀌어 이 캐시를 읽을 수 없습니다. 다시 파싱해 주세요.")
+
+    def __iter__(self) -> Iterator[Stmt]:
+        read = self.fp.read
+        while True:
+            size = self._read_varint()
+            if size == 0:
+                break
+            data = read(size + 4)
+            if len(data) != size + 4:
+                raise ValueError("AST 바이너리가 중간에 끊겼습니다.")
+            data, check = data[:size], data[size:]
+            if _CRC.unpack(check)[0] != crc32(data):
+                raise ValueError("AST 바이너리의 문장 바이트가 깨졌습니다 (crc32 가 다릅니다).")
+            try:
+                stmt = self._decode(data)
+            except IndexError:
+                raise ValueError("AST 바이너리의 문장 바이트가 깨졌습니다.") from None
+            yield stmt
+        data = read()
+        if len(data) < 5:
+            raise ValueError("AST 바이너리가 중간에 끊겼습니다.")
+        data, check = data[:-4], data[-4:]
+        if _CRC.unpack(check)[0] != crc32(data):
+            raise ValueError("AST 바이너리 끝부분이 깨졌거나 뒤에 알 수 없는 바이트가 있습니다.")
+        try:
+            span, end = self._read_span(data, 0)
+        except IndexError:
+            raise ValueError("AST 바이너리가 중간에 끊겼습니다.") from None
+        if end != len(data):
+            raise ValueError("AST 바이너리 끝에 알 수 없는 바이트가 있습니다.")
+        self.span = span
+
+    def _read_varint(self) -> int:
+        read = self.fp.read
+        v = shift = 0
+        while True:
+            b = read(1)
+            if not b:
+                raise ValueError("AST 바이너리가 중간에 끊겼습니다.")
+            v |= (b[0] & 0x7F) << shift
+            if b[0] < 0x80:
+                return v
+            shift += 7
+
+    def _read_span(self, data: bytes, pos: int) -> tuple[int, int]:
+        """Program span 하나 (_decode 안의 span 읽기와 같다). (span, 다음 위치)"""
+        b = data[pos]
+        pos += 1
+        if not b:
+            return 0, pos
+        if b >= 0x80:
+            b, pos = _get_varint(data, pos, b)
+        z = data[pos]
+        pos += 1
+        if z >= 0x80:
+            z, pos = _get_varint(data, pos, z)
+        start = self._prev + ((z >> 1) if not z & 1 else -((z + 1) >> 1))
+        if start < 0 or b > _SPAN_MASK + 1:
+            raise ValueError("AST 바이너리의 span 이 소스 범위를 벗어납니다.")
+        self._prev = start
+        return (start << SPAN_SHIFT) | (b - 1), pos
+
+    def _ref(self, data: bytes, pos: int):
+        """값 표 번호 하나 (새 값이면 뒤따르는 값까지). (값, 다음 위치)"""
+        r = data[pos]
+        pos += 1
+        if r >= 0x80:
+            r, pos = _get_varint(data, pos, r)
+        if r < len(self._values):
+            return self._values[r], pos
+        if r != len(self._values):
+            raise ValueError(f"AST 바이너리의 값 번호가 값 표 밖입니다: {r}")
+        return self._read_value(data, pos)
+
+    def _read_value(self, data: bytes, pos: int):
+        """값 표에 새로 들어오는 값 (태그 + 내용). (값, 다음 위치)"""
+        tag = data[pos]
+        pos += 1
+        if tag == _TAG_STR:
+            n = data[pos]
+            pos += 1
+            if n >= 0x80:
+                n, pos = _get_varint(data, pos, n)
+            if pos + n > len(data):
+                raise ValueError("AST 바이너리의 문자열이 중간에 끊겼습니다.")
+            value = data[pos:pos + n].decode("utf-8", "surrogatepass")
+            pos += n
+        elif tag == _TAG_INT or tag == _TAG_NEG_INT:
+            value = data[pos]
+            pos += 1
+            if value >= 0x80:
+                value, pos = _get_varint(data, pos, value)
+            if tag == _TAG_NEG_INT:
+                value = -value
+        elif tag == _TAG_FLOAT:
+            (value,) = _FLOAT.unpack_from(data, pos)
+            pos += 8
+        elif tag == _TAG_NONE:
+            value = None
+        elif tag == _TAG_FALSE or tag == _TAG_TRUE:
+            value = tag == _TAG_TRUE
+        else:
+            raise ValueError(f"알 수 없는 값 태그입니다: {tag}")
+        self._values.append(value)
+        return value, pos
+
+    def _decode(self, data: bytes) -> Stmt:
+        """문장 바이트 하나를 노드로 (후위 순회라 스택 하나면 된다)"""
+        values = self._values
+        read_value = self._read_value
+        plans, fixed_counts, types = _PLANS, _FIXED, NODE_TYPES
+        prev = self._prev
+        stack: list = []
+        pos, end = 0, len(data)
+        while pos < end:
+            code = data[pos]
+            b = data[pos + 1]
+            pos += 2
+            span = 0
+            if b:
+                if b >= 0x80:
+                    b, pos = _get_varint(data, pos, b)
+                z = data[pos]
+                pos += 1
+                if z >= 0x80:
+                    z, pos = _get_varint(data, pos, z)
+                prev += (z >> 1) if not z & 1 else -((z + 1) >> 1)
+                if prev < 0 or b > _SPAN_MASK + 1:
+                    raise ValueError("AST 바이너리의 span 이 소스 범위를 벗어납니다.")
+                span = (prev << SPAN_SHIFT) | (b - 1)
+            count = fixed_counts[code]
+            if count < 0:
+                count = data[pos]
+                pos += 1
+                if count >= 0x80:
+                    count, pos = _get_varint(data, pos, count)
+            k = base = len(stack) - count
+            args = []
+            for kind, elems in plans[code]:
+                if kind == FIELD_NODE:
+                    args.append(stack[k])
+                    k += 1
+                    continue
+                if kind == FIELD_VALUE:
+                    r = data[pos]
+                    pos += 1
+                    if r >= 0x80:
+                        r, pos = _get_varint(data, pos, r)
+                    if r < len(values):
+                        args.append(values[r])
+                    elif r == len(values):
+                        value, pos = read_value(data, pos)
+                        args.append(value)
+                    else:
+                        raise ValueError(f"AST 바이너리의 값 번호가 값 표 밖입니다: {r}")
+                    continue
+                n = data[pos]
+                pos += 1
+                if kind == FIELD_OPT_NODE:
+                    if n > 1:
+                        raise ValueError(f"AST 바이너리의 선택 자식 표시가 0/1 이 아닙니다: {n}")
+                    if n:
+                        args.append(stack[k])
+                        k += 1
+                    else:
+                        args.append(None)
+                    continue
+                if n >= 0x80:
+                    n, pos = _get_varint(data, pos, n)
+                if not n:
+                    args.append(None)
+                    continue
+                n -= 1
+                if kind == FIELD_NODE_LIST:
+                    args.append(stack[k:k + n])
+                    k += n
+                    continue
+                ref = self._ref
+                if kind == FIELD_VALUE_LIST:
+                    items = []
+                    for _ in range(n):
+                        value, pos = ref(data, pos)
+                        items.append(value)
+                    args.append(items)
+                    continue
+                pairs = []
+                for _ in range(n):
+                    pair = []
+                    for ekind in elems:
+                        if ekind == FIELD_VALUE:
+                            value, pos = ref(data, pos)
+                            pair.append(value)
+                        elif data[pos] > 1:
+                            raise ValueError(f"AST 바이너리의 쌍 원소 표시가 0/1 이 아닙니다: {data[pos]}")
+                        elif data[pos]:
+                            pair.append(stack[k])
+                            k += 1
+                            pos += 1
+                        else:
+                            pair.append(None)
+                            pos += 1
+                    pairs.append(tuple(pair))
+                args.append(pairs)
+            if k != len(stack) or base < 0:
+                raise ValueError("AST 바이너리의 자식 수가 맞지 않습니다.")
+            del stack[base:]
+            node = types[code](*args)
+            if span:
+                node.span = span
+            stack.append(node)
+        self._prev = prev
+        if len(stack) != 1:
+            raise ValueError("AST 바이너리의 문장 하나가 노드 하나로 끝나지 않습니다.")
+        return stack[0]
+
+def load_program(fp: BinaryIO) -> Program:
+    """dump_program 으로 쓴 fp 에서 Program 을 읽는다"""
+    reader = AstReader(fp)
+    program = Program(body=list(reader))
+    if reader.span:
+        program.span = reader.span
+    return program
+
+def loads_program(data: bytes) -> Program:
+    return load_program(BytesIO(data))
+
+if __name__ == "__main__":
+    import pickle
+    from lexer_demo import lex_with_spans
+    from parser_demo import Parser
+
+    code = """정의 더하기(x, y=1):
+    반환 x + y
+값 = [더하기(1, y=2), {"키": 참}]
+출력(값[0])
+"""
+    tokens, spans = lex_with_spans(code)
+    program = Parser(tokens, spans).parse_program()
+    data = dumps_program(program)
+    print(f"바이너리 {len(data)} 바이트 (pickle {len(pickle.dumps(program))} 바이트)")
+    assert loads_program(data) == program
+    print("되읽은 Program 이 원래와 같다")
@@ -0,0 +1,903 @@
+# bench_demo.py
+#
+# 프런트엔드(lexer / parser / codegen) 성능 측정 스크립트
+# 큰 한글 소스를 만들어 놓고, 이전 구현과 새 구현의 속도를 비교한다.
+#
+# 사용 예:
+# python bench_demo.py            # 전부 실행
+# python bench_demo.py lexer      # 렉서만
+# python bench_demo.py lexer --blocks 5000
+
+import argparse
+import ast
+import contextlib
+import io
+import os
+import pickle
+import tempfile
+import time
+import tracemalloc
+from array import array
+from dataclasses import fields
+
+import bench_legacy
+from lexer_demo import (
+    simple_lexer, iter_tokens, TokenStream, LexedDocument, Interner, InternCache,
+    lex_with_spans, iter_token_lines, iter_file_lines, SourceMap, span_start,
+)
+from parser_demo import Parser, reparse_program
+from ast_demo import (
+    Name, Call, print_program, Stmt, FunctionDef, ClassDef, Node, NodeFactory, field_values, dump_ast,
+    Program, iter_child_nodes, iter_ast_lines,
+)
+from codegen_demo import gen_program
+from parallel_demo import parse_parallel
+from run_korean import run_korean_file, translate_korean_file
+from arena_demo import AstArena, NODE_TYPES
+from pyast_demo import lower_program
+from astbin_demo import AstReader, AstWriter, dumps_program, loads_program
+from fold_demo import fold_constants
+
+# 벤치마크용 반복 블록 (문법 기능을 골고루 섞어 둔다)
+_BLOCK = """정의 계산{n}(x, y=2):
+    합 = x + y * 3 - (x // 2) % 5  # 주석도 섞어 둔다
+    만약 합 > 10 그리고 x != 0:
+        합 -= 1
+    아니면 합 == 3:
+        통과
+    그외:
+        합 = 합 ** 2
+    반환 합
+
+목록{n} = [1, 2.5, 1e3, "문자열 {n}", '작은따옴표']
+사전{n} = {{"키": 1, "값": 참}}
+반복 i 안에 범위(0, 10):
+    동안 i < 3:
+        i = i + 1
+    출력(계산{n}(i), 목록{n}[1:2], 사전{n}["키"])
+"""
+
+def make_big_source(blocks: int = 2000) -> str:
+    """_BLOCK 을 blocks 번 이어 붙인 큰 한글 소스"""
+    return "".join(_BLOCK.format(n=n) for n in range(blocks))
+
+def _timeit(fn, *args, repeat: int = 5) -> float:
+    """repeat 번 실행해서 가장 빠른 시간(초)"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _report(label: str, before: float, after: float) -> None:
+    print(f"  {label}")
+    print(f"    이전: {before * 1000:9.2f} ms")
+    print(f"    이후: {after * 1000:9.2f} ms   ({before / after:.2f}x)")
+
+def _measure_bytes(fn, *args):
+    """fn(*args) 결과가 붙잡고 있는 메모리(바이트)와 결과값"""
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+def _measure_peak(fn, *args) -> int:
+    """fn(*args) 실행 중 가장 많이 쓴 메모리(바이트)"""
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def _report_bytes(label: str, before: int, after: int, count: int) -> None:
+    print(f"  {label}")
+    print(f"    이전: {before / 1024:9.1f} KiB  ({before / count:.1f} B/개)")
+    print(f"    이후: {after / 1024:9.1f} KiB  ({after / count:.1f} B/개, {before / after:.2f}x 작음)")
+
+# ======================
+#  lexer: 문자 단위 루프 vs 정규식 스캐너
+# ======================
+
+def bench_lexer(source: str) -> None:
+    print("[lexer] 문자 단위 루프 -> 정규식 스캐너")
+    expected = bench_legacy.simple_lexer(source)
+    if simple_lexer(source) != expected:
+        raise AssertionError("정규식 스캐너의 토큰 출력이 이전 렉서와 다릅니다.")
+    print(f"  토큰 수: {len(expected)}")
+    _report("simple_lexer", _timeit(bench_legacy.simple_lexer, source), _timeit(simple_lexer, source))
+
+# ======================
+#  tokens: 튜플 리스트 vs TokenStream
+# ======================
+
+def _lex_to_stream(source: str) -> TokenStream:
+    return TokenStream.from_tokens(iter_tokens(source.splitlines()))
+
+def _parse(tokens) -> None:
+    Parser(tokens).parse_program()
+
+def bench_tokens(source: str) -> None:
+    print("[tokens] (종류, 값) 튜플 리스트 -> TokenStream")
+    list_bytes, tokens = _measure_bytes(simple_lexer, source)
+    stream_bytes, stream = _measure_bytes(_lex_to_stream, source)
+    if list(stream) != tokens:
+        raise AssertionError("TokenStream 의 튜플 뷰가 simple_lexer 결과와 다릅니다.")
+    print(f"  토큰 수: {len(tokens)}, 서로 다른 (종류, 값): {len(stream.table)}")
+    _report_bytes("토큰 저장 메모리", list_bytes, stream_bytes, len(tokens))
+    _report("렉싱 + 저장", _timeit(simple_lexer, source), _timeit(_lex_to_stream, source))
+    _report("Parser.parse_program", _timeit(_parse, tokens), _timeit(_parse, stream))
+
+# ======================
+#  intern: 이름마다 새 문자열 vs Interner
+# ======================
+
+def _distinct_objects(tokens, kind: str) -> tuple[int, int]:
+    """kind 토큰들의 (튜플 객체 수, 값 문자열 객체 수)"""
+    toks = [t for t in tokens if t[0] == kind]
+    return len({id(t) for t in toks}), len({id(t[1]) for t in toks})
+
+def bench_intern(source: str) -> None:
+    print("[intern] 이름마다 새 문자열 -> 컴파일 단위 인터닝")
+    legacy_bytes, legacy = _measure_bytes(bench_legacy.simple_lexer, source)
+    interned_bytes, tokens = _measure_bytes(simple_lexer, source)
+    if tokens != legacy:
+        raise AssertionError("인터닝한 토큰 출력이 이전 렉서와 다릅니다.")
+    for kind in ("IDENT", "KEYWORD"):
+        count = sum(1 for t in tokens if t[0] == kind)
+        before, after = _distinct_objects(legacy, kind), _distinct_objects(tokens, kind)
+        print(f"  {kind} {count}개: 튜플/문자열 객체 {before[0]}/{before[1]} -> {after[0]}/{after[1]}")
+    _report_bytes("토큰 리스트 메모리", legacy_bytes, interned_bytes, len(tokens))
+    _report("렉싱", _timeit(bench_legacy.simple_lexer, source), _timeit(simple_lexer, source))
+
+    # 컴파일 사이 LRU 캐시: 두 번째 컴파일은 첫 번째의 이름 토큰을 그대로 쓴다
+    cache = InternCache(maxsize=16384)
+    first = simple_lexer(source, Interner(cache))
+    second = simple_lexer(source, Interner(cache))
+    shared = sum(1 for a, b in zip(first, second) if a[0] == "IDENT" and a is b)
+    print(f"  InternCache(maxsize={cache.maxsize}): 두 컴파일이 공유한 IDENT 토큰 {shared}개, 캐시 {len(cache)}개")
+
+# ======================
+#  input: f.read() + 리스트 vs mmap 줄 스트림 + TokenStream
+# ======================
+
+def _read_and_lex(path: str) -> int:
+    with open(path, "r", encoding="utf-8") as f:
+        tokens, spans = lex_with_spans(f.read())
+    return len(tokens)
+
+def _stream_and_lex(path: str) -> int:
+    # run_korean_file 의 렉싱 단계와 같은 방식
+    tokens = TokenStream()
+    spans = array("Q")
+    for line_tokens, line_spans in iter_token_lines(iter_file_lines(path)):
+        tokens.extend(line_tokens)
+        spans.extend(line_spans)
+    return len(tokens)
+
+def bench_input(source: str) -> None:
+    print("[input] f.read() + 토큰 리스트 -> mmap 줄 스트림 + TokenStream")
+    fd, path = tempfile.mkstemp(suffix=".han")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(source)
+        if _read_and_lex(path) != _stream_and_lex(path):
+            raise AssertionError("mmap 입력 경로의 토큰 수가 다릅니다.")
+        print(f"  파일 크기: {os.path.getsize(path) / 1024:.1f} KiB")
+        before, after = _measure_peak(_read_and_lex, path), _measure_peak(_stream_and_lex, path)
+        print("  렉싱 단계 최대 메모리")
+        print(f"    이전: {before / 1024:9.1f} KiB")
+        print(f"    이후: {after / 1024:9.1f} KiB   ({before / after:.2f}x 작음)")
+        _report("렉싱", _timeit(_read_and_lex, path), _timeit(_stream_and_lex, path))
+    finally:
+        os.remove(path)
+
+# ======================
+#  parallel: 직렬 렉싱+파싱 vs 0 칸 줄 경계로 나눈 프로세스 병렬
+# ======================
+
+def _serial_front(source: str):
+    return Parser(simple_lexer(source)).parse_program()
+
+def _parallel_front(source: str, jobs: int):
+    return parse_parallel(source.splitlines(True), jobs=jobs, chunk_chars=len(source) // (jobs * 4) + 1)
+
+def bench_parallel(source: str) -> None:
+    jobs = os.cpu_count() or 1
+    print(f"[parallel] 직렬 렉싱+파싱 -> 조각별 ProcessPoolExecutor (jobs={jobs})")
+    if _parallel_front(source, max(jobs, 2)) != _serial_front(source):
+        raise AssertionError("병렬 프런트엔드의 Program 이 직렬 파싱 결과와 다릅니다.")
+    if jobs < 2:
+        print("  CPU 가 1개라 병렬 이득은 없고, 프로세스/피클 비용만 보인다")
+    _report(
+        "렉싱 + 파싱",
+        _timeit(_serial_front, source, repeat=3),
+        _timeit(_parallel_front, source, max(jobs, 2), repeat=3),
+    )
+
+# ======================
+#  incremental: 키 입력마다 전체 다시 렉싱 vs LexedDocument.edit
+# ======================
+
+_TYPED = "    합 = 합 + 계산0(i)  # 새 줄\n"
+
+def _keystrokes(source: str) -> list[tuple[int, int, str]]:
+    """문서 한가운데 줄 앞에서 _TYPED 를 한 글자씩 치는 편집 목록 (start, end, text)"""
+    at = source.index("\n반복", len(source) // 2) + 1
+    return [(at + i, at + i, ch) for i, ch in enumerate(_TYPED)]
+
+def _full_relex(source: str, edits) -> None:
+    for start, end, text in edits:
+        source = source[:start] + text + source[end:]
+        simple_lexer(source)
+
+def _incremental_relex(doc: LexedDocument, edits) -> None:
+    for start, end, text in edits:
+        doc.edit(start, end, text)
+
+def bench_incremental(source: str) -> None:
+    print("[incremental] 키 입력마다 simple_lexer 전체 -> LexedDocument.edit")
+    edits = _keystrokes(source)
+    doc = LexedDocument(source)
+    _incremental_relex(doc, edits)
+    expected = source
+    for start, end, text in edits:
+        expected = expected[:start] + text + expected[end:]
+    if doc.text != expected or doc.tokens != simple_lexer(expected):
+        raise AssertionError("증분 렉싱 결과가 전체 렉싱과 다릅니다.")
+    print(f"  키 입력 수: {len(edits)}")
+    _report(
+        "키 입력 전체",
+        _timeit(_full_relex, source, edits, repeat=1),
+        # 문서는 매번 새로 만들되, 만드는 시간은 빼고 잰다
+        min(_timeit(_incremental_relex, LexedDocument(source), edits, repeat=1) for _ in range(3)),
+    )
+
+# ======================
+#  memo: 되감은 자리 다시 파싱 vs packrat 메모
+# ======================
+
+def _parse_memo(tokens) -> Parser:
+    parser = Parser(tokens, memo=True)
+    parser.parse_program()
+    return parser
+
+# 대입 타겟/인덱싱 사슬이 긴 문장: 되감기 때 버려지는 부분이 크다
+_SUBSCRIPT_LINES = """표[가[i + 1]][나[j * 2]].값 = 표[가[i]][나[j]].값 + 격자[행[i]][열[j]]
+격자[행[i]][열[j + 1]].합계(1)
+"""
+
+def bench_memo(source: str) -> None:
+    print("[memo] 되감기 후 다시 파싱 -> (production, 위치) packrat 메모")
+    subscripts = _SUBSCRIPT_LINES * (source.count("\n") // 8)
+    for label, text in (("벤치마크 소스", source), ("인덱싱 사슬이 긴 소스", subscripts)):
+        tokens = simple_lexer(text)
+        parser = _parse_memo(tokens)
+        if Parser(tokens).parse_program() != Parser(tokens, memo=True).parse_program():
+            raise AssertionError("메모를 켠 파싱 결과가 다릅니다.")
+        print(f"  {label}: 토큰 {len(tokens)}개, 메모 적중 {parser.memo_hits}회, "
+              f"다시 파싱하지 않은 토큰 {parser.memo_tokens_saved}개")
+        _report("Parser.parse_program", _timeit(_parse, tokens, repeat=3), _timeit(_parse_memo, tokens, repeat=3))
+
+# ======================
+#  pratt: 단계별 재귀 하강 사슬 vs 우선순위 오르기
+# ======================
+
+# 이름/호출이 대부분인 식 (원자 하나를 읽을 때마다 사슬을 끝까지 내려간다)
+_CALL_LINES = """출력(값, 목록[i], 사전.키, 계산(x, y))
+합 = 계산(a, b) + 목록[c]
+"""
+
+def _parse_recursive(tokens) -> None:
+    bench_legacy.RecursiveParser(tokens).parse_program()
+
+def _parse_chain(tokens) -> None:
+    bench_legacy.ChainParser(tokens).parse_program()
+
+def bench_pratt(source: str) -> None:
+    print("[pratt] or_expr ~ power 단계별 재귀 하강 -> 우선순위 오르기(bench_legacy.RecursiveParser.parse_binary)")
+    calls = _CALL_LINES * (source.count("\n") // 4)
+    for label, text in (("벤치마크 소스", source), ("이름/호출이 대부분인 소스", calls)):
+        tokens = simple_lexer(text)
+        if bench_legacy.ChainParser(tokens).parse_program() != bench_legacy.RecursiveParser(tokens).parse_program():
+            raise AssertionError("parse_binary 의 AST 가 이전 사슬과 다릅니다.")
+        print(f"  {label}: 토큰 {len(tokens)}개")
+        _report("Parser.parse_program", _timeit(_parse_chain, tokens, repeat=3), _timeit(_parse_recursive, tokens, repeat=3))
+
+# ======================
+#  deep: 재귀 하강 vs 명시적 스택 (아주 깊게 중첩된 식과 블록)
+# ======================
+
+# 깊이 테스트용 식 (n 겹으로 중첩된다)
+_DEEP_EXPRS = {
+    "'+' 사슬": lambda n: "x = " + " + ".join(["1"] * n),
+    "괄호": lambda n: "x = " + "(" * n + "1" + ")" * n,
+    "'**' 사슬": lambda n: "x = " + " ** ".join(["2"] * n),
+    "단항 '-'": lambda n: "x = " + "-" * n + "1",
+    "리스트": lambda n: "x = " + "[" * n + "]" * n,
+    "호출": lambda n: "x = " + "f(" * n + ")" * n,
+}
+# 깊이 테스트용 블록 (한 줄 본문으로 n 겹 중첩된다)
+_DEEP_BLOCKS = {
+    "중첩 '만약'": lambda n: "만약 x: " * n + "통과",
+    "중첩 '동안'/'반복'": lambda n: "동안 x: 반복 i 안에 y: " * (n // 2) + "통과",
+}
+_DEEP = 100_000
+# 출력은 줄마다 깊이만큼 들여쓰므로 (출력량이 깊이의 제곱) 더 얕게 잰다. 블록은 코드 생성도 마찬가지
+_DEEP_PRINT = 2_000
+
+def _print_to(prog, out) -> None:
+    with contextlib.redirect_stdout(out):
+        print_program(prog)
+
+def _bench_deep_case(label: str, make, gen_depth: int) -> None:
+    tokens = simple_lexer(make(_DEEP) + "\n")
+    try:
+        bench_legacy.RecursiveParser(tokens).parse_program()
+        before = "성공"
+    except RecursionError:
+        before = "RecursionError"
+    t0 = time.perf_counter()
+    prog = Parser(tokens).parse_program()
+    t1 = time.perf_counter()
+    if gen_depth != _DEEP:
+        prog = Parser(simple_lexer(make(gen_depth) + "\n")).parse_program()
+    t2 = time.perf_counter()
+    gen_program(prog)
+    t3 = time.perf_counter()
+    small = Parser(simple_lexer(make(_DEEP_PRINT) + "\n")).parse_program()
+    t4 = time.perf_counter()
+    _print_to(small, io.StringIO())
+    t5 = time.perf_counter()
+    print(f"  {label} {_DEEP}겹: 재귀 하강 {before}, 스택 파싱 {(t1 - t0) * 1000:.1f} ms, "
+          f"코드 생성({gen_depth}겹) {(t3 - t2) * 1000:.1f} ms, 출력({_DEEP_PRINT}겹) {(t5 - t4) * 1000:.1f} ms")
+
+def bench_deep(source: str) -> None:
+    print("[deep] 재귀 하강 파서 -> 명시적 스택 (parse_expr / 블록 본문 / gen_program / print_program)")
+    tokens = simple_lexer(source)
+    if bench_legacy.RecursiveParser(tokens).parse_program() != Parser(tokens).parse_program():
+        raise AssertionError("스택 파서의 AST 가 재귀 하강 파서와 다릅니다.")
+    print(f"  벤치마크 소스: 토큰 {len(tokens)}개")
+    _report("Parser.parse_program", _timeit(_parse_recursive, tokens, repeat=3), _timeit(_parse, tokens, repeat=3))
+    for label, make in _DEEP_EXPRS.items():
+        _bench_deep_case(label, make, _DEEP)
+    for label, make in _DEEP_BLOCKS.items():
+        _bench_deep_case(label, make, _DEEP_PRINT)
+
+# ======================
+#  dispatch: 키워드 if/elif 사슬 vs 키워드 -> 메서드 표
+# ======================
+
+def _count_statements(program: Program) -> int:
+    """중첩된 본문까지 포함한 문장 수"""
+    count = 0
+    work = list(program.body)
+    while work:
+        node = work.pop()
+        count += isinstance(node, Stmt)
+        work.extend(iter_child_nodes(node))
+    return count
+
+def _parse_if_chain(tokens) -> None:
+    bench_legacy.IfChainStmtParser(tokens).parse_program()
+
+# 키워드로 시작하는 짧은 문장이 대부분인 블록 (문장 시작 분기 비용이 잘 보인다)
+_KEYWORD_BLOCK = """정의 f(x):
+    만약 x:
+        통과
+    시도:
+        반환 x
+    예외:
+        던지기 x
+    동안 x:
+        중단
+    반복 i 안에 x:
+        계속
+    불러오기 a
+    꺼내기 a 불러오기 b
+    x = 1
+    출력(x)
+"""
+
+def bench_dispatch(source: str) -> None:
+    print("[dispatch] 문장 시작 키워드 if/elif 사슬 -> 키워드 토큰별 처리 표 (Parser.statement_handlers)")
+    keywords = _KEYWORD_BLOCK * (source.count("\n") // 8)
+    for label, text in (("벤치마크 소스", source), ("키워드 문장이 대부분인 소스", keywords)):
+        tokens = simple_lexer(text)
+        if bench_legacy.IfChainStmtParser(tokens).parse_program() != Parser(tokens).parse_program():
+            raise AssertionError("처리 표로 파싱한 AST 가 if/elif 사슬과 다릅니다.")
+        statements = _count_statements(Parser(tokens).parse_program())
+        before = _timeit(_parse_if_chain, tokens, repeat=5)
+        after = _timeit(_parse, tokens, repeat=5)
+        print(f"  {label}: 문장 {statements}개")
+        _report("Parser.parse_program", before, after)
+        print(f"    문장/초: {statements / before:,.0f} -> {statements / after:,.0f}")
+
+# ======================
+#  lazy: 함수/클래스 본문까지 전부 파싱 vs 본문은 건너뛰고 개요만
+# ======================
+
+def _outline(tokens, lazy: bool) -> list[tuple[str, str]]:
+    """최상위 함수/클래스의 (종류, 이름) 목록"""
+    program = Parser(tokens, lazy_bodies=lazy).parse_program()
+    return [(type(s).__name__, s.name) for s in program.body if isinstance(s, (FunctionDef, ClassDef))]
+
+def _lex_only(source: str) -> None:
+    simple_lexer(source)
+
+# 함수/클래스 정의만 있는 라이브러리 모듈 모양의 블록
+_LIBRARY_BLOCK = """클래스 모양{n}(object):
+    정의 __init__(본인, x, y=2):
+        본인.x = x
+        본인.y = [x * 2 + y 만약 x > 0 그외 -1, y 안에 [1, 2]] 만약 x 그외 없음
+    정의 넓이(본인):
+        반환 본인.x * 본인.y ** 2 // (본인.x + 1) % 7
+
+정의 도우미{n}(a, b=3):
+    시도:
+        반환 {{"합": a + b, "곱": a * b, "목록": [a, b, a - b][1:]}}
+    예외 ValueError 별칭 e:
+        출력(e, sep="-")
+        반환 없음
+"""
+
+def bench_lazy(source: str) -> None:
+    print("[lazy] 개요(최상위 함수/클래스 목록): 본문까지 파싱 -> 본문은 INDENT/DEDENT 로 건너뛰기")
+    library = "".join(_LIBRARY_BLOCK.format(n=n) for n in range(source.count("\n") // 16))
+    for label, text in (("벤치마크 소스", source), ("함수/클래스만 있는 소스", library)):
+        tokens = simple_lexer(text)
+        if _outline(tokens, False) != _outline(tokens, True):
+            raise AssertionError("본문을 미룬 개요가 다릅니다.")
+        if Parser(tokens, lazy_bodies=True).parse_program() != Parser(tokens).parse_program():
+            raise AssertionError("미뤘다가 파싱한 본문이 바로 파싱한 것과 다릅니다.")
+        print(f"  {label}: 토큰 {len(tokens)}개, 최상위 함수/클래스 {len(_outline(tokens, True))}개")
+        print(f"    렉싱만: {_timeit(_lex_only, text, repeat=3) * 1000:9.2f} ms")
+        _report("개요 (파싱)", _timeit(_outline, tokens, False, repeat=3), _timeit(_outline, tokens, True, repeat=3))
+
+# ======================
+#  reparse: 편집마다 전체 다시 파싱 vs 바뀐 최상위 문장만
+# ======================
+
+def _body_edits(source: str, count: int = 10) -> list[tuple[int, int, str]]:
+    """
+    문서 뒤쪽 절반의 함수 본문에서 '* 3' 을 '* 7' 로 하나씩 바꾸는 편집 목록 (start, end, text).
+    소스가 작아 바꿀 곳이 count 개보다 적으면 있는 만큼만.
+    """
+    edits = []
+    at = len(source) // 2
+    for _ in range(count):
+        at = source.find("y * 3", at)
+        if at < 0:
+            break
+        at += len("y * ")
+        edits.append((at, at + 1, "7"))
+    return edits
+
+def _full_reparse(versions) -> None:
+    for tokens in versions:
+        Parser(tokens).parse_program()
+
+def _incremental_reparse(program, versions) -> None:
+    for tokens in versions:
+        program, _ = reparse_program(program, tokens)
+
+def bench_reparse(source: str) -> None:
+    print("[reparse] 편집마다 Parser.parse_program 전체 -> reparse_program (바뀐 최상위 문장만)")
+    doc = LexedDocument(source)
+    original = list(doc.tokens)
+    versions = []
+    for start, end, text in _body_edits(source):
+        doc.edit(start, end, text)
+        versions.append(list(doc.tokens))
+    program = Parser(original, incremental=True).parse_program()
+    replaced = 0
+    for tokens in versions:
+        program, diff = reparse_program(program, tokens)
+        replaced += len(diff.inserted)
+        if program != Parser(tokens).parse_program():
+            raise AssertionError("증분 파싱 결과가 전체 파싱과 다릅니다.")
+    print(f"  편집 {len(versions)}번, 최상위 문장 {len(program.body)}개 중 바뀐 문장 {replaced}개")
+    _report(
+        "편집 전체",
+        _timeit(_full_reparse, versions, repeat=1),
+        _timeit(_incremental_reparse, Parser(original, incremental=True).parse_program(), versions, repeat=3),
+    )
+
+# ======================
+#  stream: 파일 전체 토큰/AST/코드 문자열 -> 최상위 문장 단위 스트리밍 변환
+# ======================
+
+# 파일을 읽는 조각 크기 (기본 1 MiB 조각 하나가 이 크기의 소스 전체보다 커서 차이를 가리지 않게)
+_STREAM_CHUNK = 1 << 16
+
+def _translate_whole(path: str) -> None:
+    run_korean_file(path, execute=False, chunk_size=_STREAM_CHUNK)
+
+def _translate_streaming(path: str) -> None:
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        translate_korean_file(path, out, chunk_size=_STREAM_CHUNK)
+
+def bench_stream(source: str) -> None:
+    print("[stream] --no-exec 변환: 파일 전체를 모아서 gen_program -> Parser.iter_statements + gen_stmt")
+    fd, path = tempfile.mkstemp(suffix=".han")
+    os.close(fd)
+    try:
+        for copies in (1, 2):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(source * copies)
+            if copies == 1:
+                out = io.StringIO()
+                translate_korean_file(path, out)
+                if out.getvalue() != run_korean_file(path, execute=False)[0]:
+                    raise AssertionError("스트리밍 변환 결과가 gen_program 과 다릅니다.")
+            before, after = _measure_peak(_translate_whole, path), _measure_peak(_translate_streaming, path)
+            print(f"  파일 크기 {os.path.getsize(path) / 1024:.1f} KiB 의 최대 메모리")
+            print(f"    이전: {before / 1024:9.1f} KiB")
+            print(f"    이후: {after / 1024:9.1f} KiB   ({before / after:.2f}x 작음)")
+        _report("변환", _timeit(_translate_whole, path, repeat=3), _timeit(_translate_streaming, path, repeat=3))
+    finally:
+        os.remove(path)
+
+# ======================
+#  slots: 인스턴스마다 __dict__ 가 있는 dataclass 노드 -> @dataclass(slots=True) 노드
+# ======================
+
+def _copy_tree(value, legacy: bool):
+    """문장/식 트리를 새 노드로 복사한다 (legacy 면 __dict__ 판 클래스로). 이름/숫자 같은 잎 값은 공유한다"""
+    if isinstance(value, list):
+        return [_copy_tree(v, legacy) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_copy_tree(v, legacy) for v in value)
+    if not isinstance(value, Node):
+        return value
+    cls = type(value)
+    new_cls = bench_legacy.dict_node_class(cls) if legacy else cls
+    node = new_cls(*[_copy_tree(getattr(value, f.name), legacy) for f in fields(cls) if f.init])
+    if value.span:
+        node.span = value.span
+    return node
+
+def _count_nodes(value) -> int:
+    if isinstance(value, (list, tuple)):
+        return sum(map(_count_nodes, value))
+    if not isinstance(value, Node):
+        return 0
+    return 1 + sum(_count_nodes(getattr(value, f.name)) for f in fields(value) if f.init)
+
+def bench_slots(source: str) -> None:
+    print("[slots] 노드마다 __dict__ 가 있는 dataclass -> @dataclass(slots=True)")
+    tokens, spans = lex_with_spans(source)
+    body = Parser(tokens, spans).parse_program().body
+    del tokens, spans
+    count = _count_nodes(body)
+    before, old_body = _measure_bytes(_copy_tree, body, True)
+    after, new_body = _measure_bytes(_copy_tree, body, False)
+    if new_body != body or repr(old_body) != repr(body):
+        raise AssertionError("복사한 AST 가 원래 AST 와 다릅니다.")
+    del old_body, new_body
+    print(f"  노드 수: {count} (span 포함, 이름/숫자 같은 잎 값은 공유)")
+    _report_bytes("AST 전체 메모리", before, after, count)
+    _report("AST 만들기 (복사)", _timeit(_copy_tree, body, True, repeat=3), _timeit(_copy_tree, body, False, repeat=3))
+
+# ======================
+#  arena: 노드 객체 트리 -> AstArena (나란한 array)
+# ======================
+
+def _call_counts_tree(program) -> dict[str, int]:
+    """이름으로 부른 함수마다 호출 횟수 (노드 객체 트리를 훑는다)"""
+    counts: dict[str, int] = {}
+    work: list = list(program.body)
+    while work:
+        item = work.pop()
+        if isinstance(item, Node):
+            if type(item) is Call and type(item.func) is Name:
+                counts[item.func.id] = counts.get(item.func.id, 0) + 1
+            work += field_values(item)
+        elif isinstance(item, (list, tuple)):
+            work += item
+    return counts
+
+def _call_counts_arena(arena: AstArena) -> dict[str, int]:
+    """_call_counts_tree 와 같은 분석을 아레나에서 (노드 객체를 만들지 않는다)"""
+    counts: dict[str, int] = {}
+    for i in arena.find(Call):
+        func = arena.get(i, "func")
+        if arena.type(func) is Name:
+            name = arena.get(func, "id")
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+def bench_arena(source: str) -> None:
+    print("[arena] 노드 객체 트리 -> AstArena (종류/span/필드 칸을 나란한 array 에)")
+    tokens, spans = lex_with_spans(source)
+    program = Parser(tokens, spans).parse_program()
+    del tokens, spans
+    tree_bytes, _ = _measure_bytes(_copy_tree, program.body, False)
+    arena_bytes, arena = _measure_bytes(AstArena.from_program, program)
+    if arena.to_program() != program:
+        raise AssertionError("아레나에서 되돌린 Program 이 원래와 다릅니다.")
+    if _call_counts_arena(arena) != _call_counts_tree(program):
+        raise AssertionError("아레나 분석 결과가 트리 분석과 다릅니다.")
+    print(f"  노드 수: {len(arena)}, 값 표: {len(arena.values)}개")
+    _report_bytes("AST 메모리", tree_bytes, arena_bytes, len(arena))
+    _report("분석 (함수 이름별 호출 수)", _timeit(_call_counts_tree, program), _timeit(_call_counts_arena, arena))
+    print(f"  변환: 트리 -> 아레나 {_timeit(AstArena.from_program, program, repeat=3) * 1000:.2f} ms, "
+          f"아레나 -> 트리 {_timeit(arena.to_program, repeat=3) * 1000:.2f} ms")
+
+# ======================
+#  hashcons: 같은 모양의 노드를 NodeFactory 로 공유
+# ======================
+
+def _parse_program(tokens, spans, hash_cons=False):
+    return Parser(tokens, spans, hash_cons=hash_cons).parse_program()
+
+def bench_hashcons(source: str) -> None:
+    print("[hashcons] 이름/숫자/문자열/이항 연산 노드를 매번 새로 -> 구조가 같으면 NodeFactory 로 공유")
+    tokens, spans = lex_with_spans(source)
+    before, plain = _measure_bytes(_parse_program, tokens, spans)
+    after, shared = _measure_bytes(_parse_program, tokens, spans, True)
+    if gen_program(shared) != gen_program(plain) or shared != plain:
+        raise AssertionError("공유 노드로 만든 AST 의 코드 생성 결과가 다릅니다.")
+    count = _count_nodes(plain.body)
+    print(f"  노드 수: {count} (자리 기준), gen_program 결과 같음")
+    _report_bytes("AST 메모리 (span 포함)", before, after, count)
+    _report("파싱", _timeit(_parse_program, tokens, spans, repeat=3), _timeit(_parse_program, tokens, spans, True, repeat=3))
+    del plain, shared
+    # 여러 파일이 표 하나를 같이 써도, AST 를 버리면 표도 비워진다 (약한 참조)
+    factory = NodeFactory()
+    program = _parse_program(tokens, spans, factory)
+    live = len(factory)
+    del program
+    print(f"  공유 노드 {live}개 (요청 {factory.requests}번 중 {factory.shared}번 재사용), AST 를 버린 뒤 표: {len(factory)}개")
+
+# ======================
+#  visitor: isinstance 사슬 -> NodeVisitor (type(node) 로 찾는 표)
+# ======================
+
+def _ast_lines_of(prog: Program) -> list[str]:
+    """print_program 이 출력할 줄들 (출력 비용은 빼고 줄 만들기만)"""
+    return list(iter_ast_lines(prog))
+
+# 사슬 뒤쪽 갈래(슬라이스, 집합/사전, 속성, 단항, try/raise/with)가 많은 블록
+_LATE_BLOCK = """시도:
+    값{n} = 표[1:n:2][::-1].값 + {{1, 2}} - -x
+    사전{n} = {{"키": [a, b], "값": (c,)}}
+예외 값오류 별칭 e:
+    던지기 값오류(e.args[0:1])
+마침:
+    함께 열기(이름[2:]) 별칭 f:
+        통과
+"""
+
+def _report_rate(label: str, before: float, after: float, count: int) -> None:
+    print(f"  {label}")
+    print(f"    이전: {before * 1000:9.2f} ms  ({count / before / 1e6:.2f} M 노드/초)")
+    print(f"    이후: {after * 1000:9.2f} ms  ({count / after / 1e6:.2f} M 노드/초, {before / after:.2f}x)")
+
+def bench_visitor(source: str) -> None:
+    print("[visitor] 출력기/코드 생성기: isinstance 사슬 -> NodeVisitor (type(node) 로 찾는 표)")
+    late = "".join(_LATE_BLOCK.format(n=n) for n in range(source.count("\n") // 40))
+    for label, text in (("벤치 소스", source), ("뒤쪽 갈래가 많은 소스", late)):
+        program = Parser(simple_lexer(text)).parse_program()
+        if bench_legacy.gen_program(program) != gen_program(program):
+            raise AssertionError("방문자 코드 생성 결과가 isinstance 사슬과 다릅니다.")
+        if bench_legacy.ast_lines(program) != _ast_lines_of(program):
+            raise AssertionError("방문자 AST 출력이 isinstance 사슬과 다릅니다.")
+        count = _count_nodes(program.body)
+        print(f"  -- {label}: 노드 {count}개")
+        _report_rate("gen_program", _timeit(bench_legacy.gen_program, program), _timeit(gen_program, program), count)
+        _report_rate("print_program 의 줄 만들기", _timeit(bench_legacy.ast_lines, program), _timeit(_ast_lines_of, program), count)
+
+# ======================
+#  lower: 파이썬 코드 문자열 -> compile  vs  ast.Module 로 바로 내려서 compile
+# ======================
+
+def _compile_text(program: Program) -> None:
+    compile(gen_program(program), "<생성된 파이썬 코드>", "exec")
+
+def _compile_lowered(program: Program, source_map: SourceMap) -> None:
+    compile(lower_program(program, source_map), source_map.filename, "exec")
+
+def bench_lower(source: str) -> None:
+    print("[lower] gen_program 문자열을 CPython 이 다시 파싱 -> ast.Module 로 바로 내려서 compile")
+    tokens, spans = lex_with_spans(source)
+    source_map = SourceMap(source)
+    program = Parser(tokens, spans, source_map).parse_program()
+    del tokens, spans
+    module = lower_program(program, source_map)
+    if ast.dump(module) != ast.dump(ast.parse(gen_program(program))):
+        raise AssertionError("바로 내린 ast.Module 이 코드 문자열을 파싱한 것과 다릅니다.")
+    source_map.line_starts  # 줄 시작 표는 SourceMap 이 한 번 만들고 나면 재사용한다
+    _report("코드 생성 + compile", _timeit(_compile_text, program, repeat=3), _timeit(_compile_lowered, program, source_map, repeat=3))
+    lineno = module.body[-1].lineno
+    print(f"  마지막 문장의 줄 번호: {lineno} (한글 소스 {source_map.line_col(span_start(program.body[-1].span))[0]}번째 줄)")
+
+# ======================
+#  astbin: 다시 렉싱 + 파싱  vs  바이너리로 저장해 둔 AST 읽기
+# ======================
+
+# _BLOCK, _LATE_BLOCK 에 없는 노드 종류들 (ast_demo 의 모든 노드가 왕복 검사에 들어가도록)
+_REST_BLOCK = """불러오기 수학 별칭 m, 경로
+꺼내기 가.나 불러오기 다 별칭 라, 마
+클래스 상자{n}(기본):
+    정의 __init__(본인, 값=없음):
+        가 = 나 = 본인.값 = 값 만약 값 그외 -1.5e3 + 0.0 + 123456789012345678901234567890
+        동안 참:
+            만약 (n := 길이(가)) > 10:
+                중단
+            계속
+"""
+
+def _lex_parse(source: str) -> Program:
+    tokens, spans = lex_with_spans(source)
+    return Parser(tokens, spans).parse_program()
+
+def _check_round_trip(program: Program, data: bytes) -> None:
+    loaded = loads_program(data)
+    # == 는 span 을 보지 않으므로 span 은 아레나(전위 순회 순서의 span 배열)로 따로 비교한다
+    if loaded != program or AstArena.from_program(loaded).spans != AstArena.from_program(program).spans:
+        raise AssertionError("바이너리에서 되읽은 Program 이 원래와 다릅니다.")
+    if loaded.span != program.span:
+        raise AssertionError("바이너리에서 되읽은 Program span 이 원래와 다릅니다.")
+
+def bench_astbin(source: str) -> None:
+    print("[astbin] 소스를 다시 렉싱 + 파싱 -> 바이너리로 저장해 둔 AST 를 읽기")
+    text = source + "".join((_LATE_BLOCK + _REST_BLOCK).format(n=n) for n in range(8))
+    program = _lex_parse(text)
+    arena = AstArena.from_program(program)
+    seen = {arena.type(i) for i in range(len(arena))}
+    del arena
+    missing = [cls.__name__ for cls in NODE_TYPES if cls not in seen]
+    if missing:
+        raise AssertionError(f"왕복 검사 소스에 없는 노드 종류: {missing}")
+    data = dumps_program(program)
+    _check_round_trip(program, data)
+    # 공유 노드(span 없음)가 섞인 트리, 문장 하나씩 흘려 쓴 것도 같아야 한다
+    tokens, spans = lex_with_spans(text)
+    _check_round_trip(_parse_program(tokens, spans, True), dumps_program(_parse_program(tokens, spans, True)))
+    sink = io.BytesIO()
+    with AstWriter(sink) as writer:
+        for stmt in Parser(tokens, spans).iter_statements():
+            writer.write(stmt)
+    if list(AstReader(io.BytesIO(sink.getvalue()))) != program.body:
+        raise AssertionError("문장 하나씩 쓴 바이너리가 원래 Program 과 다릅니다.")
+    del tokens, spans
+    print(f"  노드 종류 {len(seen)}/{len(NODE_TYPES)}개 왕복 확인")
+    pickled = pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"  크기: 소스 {len(text.encode('utf-8')) / 1024:.1f} KiB, "
+          f"pickle {len(pickled) / 1024:.1f} KiB, 바이너리 {len(data) / 1024:.1f} KiB "
+          f"(pickle 보다 {len(pickled) / len(data):.2f}x 작음)")
+    _report("다시 렉싱 + 파싱 -> 바이너리 읽기", _timeit(_lex_parse, text, repeat=3), _timeit(loads_program, data, repeat=3))
+    print(f"  pickle.loads {_timeit(pickle.loads, pickled, repeat=3) * 1000:.2f} ms, "
+          f"바이너리 쓰기 {_timeit(dumps_program, program, repeat=3) * 1000:.2f} ms")
+
+# ======================
+#  dump: 줄마다 print  vs  dump_ast (조각을 모아 write 한 번)
+# ======================
+
+def _print_lines_to(prog: Program, out) -> None:
+    with contextlib.redirect_stdout(out):
+        bench_legacy.print_program(prog)
+
+class _CountingSink(io.StringIO):
+    """write 가 몇 번 불렸는지 센다"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+def bench_dump(source: str) -> None:
+    print("[dump] print_program: 줄마다 print -> dump_ast (조각을 모아 write 한 번)")
+    program = Parser(simple_lexer(source)).parse_program()
+    before, after = _CountingSink(), _CountingSink()
+    _print_lines_to(program, before)
+    dump_ast(program, after)
+    if before.getvalue() != after.getvalue():
+        raise AssertionError("dump_ast 의 tree 출력이 줄마다 print 한 것과 다릅니다.")
+    print(f"  출력 {len(after.getvalue().splitlines())}줄, write 호출 {before.writes}번 -> {after.writes}번")
+    # 터미널/파이프처럼 줄 단위로 버퍼를 비우는 싱크 (줄마다 시스템 콜 한 번)
+    with open(os.devnull, "w", encoding="utf-8", buffering=1) as out:
+        _report("tree 출력 (줄 버퍼링 싱크)", _timeit(_print_lines_to, program, out, repeat=3),
+                _timeit(dump_ast, program, out, repeat=3))
+        for fmt in ("jsonl", "sexp"):
+            print(f"  {fmt}: {_timeit(dump_ast, program, out, fmt, repeat=3) * 1000:.2f} ms")
+
+# ======================
+#  fold: 상수 식을 그대로 코드 생성  vs  fold_constants 로 미리 접기
+# ======================
+
+# 학생 코드에 흔한, 반복문 안의 상수 식
+_FOLD_BLOCK = """합{n} = 0
+반복 i 안에 범위(200):
+    초 = 60 * 60 * 24
+    최대 = 2 ** 10 - 1
+    만약 i % 2 == 0 그리고 1 < 2 < 3:
+        합{n} = 합{n} + 초 * (최대 + (아니다 거짓)) - -3
+"""
+
+def _gen_compile(program: Program, fold: bool) -> None:
+    if fold:
+        program = fold_constants(program)
+    compile(gen_program(program), "<생성된 파이썬 코드>", "exec")
+
+def _exec_code(code) -> None:
+    exec(code, {"범위": range})
+
+def bench_fold(source: str) -> None:
+    print("[fold] 상수 식을 그대로 코드 생성 -> fold_constants 로 미리 접고 코드 생성")
+    text = "".join(_FOLD_BLOCK.format(n=n) for n in range(source.count("\n") // 60))
+    program = Parser(simple_lexer(text)).parse_program()
+    folded = fold_constants(program)
+    env_plain, env_folded = {"범위": range}, {"범위": range}
+    exec(gen_program(program), env_plain)
+    exec(gen_program(folded), env_folded)
+    if {k: v for k, v in env_plain.items() if k != "__builtins__"} != {k: v for k, v in env_folded.items() if k != "__builtins__"}:
+        raise AssertionError("상수를 접은 코드의 실행 결과가 다릅니다.")
+    print(f"  노드 수: {_count_nodes(program.body)} -> {_count_nodes(folded.body)}, "
+          f"생성 코드 {len(gen_program(program))} -> {len(gen_program(folded))} 글자")
+    _report("코드 생성 + compile (접기 포함)", _timeit(_gen_compile, program, False, repeat=3), _timeit(_gen_compile, program, True, repeat=3))
+    plain_code = compile(gen_program(program), "<생성된 파이썬 코드>", "exec")
+    folded_code = compile(gen_program(folded), "<생성된 파이썬 코드>", "exec")
+    # CPython 도 compile 할 때 산술 상수는 접으므로, 실행에서 남는 차이는 비교 사슬 같은 나머지 몫이다
+    _report("실행", _timeit(_exec_code, plain_code, repeat=3), _timeit(_exec_code, folded_code, repeat=3))
+
+BENCHES = {
+    "lexer": bench_lexer,
+    "tokens": bench_tokens,
+    "intern": bench_intern,
+    "input": bench_input,
+    "parallel": bench_parallel,
+    "incremental": bench_incremental,
+    "memo": bench_memo,
+    "pratt": bench_pratt,
+    "deep": bench_deep,
+    "dispatch": bench_dispatch,
+    "lazy": bench_lazy,
+    "reparse": bench_reparse,
+    "stream": bench_stream,
+    "slots": bench_slots,
+    "arena": bench_arena,
+    "hashcons": bench_hashcons,
+    "visitor": bench_visitor,
+    "lower": bench_lower,
+    "astbin": bench_astbin,
+    "dump": bench_dump,
+    "fold": bench_fold,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="한글 미니 언어 프런트엔드 벤치마크")
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help="실행할 벤치마크 이름 (생략하면 전부)",
+    )
+    parser.add_argument(
+        "--blocks",
+        type=int,
+        default=2000,
+        help="벤치마크 소스에 반복할 블록 수",
+    )
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHES:
+            parser.error(f"알 수 없는 벤치마크: {name!r} (가능: {', '.join(BENCHES)})")
+
+    source = make_big_source(args.blocks)
+    print(f"소스 크기: {len(source)} 글자, {source.count(chr(10))} 줄\n")
+    for name in args.names or BENCHES:
+        BENCHES[name](source)
+        print()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
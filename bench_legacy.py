@@ -0,0 +1,1392 @@
+# bench_legacy.py
+#
+# bench_demo.py 가 새 구현과 비교하는 이전 구현들 (동작 그대로 얼려 둔 것)
+#
+# - simple_lexer:          정규식 스캐너 도입 전의 문자 단위 렉서 (lexer, intern)
+# - RecursiveSuiteParser:  블록 본문을 명시적 스택으로 바꾸기 전의 재귀 문장 파서
+# - RecursiveParser:       parse_expr 를 명시적 스택으로 바꾸기 전의 재귀 하강 식 파서 (pratt, deep)
+# - ChainParser:           우선순위 오르기 도입 전의 단계별 재귀 하강 사슬 (pratt)
+# - IfChainStmtParser:     문장 처리 표 도입 전의 if/elif 사슬 (dispatch, Parser 와는 _parse_stmt 만 다르다)
+# - dict_node_class:       __slots__ 도입 전의 __dict__ 판 노드 클래스 (slots)
+# - gen_program / ast_lines: 방문자 도입 전의 isinstance 사슬 코드 생성 / AST 출력 (visitor)
+# - print_program:         dump_ast 도입 전의 줄마다 print 하는 출력 (dump)
+#
+# 지금 구현이 바뀌어도 비교 기준이 따라 바뀌지 않도록, 이전 구현이 쓰던 표와 도우미도 여기에 복사해 두고
+# 다른 모듈에서는 공개 이름 (Parser 의 공개 메서드와 처리 표, 노드 클래스, 토큰 표) 만 가져다 쓴다.
+# IfChainStmtParser 만은 문장 시작 분기 하나를 갈아 끼우려고 Parser 의 _parse_stmt / _parse_block 에 맞춘다.
+
+from dataclasses import fields, make_dataclass
+
+from lexer_demo import number_value, DEF_KEYWORD, KEYWORD_TOKENS, SYMBOL_TOKENS
+from parser_demo import Parser
+from ast_demo import (
+    Node, Expr, Stmt, Program, Assign, ChainedAssign, AugAssign, Name, Number, BinOp,
+    If, While, For, FunctionDef, ClassDef, Return, Call, ExprStmt, Break, Continue, Pass,
+    Bool, NoneLiteral, UnaryOp, String, ListLiteral, Index, Slice, Attribute,
+    TupleLiteral, SetLiteral, DictLiteral, Compare, IfExpr, NamedExpr,
+    Param, Import, FromImport, With, WithItem, Try, ExceptHandler, Raise, iter_ast_lines,
+)
+from mapping import HAN_KEYWORDS, BUILTIN_HAN_TO_PY, SPECIAL_IDENT_HAN_TO_PY
+from tokens import (
+    SYMBOLS, MULTI_SYMBOLS, ADD_OPS, MUL_OPS, COMP_OPS, SHIFT_OPS, POW_OP, BITAND_OP, BITOR_OP, BITXOR_OP,
+)
+
+# ======================
+#  식 파싱 표 (parse_binary 를 만들 때의 parser_demo 표)
+# ======================
+
+_TOK_IF = KEYWORD_TOKENS["만약"]
+_TOK_OR = KEYWORD_TOKENS["또는"]
+_TOK_AND = KEYWORD_TOKENS["그리고"]
+_TOK_NOT = KEYWORD_TOKENS["아니다"]
+_TOK_IN = KEYWORD_TOKENS["안에"]
+_TOK_BITOR = SYMBOL_TOKENS[BITOR_OP]
+_TOK_BITXOR = SYMBOL_TOKENS[BITXOR_OP]
+_TOK_BITAND = SYMBOL_TOKENS[BITAND_OP]
+_TOK_POW = SYMBOL_TOKENS[POW_OP]
+_TOK_LBRACKET = SYMBOL_TOKENS["["]
+_TOK_DOT = SYMBOL_TOKENS["."]
+_TOK_LPAREN = SYMBOL_TOKENS["("]
+
+(_PREC_OR, _PREC_AND, _PREC_NOT, _PREC_COMPARE, _PREC_BITOR, _PREC_BITXOR, _PREC_BITAND,
+ _PREC_SHIFT, _PREC_SUM, _PREC_TERM, _PREC_FACTOR, _PREC_POW) = range(1, 13)
+
+_BINARY_OPS: dict[tuple[str, str], tuple[int, str]] = {
+    _TOK_OR: (_PREC_OR, "or"),
+    _TOK_AND: (_PREC_AND, "and"),
+    _TOK_BITOR: (_PREC_BITOR, BITOR_OP),
+    _TOK_BITXOR: (_PREC_BITXOR, BITXOR_OP),
+    _TOK_BITAND: (_PREC_BITAND, BITAND_OP),
+    **{SYMBOL_TOKENS[op]: (_PREC_SHIFT, op) for op in SHIFT_OPS},
+    **{SYMBOL_TOKENS[op]: (_PREC_SUM, op) for op in ADD_OPS},
+    **{SYMBOL_TOKENS[op]: (_PREC_TERM, op) for op in MUL_OPS},
+    _TOK_POW: (_PREC_POW, POW_OP),
+}
+
+_COMPARE_OPS: dict[tuple[str, str], str] = {
+    **{SYMBOL_TOKENS[op]: op for op in COMP_OPS if op in SYMBOL_TOKENS},
+    _TOK_IN: "in",
+}
+
+_UNARY_TOKENS = frozenset(SYMBOL_TOKENS[op] for op in ("+", "-", "~"))
+
+# IfChainStmtParser 가 사슬에서 직접 부르는 블록 문장 (지금 Parser 의 처리 표에 등록된 것)
+_BLOCK_STEPS = {keyword: Parser.block_handlers[KEYWORD_TOKENS[keyword]]
+                for keyword in ("만약", "동안", "반복", "클래스", DEF_KEYWORD, "시도", "함께")}
+
+# ======================
+#  lexer
+# ======================
+
+def simple_lexer(text: str):
+    """정규식 스캐너 도입 전의 문자 단위 루프 렉서"""
+    tokens = []
+    indent_stack = [0]
+
+    def _strip_comment_preserving_strings(code: str) -> str:
+        out: list[str] = []
+        quote: str | None = None
+        escaped = False
+        for ch in code:
+            if quote is not None:
+                out.append(ch)
+                if escaped:
+                    escaped = False
+                    continue
+                if ch == "\\":
+                    escaped = True
+                    continue
+                if ch == quote:
+                    quote = None
+                continue
+            else:
+                if ch in ('"', "'"):
+                    out.append(ch)
+                    quote = ch
+                    continue
+                if ch == "#":
+                    break
+                out.append(ch)
+        return "".join(out)
+
+    for raw_line in text.splitlines():
+        line = raw_line.rstrip("\n\r")
+        if line.strip() == "":
+            continue
+
+        indent = 0
+        i = 0
+        while i < len(line) and line[i] in (" ", "\t"):
+            if line[i] == " ":
+                indent += 1
+            else:
+                indent += 4
+            i += 1
+
+        code = _strip_comment_preserving_strings(line[i:])
+        if code.strip() == "":
+            continue
+
+        if indent > indent_stack[-1]:
+            indent_stack.append(indent)
+            tokens.append(("INDENT", ""))
+        elif indent < indent_stack[-1]:
+            while indent < indent_stack[-1]:
+                indent_stack.pop()
+                tokens.append(("DEDENT", ""))
+            if indent != indent_stack[-1]:
+                raise IndentationError("들여쓰기가 일관되지 않습니다.")
+
+        j = 0
+        while j < len(code):
+            ch = code[j]
+            if ch in (" ", "\t"):
+                j += 1
+                continue
+
+            if ch in ('"', "'"):
+                quote = ch
+                j += 1
+                buf = ""
+                while j < len(code) and code[j] != quote:
+                    buf += code[j]
+                    j += 1
+                if j < len(code) and code[j] == quote:
+                    j += 1
+                tokens.append(("STRING", buf))
+                continue
+
+            if ch.isdigit() or (ch == "." and (j + 1) < len(code) and code[j + 1].isdigit()):
+                start = j
+                n = len(code)
+                while j < n and code[j].isdigit():
+                    j += 1
+                if j < n and code[j] == ".":
+                    j += 1
+                    while j < n and code[j].isdigit():
+                        j += 1
+                if j < n and code[j] in ("e", "E"):
+                    k = j + 1
+                    if k < n and code[k] in ("+", "-"):
+                        k += 1
+                    if k < n and code[k].isdigit():
+                        j = k + 1
+                        while j < n and code[j].isdigit():
+                            j += 1
+                tokens.append(("NUMBER", code[start:j]))
+                continue
+
+            two = code[j:j+2]
+            if two in MULTI_SYMBOLS:
+                tokens.append(("SYMBOL", two))
+                j += 2
+                continue
+            if ch in SYMBOLS:
+                tokens.append(("SYMBOL", ch))
+                j += 1
+                continue
+
+            start = j
+            while (
+                j < len(code)
+                and code[j] not in (" ", "\t")
+                and code[j] not in SYMBOLS
+                and code[j] not in ('"', "'")
+            ):
+                j += 1
+            w = code[start:j]
+            if w in HAN_KEYWORDS:
+                tokens.append(("KEYWORD", w))
+            elif w.isdigit():
+                tokens.append(("NUMBER", w))
+            else:
+                tokens.append(("IDENT", w))
+
+        tokens.append(("NEWLINE", ""))
+
+    while len(indent_stack) > 1:
+        indent_stack.pop()
+        tokens.append(("DEDENT", ""))
+    return tokens
+
+# ======================
+#  parser
+# ======================
+
+class RecursiveSuiteParser(Parser):
+    """
+    블록 본문을 명시적 스택으로 바꾸기 전의 재귀 파서.
+    블록 문장은 본문마다 parse_suite -> parse_stmt 를 다시 불러 중첩 깊이만큼 파이썬 스택을 쓴다.
+    복구 모드, 토큰 스트림, 증분 파싱 정보는 없다 (벤치는 Parser(tokens) 로만 만든다).
+    """
+
+    def parse_program(self) -> Program:
+        body: list[Stmt] = []
+        while self.current[0] != "EOF":
+            # 빈 줄(NEWLINE)은 건너뜀
+            if self.current[0] == "NEWLINE":
+                self.advance()
+                continue
+            body.append(self.parse_stmt())
+        return self.mark(Program(body=body), 0)
+
+    def parse_stmt(self) -> Stmt:
+        start = self.pos
+        return self.mark(self.dispatch_stmt(), start)
+
+    def dispatch_stmt(self) -> Stmt:
+        """문장 시작 토큰으로 처리 함수를 고른다 (블록 문장 -> 이름 -> 키워드 처리 표)"""
+        tok = self.current
+        steps = self.block_handlers.get(tok)
+        if steps is not None:
+            return self.parse_block(steps)
+        if tok[0] == "IDENT":
+            return self.parse_simple_stmt()
+        handler = self.statement_handlers.get(tok)
+        if handler is not None:
+            return handler(self)
+        raise self.error(f"지원하지 않는 문장 시작 토큰: {self.current}")
+
+    def parse_block(self, steps) -> Stmt:
+        steps = steps(self)
+        value = None
+        while True:
+            try:
+                steps.send(value)
+            except StopIteration as done:
+                return done.value
+            value = self.parse_suite()
+
+    def parse_suite(self) -> list[Stmt]:
+        if self.current[0] == "NEWLINE":
+            self.advance()
+            self.expect("INDENT")
+            body: list[Stmt] = []
+            while self.current[0] not in ("DEDENT", "EOF"):
+                if self.current[0] == "NEWLINE":
+                    self.advance()
+                    continue
+                body.append(self.parse_stmt())
+            self.expect("DEDENT")
+            return body
+        return [self.parse_stmt()]
+
+class RecursiveParser(RecursiveSuiteParser):
+    """
+    parse_expr 를 명시적 스택으로 바꾸기 전의 재귀 하강 식 파서.
+    packrat 메모와 TokenStream 의 숫자 값 배열은 쓰지 않는다 (벤치는 둘 다 끈 Parser 와 비교한다).
+    """
+
+    def parse_expr(self) -> Expr:
+        """
+        expr ::= or_expr
+        """
+        return self.parse_namedexpr()
+    
+    def parse_namedexpr(self) -> Expr:
+        """
+        namedexpr ::= IDENT ':=' conditional_expr | conditional_expr
+        """
+        if self.current[0] == "IDENT" and self.peek(1) == ("SYMBOL", ":="):
+            start = self.pos
+            _, name = self.expect("IDENT")
+            target = self.mark(Name(name), start)
+            self.expect("SYMBOL", ":=")
+            value = self.parse_conditional()
+            return self.mark(NamedExpr(target=target, value=value), start)
+        return self.parse_conditional()
+    
+    def parse_conditional(self) -> Expr:
+        """
+        conditional_expr ::= or_expr ('만약' or_expr '그외' conditional_expr)?
+        (Python의 a if cond else b 를 'a 만약 cond 그외 b'로 지원)
+        """
+        start = self.pos
+        body = self.parse_binary()
+        if self.current is _TOK_IF:
+            self.advance()
+            test = self.parse_binary()
+            self.expect("KEYWORD", "그외")
+            orelse = self.parse_conditional()
+            return self.mark(IfExpr(body=body, test=test, orelse=orelse), start)
+        return body
+    
+    def parse_binary(self, min_prec: int = _PREC_OR) -> Expr:
+        """
+        or_expr 부터 power 까지를 우선순위 오르기(precedence climbing)로 한 번에 파싱한다.
+
+        or_expr    ::= and_expr ("또는" and_expr)*
+        and_expr   ::= not_expr ("그리고" not_expr)*
+        not_expr   ::= "아니다" not_expr | comparison
+        comparison ::= bitor ((comp_op | "안에" | "아니다 안에") bitor)*
+        bitor      ::= bitxor ('|' bitxor)*          (bitxor '^', bitand '&', shift '<<' '>>' 도 같은 꼴)
+        sum        ::= term (('+' | '-') term)*
+        term       ::= factor (('*' | '/' | '//' | '%') factor)*
+        factor     ::= ('+' | '-' | '~') factor | power
+        power      ::= atom_expr ('**' factor)?     (오른쪽 결합)
+
+        단계마다 함수를 하나씩 거치지 않고 _BINARY_OPS 표에서 우선순위를 찾는다.
+        min_prec 보다 약하게 묶이는 연산자를 만나면 멈춘다.
+        """
+        start = self.pos
+        tok = self.current
+
+        # 전위 연산자: '아니다' 는 not_expr 자리에서만, '+' '-' '~' 는 어디서나
+        if tok is _TOK_NOT and min_prec <= _PREC_NOT:
+            self.advance()
+            operand = self.parse_binary(_PREC_NOT)
+            left = self.mark(UnaryOp(op="not", operand=operand), start)
+        elif tok in _UNARY_TOKENS:
+            self.advance()
+            operand = self.parse_binary(_PREC_FACTOR)
+            left = self.mark(UnaryOp(op=tok[1], operand=operand), start)
+        else:
+            left = self.parse_atom_expr()
+
+        while True:
+            tok = self.current
+            entry = _BINARY_OPS.get(tok)
+            if entry is not None:
+                prec, op = entry
+                if prec < min_prec:
+                    break
+                self.advance()
+                # '**' 의 오른쪽은 factor (오른쪽 결합), 나머지는 한 단계 센 것만 (왼쪽 결합)
+                right = self.parse_binary(_PREC_FACTOR if prec == _PREC_POW else prec + 1)
+                left = self.mark(BinOp(left=left, op=op, right=right), start)
+                continue
+
+            # 비교 연산자는 연쇄(a < b < c)를 Compare 하나로 모은다
+            if min_prec <= _PREC_COMPARE and (
+                    tok in _COMPARE_OPS or (tok is _TOK_NOT and self.peek(1) is _TOK_IN)):
+                left = self._parse_compare(left, start)
+                continue
+            break
+        return left
+
+    def _parse_compare(self, left: Expr, start: int) -> Compare:
+        """left 뒤에 이어지는 비교 연산자 연쇄를 Compare 로 (각 비교 대상은 bitor)"""
+        ops: list[str] = []
+        comparators: list[Expr] = []
+        while True:
+            tok = self.current
+            # "아니다 안에" (not in)
+            if tok is _TOK_NOT:
+                if self.peek(1) is not _TOK_IN:
+                    break
+                self.advance()
+                self.advance()
+                op = "not in"
+            else:
+                op = _COMPARE_OPS.get(tok)
+                if op is None:
+                    break
+                self.advance()
+            ops.append(op)
+            comparators.append(self.parse_binary(_PREC_BITOR))
+        return self.mark(Compare(left=left, ops=ops, comparators=comparators), start)
+    
+    def parse_atom_expr(self) -> Expr:
+        """
+        atom_expr ::= NUMBER | STRING | bool/none | IDENT | '(' expr ')' | list/tuple/set/dict
+                    (postfix: call/index/slice/attr)*
+        """
+        tok_type, tok_value = self.current
+        node: Expr
+        node_start = self.pos
+        
+        # 숫자
+        if tok_type == "NUMBER":
+            node = Number(number_value(tok_value), raw=tok_value)
+            self.advance()
+        
+        # 문자열
+        elif tok_type == "STRING":
+            self.advance()
+            node = String(tok_value)
+        
+        # 불리언 / None 리터럴
+        elif tok_type == "KEYWORD" and tok_value in ("참", "거짓", "없음"):
+            self.advance()
+            if tok_value == "참":
+                node = Bool(True)
+            elif tok_value == "거짓":
+                node = Bool(False)
+            else:
+                node = NoneLiteral()
+        
+        # 괄호식/튜플: (expr) / (a, b) / (a,) / ()
+        elif tok_type == "SYMBOL" and tok_value == "(":
+            self.advance() # '(' 소비
+
+            # 빈 튜플: ()
+            if self.current[0] == "SYMBOL" and self.current[1] == ")":
+                self.advance()
+                node = TupleLiteral(elements=[])
+            else:
+                first = self.parse_expr()
+
+                # 콤마가 있으면 튜플
+                if self.current[0] == "SYMBOL" and self.current[1] == ",":
+                    elements: list[Expr] = [first]
+                    while self.current[0] == "SYMBOL" and self.current[1] == ",":
+                        self.advance() # ',' 소비
+                        # trailing comma 허용: (a,)
+                        if self.current[0] == "SYMBOL" and self.current[1] == ")":
+                            break
+                        elements.append(self.parse_expr())
+                    self.expect("SYMBOL", ")")
+                    node = TupleLiteral(elements=elements)
+                else:
+                    # 콤마가 없으면 그냥 괄호 그룹
+                    self.expect("SYMBOL", ")")
+                    node = first
+        
+        # 리스트 리터럴: [a, b, c]
+        elif tok_type == "SYMBOL" and tok_value == "[":
+            self.advance()
+            elements: list[Expr] = []
+
+            if not (self.current[0] == "SYMBOL" and self.current[1] == "]"):
+                while True:
+                    elements.append(self.parse_expr())
+                    if self.current[0] == "SYMBOL" and self.current[1] == ",":
+                        self.advance()
+                        continue
+                    break
+
+            self.expect("SYMBOL", "]")
+            node = ListLiteral(elements=elements)
+
+        # dict/set 리터럴: {k: v} / {a, b, c}
+        elif tok_type == "SYMBOL" and tok_value == "{":
+            self.advance()
+
+            # 빈 dict: {}
+            if self.current[0] == "SYMBOL" and self.current[1] == "}":
+                self.advance()
+                node = DictLiteral(items=[])
+            else:
+                first = self.parse_expr()
+
+                # dict: {key: value, ...}
+                if self.current[0] == "SYMBOL" and self.current[1] == ":":
+                    items: list[tuple[Expr, Expr]] = []
+                    while True:
+                        self.expect("SYMBOL", ":")
+                        value = self.parse_expr()
+                        items.append((first, value))
+
+                        if self.current[0] == "SYMBOL" and self.current[1] == ",":
+                            self.advance()
+                            # trailing comma 허용
+                            if self.current[0] == "SYMBOL" and self.current[1] == "}":
+                                break
+                            first = self.parse_expr()
+                            continue
+                        break
+
+                    self.expect("SYMBOL", "}")
+                    node = DictLiteral(items=items)
+                else:
+                    # set: {a, b, c}
+                    elements: list[Expr] = [first]
+                    while self.current[0] == "SYMBOL" and self.current[1] == ",":
+                        self.advance()
+                        # trailing comma 허용
+                        if self.current[0] == "SYMBOL" and self.current[1] == "}":
+                            break
+                        elements.append(self.parse_expr())
+                    self.expect("SYMBOL", "}")
+                    node = SetLiteral(elements=elements)
+        
+        # 이름(변수 또는 함수호출)
+        elif tok_type == "IDENT":
+            self.advance()
+            node = Name(tok_value)
+        else:
+            raise self.error(f"숫자/문자열/이름/괄호/리스트로 시작하는 표현식이 와야하는데 {self.current}를 만났습니다.")
+
+        # 괄호 그룹 (a + b) 은 안쪽 식의 span 을 그대로 둔다
+        if node.span == 0:
+            self.mark(node, node_start)
+        
+        # postfix: 호출/인덱싱/속성접근을 연쇄로 지원
+        while True:
+            tok = self.current
+            # 인덱싱/슬라이싱: x[0], x[1:3], x[:], x[::2]
+            if tok is _TOK_LBRACKET:
+                self.advance()
+
+                if self.current == ("SYMBOL", "]"):
+                    raise self.error("빈 인덱스는 허용되지 않습니다: x[]")
+                
+                # start / first
+                start = None
+                first = None
+                if self.current != ("SYMBOL", ":"):
+                    first = self.parse_expr()
+                
+                # ':'가 있으면 슬라이스, 아니면 인덱싱
+                if self.current == ("SYMBOL", ":"):
+                    start = first
+                    self.advance()
+
+                    # stop
+                    if self.current not in (("SYMBOL", ":"), ("SYMBOL", "]")):
+                        stop = self.parse_expr()
+                    else:
+                        stop = None
+                    
+                    # step(optional)
+                    step = None
+                    if self.current == ("SYMBOL", ":"):
+                        self.advance()
+                        if self.current != ("SYMBOL", "]"):
+                            step = self.parse_expr()
+                    
+                    self.expect("SYMBOL", "]")
+                    node = self.mark(Slice(value=node, start=start, stop=stop, step=step), node_start)
+                else:
+                    if first is None:
+                        raise self.error("인덱싱 표현식이 필요합니다.")
+                    self.expect("SYMBOL", "]")
+                    node = self.mark(Index(value=node, index=first), node_start)
+                
+                continue
+
+            # 속성 접근: x.y
+            if tok is _TOK_DOT:
+                self.advance()
+                if self.current[0] != "IDENT":
+                    raise self.error(f"'.' 다음에는 IDENT(속성 이름)이 와야 합니다: {self.current}")
+                
+                _, attr = self.expect("IDENT")
+                node = self.mark(Attribute(value=node, attr=attr), node_start)
+                continue
+
+            # 함수/메서드 호출: f(...), obj.m(...)
+            if tok is _TOK_LPAREN:
+                self.advance()
+                args: list[Expr] = []
+                keywords: list[tuple[str, Expr]] = []
+                seen_kw = False
+                if not (self.current[0] == "SYMBOL" and self.current[1] == ")"):
+                    while True:
+                        if self.current[0] == "IDENT" and self.peek(1) == ("SYMBOL", "="):
+                            seen_kw = True
+                            _, key = self.expect("IDENT")
+                            self.expect("SYMBOL", "=")
+                            val = self.parse_expr()
+                            keywords.append((key, val))
+                        else:
+                            if seen_kw:
+                                raise self.error("키워드 인자 뒤에는 위치 인자를 둘 수 없습니다.")
+                            args.append(self.parse_expr())
+                        
+                        if self.current[0] == "SYMBOL" and self.current[1] == ",":
+                            self.advance()
+                            if self.current[0] == "SYMBOL" and self.current[1] == ")":
+                                break
+                            continue
+                        break
+                self.expect("SYMBOL", ")")
+                node = self.mark(Call(func=node, args=args, keywords=keywords), node_start)
+                continue
+            break
+        return node
+    
+
+class ChainParser(RecursiveParser):
+    """parse_binary 도입 전의 단계별 재귀 하강 사슬"""
+
+    def parse_binary(self, min_prec: int = _PREC_OR) -> Expr:
+        # parse_conditional 은 항상 or_expr 자리에서 부른다
+        return self.parse_or()
+
+    def parse_or(self) -> Expr:
+        """ or_expr ::= and_expr ("또는" and_expr)* """
+        start = self.pos
+        left = self.parse_and()
+        while self.current is _TOK_OR:
+            self.advance()
+            right = self.parse_and()
+            left = self.mark(BinOp(left=left, op="or", right=right), start)
+        return left
+    
+    def parse_and(self) -> Expr:
+        """
+        and_expr ::= not_expr ("그리고" not_expr)*
+        """
+        start = self.pos
+        left = self.parse_not()
+        while self.current is _TOK_AND:
+            self.advance()
+            right = self.parse_not()
+            left = self.mark(BinOp(left=left, op="and", right=right), start)
+        return left
+    
+    def parse_not(self) -> Expr:
+        """
+        not_expr ::= "아니다" not_expr | comparison
+        """
+        if self.current is _TOK_NOT:
+            start = self.pos
+            self.advance()
+            operand = self.parse_not()
+            return self.mark(UnaryOp(op="not", operand=operand), start)
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Expr:
+        """
+        comparison ::= bitor ((comp_op | "안에" | "아니다 안에") bitor)*
+        비교 연산(<, >, <=, >=, ==, !=, in)은 비트연산(|,^)보다 우선순위가 낮다.
+        """
+        start = self.pos
+        left = self.parse_bitor()
+
+        ops: list[str] = []
+        comparators: list[Expr] = []
+
+        while True:
+            tok = self.current
+            ttype, tvalue = tok
+
+            # 0) "아니다 안에" (not in) - 비교 연산자로 취급
+            if tok is _TOK_NOT:
+                if self.peek(1) is _TOK_IN:
+                    # "아니다", "안에" 소비
+                    self.advance()
+                    self.advance()
+                    op = "not in"
+                else:
+                    break
+
+            # 1) "안에" (in)
+            elif tok is _TOK_IN:
+                self.advance()
+                op = "in"
+
+            # 2) 기존 비교 연산자들
+            elif ttype == "SYMBOL" and tvalue in COMP_OPS:
+                op = tvalue
+                self.advance()
+            else:
+                break
+
+            right = self.parse_bitor()
+            ops.append(op)
+            comparators.append(right)
+
+        if not ops:
+            return left
+        
+        return self.mark(Compare(left=left, ops=ops, comparators=comparators), start)
+    
+    def parse_bitor(self) -> Expr:
+        """
+        bitor ::= bitxor ('|' bitxor)*
+        """
+        start = self.pos
+        left = self.parse_bitxor()
+        while self.current is _TOK_BITOR:
+            self.advance()
+            right = self.parse_bitxor()
+            left = self.mark(BinOp(left=left, op="|", right=right), start)
+        return left
+    
+    def parse_bitxor(self) -> Expr:
+        """
+        bitxor ::= bitand ('^' bitand)*
+        """
+        start = self.pos
+        left = self.parse_bitand()
+        while self.current is _TOK_BITXOR:
+            self.advance()
+            right = self.parse_bitand()
+            left = self.mark(BinOp(left=left, op="^", right=right), start)
+        return left
+    
+    def parse_bitand(self) -> Expr:
+        """
+        bitand ::= shift ('&' shift)*
+        """
+        start = self.pos
+        left = self.parse_shift()
+        while self.current is _TOK_BITAND:
+            self.advance()
+            right = self.parse_shift()
+            left = self.mark(BinOp(left=left, op="&", right=right), start)
+        return left
+
+    def parse_shift(self) -> Expr:
+        """
+        shift ::= sum (('<<' | '>>') sum)*
+        """
+        start = self.pos
+        left = self.parse_sum()
+        while self.current[0] == "SYMBOL" and self.current[1] in SHIFT_OPS:
+            op = self.current[1]
+            self.advance()
+            right = self.parse_sum()
+            left = self.mark(BinOp(left=left, op=op, right=right), start)
+        return left
+    
+    def parse_sum(self) -> Expr:
+        """
+        sum ::= term (('+' | '-') term)*
+        """
+        start = self.pos
+        left = self.parse_term()
+        while self.current[0] == "SYMBOL" and self.current[1] in ADD_OPS:
+            op = self.current[1]
+            self.advance()
+            right = self.parse_term()
+            left = self.mark(BinOp(left=left, op=op, right=right), start)
+        return left
+    
+    def parse_term(self) -> Expr:
+        """
+        term ::= factor (('*' | '/' | '//' | '%') factor)*
+        """
+        start = self.pos
+        left = self.parse_factor()
+        while self.current[0] == "SYMBOL" and self.current[1] in MUL_OPS:
+            op = self.current[1]
+            self.advance()
+            right = self.parse_factor()
+            left = self.mark(BinOp(left=left, op=op, right=right), start)
+        return left
+    
+    def parse_factor(self) -> Expr:
+        """
+        factor ::= ('+' | '-' | '~') factor | power
+        """
+        tok_type, tok_value = self.current 
+        if tok_type == "SYMBOL" and tok_value in ("+", "-", "~"):
+            start = self.pos
+            self.advance()
+            operand = self.parse_factor()
+            return self.mark(UnaryOp(op=tok_value, operand=operand), start)
+        return self.parse_power()
+    
+    def parse_power(self) -> Expr:
+        """
+        power ::= atom_expr ('**' factor)? (오른쪽 결합)
+        """
+        start = self.pos
+        left = self.parse_atom_expr()
+        if self.current is _TOK_POW:
+            self.advance()
+            right = self.parse_factor()
+            return self.mark(BinOp(left=left, op="**", right=right), start)
+        return left
+
+class IfChainStmtParser(Parser):
+    """
+    문장 처리 표 도입 전의 if/elif 사슬로 문장 시작을 나눈다.
+    Parser 와는 _parse_stmt 만 다르다: 블록 문장 표를 비워 블록 문장도 사슬을 거치게 하고,
+    그 본문은 Parser 와 같은 본문 파싱(_parse_block)으로 넘긴다. 그래서 벤치는 문장 시작 분기만 비교한다.
+    (블록 문장 표가 비어 있으므로 _RECURSIVE_BLOCKS 겹보다 깊은 블록은 파이썬 스택을 쓴다. 벤치 소스는 얕다.)
+    """
+
+    block_handlers = {}
+
+    def _parse_stmt(self) -> Stmt:
+        ttype, tvalue = self.current
+
+        if ttype == "KEYWORD" and tvalue == "만약":
+            return self._parse_block(_BLOCK_STEPS["만약"], self.recover)
+        elif ttype == "KEYWORD" and tvalue == "동안":
+            return self._parse_block(_BLOCK_STEPS["동안"], self.recover)
+        elif ttype == "KEYWORD" and tvalue == "반복":
+            return self._parse_block(_BLOCK_STEPS["반복"], self.recover)
+        elif ttype == "KEYWORD" and tvalue == "클래스":
+            return self._parse_block(_BLOCK_STEPS["클래스"], self.recover)
+        elif ttype == "KEYWORD" and tvalue == DEF_KEYWORD:
+            return self._parse_block(_BLOCK_STEPS[DEF_KEYWORD], self.recover)
+        elif ttype == "KEYWORD" and tvalue == "반환":
+            return self.parse_return()
+        elif ttype == "KEYWORD" and tvalue == "중단":
+            self.expect("KEYWORD", "중단")
+            return Break()
+        elif ttype == "KEYWORD" and tvalue == "계속":
+            self.expect("KEYWORD", "계속")
+            return Continue()
+        elif ttype == "KEYWORD" and tvalue == "통과":
+            self.expect("KEYWORD", "통과")
+            return Pass()
+        elif ttype == "KEYWORD" and tvalue == "불러오기":
+            return self.parse_import()
+        elif ttype == "KEYWORD" and tvalue == "꺼내기":
+            return self.parse_from_import()
+        elif ttype == "KEYWORD" and tvalue == "시도":
+            return self._parse_block(_BLOCK_STEPS["시도"], self.recover)
+        elif ttype == "KEYWORD" and tvalue == "함께":
+            return self._parse_block(_BLOCK_STEPS["함께"], self.recover)
+        elif ttype == "KEYWORD" and tvalue == "던지기":
+            return self.parse_raise()
+        elif ttype == "IDENT":
+            return self.parse_simple_stmt()
+
+        raise self.error(f"지원하지 않는 문장 시작 토큰: {self.current}")
+
+# ======================
+#  slots: __dict__ 판 노드
+# ======================
+
+class DictNode:
+    """__slots__ 도입 전의 노드 부모 (span 은 클래스 기본값, 기록하면 인스턴스 __dict__ 에)"""
+    span: int = 0
+
+# 노드 클래스 -> 필드가 같은 __dict__ 판 dataclass (_copy_tree 가 처음 볼 때 만든다)
+_DICT_NODES: dict[type, type] = {}
+
+def dict_node_class(cls: type) -> type:
+    legacy = _DICT_NODES.get(cls)
+    if legacy is None:
+        names = [f.name for f in fields(cls) if f.init]
+        legacy = _DICT_NODES[cls] = make_dataclass(cls.__name__, names, bases=(DictNode,))
+    return legacy
+
+# ======================
+#  visitor: isinstance 사슬 코드 생성 / AST 출력
+# ======================
+
+# 이 코드 생성기와 출력기가 쓰던 codegen_demo / ast_demo 의 도우미
+
+_EXPR = 0
+_STMT = 1
+
+def _push_joined(work: list, items, sep: str) -> None:
+    """items 를 sep 으로 이어 붙이도록 work 에 (거꾸로) 쌓는다"""
+    first = True
+    for item in reversed(items):
+        if not first:
+            work.append(sep)
+        work.append(item)
+        first = False
+
+class _Keyword:
+    """_emit_expr 의 작업 목록 안에서만 쓰는 키워드 인자 (key=value)"""
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: str, value: Expr):
+        self.key = key
+        self.value = value
+
+def _block(indent: str, body: list[Stmt], step: str = "    ", empty: str | None = None) -> list:
+    """본문 문장들을 step 만큼 더 들여 쓴 작업 목록 (비어 있으면 empty 줄 하나)"""
+    inner = indent + step
+    if not body:
+        return [] if empty is None else [(inner, empty)]
+    return [(inner, stmt) for stmt in body]
+
+class _ElifHead:
+    """'아니면' 줄"""
+    __slots__ = ("test",)
+
+    def __init__(self, n: If):
+        self.test = n.test
+
+class _HandlerHead:
+    """'예외' 줄 (+ 그 본문)"""
+    __slots__ = ("handler",)
+
+    def __init__(self, handler: ExceptHandler):
+        self.handler = handler
+
+def _emit_expr(node: Expr, out: list[str]) -> None:
+    """방문자 도입 전의 isinstance 사슬"""
+    work: list = [node]
+    while work:
+        node = work.pop()
+        if type(node) is str:
+            out.append(node)
+        elif isinstance(node, Number):
+            out.append(node.raw if node.raw is not None else str(node.value))
+        elif isinstance(node, Name):
+            out.append(SPECIAL_IDENT_HAN_TO_PY.get(node.id, node.id))
+        elif isinstance(node, BinOp):
+            out.append("(")
+            work += (")", node.right, f" {node.op} ", node.left)
+        elif isinstance(node, Compare):
+            out.append("(")
+            work.append(")")
+            for op, cmp_ in reversed(list(zip(node.ops, node.comparators))):
+                work += (cmp_, f" {op} ")
+            work.append(node.left)
+        elif isinstance(node, IfExpr):
+            out.append("(")
+            work += (")", node.orelse, " else ", node.test, " if ", node.body)
+        elif isinstance(node, NamedExpr):
+            out.append("(")
+            work += (")", node.value, " := ", node.target)
+        elif isinstance(node, Call):
+            work.append(")")
+            parts: list = list(node.args)
+            if node.keywords:
+                for k, v in node.keywords:
+                    parts.append(_Keyword(k, v))
+            _push_joined(work, parts, ", ")
+            work.append("(")
+            if isinstance(node.func, Name):
+                work.append(BUILTIN_HAN_TO_PY.get(node.func.id, node.func.id))
+            else:
+                work.append(node.func)
+        elif isinstance(node, _Keyword):
+            out.append(f"{node.key}=")
+            work.append(node.value)
+        elif isinstance(node, ListLiteral):
+            out.append("[")
+            work.append("]")
+            _push_joined(work, node.elements, ", ")
+        elif isinstance(node, TupleLiteral):
+            if len(node.elements) == 0:
+                out.append("()")
+                continue
+            out.append("(")
+            work.append(",)" if len(node.elements) == 1 else ")")
+            _push_joined(work, node.elements, ", ")
+        elif isinstance(node, SetLiteral):
+            if len(node.elements) == 0:
+                out.append("set()")
+                continue
+            out.append("{")
+            work.append("}")
+            _push_joined(work, node.elements, ", ")
+        elif isinstance(node, DictLiteral):
+            if not node.items:
+                out.append("{}")
+                continue
+            out.append("{")
+            work.append("}")
+            first = True
+            for k, v in reversed(node.items):
+                if not first:
+                    work.append(", ")
+                work += (v, ": ", k)
+                first = False
+        elif isinstance(node, Attribute):
+            work += (f".{node.attr}", node.value)
+        elif isinstance(node, Index):
+            work += ("]", node.index, "[", node.value)
+        elif isinstance(node, Slice):
+            # value[start:stop] / value[start:stop:step] (없는 부분은 빈 칸)
+            work.append("]")
+            if node.step is not None:
+                work.append(node.step)
+                work.append(":")
+            if node.stop is not None:
+                work.append(node.stop)
+            work.append(":")
+            if node.start is not None:
+                work.append(node.start)
+            work += ("[", node.value)
+        elif isinstance(node, String):
+            out.append(repr(node.value))
+        elif isinstance(node, Bool):
+            out.append("True" if node.value else "False")
+        elif isinstance(node, NoneLiteral):
+            out.append("None")
+        elif isinstance(node, UnaryOp):
+            if node.op == "not":
+                out.append("(not ")
+            else:
+                out.append(f"({node.op}")
+            work += (")", node.operand)
+        else:
+            raise TypeError(f"지원하지 않는 Expr 타입: {node!r}")
+
+def gen_expr(node: Expr) -> str:
+    out: list[str] = []
+    _emit_expr(node, out)
+    return "".join(out)
+
+def _stmt_head(node, indent: str) -> tuple[str, list]:
+    """방문자 도입 전의 isinstance 사슬"""
+    # 0) 표현식 문 (예: 출력(값))
+    if isinstance(node, ExprStmt):
+        return gen_expr(node.value), []
+
+    # 1) 대입문
+    if isinstance(node, Assign):
+        target_code = gen_expr(node.target)
+        value_code = gen_expr(node.value)
+        return f"{target_code} = {value_code}", []
+
+    if isinstance(node, ChainedAssign):
+        parts = [gen_expr(t) for t in node.targets]
+        return f"{' = '.join(parts)} = {gen_expr(node.value)}", []
+
+    # 1.5) AugAssign (+=, -=, *=, /=)
+    elif isinstance(node, AugAssign):
+        target_code = gen_expr(node.target)
+        value_code = gen_expr(node.value)
+        return f"{target_code} {node.op}= {value_code}", []
+
+    # 2) if 문: 아니면(elif) 사슬은 orelse 안의 If 로 중첩되어 있지만 같은 깊이로 펼친다
+    elif isinstance(node, If):
+        rest = _block(indent, node.body)
+        n = node
+        while n.orelse and len(n.orelse) == 1 and isinstance(n.orelse[0], If):
+            n = n.orelse[0]
+            rest.append((indent, _ElifHead(n)))
+            rest += _block(indent, n.body)
+        # 그 외의 orelse(일반 else 블록)
+        if n.orelse:
+            rest.append((indent, "else:"))
+            rest += _block(indent, n.orelse)
+        return f"if {gen_expr(node.test)}:", rest
+    elif isinstance(node, _ElifHead):
+        # 조건식은 본문을 다 만든 뒤 이 줄에 올 차례가 되어서야 만든다 (에러 순서도 재귀 버전과 같게)
+        return f"elif {gen_expr(node.test)}:", []
+
+    # 3) while 문
+    elif isinstance(node, While):
+        cond_code = gen_expr(node.test)
+        return f"while {cond_code}:", _block(indent, node.body)
+
+    # 4) for 문
+    elif isinstance(node, For):
+        target = gen_expr(node.target)
+        iter_code = gen_expr(node.iter)
+        return f"for {target} in {iter_code}:", _block(indent, node.body)
+
+    # 4.5) break / continue / pass
+    elif isinstance(node, Break):
+        return "break", []
+    elif isinstance(node, Continue):
+        return "continue", []
+    elif isinstance(node, Pass):
+        return "pass", []
+
+    # 5) return
+    elif isinstance(node, Return):
+        if node.value is None:
+            return "return", []
+        else:
+            return f"return {gen_expr(node.value)}", []
+
+    # 6) functiondef
+    elif isinstance(node, FunctionDef):
+        parts: list[str] = []
+        for p in node.args:
+            if not isinstance(p, Param):
+                raise TypeError(f"FunctionDef.args에는 Param만 들어갈 수 있습니다: {p!r}")
+            if p.default is None:
+                parts.append(SPECIAL_IDENT_HAN_TO_PY.get(p.name, p.name))
+            else:
+                n = SPECIAL_IDENT_HAN_TO_PY.get(p.name, p.name)
+                parts.append(f"{n}={gen_expr(p.default)}")
+        params = ", ".join(parts)
+        return f"def {node.name}({params}):", _block(indent, node.body, empty="pass")
+    elif isinstance(node, ClassDef):
+        if node.bases:
+            bases_code = ', '.join(gen_expr(b) for b in node.bases)
+            head = f"class {node.name}({bases_code}):"
+        else:
+            head = f"class {node.name}:"
+        return head, _block(indent, node.body, empty="pass")
+    elif isinstance(node, With):
+        items: list[str] = []
+        for it in node.items:
+            if not isinstance(it, WithItem):
+                raise TypeError(f"With.items에는 WithItem만 들어갈 수 있습니다: {it!r}")
+            part = gen_expr(it.context_expr)
+            if it.optional_vars is not None:
+                part += f" as {gen_expr(it.optional_vars)}"
+            items.append(part)
+
+        # (with 본문은 한 칸만 들여 쓴다)
+        return f"with {', '.join(items)}:", _block(indent, node.body, " ", empty="pass")
+    elif isinstance(node, Import):
+        items: list[str] = []
+        for module, asname in node.names:
+            if asname:
+                items.append(f"{module} as {asname}")
+            else:
+                items.append(module)
+        return f"import {', '.join(items)}", []
+    elif isinstance(node, FromImport):
+        items: list[str] = []
+        for name, asname in node.names:
+            if name == "*":
+                if asname:
+                    raise SyntaxError("from ... import * 는 별칭(as)을 붙일 수 없습니다.")
+                items.append("*")
+            else:
+                if asname:
+                    items.append(f"{name} as {asname}")
+                else:
+                    items.append(name)
+        return f"from {node.module} import {', '.join(items)}", []
+    elif isinstance(node, Raise):
+        if node.exc is None:
+            return "raise", []
+        return f"raise {gen_expr(node.exc)}", []
+    elif isinstance(node, Try):
+        rest = _block(indent, node.body, empty="pass")
+        # except 줄은 본문을 다 만든 뒤에 만든다 (에러 순서도 재귀 버전과 같게)
+        rest += [(indent, _HandlerHead(h)) for h in node.handlers]
+        if node.orelse is not None:
+            rest.append((indent, "else:"))
+            rest += _block(indent, node.orelse, empty="pass")
+        if node.finalbody is not None:
+            rest.append((indent, "finally:"))
+            rest += _block(indent, node.finalbody, empty="pass")
+        return "try:", rest
+    elif isinstance(node, _HandlerHead):
+        h = node.handler
+        if not isinstance(h, ExceptHandler):
+            raise TypeError(f"Try.handlers에는 ExceptHandler만 들어갈 수 있습니다: {h!r}")
+        head = "except"
+        if h.type is not None:
+            head += f" {gen_expr(h.type)}"
+        if h.name is not None:
+            if h.type is None:
+                raise SyntaxError("'예외 별칭 e' 형태는 지원하지 않습니다. (타입 없이 별칭 불가)")
+            head += f" as {h.name}"
+        head += ":"
+        return head, _block(indent, h.body, empty="pass")
+    else:
+        raise TypeError(f"지원하지 않는 Stmt 타입: {node!r}")
+
+def gen_program(prog: Program) -> str:
+    """문장 머리 줄도 isinstance 사슬로 만드는 gen_program (line_map 없이)"""
+    lines: list[str] = []
+    work: list = [("", stmt) for stmt in reversed(prog.body)]
+    while work:
+        indent, node = work.pop()
+        if type(node) is str:
+            lines.append(indent + node)
+            continue
+        head, body = _stmt_head(node, indent)
+        lines.append(indent + head)
+        if body:
+            work.extend(reversed(body))
+    return "\n".join(lines)
+
+def _expr_parts(node: Expr, indent: int) -> list:
+    space = " " * indent
+    inner = indent + 2
+    if isinstance(node, Number):
+        return [f"{space}Number(value={node.value})"]
+    elif isinstance(node, Name):
+        return [f"{space}Name(id={node.id!r})"]
+    elif isinstance(node, BinOp):
+        return [
+            f"{space}BinOp(op={node.op!r})",
+            f"{space} left:", (_EXPR, node.left, inner),
+            f"{space} right:", (_EXPR, node.right, inner),
+        ]
+    elif isinstance(node, Compare):
+        return [
+            f"{space}Compare(ops={node.ops!r})",
+            f"{space} left:", (_EXPR, node.left, inner),
+            f"{space} comparators:", *[(_EXPR, c, inner) for c in node.comparators],
+        ]
+    elif isinstance(node, IfExpr):
+        return [
+            f"{space}IfExpr",
+            f"{space} body:", (_EXPR, node.body, inner),
+            f"{space} test:", (_EXPR, node.test, inner),
+            f"{space} orelse:", (_EXPR, node.orelse, inner),
+        ]
+    elif isinstance(node, NamedExpr):
+        return [
+            f"{space}NamedExpr",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+    elif isinstance(node, Call):
+        parts = [
+            f"{space}Call",
+            f"{space} func:", (_EXPR, node.func, inner),
+            f"{space} args:", *[(_EXPR, a, inner) for a in node.args],
+        ]
+        if node.keywords:
+            parts.append(f"{space} keywords:")
+            for k, v in node.keywords:
+                parts += (f"{space}  {k}=", (_EXPR, v, indent + 4))
+        return parts
+    elif isinstance(node, String):
+        return [f"{space}String(value={node.value!r})"]
+    elif isinstance(node, Bool):
+        return [f"{space}Bool(value={node.value})"]
+    elif isinstance(node, NoneLiteral):
+        return [f"{space}NoneLiteral()"]
+    elif isinstance(node, UnaryOp):
+        return [
+            f"{space}UnaryOp(op={node.op!r})",
+            f"{space} operand:", (_EXPR, node.operand, inner),
+        ]
+    elif isinstance(node, ListLiteral):
+        return [f"{space}ListLiteral", *[(_EXPR, e, inner) for e in node.elements]]
+    elif isinstance(node, TupleLiteral):
+        return [f"{space}TupleLiteral", *[(_EXPR, e, inner) for e in node.elements]]
+    elif isinstance(node, SetLiteral):
+        return [f"{space}SetLiteral", *[(_EXPR, e, inner) for e in node.elements]]
+    elif isinstance(node, DictLiteral):
+        parts = [f"{space}DictLiteral"]
+        for k , v in node.items:
+            parts += (f"{space} key:", (_EXPR, k, indent + 4), f"{space} value:", (_EXPR, v, indent + 4))
+        return parts
+    elif isinstance(node, Attribute):
+        return [
+            f"{space}Attribute(attr={node.attr!r})",
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+    elif isinstance(node, Index):
+        return [
+            f"{space}Index",
+            f"{space} value:", (_EXPR, node.value, inner),
+            f"{space} index:", (_EXPR, node.index, inner),
+        ]
+    elif isinstance(node, Slice):
+        parts = [f"{space}Slice", f"{space} value:", (_EXPR, node.value, inner)]
+        for label, n in (("start", node.start), ("stop", node.stop), ("step", node.step)):
+            parts.append(f"{space} {label}:")
+            parts.append(f"{space} None" if n is None else (_EXPR, n, inner))
+        return parts
+    else:
+        return [f"{space}<Unknown Expr {node}>"]
+
+def _stmt_parts(node: Stmt, indent: int) -> list:
+    space = " " * indent
+    inner = indent + 2
+    if isinstance(node, Assign):
+        return [
+            f"{space}Assign",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+    elif isinstance(node, ChainedAssign):
+        return [
+            f"{space}ChainedAssign",
+            f"{space} targets:", *[(_EXPR, t, inner) for t in node.targets],
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+    elif isinstance(node, ExprStmt):
+        return [f"{space}ExprStmt", f"{space} value:", (_EXPR, node.value, inner)]
+    elif isinstance(node, AugAssign):
+        return [
+            f"{space}AugAssign(op={node.op!r})",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} value:", (_EXPR, node.value, inner),
+        ]
+    elif isinstance(node, If):
+        parts = [
+            f"{space}If",
+            f"{space} test:", (_EXPR, node.test, inner),
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
+        if node.orelse:
+            parts.append(f"{space} orelse:")
+            parts += [(_STMT, s, inner) for s in node.orelse]
+        return parts
+    elif isinstance(node, While):
+        return [
+            f"{space}While",
+            f"{space} test:", (_EXPR, node.test, inner),
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
+    elif isinstance(node, For):
+        return [
+            f"{space}For",
+            f"{space} target:", (_EXPR, node.target, inner),
+            f"{space} iter:", (_EXPR, node.iter, inner),
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
+    elif isinstance(node, With):
+        parts = [f"{space}With", f"{space} items:"]
+        for it in node.items:
+            parts += (f"{space}  WithItem", f"{space}   context_expr:", (_EXPR, it.context_expr, indent + 4))
+            if it.optional_vars is not None:
+                parts += (f"{space}   optional_vars:", (_EXPR, it.optional_vars, indent + 4))
+        parts.append(f"{space} body:")
+        parts += [(_STMT, s, inner) for s in node.body]
+        return parts
+    elif isinstance(node, Break):
+        return [f"{space}Break"]
+    elif isinstance(node, Continue):
+        return [f"{space}Continue"]
+    elif isinstance(node, Pass):
+        return [f"{space}Pass"]
+    elif isinstance(node, Return):
+        if node.value is None:
+            return [f"{space}Return"]
+        return [f"{space}Return", (_EXPR, node.value, inner)]
+    elif isinstance(node, FunctionDef):
+        args = []
+        for p in node.args:
+            if p.default is None:
+                args.append(p.name)
+            else:
+                args.append(f"{p.name}=...")
+        return [
+            f"{space}FunctionDef(name={node.name!r}, args={args})",
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
+    elif isinstance(node, ClassDef):
+        bases = []
+        for b in node.bases:
+            bases.append(type(b).__name__)
+        return [
+            f"{space}ClassDef(name={node.name!r}, bases={bases})",
+            f"{space} body:", *[(_STMT, s, inner) for s in node.body],
+        ]
+    elif isinstance(node, Import):
+        return [f"{space}Import(names={node.names})"]
+    elif isinstance(node, FromImport):
+        return [f"{space}FromImport(module={node.module!r}, names={node.names})"]
+    elif isinstance(node, Raise):
+        if node.exc is None:
+            return [f"{space}Raise"]
+        return [f"{space}Raise", (_EXPR, node.exc, inner)]
+    elif isinstance(node, Try):
+        parts = [f"{space}Try", f"{space} body:", *[(_STMT, s, inner) for s in node.body], f"{space} handlers:"]
+        for h in node.handlers:
+            h_type = None if h.type is None else type(h.type).__name__
+            parts.append(f"{space}  ExceptHandler(type={h_type}, name={h.name!r})")
+            if h.type is not None:
+                parts += (f"{space}   type_expr:", (_EXPR, h.type, indent + 4))
+            parts.append(f"{space}   body:")
+            parts += [(_STMT, s, indent + 4) for s in h.body]
+        if node.orelse:
+            parts.append(f"{space} orelse:")
+            parts += [(_STMT, s, inner) for s in node.orelse]
+        if node.finalbody:
+            parts.append(f"{space} finalbody:")
+            parts += [(_STMT, s, inner) for s in node.finalbody]
+        return parts
+    else:
+        return [f"{space}<Unknown Stmt {node!r}>"]
+
+def _lines(kind: int, node: Node, indent: int):
+    """방문자 도입 전의 ast_demo 의 줄 만들기"""
+    work: list = [(kind, node, indent)]
+    while work:
+        item = work.pop()
+        if type(item) is str:
+            yield item
+            continue
+        kind, node, indent = item
+        parts = _expr_parts(node, indent) if kind == _EXPR else _stmt_parts(node, indent)
+        work.extend(reversed(parts))
+
+def ast_lines(prog: Program) -> list[str]:
+    """isinstance 사슬로 print_program 의 줄들을 만든다"""
+    lines = ["Program"]
+    for stmt in prog.body:
+        lines += _lines(_STMT, stmt, 1)
+    return lines
+
+# ======================
+#  dump: 줄마다 print
+# ======================
+
+def print_program(prog: Program) -> None:
+    """dump_ast 도입 전의 print_program (줄마다 print)"""
+    for line in iter_ast_lines(prog):
+        print(line)
@@ -14,171 +14,284 @@ from ast_demo import (
     Compare, Param, Import, FromImport,
     With, WithItem,
     Try, ExceptHandler, Raise,
+    NodeVisitor,
 )
 def gen_expr(node: Expr) -> str:
     """ 표현식(Expr) -> 파이썬 코드 문자열 """
-    if isinstance(node, Number):
-        return node.raw if node.raw is not None else str(node.value)
-    elif isinstance(node, Name):
-        return SPECIAL_IDENT_HAN_TO_PY.get(node.id, node.id)
-    elif isinstance(node, BinOp):
-        left = gen_expr(node.left)
-        right = gen_expr(node.right)
-        return f"({left} {node.op} {right})"
-    elif isinstance(node, Compare):
-        parts = [gen_expr(node.left)]
-        for op, cmp_ in zip(node.ops, node.comparators):
-            parts.append(op)
-            parts.append(gen_expr(cmp_))
-        return f"({' '.join(parts)})"
-    elif isinstance(node, IfExpr):
-        return f"({gen_expr(node.body)} if {gen_expr(node.test)} else {gen_expr(node.orelse)})"
-    elif isinstance(node, NamedExpr):
-        return f"({gen_expr(node.target)} := {gen_expr(node.value)})"
-    elif isinstance(node, Call):
-        if isinstance(node.func, Name):
-            func_code = BUILTIN_HAN_TO_PY.get(node.func.id, node.func.id)
+    out: list[str] = []
+    _emit_expr(node, out)
+    return "".join(out)
+
+def _push_joined(work: list, items, sep: str) -> None:
+    """items 를 sep 으로 이어 붙이도록 work 에 (거꾸로) 쌓는다"""
+    first = True
+    for item in reversed(items):
+        if not first:
+            work.append(sep)
+        work.append(item)
+        first = False
+
+def _emit_expr(node: Expr, out: list[str]) -> None:
+    """
+    node 의 파이썬 코드 조각들을 순서대로 out 에 붙인다.
+    재귀 호출 대신 작업 목록(work)을 쓴다: 문자열은 그대로 내보낼 조각, 노드는 펼칠 식.
+    조각이 나올 순서의 거꾸로 쌓으므로 중첩이 아무리 깊어도 파이썬 스택은 늘지 않는다.
+    노드 하나를 펼치는 일은 _ExprCode 방문자가 한다.
+    """
+    code = _EXPR_CODE
+    table = code.visit_table
+    work: list = [node]
+    while work:
+        node = work.pop()
+        if type(node) is str:
+            out.append(node)
         else:
-            func_code = gen_expr(node.func)
-        parts: list[str] = []
-        parts.extend(gen_expr(a) for a in node.args)
+            method = table.get(type(node)) or code.visit_method(type(node))
+            method(code, node, out, work)
+
+class _ExprCode(NodeVisitor):
+    """visit_X(node, out, work): 바로 나오는 조각은 out 에 붙이고, 뒤에 펼칠 것은 work 에 거꾸로 쌓는다"""
+
+    def visit_Number(self, node: Number, out: list, work: list) -> None:
+        out.append(node.raw if node.raw is not None else str(node.value))
+
+    def visit_Name(self, node: Name, out: list, work: list) -> None:
+        out.append(SPECIAL_IDENT_HAN_TO_PY.get(node.id, node.id))
+
+    def visit_BinOp(self, node: BinOp, out: list, work: list) -> None:
+        out.append("(")
+        work += (")", node.right, f" {node.op} ", node.left)
+
+    def visit_Compare(self, node: Compare, out: list, work: list) -> None:
+        out.append("(")
+        work.append(")")
+        for op, cmp_ in reversed(list(zip(node.ops, node.comparators))):
+            work += (cmp_, f" {op} ")
+        work.append(node.left)
+
+    def visit_IfExpr(self, node: IfExpr, out: list, work: list) -> None:
+        out.append("(")
+        work += (")", node.orelse, " else ", node.test, " if ", node.body)
+
+    def visit_NamedExpr(self, node: NamedExpr, out: list, work: list) -> None:
+        out.append("(")
+        work += (")", node.value, " := ", node.target)
+
+    def visit_Call(self, node: Call, out: list, work: list) -> None:
+        work.append(")")
+        parts: list = list(node.args)
         if node.keywords:
-            parts.extend(f"{k}={gen_expr(v)}" for k, v in node.keywords)
-        args_code = ", ".join(parts)
-        return f"{func_code}({args_code})"
-    elif isinstance(node, ListLiteral):
-        elems = ", ".join(gen_expr(e) for e in node.elements)
-        return f"[{elems}]"
-    elif isinstance(node, TupleLiteral):
-        elems = ", ".join(gen_expr(e) for e in node.elements)
+            for k, v in node.keywords:
+                parts.append(_Keyword(k, v))
+        _push_joined(work, parts, ", ")
+        work.append("(")
+        if isinstance(node.func, Name):
+            work.append(BUILTIN_HAN_TO_PY.get(node.func.id, node.func.id))
+        else:
+            work.append(node.func)
+
+    def visit__Keyword(self, node: "_Keyword", out: list, work: list) -> None:
+        out.append(f"{node.key}=")
+        work.append(node.value)
+
+    def visit_ListLiteral(self, node: ListLiteral, out: list, work: list) -> None:
+        out.append("[")
+        work.append("]")
+        _push_joined(work, node.elements, ", ")
+
+    def visit_TupleLiteral(self, node: TupleLiteral, out: list, work: list) -> None:
         if len(node.elements) == 0:
-            return "()"
-        if len(node.elements) == 1:
-            return f"({elems},)"
-        return f"({elems})"
-    elif isinstance(node, SetLiteral):
+            out.append("()")
+            return
+        out.append("(")
+        work.append(",)" if len(node.elements) == 1 else ")")
+        _push_joined(work, node.elements, ", ")
+
+    def visit_SetLiteral(self, node: SetLiteral, out: list, work: list) -> None:
         if len(node.elements) == 0:
-            return "set()"
-        elems = ", ".join(gen_expr(e) for e in node.elements)
-        return f"{{{elems}}}"
-    elif isinstance(node, DictLiteral):
+            out.append("set()")
+            return
+        out.append("{")
+        work.append("}")
+        _push_joined(work, node.elements, ", ")
+
+    def visit_DictLiteral(self, node: DictLiteral, out: list, work: list) -> None:
         if not node.items:
-            return "{}"
-        items = ", ".join(f"{gen_expr(k)}: {gen_expr(v)}" for k, v in node.items)
-        return f"{{{items}}}"
-    elif isinstance(node, Attribute):
-        return f"{gen_expr(node.value)}.{node.attr}"
-    elif isinstance(node, Index):
-        return f"{gen_expr(node.value)}[{gen_expr(node.index)}]"
-    elif isinstance(node, Slice):
-        start = "" if node.start is None else gen_expr(node.start)
-        stop = "" if node.stop is None else gen_expr(node.stop)
-        if node.step is None:
-            inside = f"{start}:{stop}"
-        else:
-            step = "" if node.step is None else gen_expr(node.step)
-            inside = f"{start}:{stop}:{step}"
-        return f"{gen_expr(node.value)}[{inside}]"
-    elif isinstance(node, String):
-        return repr(node.value)
-    elif isinstance(node, Bool):
-        return "True" if node.value else "False"
-    elif isinstance(node, NoneLiteral):
-        return "None"
-    elif isinstance(node, UnaryOp):
+            out.append("{}")
+            return
+        out.append("{")
+        work.append("}")
+        first = True
+        for k, v in reversed(node.items):
+            if not first:
+                work.append(", ")
+            work += (v, ": ", k)
+            first = False
+
+    def visit_Attribute(self, node: Attribute, out: list, work: list) -> None:
+        work += (f".{node.attr}", node.value)
+
+    def visit_Index(self, node: Index, out: list, work: list) -> None:
+        work += ("]", node.index, "[", node.value)
+
+    def visit_Slice(self, node: Slice, out: list, work: list) -> None:
+        # value[start:stop] / value[start:stop:step] (없는 부분은 빈 칸)
+        work.append("]")
+        if node.step is not None:
+            work.append(node.step)
+            work.append(":")
+        if node.stop is not None:
+            work.append(node.stop)
+        work.append(":")
+        if node.start is not None:
+            work.append(node.start)
+        work += ("[", node.value)
+
+    def visit_String(self, node: String, out: list, work: list) -> None:
+        out.append(repr(node.value))
+
+    def visit_Bool(self, node: Bool, out: list, work: list) -> None:
+        out.append("True" if node.value else "False")
+
+    def visit_NoneLiteral(self, node: NoneLiteral, out: list, work: list) -> None:
+        out.append("None")
+
+    def visit_UnaryOp(self, node: UnaryOp, out: list, work: list) -> None:
         if node.op == "not":
-            return f"(not {gen_expr(node.operand)})"
+            out.append("(not ")
         else:
-            return f"({node.op}{gen_expr(node.operand)})"
-    else:
+            out.append(f"({node.op}")
+        work += (")", node.operand)
+
+    def generic_visit(self, node, out: list, work: list) -> None:
         raise TypeError(f"지원하지 않는 Expr 타입: {node!r}")
-    
+
+_EXPR_CODE = _ExprCode()
+
+class _Keyword:
+    """_emit_expr 의 작업 목록 안에서만 쓰는 키워드 인자 (key=value)"""
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: str, value: Expr):
+        self.key = key
+        self.value = value
+
 def gen_stmt(node: Stmt) -> str:
-    """ 문장(Stmt) -> 한 줄짜리 파이썬 코드 문자열 """
+    """ 문장(Stmt) -> 파이썬 코드 문자열 (복합문이면 여러 줄) """
+    lines: list[str] = []
+    _emit_stmts([node], lines)
+    return "\n".join(lines)
+
+def _emit_stmts(stmts: list[Stmt], lines: list[str], spans: list[int] | None = None) -> None:
+    """
+    문장들의 파이썬 코드를 한 줄씩 lines 에 붙인다.
+    spans 를 주면 줄마다 그 줄을 만든 한글 문장의 span 도 붙인다.
+    (문장의 첫 줄은 그 문장의 span, 나머지 줄은 바로 위 줄 것을 물려받음)
+
+    복합문의 본문도 재귀 호출 대신 작업 목록(work)에 (들여쓰기, 문장 또는 완성된 줄) 로 쌓아서
+    펼치므로, 블록이 아무리 깊게 중첩되어도 파이썬 스택은 늘지 않는다.
+    """
+    span = 0
+    head_of = _STMT_HEAD
+    table = head_of.visit_table
+    work: list[tuple[str, object]] = [("", stmt) for stmt in reversed(stmts)]
+    while work:
+        indent, node = work.pop()
+        # 완성된 줄 (복합문의 머리 줄 뒤에 오는 else:/except: 등)
+        if type(node) is str:
+            lines.append(indent + node)
+            if spans is not None:
+                spans.append(span)
+            continue
+
+        method = table.get(type(node)) or head_of.visit_method(type(node))
+        head, body = method(head_of, node, indent)
+        if spans is not None and isinstance(node, Stmt) and node.span:
+            span = node.span
+        lines.append(indent + head)
+        if spans is not None:
+            spans.append(span)
+        if body:
+            work.extend(reversed(body))
+
+def _block(indent: str, body: list[Stmt], step: str = "    ", empty: str | None = None) -> list:
+    """본문 문장들을 step 만큼 더 들여 쓴 작업 목록 (비어 있으면 empty 줄 하나)"""
+    inner = indent + step
+    if not body:
+        return [] if empty is None else [(inner, empty)]
+    return [(inner, stmt) for stmt in body]
+
+class _StmtHead(NodeVisitor):
+    """문장 하나의 첫 줄과, 그 뒤에 이어질 작업 목록: visit_X(node, indent) -> (첫 줄, [(들여쓰기, 문장 또는 완성된 줄), ...])"""
+
     # 0) 표현식 문 (예: 출력(값))
-    if isinstance(node, ExprStmt):
-        return gen_expr(node.value)
-    
+    def visit_ExprStmt(self, node: ExprStmt, indent: str) -> tuple[str, list]:
+        return gen_expr(node.value), []
+
     # 1) 대입문
-    if isinstance(node, Assign):
+    def visit_Assign(self, node: Assign, indent: str) -> tuple[str, list]:
         target_code = gen_expr(node.target)
         value_code = gen_expr(node.value)
-        return f"{target_code} = {value_code}"
-    
-    if isinstance(node, ChainedAssign):
+        return f"{target_code} = {value_code}", []
+
+    def visit_ChainedAssign(self, node: ChainedAssign, indent: str) -> tuple[str, list]:
         parts = [gen_expr(t) for t in node.targets]
-        return f"{' = '.join(parts)} = {gen_expr(node.value)}"
-    
+        return f"{' = '.join(parts)} = {gen_expr(node.value)}", []
+
     # 1.5) AugAssign (+=, -=, *=, /=)
-    elif isinstance(node, AugAssign):
+    def visit_AugAssign(self, node: AugAssign, indent: str) -> tuple[str, list]:
         target_code = gen_expr(node.target)
         value_code = gen_expr(node.value)
-        return f"{target_code} {node.op}= {value_code}"
-    
-    # 2) if 문
-    elif isinstance(node, If):
-        lines = []
-
-        def emit_if_chain(n: If, first: bool):
-            cond_code = gen_expr(n.test)
-            head = "if" if first else "elif"
-            lines.append(f"{head} {cond_code}:")
-            for stmt in n.body:
-                body_code = gen_stmt(stmt)
-                for line in body_code.splitlines():
-                    lines.append("    " + line)
-
-            if n.orelse and len(n.orelse) == 1 and isinstance(n.orelse[0], If):
-                emit_if_chain(n.orelse[0], first=False)
-            # 그 외의 orelse(일반 else 블록)
-            elif n.orelse:
-                lines.append("else:")
-                for stmt in n.orelse:
-                    body_code = gen_stmt(stmt)
-                    for line in body_code.splitlines():
-                        lines.append("    " + line)
-        
-        emit_if_chain(node, first=True)
-        return "\n".join(lines)
+        return f"{target_code} {node.op}= {value_code}", []
+
+    # 2) if 문: 아니면(elif) 사슬은 orelse 안의 If 로 중첩되어 있지만 같은 깊이로 펼친다
+    def visit_If(self, node: If, indent: str) -> tuple[str, list]:
+        rest = _block(indent, node.body)
+        n = node
+        while n.orelse and len(n.orelse) == 1 and isinstance(n.orelse[0], If):
+            n = n.orelse[0]
+            rest.append((indent, _ElifHead(n)))
+            rest += _block(indent, n.body)
+        # 그 외의 orelse(일반 else 블록)
+        if n.orelse:
+            rest.append((indent, "else:"))
+            rest += _block(indent, n.orelse)
+        return f"if {gen_expr(node.test)}:", rest
+
+    def visit__ElifHead(self, node: "_ElifHead", indent: str) -> tuple[str, list]:
+        # 조건식은 본문을 다 만든 뒤 이 줄에 올 차례가 되어서야 만든다 (에러 순서도 재귀 버전과 같게)
+        return f"elif {gen_expr(node.test)}:", []
 
     # 3) while 문
-    elif isinstance(node, While):
+    def visit_While(self, node: While, indent: str) -> tuple[str, list]:
         cond_code = gen_expr(node.test)
-        lines = [f"while {cond_code}:"]
-        for stmt in node.body:
-            body_code = gen_stmt(stmt)
-            for line in body_code.splitlines():
-                lines.append("    " + line)
-        return "\n".join(lines)
+        return f"while {cond_code}:", _block(indent, node.body)
 
     # 4) for 문
-    elif isinstance(node, For):
+    def visit_For(self, node: For, indent: str) -> tuple[str, list]:
         target = gen_expr(node.target)
         iter_code = gen_expr(node.iter)
-        lines = [f"for {target} in {iter_code}:"]
-        for stmt in node.body:
-            body_code = gen_stmt(stmt)
-            for line in body_code.splitlines():
-                lines.append("    " + line)
-        return "\n".join(lines)
-    
+        return f"for {target} in {iter_code}:", _block(indent, node.body)
+
     # 4.5) break / continue / pass
-    elif isinstance(node, Break):
-        return "break"
-    elif isinstance(node, Continue):
-        return "continue"
-    elif isinstance(node, Pass):
-        return "pass"
-    
+    def visit_Break(self, node: Break, indent: str) -> tuple[str, list]:
+        return "break", []
+
+    def visit_Continue(self, node: Continue, indent: str) -> tuple[str, list]:
+        return "continue", []
+
+    def visit_Pass(self, node: Pass, indent: str) -> tuple[str, list]:
+        return "pass", []
+
     # 5) return
-    elif isinstance(node, Return):
+    def visit_Return(self, node: Return, indent: str) -> tuple[str, list]:
         if node.value is None:
-            return "return"
+            return "return", []
         else:
-            return f"return {gen_expr(node.value)}"
-    
+            return f"return {gen_expr(node.value)}", []
+
     # 6) functiondef
-    elif isinstance(node, FunctionDef):
+    def visit_FunctionDef(self, node: FunctionDef, indent: str) -> tuple[str, list]:
         parts: list[str] = []
         for p in node.args:
             if not isinstance(p, Param):
@@ -189,33 +302,17 @@ def gen_stmt(node: Stmt) -> str:
                 n = SPECIAL_IDENT_HAN_TO_PY.get(p.name, p.name)
                 parts.append(f"{n}={gen_expr(p.default)}")
         params = ", ".join(parts)
-        lines = [f"def {node.name}({params}):"]
-        if not node.body:
-            lines.append("    pass")
-        else:
-            for stmt in node.body:
-                body_code = gen_stmt(stmt)
-                for line in body_code.splitlines():
-                    lines.append("    " + line)
+        return f"def {node.name}({params}):", _block(indent, node.body, empty="pass")
 
-        return "\n".join(lines)
-    elif isinstance(node, ClassDef):
+    def visit_ClassDef(self, node: ClassDef, indent: str) -> tuple[str, list]:
         if node.bases:
             bases_code = ', '.join(gen_expr(b) for b in node.bases)
             head = f"class {node.name}({bases_code}):"
         else:
             head = f"class {node.name}:"
+        return head, _block(indent, node.body, empty="pass")
 
-        lines = [head]
-        if not node.body:
-            lines.append('    pass')
-        else:
-            for stmt in node.body:
-                body_code = gen_stmt(stmt)
-                for line in body_code.splitlines():
-                    lines.append('    ' + line)
-        return '\n'.join(lines)
-    elif isinstance(node, With):
+    def visit_With(self, node: With, indent: str) -> tuple[str, list]:
         items: list[str] = []
         for it in node.items:
             if not isinstance(it, WithItem):
@@ -225,25 +322,19 @@ def gen_stmt(node: Stmt) -> str:
                 part += f" as {gen_expr(it.optional_vars)}"
             items.append(part)
 
-        head = f"with {', '.join(items)}:"
-        lines = [head]
-        if not node.body:
-            lines.append(" pass")
-        else:
-            for stmt in node.body:
-                body_code = gen_stmt(stmt)
-                for line in body_code.splitlines():
-                    lines.append(" " + line)
-        return "\n".join(lines)
-    elif isinstance(node, Import):
+        # (with 본문은 한 칸만 들여 쓴다)
+        return f"with {', '.join(items)}:", _block(indent, node.body, " ", empty="pass")
+
+    def visit_Import(self, node: Import, indent: str) -> tuple[str, list]:
         items: list[str] = []
         for module, asname in node.names:
             if asname:
                 items.append(f"{module} as {asname}")
             else:
                 items.append(module)
-        return f"import {', '.join(items)}"
-    elif isinstance(node, FromImport):
+        return f"import {', '.join(items)}", []
+
+    def visit_FromImport(self, node: FromImport, indent: str) -> tuple[str, list]:
         items: list[str] = []
         for name, asname in node.names:
             if name == "*":
@@ -255,71 +346,70 @@ def gen_stmt(node: Stmt) -> str:
                     items.append(f"{name} as {asname}")
                 else:
                     items.append(name)
-        return f"from {node.module} import {', '.join(items)}"
-    elif isinstance(node, Raise):
+        return f"from {node.module} import {', '.join(items)}", []
+
+    def visit_Raise(self, node: Raise, indent: str) -> tuple[str, list]:
         if node.exc is None:
-            return "raise"
-        return f"raise {gen_expr(node.exc)}"
-    elif isinstance(node, Try):
-        lines: list[str] = ["try:"]
-        if not node.body:
-            lines.append("    pass")
-        else:
-            for stmt in node.body:
-                body_code = gen_stmt(stmt)
-                for line in body_code.splitlines():
-                    lines.append("    " + line)
-
-        for h in node.handlers:
-            if not isinstance(h, ExceptHandler):
-                raise TypeError(f"Try.handlers에는 ExceptHandler만 들어갈 수 있습니다: {h!r}")
-            head = "except"
-            if h.type is not None:
-                head += f" {gen_expr(h.type)}"
-            if h.name is not None:
-                if h.type is None:
-                    raise SyntaxError("'예외 별칭 e' 형태는 지원하지 않습니다. (타입 없이 별칭 불가)")
-                head += f" as {h.name}"
-            head += ":"
-            lines.append(head)
-            if not h.body:
-                lines.append("    pass")
-            else:
-                for stmt in h.body:
-                    body_code = gen_stmt(stmt)
-                    for line in body_code.splitlines():
-                        lines.append("    " + line)
+            return "raise", []
+        return f"raise {gen_expr(node.exc)}", []
 
+    def visit_Try(self, node: Try, indent: str) -> tuple[str, list]:
+        rest = _block(indent, node.body, empty="pass")
+        # except 줄은 본문을 다 만든 뒤에 만든다 (에러 순서도 재귀 버전과 같게)
+        rest += [(indent, _HandlerHead(h)) for h in node.handlers]
         if node.orelse is not None:
-            lines.append("else:")
-            if not node.orelse:
-                lines.append("    pass")
-            else:
-                for stmt in node.orelse:
-                    body_code = gen_stmt(stmt)
-                    for line in body_code.splitlines():
-                        lines.append("    " + line)
-
+            rest.append((indent, "else:"))
+            rest += _block(indent, node.orelse, empty="pass")
         if node.finalbody is not None:
-            lines.append("finally:")
-            if not node.finalbody:
-                lines.append("    pass")
-            else:
-                for stmt in node.finalbody:
-                    body_code = gen_stmt(stmt)
-                    for line in body_code.splitlines():
-                        lines.append("    " + line)
-            
-        return "\n".join(lines)
-    else:
+            rest.append((indent, "finally:"))
+            rest += _block(indent, node.finalbody, empty="pass")
+        return "try:", rest
+
+    def visit__HandlerHead(self, node: "_HandlerHead", indent: str) -> tuple[str, list]:
+        h = node.handler
+        if not isinstance(h, ExceptHandler):
+            raise TypeError(f"Try.handlers에는 ExceptHandler만 들어갈 수 있습니다: {h!r}")
+        head = "except"
+        if h.type is not None:
+            head += f" {gen_expr(h.type)}"
+        if h.name is not None:
+            if h.type is None:
+                raise SyntaxError("'예외 별칭 e' 형태는 지원하지 않습니다. (타입 없이 별칭 불가)")
+            head += f" as {h.name}"
+        head += ":"
+        return head, _block(indent, h.body, empty="pass")
+
+    def generic_visit(self, node, indent: str) -> tuple[str, list]:
         raise TypeError(f"지원하지 않는 Stmt 타입: {node!r}")
-    
-def gen_program(prog: Program) -> str:
-    """ Program 전체를 파이썬 소스코드 문자열로 변환 """
+
+_STMT_HEAD = _StmtHead()
+
+# _emit_stmts 의 작업 목록 안에서만 쓰는 머리 줄들 (Stmt 가 아니므로 span 은 위 줄 것을 물려받는다)
+class _ElifHead:
+    """'아니면' 줄"""
+    __slots__ = ("test",)
+
+    def __init__(self, n: If):
+        self.test = n.test
+
+class _HandlerHead:
+    """'예외' 줄 (+ 그 본문)"""
+    __slots__ = ("handler",)
+
+    def __init__(self, handler: ExceptHandler):
+        self.handler = handler
+
+def gen_program(prog: Program, line_map: list[int] | None = None) -> str:
+    """
+    Program 전체를 파이썬 소스코드 문자열로 변환
+
+    line_map 리스트를 주면, 생성된 파이썬 코드 i+1 번째 줄을 만든
+    한글 문장의 span 을 line_map[i] 에 채운다. (span 이 없는 줄은 바로 위 줄 것을 물려받음)
+    """
     lines: list[str] = []
-    for stmt in prog.body:
-        code = gen_stmt(stmt)
-        lines.extend(code.splitlines())
+    if line_map is not None:
+        line_map.clear()
+    _emit_stmts(prog.body, lines, line_map)
     return "\n".join(lines)
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+# fold_demo.py
+#
+# 상수 접기: 피연산자가 전부 리터럴인 식을 코드 생성 전에 미리 계산해 둔다
+#
+#     초 = 60 * 60 * 24        ->  초 = 86400
+#     최대 = 2 ** 10 - 1       ->  최대 = 1023
+#     참이면 = 아니다 (1 < 2)   ->  참이면 = False
+#
+# 접는 노드는 BinOp / UnaryOp / Compare 이고, 피연산자는 Number / String / Bool / NoneLiteral
+# (그리고 음수 리터럴 모양인 UnaryOp("-", Number)) 이어야 한다.
+# 파이썬과 결과가 같을 때만 접는다:
+# - 계산하다 에러가 나면 (0 으로 나누기, 타입이 안 맞는 연산 ...) 접지 않고 실행 때 같은 에러가 나게 둔다
+# - ** / * / << 와 문자열 반복/이어 붙이기는 결과 크기를 미리 보고 상한을 넘으면 접지 않는다
+#   (CPython 의 상수 접기와 같은 상한: 정수 128비트, 문자열 4096글자)
+# - 결과가 int / float / str / bool / None 이 아니거나 (복소수 등), inf / nan 이면 접지 않는다
+# - 문자열 % 는 포맷이라 접지 않는다
+#
+# 트리는 고치지 않는다: 바뀐 노드에서 뿌리까지만 새 노드로 만들고 나머지 서브트리는 그대로 같이 쓴다.
+# 그래서 Parser(hash_cons=...) 가 여러 곳에서 같이 쓰는 노드도 안전하고, 원래 Program 도 그대로 남는다.
+# 새 노드는 바꾼 노드의 span 을 물려받으므로 에러 위치는 원래 식을 가리킨다.
+#
+# 사용 예:
+#     program = fold_constants(Parser(tokens, spans).parse_program())
+#     py_code = gen_program(program)
+
+import operator
+from math import copysign, isfinite
+
+from ast_demo import Node, Expr, Number, String, Bool, NoneLiteral, BinOp, UnaryOp, Compare, CopyTransformer
+
+# 결과 크기 상한 (CPython Python/ast_opt.c 의 MAX_INT_SIZE / MAX_STR_SIZE)
+_MAX_INT_BITS = 128
+_MAX_STR_LEN = 4096
+
+# 리터럴이 아님을 나타내는 값 (None 은 NoneLiteral 의 값이라 쓸 수 없다)
+_NOT_CONST = object()
+
+_BIN_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+    "**": operator.pow,
+    "<<": operator.lshift,
+    ">>": operator.rshift,
+    "&": operator.and_,
+    "|": operator.or_,
+    "^": operator.xor,
+    "and": lambda a, b: a and b,
+    "or": lambda a, b: a or b,
+}
+
+_UNARY_OPS = {
+    "-": operator.neg,
+    "+": operator.pos,
+    "~": operator.invert,
+    "not": operator.not_,
+}
+
+_COMPARE_OPS = {
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+_RESULT_TYPES = frozenset({int, float, str, bool, type(None)})
+
+def _const(node: Expr):
+    """리터럴 노드의 값 (리터럴이 아니면 _NOT_CONST)"""
+    kind = type(node)
+    if kind is Number or kind is String or kind is Bool:
+        return node.value
+    if kind is NoneLiteral:
+        return None
+    if kind is UnaryOp and node.op == "-" and type(node.operand) is Number:
+        return -node.operand.value
+    return _NOT_CONST
+
+def _too_big(op: str, a, b) -> bool:
+    """계산하기 전에 결과가 상한을 넘을지 본다 (2 ** 10 ** 9 를 실제로 계산하지 않도록)"""
+    ints = type(a) in (int, bool) and type(b) in (int, bool)
+    if op == "**":
+        return ints and b > 0 and a.bit_length() * b > _MAX_INT_BITS
+    if op == "*":
+        if ints:
+            return a.bit_length() + b.bit_length() > _MAX_INT_BITS
+        if type(a) is str and type(b) in (int, bool):
+            return len(a) * b > _MAX_STR_LEN
+        if type(b) is str and type(a) in (int, bool):
+            return len(b) * a > _MAX_STR_LEN
+        return False
+    if op == "<<":
+        return ints and b > 0 and a.bit_length() + b > _MAX_INT_BITS
+    if op == "+":
+        return type(a) is str and type(b) is str and len(a) + len(b) > _MAX_STR_LEN
+    if op == "%":
+        return type(a) is str  # 문자열 포맷
+    return False
+
+def _literal(value, span: int):
+    """계산한 값 -> 리터럴 노드 (그 값을 담을 수 없으면 None)"""
+    kind = type(value)
+    if kind not in _RESULT_TYPES:
+        return None
+    if kind is str:
+        if len(value) > _MAX_STR_LEN:
+            return None
+        node = String(value)
+    elif kind is bool:
+        node = Bool(value)
+    elif value is None:
+        node = NoneLiteral()
+    elif kind is int and value.bit_length() > _MAX_INT_BITS:
+        return None
+    elif kind is float and not isfinite(value):
+        return None
+    elif copysign(1, value) < 0:
+        # gen_expr 는 Number 를 괄호 없이 쓰므로 음수는 (-5) 로 나오는 단항 - 로 만든다 (-0.0 도)
+        node = UnaryOp("-", Number(-value))
+    else:
+        node = Number(value)
+    if span:
+        node.span = span
+    return node
+
+class _Folder(CopyTransformer):
+    """자식을 다 접은 노드 하나를 접는다 (접을 수 없으면 그 노드를 그대로 돌려준다)"""
+
+    def visit_BinOp(self, node: BinOp) -> Expr:
+        fn = _BIN_OPS.get(node.op)
+        left, right = _const(node.left), _const(node.right)
+        if fn is None or left is _NOT_CONST or right is _NOT_CONST or _too_big(node.op, left, right):
+            return node
+        try:
+            value = fn(left, right)
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+        return _literal(value, node.span) or node
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Expr:
+        if node.op == "-" and type(node.operand) is Number:
+            return node  # 이미 음수 리터럴 모양
+        fn = _UNARY_OPS.get(node.op)
+        operand = _const(node.operand)
+        if fn is None or operand is _NOT_CONST or (node.op == "~" and type(operand) is bool):
+            return node  # ~참 은 파이썬 3.12 부터 DeprecationWarning 이라 실행 때 그대로 둔다
+        try:
+            value = fn(operand)
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+        return _literal(value, node.span) or node
+
+    def visit_Compare(self, node: Compare) -> Expr:
+        left = _const(node.left)
+        if left is _NOT_CONST:
+            return node
+        values = [_const(c) for c in node.comparators]
+        if _NOT_CONST in values or not all(op in _COMPARE_OPS for op in node.ops):
+            return node
+        try:
+            # 파이썬 비교 사슬: a < b < c 는 a < b and b < c (처음 거짓에서 멈춘다)
+            result = True
+            for op, right in zip(node.ops, values):
+                result = _COMPARE_OPS[op](left, right)
+                if not result:
+                    break
+                left = right
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+        return _literal(result, node.span) or node
+
+_FOLDER = _Folder()
+
+def fold_constants(node: Node) -> Node:
+    """
+    node (보통 Program) 안의 상수 식을 접은 트리. 바뀐 것이 없으면 node 를 그대로 돌려준다.
+    CopyTransformer 라 재귀 없이 후위 순회하므로 식이 아주 깊어도 된다.
+    미뤄 둔 함수/클래스 본문은 이때 파싱된다 (gen_program 과 같다).
+    """
+    return _FOLDER.visit(node)
+
+if __name__ == "__main__":
+    from codegen_demo import gen_program
+    from lexer_demo import lex_with_spans
+    from parser_demo import Parser
+
+    code = """초 = 60 * 60 * 24
+최대 = 2 ** 10 - 1
+인사 = "안녕" + "하세요"
+비교 = 1 < 2 < 3
+위험 = 1 / 0
+큰수 = 2 ** 1000
+"""
+    program = Parser(*lex_with_spans(code)).parse_program()
+    print(gen_program(program))
+    print("--- 상수 접기 후 ---")
+    print(gen_program(fold_constants(program)))
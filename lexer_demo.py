@@ -1,7 +1,19 @@
 # lexer_demo.py
 
+import codecs
+import mmap
+import re
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import accumulate, islice
+from typing import Iterable, Iterator
+
 from mapping import KW_DEF, HAN_KEYWORDS
-from tokens import SYMBOLS, MULTI_SYMBOLS
+from tokens import SYMBOLS, MULTI_SYMBOLS, KIND_CODES
 
 # 키워드 판정은 중앙 맵핑 기반으로
 KEYWORDS = HAN_KEYWORDS
@@ -9,176 +21,939 @@ KEYWORDS = HAN_KEYWORDS
 # def 에 해당하는 한글 키워드
 DEF_KEYWORD = KW_DEF
 
-def simple_lexer(text: str):
+# ======================
+#  스캐너 엔진 (모듈 로드 시 한 번만 빌드)
+# ======================
+
+def _string_patterns(q: str) -> tuple[str, str]:
     """
-    데모 Lexer:
-    - 줄 단위로 읽으면서 선행 공백 개수로 들여쓰기 레벨을 판단
-    - 들여쓰기 증가 : INDENT 토큰
-    - 들여쓰기 감소 : DEDENT 토큰
-    - 각 줄 끝에 NEWLINE 토큰
-    - 괄호 / 콜론 / 쉼표 / 연산자 등은 SYMBOL 토큰
-    - 키워드 / 숫자 / 이름 구분
+    따옴표 q 에 대한 (삼중 따옴표 문자열, 한 줄 문자열) 정규식.
+    본문은 '이스케이프가 아닌 글자 묶음'과 '\\x 이스케이프'를 번갈아 먹으므로
+    글자마다 파이썬 루프를 돌지 않고 닫는 따옴표까지 한 번에 건너뛴다.
+    닫는 따옴표가 없으면 줄 끝까지 먹는다. (닫혔는지는 _is_closed 로 판정)
     """
-    tokens = []
-    indent_stack =[0] # 들여쓰기 레벨 스택
-
-    def _strip_comment_preserving_strings(code: str) -> str:
-        """문자열 밖의 #부터는 주석으로 취급해 잘라낸다."""
-        out: list[str] = []
-        quote: str | None = None
-        escaped = False
-        for ch in code:
-            if quote is not None:
-                out.append(ch)
-                if escaped:
-                    escaped = False
-                    continue
-                if ch == "\\":
-                    escaped = True
-                    continue
-                if ch == quote:
-                    quote = None
-                continue
+    plain = rf"[^{q}\\]*"
+    triple = rf"{q * 3}{plain}(?:(?:\\.|{q}(?!{q * 2})){plain})*(?:{q * 3}|\\?$)"
+    single = rf"{q}{plain}(?:\\.{plain})*\\?{q}?"
+    return triple, single
+
+def _build_scanner(symbols: list[str], multi_symbols: list[str]) -> re.Pattern[str]:
+    """
+    토큰 규격(tokens.py)으로부터 마스터 정규식을 만든다.
+    공백/탭을 뺀 모든 글자가 주석/문자열/숫자/심볼/단어 중 하나에 걸리므로
+    findall 한 번으로 한 줄을 토큰 문자열들로 자를 수 있다.
+    (공백/탭은 어떤 패턴에도 안 걸려서 findall 이 알아서 건너뛴다)
+    """
+    # 긴 심볼부터 시도해야 '<=' 가 '<' 로 잘리지 않는다
+    multi = "|".join(re.escape(s) for s in sorted(multi_symbols, key=len, reverse=True))
+    single = "".join(re.escape(s) for s in symbols)
+    exponent = r"(?:[eE][+-]?\d+)?"
+    dq_triple, dq_single = _string_patterns('"')
+    sq_triple, sq_single = _string_patterns("'")
+    return re.compile(
+        rf"""
+        \#.*                                # 주석: 줄 끝까지
+        |{dq_triple}|{sq_triple}            # 삼중 따옴표 문자열 (여러 줄에 걸칠 수 있음)
+        |{dq_single}|{sq_single}            # 한 줄 문자열
+        |\d+(?:\.\d*)?{exponent}            # 숫자: 123 / 3.14 / 3. / 1e-3
+        |\.\d+{exponent}                    #       .5 / .5e3
+        |{multi}                            # 두 글자 심볼
+        |[{single}]                         # 한 글자 심볼
+        |[^ \t"'\#{single}]+                # 그외: 키워드 / 이름
+        """,
+        re.VERBOSE,
+    )
+
+_SCANNER = _build_scanner(SYMBOLS, MULTI_SYMBOLS)
+
+# 심볼/키워드 토큰은 모듈 로드 때 한 번만 만들고, 모든 컴파일이 같은 튜플 객체를 쓴다
+# (키워드 목록은 mapping.PY_TO_HAN 에서 만든 HAN_KEYWORDS)
+SYMBOL_TOKENS: dict[str, tuple[str, str]] = {s: ("SYMBOL", sys.intern(s)) for s in SYMBOLS + MULTI_SYMBOLS}
+KEYWORD_TOKENS: dict[str, tuple[str, str]] = {kw: ("KEYWORD", sys.intern(kw)) for kw in sorted(KEYWORDS)}
+NEWLINE_TOKEN = ("NEWLINE", "")
+INDENT_TOKEN = ("INDENT", "")
+DEDENT_TOKEN = ("DEDENT", "")
+EOF_TOKEN = ("EOF", "")
+
+# 원문 조각 -> 토큰 (문자열만 보고 바로 결정되는 것들)
+_FIXED_TOKENS: dict[str, tuple[str, str]] = {**SYMBOL_TOKENS, **KEYWORD_TOKENS}
+
+# 선행 들여쓰기(스페이스/탭)
+_INDENT_RE = re.compile(r"[ \t]*")
+
+# ======================
+#  이름 / 키워드 인터닝
+# ======================
+
+class InternCache:
+    """
+    여러 번의 컴파일이 함께 쓰는 이름 토큰 캐시.
+    최근에 쓴 이름부터 maxsize 개만 남기는 LRU 다.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._tokens: OrderedDict[str, tuple[str, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def get(self, text: str) -> tuple[str, str]:
+        """text 이름의 IDENT 토큰 (없으면 만들어서 넣고, 넘치면 가장 오래 안 쓴 것을 버린다)"""
+        tokens = self._tokens
+        tok = tokens.get(text)
+        if tok is not None:
+            tokens.move_to_end(text)
+            return tok
+        tok = tokens[text] = ("IDENT", text)
+        if len(tokens) > self.maxsize:
+            tokens.popitem(last=False)
+        return tok
+
+class Interner:
+    """
+    컴파일 한 번 동안 쓰는 토큰 인터닝 테이블 (원문 조각 -> 토큰 튜플).
+
+    - 키워드/심볼: 모듈에 미리 만들어 둔 튜플 (KEYWORD_TOKENS / SYMBOL_TOKENS)
+    - 이름/숫자: 처음 본 조각으로 튜플을 만들고, 이후 같은 조각은 같은 튜플(같은 문자열)을 쓴다
+
+    cache(InternCache)를 주면 이름 토큰은 컴파일 사이에서도 같은 객체를 쓴다.
+    limit 을 주면 이름/숫자가 limit 개를 넘을 때 표를 비우고 다시 모은다.
+    (스트리밍 변환처럼 메모리가 파일의 어휘 수를 따라 늘면 안 될 때. 같은 조각이 다른 튜플이 될 수 있을 뿐 토큰 값은 같다)
+    """
+
+    def __init__(self, cache: InternCache | None = None, limit: int | None = None) -> None:
+        self.cache = cache
+        self.limit = limit
+        self.tokens: dict[str, tuple[str, str]] = dict(_FIXED_TOKENS)
+
+    def add(self, kind: str, text: str) -> tuple[str, str]:
+        """처음 보는 IDENT / NUMBER 조각을 등록하고 대표 토큰을 돌려준다."""
+        if kind == "IDENT" and self.cache is not None:
+            tok = self.cache.get(text)
+        else:
+            tok = (kind, text)
+        if self.limit is not None and len(self.tokens) >= self.limit + len(_FIXED_TOKENS):
+            # 줄마다 잡아 둔 tokens.get 이 계속 맞도록 같은 dict 를 비운다
+            self.tokens.clear()
+            self.tokens.update(_FIXED_TOKENS)
+        self.tokens[text] = tok
+        return tok
+
+# 토큰 튜플 -> 대표 튜플 (intern_tokens 의 초기값)
+_CANONICAL_TOKENS: dict[tuple[str, str], tuple[str, str]] = {
+    tok: tok for tok in (*_FIXED_TOKENS.values(), NEWLINE_TOKEN, INDENT_TOKEN, DEDENT_TOKEN, EOF_TOKEN)
+}
+
+def intern_tokens(tokens: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    """
+    어디서 온 토큰 리스트든, 같은 (종류, 값)은 같은 튜플 객체가 되도록 바꾼 리스트.
+    키워드/심볼/줄 토큰은 모듈 상수(KEYWORD_TOKENS 등) 그 자체가 되므로 `is` 로 비교할 수 있다.
+    """
+    canon = dict(_CANONICAL_TOKENS)
+    return list(map(canon.setdefault, tokens, tokens))
+
+def canonical_tokens(tokens: Iterable[tuple[str, str]]) -> Iterator[tuple[str, str]]:
+    """
+    intern_tokens 의 스트리밍 판: 토큰을 하나씩 흘려보내며 키워드/심볼/줄 토큰만 모듈 상수로 바꾼다.
+    이름/숫자/문자열은 표에 모으지 않으므로 긴 스트림에서도 메모리가 늘지 않는다.
+    """
+    get = _CANONICAL_TOKENS.get
+    for tok in tokens:
+        yield get(tok, tok)
+
+# ======================
+#  문자열 리터럴
+# ======================
+
+# 파이썬과 같은 이스케이프 규칙 (\n, \t, \\, \", \x41, \uAC00, \N{...}, \101, 줄 이음 ...)
+_ESCAPE_RE = re.compile(r"\\(N\{[^}]*\}|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|[0-7]{1,3}|.)", re.DOTALL)
+_SIMPLE_ESCAPES: dict[str, str] = {
+    "\\": "\\", "'": "'", '"': '"',
+    "a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v",
+    "\n": "",  # 문자열 안의 '\'+줄바꿈은 줄 이음
+}
+
+def _unescape(m: re.Match[str]) -> str:
+    esc = m.group(1)
+    simple = _SIMPLE_ESCAPES.get(esc)
+    if simple is not None:
+        return simple
+    head = esc[0]
+    try:
+        if head in "xuU" and len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        if head == "N" and len(esc) > 1:
+            return unicodedata.lookup(esc[2:-1])
+        if head in "01234567":
+            return chr(int(esc, 8))
+    except (KeyError, ValueError):
+        # 칸은 문자열 본문 안의 위치 (1부터). 줄 번호와 줄 안의 칸은 _tokenize 가 채운다
+        raise SyntaxError(f"잘못된 이스케이프 시퀀스입니다: \\{esc}", (SOURCE_NAME, None, m.start() + 1, None)) from None
+    # 모르는 이스케이프는 파이썬처럼 역슬래시를 그대로 둔다
+    return "\\" + esc
+
+def _decode_escapes(body: str) -> str:
+    """문자열 본문의 이스케이프를 풀어서 실제 값으로 만든다."""
+    if "\\" not in body:
+        return body
+    return _ESCAPE_RE.sub(_unescape, body)
+
+def _is_closed(text: str, quote: str) -> bool:
+    """스캐너가 잘라낸 문자열 text 가 닫는 따옴표(quote)로 제대로 끝났는지"""
+    n = len(quote)
+    if len(text) < 2 * n or not text.endswith(quote):
+        return False
+    # 닫는 따옴표 바로 앞 역슬래시가 홀수 개면 그 따옴표는 이스케이프된 것
+    end = len(text) - n
+    k = end
+    while k > n and text[k - 1] == "\\":
+        k -= 1
+    return (end - k) % 2 == 0
+
+def _find_close(line: str, quote: str) -> int:
+    """줄에서 이스케이프되지 않은 닫는 따옴표를 find 로 찾아 그 '다음' 위치를 돌려준다. 없으면 -1"""
+    pos = 0
+    while True:
+        k = line.find(quote, pos)
+        if k < 0:
+            return -1
+        b = k
+        while b > 0 and line[b - 1] == "\\":
+            b -= 1
+        if (k - b) % 2 == 0:
+            return k + len(quote)
+        pos = k + 1
+
+def _scan_line(
+        code: str, interner: Interner, bad: list[SyntaxError],
+) -> tuple[list[tuple[str, str]], list[str], str | None]:
+    """
+    들여쓰기를 뗀 한 줄을 토큰 리스트로 바꾼다. 주석(#)을 만나면 거기서 멈춘다.
+    (토큰들, 토큰마다 잘라낸 원문 조각들, 줄 끝까지 닫히지 않은 삼중 따옴표 문자열 조각)을 돌려준다.
+    키워드/심볼/이미 본 이름·숫자는 interner 의 튜플을 그대로 쓴다.
+    잘못된 이스케이프는 멈추지 않고 bad 에 모으고 (칸은 code 기준), 그 문자열은 본문 그대로 둔다.
+    """
+    toks: list[tuple[str, str]] = []
+    append = toks.append
+    known = interner.tokens.get
+    texts = _SCANNER.findall(code)
+    for text in texts:
+        tok = known(text)
+        if tok is not None:
+            append(tok)
+            continue
+        ch = text[0]
+        if ch == '"' or ch == "'":
+            quote = ch * 3 if text.startswith(ch * 3) else ch
+            if _is_closed(text, quote):
+                body = text[len(quote):-len(quote)]
+            elif len(quote) == 3:
+                # 삼중 따옴표는 다음 줄로 이어진다
+                return toks, texts, text
             else:
-                if ch in ('"', "'"):
-                    out.append(ch)
-                    quote = ch
-                    continue
-                if ch == "#":
-                    break
-                out.append(ch)
-        return "".join(out)
+                # 닫는 따옴표가 없으면 줄 끝까지
+                body = text[1:]
+            try:
+                body = _decode_escapes(body)
+            except SyntaxError as e:
+                e.offset += code.find(text) + len(quote)
+                bad.append(e)
+            append(("STRING", body))
+        elif ch == "#":
+            break
+        elif ch == "." or ch.isdecimal() or text.isdigit():
+            append(interner.add("NUMBER", text))
+        else:
+            append(interner.add("IDENT", text))
+    return toks, texts, None
+
+# ======================
+#  소스 위치(span)
+# ======================
+
+# span 은 (시작 위치 << 32) | 길이 로 묶은 정수 하나.
+# 원본 문자열의 위치만 가리키고 부분 문자열은 따로 만들지 않는다.
+SPAN_SHIFT = 32
+_SPAN_MASK = (1 << SPAN_SHIFT) - 1
+
+def pack_span(start: int, length: int) -> int:
+    return (start << SPAN_SHIFT) | length
+
+def span_start(span: int) -> int:
+    return span >> SPAN_SHIFT
+
+def span_end(span: int) -> int:
+    return (span >> SPAN_SHIFT) + (span & _SPAN_MASK)
+
+def join_spans(first: int, last: int) -> int:
+    """first 의 시작부터 last 의 끝까지를 덮는 span"""
+    start = first >> SPAN_SHIFT
+    return pack_span(start, span_end(last) - start)
+
+# 진단 메시지에 쓰는 기본 소스 이름
+SOURCE_NAME = "<한글 소스>"
+
+# str.splitlines 가 줄 끝으로 보는 글자들
+_LINE_ENDS = "\r\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+class SourceMap:
+    """
+    원본 소스 문자열과 줄 시작 위치 인덱스.
+    토큰/노드는 span(정수)만 들고 있고, 줄/칸 번호는 진단 메시지가 필요할 때
+    여기서 처음 계산한다. (줄 시작 인덱스도 그때 한 번만 만든다)
+    """
+
+    def __init__(self, text: str, filename: str = SOURCE_NAME) -> None:
+        self.text = text
+        self.filename = filename
+        self._line_starts: array | None = None
+
+    @property
+    def line_starts(self) -> array:
+        if self._line_starts is None:
+            self._line_starts = array("Q", accumulate(map(len, self.text.splitlines(True)), initial=0))
+        return self._line_starts
 
-    lines = text.splitlines()
+    def line_col(self, offset: int) -> tuple[int, int]:
+        """원본 위치 -> (줄 번호, 칸 번호). 둘 다 1부터 센다."""
+        starts = self.line_starts
+        i = bisect_right(starts, offset) - 1
+        return i + 1, offset - starts[i] + 1
+
+    def line_text(self, lineno: int) -> str:
+        """lineno 번째 줄 (줄 끝 문자 제외)"""
+        starts = self.line_starts
+        if not 1 <= lineno < len(starts):
+            return ""
+        return self.text[starts[lineno - 1]:starts[lineno]].rstrip(_LINE_ENDS)
+
+    def snippet(self, span: int) -> str:
+        """span 이 가리키는 원문 조각"""
+        return self.text[span_start(span):span_end(span)]
+
+    def describe(self, span: int) -> str:
+        """에러 메시지용 위치 설명 (파일 이름, 줄/칸 번호, 그 줄 내용)"""
+        lineno, col = self.line_col(span_start(span))
+        return f"{self.filename} {lineno}번째 줄 {col}칸: {self.line_text(lineno).strip()}"
+
+    def syntax_error(self, msg: str, span: int) -> SyntaxError:
+        """줄/칸 정보가 붙은 SyntaxError"""
+        lineno, col = self.line_col(span_start(span))
+        return SyntaxError(msg, (self.filename, lineno, col, self.line_text(lineno)))
+
+class FileSourceMap(SourceMap):
+    """
+    파일에서 바로 렉싱했을 때의 SourceMap.
+    원문은 진단 메시지가 실제로 필요해질 때 처음으로 파일에서 다시 읽는다.
+    """
+
+    def __init__(self, path: str, filename: str | None = None) -> None:
+        self.path = path
+        self.filename = filename if filename is not None else path
+        self._line_starts = None
+        self._text: str | None = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(iter_file_lines(self.path))
+        return self._text
+
+def _token_spans(code: str, texts: list[str], base: int, count: int) -> list[int]:
+    """
+    한 줄에서 잘라낸 원문 조각들의 span.
+    토큰 사이에는 공백/탭만 있으므로 find 로 바로 다음 위치를 찾을 수 있다.
+    """
+    spans: list[int] = []
+    append = spans.append
+    find = code.find
+    pos = 0
+    for i in range(count):
+        text = texts[i]
+        start = find(text, pos)
+        pos = start + len(text)
+        append(((base + start) << SPAN_SHIFT) | len(text))
+    return spans
+
+def _located(e: SyntaxError, lineno: int, col: int, line: str) -> SyntaxError:
+    """code 기준 칸만 있는 _scan_line 의 에러 -> 줄 번호/칸/줄 내용이 붙은 에러 (col: code 가 시작하는 칸, 0부터)"""
+    return SyntaxError(e.msg, (SOURCE_NAME, lineno, col + e.offset, line))
+
+def _tokenize(
+        stream: Iterable[str],
+        with_spans: bool,
+        indent_stack: list[int] | None = None,
+        lineno: int = 0,
+        offset: int = 0,
+        interner: Interner | None = None,
+        errors: list[SyntaxError] | None = None,
+) -> Iterator[tuple[int, list[tuple[str, str]], list[int] | None]]:
+    """
+    iter_tokens / iter_tokens_with_spans / LexedDocument 의 공통 본체.
+    논리 줄 하나마다 (시작 줄 인덱스, 토큰 리스트, span 리스트 또는 None)을 내보낸다.
+
+    indent_stack / lineno / offset 을 주면 문서 중간의 줄부터 이어서 렉싱한다.
+    indent_stack 은 제자리에서 바뀌므로, yield 사이에 들여다보면 다음 줄 직전의 상태다.
+
+    errors 를 주면 첫 SyntaxError 에서 멈추지 않고 errors 에 모은 뒤 계속 렉싱한다 (Parser 의 recover 용):
+    잘못된 이스케이프는 문자열 본문을 그대로 두고, 맞지 않는 들여쓰기는 그 줄 들여쓰기로 블록을 다시 재고,
+    닫히지 않은 삼중 따옴표는 파일 끝까지를 문자열로 본다.
+    """
+    if indent_stack is None:
+        indent_stack = [0] # 들여쓰기 레벨 스택
+    if interner is None:
+        interner = Interner()
+    bad: list[SyntaxError] = []  # _scan_line 이 한 줄에서 찾은 에러 (칸은 code 기준)
+    lines = iter(stream)
+    # lineno: 지금까지 읽은 줄 수 (에러 메시지용)
+    # offset: 다음 줄이 원본에서 시작하는 위치
+    line_end = offset  # 직전 논리 줄이 끝난 위치 (DEDENT 의 span)
 
     for raw_line in lines:
+        row = lineno
+        lineno += 1
+        line_offset = offset
+        offset += len(raw_line)
+
         # 줄 끝 개행 문자 제거
-        line = raw_line.rstrip("\n\r")
+        line = raw_line.rstrip(_LINE_ENDS)
 
-        # 완전 빈 줄이면 스킵 (브록 구조에 영향 주지 않게)
-        if line.strip() =="":
-            continue
+        # 선행 공백 개수 세기 (스페이스/탭 지원, 탭은 4칸)
+        lead = _INDENT_RE.match(line).end()
+        indent = lead + 3 * line.count("\t", 0, lead)
 
-        # 선행 공백 개수 세기 (스페이스/탭 지원)
-        indent = 0
-        i = 0
-        while i < len(line) and line[i] in (" ", "\t"):
-            if line[i] == " ":
-                indent += 1
-            else:  # '\t'
-                indent +=4
-            i += 1
-
-        # 실제 코드 부분(선행 공백 제거된 부분)
-        code = line[i:]
-        code = _strip_comment_preserving_strings(code)
-
-        # 주석/공백만 남으면(= 논리적으로 빈 줄) 들여쓰기/토큰에 영향 주지 않게 스킵
-        if code.strip() == "":
+        # 실제 코드 부분(선행 공백 제거된 부분)을 주석 제거와 함께 한 번에 토큰화
+        code = line[lead:]
+        line_tokens, texts, pending = _scan_line(code, interner, bad)
+        if bad:
+            if errors is None:
+                raise _located(bad[0], lineno, lead, line)
+            errors += [_located(e, lineno, lead, line) for e in bad]
+            bad.clear()
+
+        # 빈 줄 / 주석·공백만 있는 줄은 들여쓰기/토큰에 영향 주지 않게 스킵
+        # ('\x0c' 같은 특수 공백은 이름 토큰으로 잘리므로, 그것만 있는 줄도 빈 줄로 본다)
+        if pending is None and (
+            not line_tokens
+            or (line_tokens[0][1].isspace() and all(k == "IDENT" and v.isspace() for k, v in line_tokens))
+        ):
             continue
 
+        out: list[tuple[str, str]] = []
+        spans: list[int] | None = [] if with_spans else None
+        base = line_offset + lead
+
         # 이전 줄과 들여쓰기 비교해서 INDENT / DEDENT 토큰 생성
         if indent > indent_stack[-1]:
             indent_stack.append(indent)
-            tokens.append(("INDENT", ""))
+            out.append(INDENT_TOKEN)
+            if with_spans:
+                spans.append(pack_span(base, 0))
         elif indent < indent_stack[-1]:
             # 한 번에 여러 레벨 줄어들 수도 있으니 while
             while indent < indent_stack[-1]:
                 indent_stack.pop()
-                tokens.append(("DEDENT", ""))
+                out.append(DEDENT_TOKEN)
+                if with_spans:
+                    spans.append(pack_span(line_end, 0))
             if indent != indent_stack[-1]:
-                raise IndentationError("들여쓰기가 일관되지 않습니다.")
+                error = IndentationError("들여쓰기가 일관되지 않습니다.", (SOURCE_NAME, lineno, lead + 1, line))
+                if errors is None:
+                    raise error
+                errors.append(error)
+                # 방금 닫은 블록을 이 줄 들여쓰기로 다시 연다 (DEDENT 하나 취소)
+                indent_stack.append(indent)
+                out.pop()
+                if with_spans:
+                    spans.pop()
 
-        j = 0
-        while j < len(code):
-            ch = code[j]
+        out += line_tokens
+        if with_spans:
+            spans += _token_spans(code, texts, base, len(line_tokens))
 
-            # 공백/탭 스킵
-            if ch in(" ", "\t"):
-                j += 1
-                continue
+        # 삼중 따옴표 문자열이 줄을 넘어가면 닫힐 때까지 다음 줄들을 이 논리 줄에 붙인다
+        # (이어지는 줄들은 들여쓰기 판단에 쓰지 않는다)
+        while pending is not None:
+            quote = pending[:3]
+            start = base + len(code) - len(pending)
+            parts = [pending[3:]]
+            # 에러 위치용: 문자열이 시작한 줄
+            first_lineno, first_line, first_col = lineno, line, start - line_offset
+            for raw_line in lines:
+                lineno += 1
+                line_offset = offset
+                offset += len(raw_line)
+                line = raw_line.rstrip(_LINE_ENDS)
+                end = _find_close(line, quote)
+                if end >= 0:
+                    break
+                parts.append(line)
+            else:
+                error = SyntaxError(
+                    "삼중 따옴표 문자열이 닫히지 않았습니다.", (SOURCE_NAME, first_lineno, first_col + 1, first_line),
+                )
+                if errors is None:
+                    raise error
+                errors.append(error)
+                # 파일 끝까지를 문자열 하나로 보고 렉싱을 마친다
+                out.append(("STRING", "\n".join(parts)))
+                if with_spans:
+                    spans.append(pack_span(start, offset - start))
+                base, code = offset, ""
+                break
+            parts.append(line[:end - 3])
+            body = "\n".join(parts)
+            try:
+                body = _decode_escapes(body)
+            except SyntaxError as e:
+                # 본문 안의 위치 -> 본문이 걸친 줄 중 몇 번째 줄의 몇 칸인지
+                i = e.offset - 1
+                k = body.count("\n", 0, i)
+                if k:
+                    e = SyntaxError(e.msg, (SOURCE_NAME, first_lineno + k, i - body.rfind("\n", 0, i), parts[k]))
+                else:
+                    e = SyntaxError(e.msg, (SOURCE_NAME, first_lineno, first_col + 3 + e.offset, first_line))
+                if errors is None:
+                    raise e from None
+                errors.append(e)
+            out.append(("STRING", body))
 
-            # 문자열 리터럴: "..."
-            if ch in('"', "'"):
-                quote = ch
-                j += 1
-                buf = ""
-                while j <len(code) and code[j] != quote:
-                    buf += code[j]
-                    j += 1
-                # 닫는 따옴표 건너뛰기 (있다면)
-                if j < len(code) and code[j] == quote:
-                    j += 1
-                tokens.append(("STRING", buf))
-                continue
+            # 닫는 따옴표 뒤에 남은 코드
+            code = line[end:]
+            base = line_offset + end
+            line_tokens, texts, pending = _scan_line(code, interner, bad)
+            if bad:
+                if errors is None:
+                    raise _located(bad[0], lineno, end, line)
+                errors += [_located(e, lineno, end, line) for e in bad]
+                bad.clear()
+            out += line_tokens
+            if with_spans:
+                spans.append(pack_span(start, base - start))
+                spans += _token_spans(code, texts, base, len(line_tokens))
 
-            # 숫자 리터럴: 123 / 3.14 / 3. / .5 / 1e - 3 / 1.2e + 3
-            if ch.isdigit() or (ch == "." and (j + 1) < len(code) and code[j + 1].isdigit()):
-                start = j
-                n = len(code)
-                # 정수부
-                while j < n and code[j].isdigit():
-                    j += 1
-                
-                # 소수점: '.' + 소수부
-                if j < n and code[j] == ".":
-                    j += 1
-                    while j < n and code[j].isdigit():
-                        j += 1
-
-                # 지수부: e/E (+/-)? digits
-                if j < n and code[j] in ("e", "E"):
-                    k = j + 1
-                    if k < n and code[k] in ("+", "-"):
-                        k += 1
-                    # 지수부는 최소 1자리 숫자 필요
-                    if k < n and code[k].isdigit():
-                        j = k + 1
-                        while j < n and code[j].isdigit():
-                            j += 1
-                    
-                tokens.append(("NUMBER", code[start:j]))
-                continue
+        # 4) 줄 끝 표시
+        line_end = base + len(code)
+        out.append(NEWLINE_TOKEN)
+        if with_spans:
+            spans.append(pack_span(line_end, 0))
+        yield row, out, spans
 
-            # 심볼 (연산자, 괄호 등)
-            two = code[j:j+2]
-            if two in MULTI_SYMBOLS:
-                tokens.append(("SYMBOL", two))
-                j += 2
-                continue
-            # 한 글자 심볼
-            if ch in SYMBOLS:
-                tokens.append(("SYMBOL", ch))
-                j += 1
+    # 파일이 끝났는데 아직 들여쓰기가 남아 있다면 모두 DEDENT
+    if len(indent_stack) > 1:
+        count = len(indent_stack) - 1
+        del indent_stack[1:]
+        yield lineno, [DEDENT_TOKEN] * count, [pack_span(line_end, 0)] * count if with_spans else None
+
+def iter_file_lines(path: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """
+    파일을 mmap 으로 열고 UTF-8 을 chunk_size 바이트씩 점진적으로 디코딩해서
+    한 줄씩 (줄 끝 문자 포함) 돌려준다. 파일 전체를 str 로 만들지 않으므로
+    아주 큰 소스도 메모리에는 조각 하나 정도만 올라온다.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # 빈 파일은 mmap 할 수 없다
+        with mm:
+            carry = ""
+            for pos in range(0, len(mm), chunk_size):
+                lines = (carry + decoder.decode(mm[pos:pos + chunk_size])).splitlines(True)
+                # 마지막 줄은 다음 조각과 이어질 수 있다 (줄 중간이거나 "\r" 다음 "\n")
+                carry = lines.pop() if lines else ""
+                yield from lines
+            yield from (carry + decoder.decode(b"", final=True)).splitlines(True)
+
+def iter_tokens(stream: Iterable[str], interner: Interner | None = None) -> Iterator[tuple[str, str]]:
+    """
+    스트리밍 Lexer:
+    - 텍스트 파일 객체 또는 줄(str) 이터레이터를 받아 한 줄씩 읽는다
+    - 메모리에는 indent_stack 과 현재 줄(+ 인터닝 테이블)만 유지한다
+    - 토큰은 simple_lexer 와 같은 (종류, 값) 튜플을 하나씩 yield 한다
+    - interner 를 주면 그 테이블로 이름을 인터닝한다 (생략하면 호출마다 새 테이블)
+
+    사용 예:
+        with open("큰파일.han", encoding="utf-8") as f:
+            for tok in iter_tokens(f):
+                ...
+    """
+    for _, line_tokens, _ in _tokenize(stream, False, interner=interner):
+        yield from line_tokens
+
+def iter_tokens_with_spans(
+        stream: Iterable[str],
+        interner: Interner | None = None,
+) -> Iterator[tuple[tuple[str, str], int]]:
+    """
+    iter_tokens 와 같지만 토큰마다 원본 위치 span 을 같이 준다: ((종류, 값), span)
+    span 의 위치는 stream 에서 읽은 글자 수 기준이므로, 줄 끝 문자를 포함한 줄들을 넘겨야 한다.
+    (파일 객체나 text.splitlines(True))
+    """
+    for _, line_tokens, spans in _tokenize(stream, True, interner=interner):
+        yield from zip(line_tokens, spans)
+
+def iter_token_lines(
+        stream: Iterable[str],
+        interner: Interner | None = None,
+        *,
+        with_spans: bool = True,
+        lineno: int = 0,
+        offset: int = 0,
+        errors: list[SyntaxError] | None = None,
+) -> Iterator[tuple[list[tuple[str, str]], list[int] | None]]:
+    """
+    iter_tokens_with_spans 와 같지만 논리 줄 하나씩 (토큰 리스트, span 리스트)로 준다.
+    토큰을 줄 단위로 한꺼번에 담는 쪽(run_korean_file 의 TokenStream)이 토큰마다 yield 를 거치지 않게 한다.
+
+    stream 이 문서 중간(들여쓰기 0 칸 줄)부터 시작하면 lineno / offset 에 그 줄의 번호와 위치를 준다.
+    (에러 메시지의 줄 번호와 span 이 문서 전체 기준이 된다)
+    with_spans=False 면 span 리스트 대신 None 을 준다.
+    errors 를 주면 렉싱 에러에서 멈추지 않고 errors 에 모은다 (_tokenize 참고).
+    """
+    for _, line_tokens, spans in _tokenize(stream, with_spans, None, lineno, offset, interner, errors):
+        yield line_tokens, spans
+
+def mark_top_level(lines: Iterable[str]) -> Iterator[tuple[str, str | None]]:
+    """
+    줄마다 (줄, 첫 토큰 조각 또는 None)을 돌려준다.
+    첫 토큰 조각은 들여쓰기 0 칸에서 코드가 시작하는 줄(문자열 안이 아닌)에만 붙는다.
+    그런 줄에서는 indent_stack 이 [0] 으로 돌아가므로 거기서부터 렉싱을 새로 시작해도 결과가 같다.
+
+    여러 줄 삼중 따옴표 문자열은 따옴표 세 개가 들어 있는 줄만 실제로 스캔해서 따라간다.
+    """
+    interner = Interner()
+    bad: list[SyntaxError] = []  # 이스케이프 에러는 그 줄을 렉싱하는 쪽이 위치와 함께 낸다
+    pending: str | None = None  # 닫히지 않은 삼중 따옴표
+    for raw_line in lines:
+        line = raw_line.rstrip(_LINE_ENDS)
+        first = None
+        if pending is not None:
+            end = _find_close(line, pending)
+            if end < 0:
+                yield raw_line, None
                 continue
+            rest = line[end:]
+        else:
+            rest = line
+            if line and not line[0].isspace() and line[0] != "#":
+                first = _SCANNER.match(line).group()
+        pending = None
+        if '"""' in rest or "'''" in rest:
+            _, _, tail = _scan_line(rest, interner, bad)
+            bad.clear()
+            if tail is not None:
+                pending = tail[:3]
+        yield raw_line, first
 
-            # 그외: 키워드 / 숫자 / 이름
-            start = j
-            while (
-                j < len(code)
-                and code[j] not in (" ", "\t")
-                and code[j] not in SYMBOLS
-                and code[j] not in ('"', "'")
-            ):
-                j += 1
-            w = code[start:j]
-
-            if w in KEYWORDS:
-                tokens.append(("KEYWORD", w))
-            elif w.isdigit():
-                tokens.append(("NUMBER", w))
-            else:
-                tokens.append(("IDENT", w))
+def simple_lexer(text: str, interner: Interner | None = None):
+    """
+    데모 Lexer:
+    - 줄 단위로 읽으면서 선행 공백 개수로 들여쓰기 레벨을 판단
+    - 들여쓰기 증가 : INDENT 토큰
+    - 들여쓰기 감소 : DEDENT 토큰
+    - 각 줄 끝에 NEWLINE 토큰
+    - 괄호 / 콜론 / 쉼표 / 연산자 등은 SYMBOL 토큰
+    - 키워드 / 숫자 / 이름 구분
+    - 같은 이름/키워드/심볼 토큰은 모두 같은 튜플 객체 (Interner)
 
-        # 4) 줄 끝 표시
-        tokens.append(("NEWLINE", ""))
+    실제 작업은 iter_tokens 가 하고, 여기서는 리스트로 모아서 돌려준다.
+    """
+    return list(iter_tokens(text.splitlines(True), interner))
 
-    # 파일이 끝났는데 아직 들여쓰기가 남아 있다면 모두 DEDENT
-    while len(indent_stack) > 1:
-        indent_stack.pop()
-        tokens.append(("DEDENT", ""))
-    
-    return tokens
+def lex_with_spans(text: str, interner: Interner | None = None) -> tuple[list[tuple[str, str]], array]:
+    """simple_lexer 와 같은 토큰 리스트 + 토큰마다의 span 배열(array('Q'))"""
+    tokens: list[tuple[str, str]] = []
+    spans = array("Q")
+    for _, line_tokens, line_spans in _tokenize(text.splitlines(True), True, interner=interner):
+        tokens += line_tokens
+        spans.extend(line_spans)
+    return tokens, spans
+
+# ======================
+#  압축 토큰 스트림
+# ======================
+
+def number_value(raw: str) -> int | float:
+    """NUMBER 토큰 문자열 -> int / float"""
+    if ("." in raw) or ("e" in raw) or ("E" in raw):
+        return float(raw)
+    return int(raw)
+
+class TokenStream:
+    """
+    (종류, 값) 튜플 리스트 대신 쓰는 압축 토큰 저장소.
+
+    - 종류: array('B') 에 작은 정수 코드로 (tokens.KIND_CODES)
+    - 값: 같은 (종류, 값) 쌍은 테이블에 한 번만 두고, 토큰마다 array('I') 로 테이블 번호만 저장
+    - 숫자: 테이블에 넣을 때 한 번만 int/float 로 변환해 둔다
+
+    stream[i] 는 기존과 같은 ("SYMBOL", "(") 튜플을 돌려주므로
+    튜플 리스트를 기대하던 코드에 그대로 넘길 수 있다.
+    테이블의 튜플을 그대로 돌려주기 때문에 접근할 때 새 객체를 만들지 않는다.
+    (Parser 처럼 인덱싱을 아주 많이 하는 쪽은 view() 로 리스트 속도를 얻는다)
+    """
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.ids = array("I")
+        self.table: list[tuple[str, str]] = []       # 번호 -> (종류, 값)
+        self.numbers: list[int | float | None] = []  # 번호 -> 미리 변환한 숫자 (NUMBER 가 아니면 None)
+        self._codes: list[int] = []                   # 번호 -> 종류 코드
+        self._index: dict[tuple[str, str], int] = {}
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[tuple[str, str]]) -> "TokenStream":
+        """
+        튜플 토큰들을 압축해서 담는다. iter_tokens 를 바로 넘기면
+        튜플 리스트를 한 번도 만들지 않고 스트림을 채울 수 있다.
+        """
+        stream = cls()
+        stream.extend(tokens)
+        return stream
+
+    def extend(self, tokens: Iterable[tuple[str, str]]) -> None:
+        """
+        토큰 여러 개를 뒤에 붙인다.
+        append 와 같은 일을 하되, 토큰마다 메서드 호출이 없도록 지역 변수로 펼쳐 두고
+        종류 배열은 마지막에 테이블 번호로부터 한 번에 채운다.
+        """
+        index_get = self._index.get
+        ids = self.ids
+        start = len(ids)
+        ids_append = ids.append
+        for tok in tokens:
+            idx = index_get(tok)
+            if idx is None:
+                idx = self._intern(tok)
+            ids_append(idx)
+        self.kinds.extend(map(self._codes.__getitem__, ids[start:] if start else ids))
+
+    def _intern(self, tok: tuple[str, str]) -> int:
+        """처음 보는 (종류, 값)을 테이블에 넣고 번호를 돌려준다."""
+        kind, value = tok
+        idx = len(self.table)
+        tok = (sys.intern(kind), value)
+        self._index[tok] = idx
+        self.table.append(tok)
+        self.numbers.append(number_value(value) if kind == "NUMBER" else None)
+        self._codes.append(KIND_CODES[kind])
+        return idx
+
+    def append(self, tok: tuple[str, str]) -> None:
+        idx = self._index.get(tok)
+        if idx is None:
+            idx = self._intern(tok)
+        self.kinds.append(self._codes[idx])
+        self.ids.append(idx)
+
+    def kind(self, i: int) -> int:
+        """i 번째 토큰의 종류 코드"""
+        return self.kinds[i]
+
+    def value(self, i: int) -> str:
+        """i 번째 토큰의 값 문자열"""
+        return self.table[self.ids[i]][1]
+
+    def number(self, i: int) -> int | float:
+        """i 번째 NUMBER 토큰의 미리 변환된 값"""
+        n = self.numbers[self.ids[i]]
+        if n is None:
+            raise TypeError(f"{i}번째 토큰은 NUMBER 가 아닙니다: {self[i]}")
+        return n
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            table = self.table
+            return [table[idx] for idx in self.ids[i]]
+        return self.table[self.ids[i]]
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        return map(self.table.__getitem__, self.ids)
+
+    def view(self) -> list[tuple[str, str]]:
+        """
+        튜플 리스트 호환 뷰. 원소는 테이블의 튜플을 공유하므로
+        토큰마다 포인터 하나(8바이트)만 더 들고, 인덱싱은 리스트 속도 그대로다.
+        """
+        return list(self)
+
+# ======================
+#  증분 렉싱 (편집기용)
+# ======================
+
+@dataclass
+class TokenDiff:
+    """
+    편집 한 번으로 바뀐 토큰 구간.
+    tokens[start:start + len(removed)] 를 inserted 로 바꾸면 새 토큰 리스트가 된다.
+    """
+    start: int
+    removed: list[tuple[str, str]]
+    inserted: list[tuple[str, str]]
+
+class LexedDocument:
+    """
+    편집기 버퍼 하나의 토큰 상태. tokens 는 언제나 simple_lexer(text) 와 같다.
+
+    논리 줄마다 체크포인트(시작 줄 인덱스, 첫 토큰 인덱스, 그 줄 직전의 indent_stack)를 남겨 두고,
+    edit() 가 오면 편집한 줄 직전의 체크포인트부터만 다시 렉싱한다.
+    편집한 줄들을 지나서 (같은 줄, 같은 indent_stack) 체크포인트를 다시 만나면
+    그 뒤 토큰은 이전과 똑같으므로 거기서 멈춘다.
+
+    사용 예:
+        doc = LexedDocument(text)
+        diff = doc.edit(10, 12, "값")   # text[10:12] 를 "값" 으로
+        tokens[diff.start:diff.start + len(diff.removed)] = diff.inserted
+    """
+
+    def __init__(self, text: str = "", interner: Interner | None = None) -> None:
+        self.lines: list[str] = text.splitlines(True)
+        self.tokens: list[tuple[str, str]] = []
+        self.interner = interner if interner is not None else Interner()  # 편집 사이에도 이름을 공유
+        self._rows = array("I")                   # 체크포인트마다: 논리 줄이 시작하는 줄 인덱스
+        self._firsts = array("I")                 # 체크포인트마다: 그 줄의 첫 토큰 인덱스
+        self._stacks: list[tuple[int, ...]] = []  # 체크포인트마다: 그 줄 직전의 indent_stack
+        self._starts = array("Q", [0])  # 줄 시작 위치. 앞에서부터 필요한 데까지만 채운다
+        self._length = len(text)
+        self._valid = True  # False 면 마지막 렉싱이 에러로 끝났으니 다음 edit 때 전부 다시
+        self._relex(0, sys.maxsize, 0)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.lines)
+
+    @property
+    def line_starts(self) -> array:
+        """줄마다 시작 위치 + 끝에 전체 길이"""
+        self._row_at(self._length)
+        return self._starts
+
+    def _row_at(self, offset: int) -> int:
+        """
+        offset 이 들어 있는 줄 번호 (문서 끝이면 줄 수).
+        편집하면 그 줄 뒤의 시작 위치는 버리고, 여기서 필요한 데까지만 다시 이어 붙인다.
+        (같은 곳 근처를 계속 고치는 타이핑은 문서 길이와 상관없이 빠르다)
+        """
+        starts = self._starts
+        lines = self.lines
+        row = len(starts) - 1
+        pos = starts[row]
+        while pos <= offset and row < len(lines):
+            pos += len(lines[row])
+            row += 1
+            starts.append(pos)
+        return bisect_right(starts, offset) - 1
+
+    def edit(self, start: int, end: int, new_text: str) -> TokenDiff:
+        """
+        text[start:end] 를 new_text 로 바꾸고, 바뀐 토큰 구간을 돌려준다.
+        렉싱 에러가 나면 텍스트 편집은 반영된 채로 에러를 올리고,
+        다음 edit() 때 전체를 다시 렉싱한다.
+        """
+        lines = self.lines
+        if not 0 <= start <= end <= self._length:
+            raise ValueError(f"편집 구간이 문서 밖입니다: {start}..{end} (길이 {self._length})")
+
+        # 편집이 걸친 줄 [first, last] 를 통째로 새 줄들로 바꾼다
+        chunk = new_text
+        first, last = 0, -1
+        if lines:
+            first = min(self._row_at(start), len(lines) - 1)
+            last = min(self._row_at(end), len(lines) - 1)
+            starts = self._starts
+            chunk = lines[first][:start - starts[first]] + new_text + lines[last][end - starts[last]:]
+            # "\r" 과 "\n" 이 편집 경계에서 만나면 합쳐서 한 줄 끝("\r\n")이 된다
+            if chunk.startswith("\n") and first > 0 and lines[first - 1].endswith("\r"):
+                first -= 1
+                chunk = lines[first] + chunk
+            if chunk.endswith("\r") and last + 1 < len(lines):
+                last += 1
+                chunk += lines[last]
+        new_lines = chunk.splitlines(True)
+        lines[first:last + 1] = new_lines
+        del self._starts[first + 1:]
+        self._length += len(new_text) - (end - start)
+
+        if not self._valid:
+            return self._relex(0, sys.maxsize, 0)
+        return self._relex(first, first + len(new_lines), len(new_lines) - (last + 1 - first))
+
+    def _relex(self, first: int, stop_row: int, delta: int) -> TokenDiff:
+        """
+        first 번째 줄부터 바뀐 문서를 다시 렉싱해서 tokens 와 체크포인트를 고친다.
+        stop_row 이후의 줄은 이전 문서의 (줄 - delta) 번째 줄과 같다.
+        """
+        rows, firsts, stacks = self._rows, self._firsts, self._stacks
+
+        # 편집한 줄을 포함하는 논리 줄의 체크포인트에서 다시 시작
+        k = bisect_right(rows, first) - 1
+        if k < 0:
+            k, row0, tok0, prev = 0, 0, 0, (0,)
+        else:
+            row0, tok0, prev = rows[k], firsts[k], stacks[k]
+        stack = list(prev)
+
+        new_tokens: list[tuple[str, str]] = []
+        new_rows: list[int] = []
+        new_firsts: list[int] = []
+        new_stacks: list[tuple[int, ...]] = []
+        j = len(rows)  # 다시 만난 옛 체크포인트 (못 만나면 끝까지 교체)
+        try:
+            lines = islice(self.lines, row0, None)
+            for row, line_tokens, _ in _tokenize(lines, False, stack, row0, interner=self.interner):
+                if row >= stop_row:
+                    # 편집 뒤의 안 바뀐 줄: 옛 체크포인트와 indent_stack 까지 같으면 나머지도 같다
+                    old_row = row - delta
+                    i = bisect_left(rows, old_row, k)
+                    if i < len(rows) and rows[i] == old_row and stacks[i] == prev:
+                        j = i
+                        break
+                new_rows.append(row)
+                new_firsts.append(tok0 + len(new_tokens))
+                new_stacks.append(prev)
+                new_tokens += line_tokens
+                # 들여쓰기가 바뀐 줄에서만 새 튜플을 만들고, 나머지 줄은 같은 튜플을 공유한다
+                if len(stack) != len(prev):
+                    prev = tuple(stack)
+        except SyntaxError:
+            self._valid = False
+            raise
+        self._valid = True
+
+        old_end = firsts[j] if j < len(rows) else len(self.tokens)
+        removed = self.tokens[tok0:old_end]
+        self.tokens[tok0:old_end] = new_tokens
+
+        # 체크포인트 교체 + 뒤쪽 체크포인트의 줄/토큰 번호 밀기
+        tail_rows, tail_firsts = rows[j:], firsts[j:]
+        if delta:
+            tail_rows = array("I", [r + delta for r in tail_rows])
+        shift = len(new_tokens) - len(removed)
+        if shift:
+            tail_firsts = array("I", [t + shift for t in tail_firsts])
+        self._rows = rows[:k] + array("I", new_rows) + tail_rows
+        self._firsts = firsts[:k] + array("I", new_firsts) + tail_firsts
+        stacks[k:j] = new_stacks
+
+        # 다시 렉싱한 구간 안에서도 앞뒤로 같은 토큰은 diff 에서 뺀다
+        n = min(len(removed), len(new_tokens))
+        head = 0
+        while head < n and removed[head] == new_tokens[head]:
+            head += 1
+        tail = 0
+        while tail < n - head and removed[-1 - tail] == new_tokens[-1 - tail]:
+            tail += 1
+        return TokenDiff(
+            start=tok0 + head,
+            removed=removed[head:len(removed) - tail],
+            inserted=new_tokens[head:len(new_tokens) - tail],
+        )
 
 
 if __name__ == "__main__":
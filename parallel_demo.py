@@ -0,0 +1,131 @@
+# parallel_demo.py
+#
+# 아주 큰 .han 파일용 병렬 프런트엔드 (렉싱 + 파싱)
+#
+# 들여쓰기 0 칸에서 코드가 시작하는 줄에서는 indent_stack 이 [0] 으로 돌아가므로,
+# 그 줄부터는 렉싱/파싱을 따로 새로 시작해도 결과가 같다.
+# 소스를 그런 줄에서 조각내서 ProcessPoolExecutor 로 조각마다 렉싱+파싱하고,
+# 조각들의 Program.body 를 순서대로 이어 붙인다. (결과는 직렬 Parser.parse_program 과 같다)
+#
+# 단, 아니면/그외/예외/마침/성공 으로 시작하는 줄은 앞의 만약/시도 문에 이어지므로 자르지 않는다.
+#
+# 사용 예:
+# with open("큰파일.han", encoding="utf-8") as f:
+#     program = parse_parallel(f, jobs=8)
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Iterable, Iterator
+
+from mapping import PY_TO_HAN
+from lexer_demo import iter_token_lines, mark_top_level, join_spans, SourceMap, SOURCE_NAME
+from parser_demo import Parser
+from ast_demo import Program
+
+# 앞 문장에 이어지는 키워드 (elif / else / except / finally / try-else)
+CONTINUATION_KEYWORDS = frozenset({
+    PY_TO_HAN["elif"], PY_TO_HAN["else"], PY_TO_HAN["except"], PY_TO_HAN["finally"], "성공",
+})
+
+def split_top_level(lines: Iterable[str], chunk_chars: int) -> Iterator[tuple[int, int, str]]:
+    """
+    줄들을 chunk_chars 글자 안팎의 조각으로 나눈다: (시작 줄 번호, 시작 위치, 조각 텍스트)
+    조각은 항상 새로 렉싱을 시작해도 되는 0 칸 줄에서 시작한다.
+    (lines 는 줄 끝 문자를 포함한 줄들: 파일 객체, text.splitlines(True), iter_file_lines)
+    """
+    buf: list[str] = []
+    size = 0
+    row = offset = 0
+    start_row = start_offset = 0
+    for line, first in mark_top_level(lines):
+        if size >= chunk_chars and first is not None and first not in CONTINUATION_KEYWORDS:
+            yield start_row, start_offset, "".join(buf)
+            buf = []
+            size = 0
+            start_row, start_offset = row, offset
+        buf.append(line)
+        size += len(line)
+        row += 1
+        offset += len(line)
+    if buf:
+        yield start_row, start_offset, "".join(buf)
+
+def _parse_chunk(row: int, offset: int, text: str, with_spans: bool, filename: str) -> Program:
+    """
+    조각 하나를 렉싱+파싱한다 (워커 프로세스에서 실행).
+    줄 번호/span 은 문서 전체 기준이고, 문법 에러에도 문서 전체 기준 줄 번호를 붙인다.
+    """
+    tokens: list[tuple[str, str]] = []
+    spans = array("Q") if with_spans else None
+    for line_tokens, line_spans in iter_token_lines(
+            text.splitlines(True), with_spans=with_spans, lineno=row, offset=offset):
+        tokens += line_tokens
+        if spans is not None:
+            spans.extend(line_spans)
+    try:
+        return Parser(tokens, spans).parse_program()
+    except SyntaxError:
+        pass
+
+    # 에러 위치를 알아내기 위해 조각 기준 span 으로 한 번 더 파싱한다
+    # (에러가 난 조각에서만 하는 일이라 정상 경로는 느려지지 않는다)
+    tokens = []
+    spans = array("Q")
+    for line_tokens, line_spans in iter_token_lines(text.splitlines(True), lineno=row):
+        tokens += line_tokens
+        spans.extend(line_spans)
+    try:
+        Parser(tokens, spans, SourceMap(text, filename)).parse_program()
+    except SyntaxError as e:
+        if e.lineno is None:
+            raise
+        raise SyntaxError(e.msg, (filename, e.lineno + row, e.offset, e.text)) from None
+    raise AssertionError("조각을 다시 파싱했더니 에러가 나지 않았습니다.")
+
+def parse_parallel(
+        lines: Iterable[str],
+        *,
+        jobs: int | None = None,
+        chunk_chars: int = 1 << 18,
+        with_spans: bool = False,
+        filename: str = SOURCE_NAME,
+) -> Program:
+    """
+    Parser(simple_lexer(text)).parse_program() 과 같은 Program 을 조각별 병렬 처리로 만든다.
+    - jobs: 워커 프로세스 수 (생략하면 CPU 수)
+    - chunk_chars: 조각 하나의 대략적인 글자 수
+    - with_spans: 노드에 문서 전체 기준 span 을 기록한다
+    조각이 하나뿐이면 프로세스를 띄우지 않고 그 자리에서 처리한다.
+    """
+    chunks = split_top_level(lines, chunk_chars)
+    head = list(islice(chunks, 2))
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if len(head) < 2 or jobs < 2:
+        programs = (_parse_chunk(row, offset, text, with_spans, filename) for row, offset, text in chain(head, chunks))
+        return _stitch(programs, with_spans)
+
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = [
+            pool.submit(_parse_chunk, row, offset, text, with_spans, filename)
+            for row, offset, text in chain(head, chunks)
+        ]
+        # 앞 조각부터 순서대로 (에러도 소스 순서상 첫 번째 것이 올라간다)
+        return _stitch((f.result() for f in futures), with_spans)
+
+def _stitch(programs: Iterable[Program], with_spans: bool) -> Program:
+    """조각 Program 들의 body 를 순서대로 이어 붙인 Program"""
+    body = []
+    first = last = None
+    for program in programs:
+        body += program.body
+        if first is None:
+            first = program
+        last = program
+    result = Program(body=body)
+    if with_spans and first is not None:
+        result.span = join_spans(first.span, last.span)
+    return result
@@ -5,11 +5,22 @@
 # 2) Parser 로 AST 트리로 바꿔보는 데모
 # + if/while/for/def 꺼내기 파이썬 처럼 블록(들여쓰기) 지원
 
+from array import array
+from dataclasses import dataclass
+from functools import partial
+from operator import sub
+from typing import Callable, Generator, Iterator
+
 from codegen_demo import gen_program
-from lexer_demo import simple_lexer, DEF_KEYWORD
+from mapping import PY_TO_HAN
+from lexer_demo import (
+    simple_lexer, DEF_KEYWORD, TokenStream, number_value, SourceMap, join_spans,
+    intern_tokens, canonical_tokens, KEYWORD_TOKENS, SYMBOL_TOKENS, EOF_TOKEN, NEWLINE_TOKEN, INDENT_TOKEN, DEDENT_TOKEN,
+    SPAN_SHIFT,
+)
 from tokens import ADD_OPS, MUL_OPS, COMP_OPS, SHIFT_OPS, POW_OP, BITAND_OP, BITOR_OP, BITXOR_OP
 from ast_demo import (
-    Expr, Stmt, 
+    Node, Expr, Stmt, DeferredBody, NodeFactory, field_values,
     Program, Assign, ChainedAssign, AugAssign, Name, Number, BinOp, 
     If, While, For, FunctionDef, ClassDef, Return, Call, ExprStmt,
     Break, Continue, Pass,
@@ -23,17 +34,478 @@ from ast_demo import (
     Try, ExceptHandler, Raise,
 )
 
+# Parser 안의 토큰은 intern_tokens 를 거쳐 대표 튜플이 되므로,
+# 식 파싱에서 자주 보는 키워드/심볼은 값 비교 대신 `is` 로 비교한다
+_TOK_IF = KEYWORD_TOKENS["만약"]
+_TOK_OR = KEYWORD_TOKENS["또는"]
+_TOK_AND = KEYWORD_TOKENS["그리고"]
+_TOK_NOT = KEYWORD_TOKENS["아니다"]
+_TOK_IN = KEYWORD_TOKENS["안에"]
+_TOK_BITOR = SYMBOL_TOKENS[BITOR_OP]
+_TOK_BITXOR = SYMBOL_TOKENS[BITXOR_OP]
+_TOK_BITAND = SYMBOL_TOKENS[BITAND_OP]
+_TOK_POW = SYMBOL_TOKENS[POW_OP]
+_TOK_LBRACKET = SYMBOL_TOKENS["["]
+_TOK_DOT = SYMBOL_TOKENS["."]
+_TOK_LPAREN = SYMBOL_TOKENS["("]
+
+# 식 파싱(parse_expr)의 우선순위: 클수록 세게 묶인다
+(_PREC_OR, _PREC_AND, _PREC_NOT, _PREC_COMPARE, _PREC_BITOR, _PREC_BITXOR, _PREC_BITAND,
+ _PREC_SHIFT, _PREC_SUM, _PREC_TERM, _PREC_FACTOR, _PREC_POW) = range(1, 13)
+
+# 이항 연산자 토큰 -> (우선순위, BinOp.op)
+_BINARY_OPS: dict[tuple[str, str], tuple[int, str]] = {
+    _TOK_OR: (_PREC_OR, "or"),
+    _TOK_AND: (_PREC_AND, "and"),
+    _TOK_BITOR: (_PREC_BITOR, BITOR_OP),
+    _TOK_BITXOR: (_PREC_BITXOR, BITXOR_OP),
+    _TOK_BITAND: (_PREC_BITAND, BITAND_OP),
+    **{SYMBOL_TOKENS[op]: (_PREC_SHIFT, op) for op in SHIFT_OPS},
+    **{SYMBOL_TOKENS[op]: (_PREC_SUM, op) for op in ADD_OPS},
+    **{SYMBOL_TOKENS[op]: (_PREC_TERM, op) for op in MUL_OPS},
+    _TOK_POW: (_PREC_POW, POW_OP),
+}
+
+# 비교 연산자 토큰 -> Compare.ops 의 값 ("아니다 안에" 는 두 토큰이라 parse_expr 에서 따로 본다)
+_COMPARE_OPS: dict[tuple[str, str], str] = {
+    **{SYMBOL_TOKENS[op]: op for op in COMP_OPS if op in SYMBOL_TOKENS},
+    _TOK_IN: "in",
+}
+
+# 단항 연산자 토큰 (factor)
+_UNARY_TOKENS = frozenset(SYMBOL_TOKENS[op] for op in ("+", "-", "~"))
+
+# packrat 메모 테이블의 production 이름 (키는 (production, 토큰 위치))
+_MEMO_EXPR = "expr"
+_MEMO_TARGET = "target"
+_MEMO_TARGET_LIST = "target_list"
+
+# parse_expr 의 진행 단계: 새 식 시작 / 원자 뒤 postfix / 끝난 식을 프레임에 넘기기
+_START, _POSTFIX, _DELIVER = range(3)
+# 새로 시작할 식의 단계
+_WANT_EXPR, _WANT_CONDITIONAL, _WANT_BINARY = range(3)
+# _BinaryFrame 이 기다리는 값: 첫 피연산자 / 이항 연산자의 오른쪽 / 비교 대상
+_BIN_OPERAND, _BIN_RIGHT, _BIN_COMPARE = range(3)
+# _BraceFrame 이 기다리는 값: 첫 식 / dict 키 / dict 값 / set 원소
+_BRACE_FIRST, _BRACE_KEY, _BRACE_VALUE, _BRACE_SET = range(4)
+# _SubscriptFrame 이 기다리는 값: 첫 식(인덱스 또는 start) / stop / step
+_SUB_FIRST, _SUB_STOP, _SUB_STEP = range(3)
+# 원자 뒤에 오면 식이 이어지는 토큰 (이항/비교 연산자, "아니다 안에" 의 '아니다', conditional 의 '만약')
+_EXPR_CONTINUATION = frozenset({*_BINARY_OPS, *_COMPARE_OPS, _TOK_NOT, _TOK_IF})
+
+# parse_expr 작업 목록(스택)의 프레임: 안쪽 식 하나가 끝나면 deliver(parser, stack, value) 로 받는다.
+# deliver 는 다음 할 일을 (단계, a, b) 로 돌려준다:
+#   (_START, want, min_prec)  프레임은 남고, 그 단계의 새 식을 시작한다
+#   (_DELIVER, value, None)   프레임이 끝났다 (스택에서 뺐다): value 를 아래 프레임에 넘긴다
+#   (_POSTFIX, node, start)   프레임이 끝났다: node 는 원자이니 뒤의 호출/인덱싱/속성 접근을 본다
+_NEXT_EXPR = (_START, _WANT_EXPR, _PREC_OR)
+_NEXT_CONDITIONAL = (_START, _WANT_CONDITIONAL, _PREC_OR)
+_NEXT_TEST = (_START, _WANT_BINARY, _PREC_OR)
+_NEXT_COMPARED = (_START, _WANT_BINARY, _PREC_BITOR)
+# 우선순위 prec 인 이항 연산자의 오른쪽: '**' 는 factor (오른쪽 결합), 나머지는 한 단계 센 것만 (왼쪽 결합)
+_NEXT_RIGHT = tuple((_START, _WANT_BINARY, _PREC_FACTOR if prec == _PREC_POW else prec + 1)
+                    for prec in range(_PREC_POW + 1))
+
+class _ExprFrame:
+    """식 하나 (packrat 메모를 켰을 때만 쌓는다): 끝나면 (식, 끝 위치) 를 메모에 넣는다"""
+    __slots__ = ("start",)
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        stack.pop()
+        parser._memo[(_MEMO_EXPR, self.start)] = (value, parser.pos)
+        return _DELIVER, value, None
+
+class _NamedFrame:
+    """IDENT ':=' 뒤의 값을 기다린다"""
+    __slots__ = ("start", "target")
+
+    def __init__(self, start: int, target: Name) -> None:
+        self.start = start
+        self.target = target
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        stack.pop()
+        return _DELIVER, parser.mark(NamedExpr(target=self.target, value=value), self.start), None
+
+class _ConditionalFrame:
+    """body '만약' test '그외' orelse 에서 test 를, 그다음 orelse 를 기다린다 (test 가 None 이면 test 차례)"""
+    __slots__ = ("start", "body", "test")
+
+    def __init__(self, start: int, body: Expr) -> None:
+        self.start = start
+        self.body = body
+        self.test: Expr | None = None
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        if self.test is None:
+            parser.expect("KEYWORD", "그외")
+            self.test = value
+            return _NEXT_CONDITIONAL
+        stack.pop()
+        node = IfExpr(body=self.body, test=self.test, orelse=value)
+        return _DELIVER, parser.mark(node, self.start), None
+
+class _BinaryFrame:
+    """
+    min_prec 이상인 이항/비교 연산자로 이어지는 식 (우선순위 오르기).
+    state 에 따라 첫 피연산자, op 의 오른쪽, 비교 연쇄 (ops / comparators) 의 다음 대상을 기다린다.
+    cond 면 conditional 의 body 자리라 끝난 뒤 '만약' 이 오면 _ConditionalFrame 으로 바뀐다.
+    """
+    __slots__ = ("start", "min_prec", "cond", "state", "left", "op", "ops", "comparators")
+
+    def __init__(self, start: int, min_prec: int, cond: bool) -> None:
+        self.start = start
+        self.min_prec = min_prec
+        self.cond = cond
+        self.state = _BIN_OPERAND
+        self.left: Expr | None = None
+        self.op: str | None = None
+        self.ops: list[str] | None = None
+        self.comparators: list[Expr] | None = None
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        state = self.state
+        if state == _BIN_OPERAND:
+            left = value
+        elif state == _BIN_RIGHT:
+            cons = parser._cons
+            left = None if cons is None else cons.binop(self.left, self.op, value)
+            if left is None:  # 해시 콘싱이 아니거나, 피연산자 중에 공유하지 않는 노드가 있다
+                left = parser.mark(BinOp(left=self.left, op=self.op, right=value), self.start)
+        else:
+            # 비교 연쇄 (a < b < c) 는 Compare 하나로 모은다
+            self.comparators.append(value)
+            op = parser._compare_op()
+            if op is not None:
+                self.ops.append(op)
+                return _NEXT_COMPARED
+            left = parser.mark(Compare(left=self.left, ops=self.ops, comparators=self.comparators), self.start)
+
+        pos = parser.pos
+        tokens = parser.tokens
+        tok = tokens[pos] if pos < len(tokens) else EOF_TOKEN
+        entry = _BINARY_OPS.get(tok)
+        if entry is not None and entry[0] >= self.min_prec:
+            parser.pos = pos + 1
+            self.state = _BIN_RIGHT
+            self.left = left
+            self.op = entry[1]
+            return _NEXT_RIGHT[entry[0]]
+        if entry is None and self.min_prec <= _PREC_COMPARE:
+            op = parser._compare_op()
+            if op is not None:
+                self.state = _BIN_COMPARE
+                self.left = left
+                self.ops = [op]
+                self.comparators = []
+                return _NEXT_COMPARED
+        if self.cond and tok is _TOK_IF:
+            # conditional: body '만약' test '그외' orelse
+            parser.advance()
+            stack[-1] = _ConditionalFrame(self.start, left)
+            return _NEXT_TEST
+        stack.pop()
+        return _DELIVER, left, None
+
+class _UnaryFrame:
+    """전위 연산자 op ('-', '+', '~', "not") 의 피연산자를 기다린다"""
+    __slots__ = ("start", "op")
+
+    def __init__(self, start: int, op: str) -> None:
+        self.start = start
+        self.op = op
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        stack.pop()
+        return _DELIVER, parser.mark(UnaryOp(op=self.op, operand=value), self.start), None
+
+class _ParenFrame:
+    """'(' 안의 식: 괄호 그룹 또는 튜플 (elements 는 콤마를 만나기 전에는 None)"""
+    __slots__ = ("start", "elements")
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.elements: list[Expr] | None = None
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        elements = self.elements
+        if elements is None:
+            # 콤마가 없으면 그냥 괄호 그룹
+            if not (parser.current[0] == "SYMBOL" and parser.current[1] == ","):
+                parser.expect("SYMBOL", ")")
+                stack.pop()
+                return _POSTFIX, value, self.start
+            elements = self.elements = [value]
+        else:
+            elements.append(value)
+        # 콤마가 있으면 튜플 (trailing comma 허용: (a,))
+        if parser.current[0] == "SYMBOL" and parser.current[1] == ",":
+            parser.advance()
+            if not (parser.current[0] == "SYMBOL" and parser.current[1] == ")"):
+                return _NEXT_EXPR
+        parser.expect("SYMBOL", ")")
+        stack.pop()
+        return _POSTFIX, TupleLiteral(elements=elements), self.start
+
+class _ListFrame:
+    """리스트 리터럴 [a, b, c] 의 다음 원소를 기다린다"""
+    __slots__ = ("start", "elements")
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.elements: list[Expr] = []
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        self.elements.append(value)
+        if parser.current[0] == "SYMBOL" and parser.current[1] == ",":
+            parser.advance()
+            return _NEXT_EXPR
+        parser.expect("SYMBOL", "]")
+        stack.pop()
+        return _POSTFIX, ListLiteral(elements=self.elements), self.start
+
+class _BraceFrame:
+    """'{' 안의 식: 첫 식 뒤에 ':' 가 오면 dict, 아니면 set (items 는 dict 항목들 또는 set 원소들)"""
+    __slots__ = ("start", "state", "key", "items")
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.state = _BRACE_FIRST
+        self.key: Expr | None = None
+        self.items: list | None = None
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        state = self.state
+        if state == _BRACE_FIRST:
+            state = _BRACE_KEY if parser.current[0] == "SYMBOL" and parser.current[1] == ":" else _BRACE_SET
+            self.items = []
+        if state == _BRACE_KEY:
+            # dict: {key: value, ...}
+            parser.expect("SYMBOL", ":")
+            self.state = _BRACE_VALUE
+            self.key = value
+            return _NEXT_EXPR
+        if state == _BRACE_VALUE:
+            self.items.append((self.key, value))
+            if parser.current[0] == "SYMBOL" and parser.current[1] == ",":
+                parser.advance()
+                # trailing comma 허용
+                if not (parser.current[0] == "SYMBOL" and parser.current[1] == "}"):
+                    self.state = _BRACE_KEY
+                    return _NEXT_EXPR
+            parser.expect("SYMBOL", "}")
+            stack.pop()
+            return _POSTFIX, DictLiteral(items=self.items), self.start
+        # set: {a, b, c}
+        self.state = _BRACE_SET
+        self.items.append(value)
+        if parser.current[0] == "SYMBOL" and parser.current[1] == ",":
+            parser.advance()
+            # trailing comma 허용
+            if not (parser.current[0] == "SYMBOL" and parser.current[1] == "}"):
+                return _NEXT_EXPR
+        parser.expect("SYMBOL", "}")
+        stack.pop()
+        return _POSTFIX, SetLiteral(elements=self.items), self.start
+
+class _SubscriptFrame:
+    """container[...] 의 인덱스, 또는 슬라이스의 start / stop / step 을 차례로 기다린다 (없는 자리는 None)"""
+    __slots__ = ("start", "container", "state", "lower", "upper")
+
+    def __init__(self, start: int, container: Expr) -> None:
+        self.start = start
+        self.container = container
+        self.state = _SUB_FIRST
+        self.lower: Expr | None = None
+        self.upper: Expr | None = None
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr | None) -> tuple:
+        if self.state == _SUB_FIRST:
+            if parser.current != ("SYMBOL", ":"):
+                # 인덱싱
+                if value is None:
+                    raise parser.error("인덱싱 표현식이 필요합니다.")
+                parser.expect("SYMBOL", "]")
+                stack.pop()
+                return _POSTFIX, parser.mark(Index(value=self.container, index=value), self.start), self.start
+            # ':'가 있으면 슬라이스
+            self.lower = value
+            parser.advance()
+            self.state = _SUB_STOP
+            if parser.current not in (("SYMBOL", ":"), ("SYMBOL", "]")):
+                return _NEXT_EXPR
+            value = None
+        if self.state == _SUB_STOP:
+            self.upper = value
+            self.state = _SUB_STEP
+            # step(optional)
+            if parser.current == ("SYMBOL", ":"):
+                parser.advance()
+                if parser.current != ("SYMBOL", "]"):
+                    return _NEXT_EXPR
+            value = None
+        parser.expect("SYMBOL", "]")
+        stack.pop()
+        node = Slice(value=self.container, start=self.lower, stop=self.upper, step=value)
+        return _POSTFIX, parser.mark(node, self.start), self.start
+
+class _CallFrame:
+    """func(...) 의 인자: 위치 인자들, 키워드 인자들, 키워드 인자를 봤는지, 지금 인자의 키 (위치 인자면 None)"""
+    __slots__ = ("start", "func", "args", "keywords", "seen_keyword", "key")
+
+    def __init__(self, start: int, func: Expr) -> None:
+        self.start = start
+        self.func = func
+        self.args: list[Expr] = []
+        self.keywords: list[tuple[str, Expr]] = []
+        self.seen_keyword = False
+        self.key: str | None = None
+
+    def start_arg(self, parser: "Parser") -> tuple:
+        """인자 하나를 시작한다: 키워드 인자(IDENT '=')면 키를 먼저 읽는다"""
+        if parser.current[0] == "IDENT" and parser.peek(1) == ("SYMBOL", "="):
+            self.seen_keyword = True
+            _, self.key = parser.expect("IDENT")
+            parser.expect("SYMBOL", "=")
+        else:
+            if self.seen_keyword:
+                raise parser.error("키워드 인자 뒤에는 위치 인자를 둘 수 없습니다.")
+            self.key = None
+        return _NEXT_EXPR
+
+    def deliver(self, parser: "Parser", stack: list, value: Expr) -> tuple:
+        if self.key is not None:
+            self.keywords.append((self.key, value))
+        else:
+            self.args.append(value)
+        if parser.current[0] == "SYMBOL" and parser.current[1] == ",":
+            parser.advance()
+            if not (parser.current[0] == "SYMBOL" and parser.current[1] == ")"):
+                return self.start_arg(parser)
+        parser.expect("SYMBOL", ")")
+        stack.pop()
+        node = Call(func=self.func, args=self.args, keywords=self.keywords)
+        return _POSTFIX, parser.mark(node, self.start), self.start
+
+# 깊이 0 에서 줄이 끝난 뒤에 와도 같은 최상위 문장이 이어지는 키워드 (아니면/그외/예외/마침/성공)
+_STMT_CONTINUATION = frozenset(
+    [*(KEYWORD_TOKENS[PY_TO_HAN[py]] for py in ("elif", "else", "except", "finally")), KEYWORD_TOKENS["성공"]]
+)
+
+# 블록 문장이 이만큼 겹칠 때까지는 재귀로 파싱하고 (_parse_block), 더 깊은 블록은 블록 스택으로 넘긴다.
+# 한 겹에 파이썬 프레임 셋 (_parse_stmt_into -> _parse_block -> _parse_body) 이라 재귀 한도에 한참 못 미친다
+_RECURSIVE_BLOCKS = 100
+
+# 문장 파싱(_parse_stmts)의 블록 스택 프레임.
+# 블록 문장은 본문이 필요할 때마다 멈추는 제너레이터(steps)이고, 본문은 스택 위의 _Block 이 모은다.
+
+class _Compound:
+    """본문을 기다리는 블록 문장: steps 제너레이터, 시작 토큰 위치 (parse_suite 면 None), 끝나면 붙을 리스트"""
+    __slots__ = ("steps", "start", "into")
+
+    def __init__(self, steps, start: int | None, into: list) -> None:
+        self.steps = steps
+        self.start = start
+        self.into = into
+
+# _Block 의 모양: 여러 줄 블록 (INDENT ... DEDENT) / 한 줄 본문 (':' 뒤 문장 하나) /
+# 머리가 깨진 문장 뒤의 블록 (복구 모드: 안의 에러만 모으고 버린다)
+_SUITE_BLOCK, _SUITE_LINE, _SUITE_ORPHAN = range(3)
+
+class _Block:
+    """파싱 중인 본문: 문장을 모으는 리스트와 모양"""
+    __slots__ = ("body", "kind")
+
+    def __init__(self, kind: int) -> None:
+        self.body: list[Stmt] = []
+        self.kind = kind
+
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(
+            self, tokens, spans=None, source: SourceMap | None = None, *,
+            memo: bool = False, recover: bool = False, lazy_bodies: bool = False,
+            incremental: bool = False, hash_cons: bool | NodeFactory = False,
+    ):
+        """
+        tokens: (종류, 값) 튜플 리스트 또는 TokenStream, 또는 토큰 이터레이터.
+                이터레이터면 한꺼번에 읽지 않고 iter_statements 가 최상위 문장 하나씩 끌어온다.
+        spans:  토큰마다의 원본 위치 (lex_with_spans). 주면 노드마다 span 을 기록한다.
+                tokens 가 이터레이터면 spans 도 토큰과 나란히 읽을 이터러블이어야 한다.
+        source: 원본 SourceMap. 주면 SyntaxError 에 줄/칸 번호가 붙는다.
+        memo:   True 면 되감기(backtracking) 하는 자리의 파싱 결과를 (production, 위치) 로 기억해서
+                다시 파싱하지 않는다 (packrat). 표는 최상위 문장마다 비운다.
+        recover: True 면 첫 SyntaxError 에서 멈추지 않는다. 에러를 diagnostics 에 모으고
+                 그 문장을 버린 뒤 다음 NEWLINE (또는 블록을 닫는 DEDENT) 에서 다시 파싱을 이어간다.
+                 parse_program 은 성공한 문장만 담은 Program 을 돌려준다.
+        lazy_bodies: True 면 함수/클래스의 여러 줄 본문은 INDENT/DEDENT 짝만 맞춰 건너뛰고,
+                     .body 를 처음 읽을 때 파싱한다 (ast_demo.DeferredBody). 이름/인자/베이스만
+                     필요한 도구(개요, 심볼 목록)용. 본문의 문법 에러도 그때 난다.
+        incremental: True 면 parse_program 이 최상위 문장마다의 토큰 구간을 Program 에 남긴다.
+                     편집 뒤에 reparse_program 으로 바뀐 문장만 다시 파싱할 때 쓴다.
+        hash_cons: True 또는 NodeFactory 면 원자(이름/숫자/문자열/참거짓/없음)와 이항 연산 노드를
+                   팩토리로 만들어서 구조가 같은 노드를 공유한다 (ast_demo.NodeFactory).
+                   공유 노드에는 span 을 기록하지 않는다. 팩토리를 넘기면 여러 파일이 같은 표를 쓴다.
+        """
+        self._number_at = None
+        self._stream: Iterator[tuple[str, str]] | None = None
+        if isinstance(tokens, Iterator):
+            if lazy_bodies or incremental:
+                raise ValueError("토큰 이터레이터로는 lazy_bodies / incremental 을 쓸 수 없습니다 (지나간 토큰은 버려진다)")
+            # 스트리밍: self.tokens / self.spans 는 지금 파싱 중인 최상위 문장의 창이다 (_fill_window)
+            self._stream = canonical_tokens(tokens)
+            self._span_stream = None if spans is None else iter(spans)
+            self._stream_done = False
+            self._first_span: int | None = None  # Program 의 span 시작
+            tokens = []
+            spans = None if spans is None else []
+        if isinstance(tokens, TokenStream):
+            # 숫자 토큰은 이미 변환되어 있으니 그걸 쓰고,
+            # 인덱싱은 (대표 튜플로 바꾼) 테이블을 공유하는 리스트 뷰로 한다
+            self._number_at = tokens.number
+            table = intern_tokens(tokens.table)
+            self.tokens = list(map(table.__getitem__, tokens.ids))
+        else:
+            # 같은 토큰은 같은 튜플 객체로 (키워드/심볼은 모듈 상수 그 자체)
+            self.tokens = intern_tokens(tokens)
+        self.spans = spans
+        self.source = source
         self.pos = 0  # 현재 읽고 있는 토큰 위치 인덱스
 
+        # packrat 메모: (production, 시작 위치) -> (노드, 끝 위치)
+        self._memo: dict[tuple[str, int], tuple[Expr, int]] | None = {} if memo else None
+        self.memo_hits = 0          # 메모에서 꺼내 쓴 횟수
+        self.memo_tokens_saved = 0  # 그 덕분에 다시 파싱하지 않은 토큰 수
+
+        # 에러 복구 모드에서 모은 문법 에러들 (나온 순서대로)
+        self.recover = recover
+        self.diagnostics: list[SyntaxError] = []
+
+        self.lazy_bodies = lazy_bodies
+
+        # 0 보다 크면 실패해도 되감고 버릴 시도 중이다 (parse_simple_stmt).
+        # 그동안 나는 SyntaxError 에는 줄/칸 번호를 붙이지 않는다 (원문을 읽어 들이지 않게)
+        self._speculating = 0
+
+        # 지금 재귀로 파싱 중인 블록 문장의 겹 수 (_parse_block)
+        self._block_depth = 0
+
+        # 최상위 문장마다 [시작, 끝) 토큰 위치를 이어 붙인 배열 (incremental 일 때만)
+        self._ranges: array | None = array("I") if incremental else None
+
+        # 해시 콘싱 팩토리 (None 이면 노드를 매번 새로 만든다)
+        if hash_cons is True:
+            hash_cons = NodeFactory()
+        self._cons: NodeFactory | None = hash_cons if isinstance(hash_cons, NodeFactory) else None
+
     
     @property
     def current(self):
         if self.pos < len(self.tokens):
             return self.tokens[self.pos]
-        return ("EOF", "")
+        return EOF_TOKEN
     
     # 토큰 하나 소비하면서 앞으로 한 칸 이동
     def advance(self):
@@ -44,7 +516,7 @@ class Parser:
         idx = self.pos + offset
         if idx < len(self.tokens):
             return self.tokens[idx]
-        return ("EOF", "")
+        return EOF_TOKEN
     
     # 기대하는 타입/값과 맞는지 검사하면서 토큰 소비
     def expect(self, expected_type=None, expected_value=None):
@@ -52,31 +524,334 @@ class Parser:
         ttype, tvalue = tok
 
         if expected_type is not None and ttype != expected_type:
-            raise SyntaxError(f"{expected_type} 가 와야 하는데 {ttype} 를 만났습니다: {tok}")
+            raise self.error(f"{expected_type} 가 와야 하는데 {ttype} 를 만났습니다: {tok}")
         if expected_value is not None and tvalue != expected_value:
-            raise SyntaxError(f"{expected_value!r} 가 와야 하는데 {tvalue!r} 를 만났습니다: {tok}")
+            raise self.error(f"{expected_value!r} 가 와야 하는데 {tvalue!r} 를 만났습니다: {tok}")
         
         self.advance()
         return tok
+
+    # 현재 토큰 위치를 담은 SyntaxError (줄/칸 번호는 여기서 처음 계산).
+    # 등록한 문장 처리 함수나 하위 클래스도 raise parser.error(...) 로 같은 모양의 에러를 낸다
+    def error(self, msg: str) -> SyntaxError:
+        if self.source is None or not self.spans or self._speculating:
+            return SyntaxError(msg)
+        pos = min(self.pos, len(self.spans) - 1)
+        return self.source.syntax_error(msg, self.spans[pos])
+
+    # 토큰 start 부터 방금 소비한 토큰까지를 node 의 원본 구간(span)으로 기록 (처리 함수가 만든 노드에도 쓴다)
+    def mark(self, node, start: int):
+        if self.spans is not None and self.pos > start:
+            node.span = join_spans(self.spans[start], self.spans[self.pos - 1])
+        return node
+
+    def _parse_stmt_into(self, body: list[Stmt], recover: bool | None = None) -> None:
+        """
+        문장 하나를 파싱해서 body 에 붙인다 (recover 면 에러를 기록하고 그 문장은 건너뛴다. None 이면 self.recover).
+
+        보통 깊이의 코드는 재귀로 파싱한다: 블록 문장은 _parse_block 이 제너레이터를 바로 돌리고,
+        본문은 _parse_body 가 문장마다 이 메서드를 다시 부른다. 스택 프레임 객체를 만들지 않으므로
+        짧은 문장이 대부분인 보통 코드에서는 이 길이 _parse_stmts 보다 빠르다.
+        블록이 _RECURSIVE_BLOCKS 겹보다 깊어지면 _parse_block 이 그 안쪽을 블록 스택으로 넘긴다.
+        """
+        if recover is None:
+            recover = self.recover
+        start = self.pos
+        steps = self.block_handlers.get(self.current)
+        try:
+            node = self._parse_stmt() if steps is None else self._parse_block(steps, recover)
+        except SyntaxError as e:
+            if not recover:
+                raise
+            self.diagnostics.append(e)
+            if self._synchronize(start):
+                # 머리가 깨진 블록 문장의 본문: 안의 에러만 모으고 버린다
+                self._parse_stmts([_Block(_SUITE_ORPHAN)], None, True)
+            return
+        body.append(self.mark(node, start))
+
+    def _parse_block(self, steps, recover: bool) -> Stmt:
+        """블록 문장 하나 (span 은 부른 쪽이 기록한다)"""
+        if self._block_depth >= _RECURSIVE_BLOCKS:
+            # 너무 깊다: 이 문장부터는 블록 스택으로. 시작 위치가 None 인 바닥 프레임이라
+            # 이 문장 자체(머리나 한 줄 본문)가 깨지면 에러가 그대로 올라와 바깥 재귀가 처리한다
+            holder: list[Stmt] = []
+            self._parse_stmts([_Compound(steps(self), None, holder)], None, recover)
+            return holder[0]
+        self._block_depth += 1
+        try:
+            steps = steps(self)
+            value = None
+            while True:
+                try:
+                    steps.send(value)
+                except StopIteration as done:
+                    return done.value
+                value = self._parse_body(recover)
+        finally:
+            self._block_depth -= 1
+
+    def _parse_body(self, recover: bool) -> list[Stmt]:
+        """블록 문장의 본문 하나 (parse_suite 의 재귀 판)"""
+        if self.current is not NEWLINE_TOKEN:
+            # 한 줄 본문: 여기서 난 에러는 본문을 가진 블록 문장이 깨진 것이라 잡지 않는다
+            start = self.pos
+            steps = self.block_handlers.get(self.current)
+            node = self._parse_stmt() if steps is None else self._parse_block(steps, recover)
+            return [self.mark(node, start)]
+        self.pos += 1
+        self.expect("INDENT")
+        body: list[Stmt] = []
+        while True:
+            tok = self.current
+            if tok is NEWLINE_TOKEN:
+                self.pos += 1
+            elif tok is DEDENT_TOKEN or tok is EOF_TOKEN:
+                break
+            else:
+                self._parse_stmt_into(body, recover)
+        self.expect("DEDENT")  # 블록이 닫히기 전에 파일이 끝났으면 여기서 에러
+        return body
+
+    def _parse_stmts(self, stack: list, into: list[Stmt] | None, recover: bool) -> None:
+        """
+        아주 깊은 블록의 문장 파싱. 블록 문장의 본문을 재귀 대신 블록 스택으로 파싱한다:
+        블록 문장은 본문이 필요할 때 멈추는 제너레이터(block_handlers)이고, 그 본문은
+        INDENT 에서 스택에 _Block 을 쌓고 DEDENT 에서 꺼내며 모은다.
+        스택에는 본문을 기다리는 _Compound 와 그 본문 _Block 이 번갈아 쌓이므로,
+        블록이 아무리 깊게 겹쳐도 (만약 안의 만약 안의 ...) 파이썬 스택은 늘지 않는다.
+
+        into 가 있으면 거기에 붙을 문장 하나로 시작하고, 없으면 stack 위의 일부터 한다.
+        스택이 다 비면 (시작한 문장이 끝나면) 돌아온다.
+
+        recover 면 깨진 문장 하나만 버리고 (diagnostics 에 기록) 감싼 블록에서 이어간다.
+        깨진 문장의 단위는 재귀 하강 때와 같다: 여러 줄 블록 안의 문장 하나,
+        한 줄 본문 안의 문장이면 그 본문을 가진 블록 문장까지.
+        """
+        handlers = self.block_handlers
+        while True:
+            try:
+                if into is None:
+                    into = self._resume_block(stack)
+                    if into is None:
+                        return
+                start = self.pos
+                steps = handlers.get(self.current)
+                if steps is not None:
+                    stack.append(_Compound(steps(self), start, into))
+                    into = None
+                    continue
+                into.append(self.mark(self._parse_stmt(), start))
+                if not stack or stack[-1].kind == _SUITE_LINE:
+                    into = None
+                    continue
+                # 여러 줄 블록 안의 다음 문장 (가장 흔한 경우라 _resume_block 을 거치지 않는다)
+                tok = self.current
+                while tok is NEWLINE_TOKEN:
+                    self.pos += 1
+                    tok = self.current
+                if tok is DEDENT_TOKEN or tok is EOF_TOKEN:
+                    into = None
+            except SyntaxError as e:
+                if not recover:
+                    raise
+                if into is None:
+                    # 스택 위의 블록 문장이 깨졌다 (머리, 다음 절, 본문의 INDENT/DEDENT)
+                    top = stack.pop()
+                    while type(top) is not _Compound:
+                        top = stack.pop()
+                    start, into = top.start, top.into
+                # 한 줄 본문 안의 문장은 그 본문을 가진 블록 문장과 함께 버린다
+                while stack and type(stack[-1]) is _Block and stack[-1].kind == _SUITE_LINE:
+                    stack.pop()
+                    top = stack.pop()
+                    start, into = top.start, top.into
+                if start is None:
+                    raise  # parse_suite 의 본문 자체가 깨졌다: 부른 쪽의 문장이 깨진 것
+                self.diagnostics.append(e)
+                if self._synchronize(start):
+                    stack.append(_Block(_SUITE_ORPHAN))
+                into = None
+
+    def _resume_block(self, stack: list) -> list[Stmt] | None:
+        """
+        스택 위에서 다음 문장이 붙을 본문 리스트를 찾는다 (다 끝났으면 None).
+        그 사이에 끝난 본문은 블록 문장에 넘기고, 끝난 블록 문장은 감싼 본문에 붙인다.
+        """
+        while stack:
+            top = stack[-1]
+            if type(top) is _Block:
+                if top.kind != _SUITE_LINE:
+                    tok = self.current
+                    while tok is NEWLINE_TOKEN:
+                        self.pos += 1
+                        tok = self.current
+                    if tok is not DEDENT_TOKEN:
+                        if tok is not EOF_TOKEN:
+                            return top.body
+                        if top.kind != _SUITE_ORPHAN:
+                            self.expect("DEDENT")  # 블록이 닫히기 전에 파일이 끝났다
+                    else:
+                        self.pos += 1
+                stack.pop()
+                if top.kind == _SUITE_ORPHAN:
+                    continue
+                value = top.body
+                top = stack[-1]
+            else:
+                value = None  # 막 쌓은 블록 문장: 머리부터 읽는다
+            try:
+                top.steps.send(value)  # 본문을 넘기고 다음 본문을 요청할 때까지 (만약 -> 아니면 ...)
+            except StopIteration as done:
+                stack.pop()
+                node = done.value
+                top.into.append(node if top.start is None else self.mark(node, top.start))
+                continue
+            # 본문 요청: NEWLINE + INDENT 면 여러 줄 블록, 아니면 같은 줄의 문장 하나
+            if self.current is NEWLINE_TOKEN:
+                self.pos += 1
+                self.expect("INDENT")
+                stack.append(_Block(_SUITE_BLOCK))
+                continue
+            block = _Block(_SUITE_LINE)
+            stack.append(block)
+            return block.body
+        return None
+
+    def _synchronize(self, start: int) -> bool:
+        """
+        start 에서 시작한 문장이 깨졌을 때 다음 문장 시작까지 건너뛴다.
+        - 에러가 난 줄은 NEWLINE 까지 버린다 (이미 줄 맨 앞이면 버리지 않는다)
+        - DEDENT / EOF 는 소비하지 않는다: 감싸고 있는 블록이 정상적으로 닫히게 둔다
+        - 바로 뒤에 들여쓴 블록이 오면 (머리가 깨진 만약/정의 등의 본문) INDENT 를 소비하고 True.
+          부른 쪽은 그 블록을 버리되, 안의 문장들은 파싱해서 거기서 나는 에러도 함께 모은다
+        """
+        if self._stream is not None and self.pos >= len(self.tokens) - 1:
+            # 창 끝(미리 본 토큰)까지 왔다: 건너뛸 줄과 딸린 블록은 다음 문장에 있다
+            self._fill_window(keep=True)
+        if not (self.pos > start and self.tokens[self.pos - 1][0] == "NEWLINE"):
+            while self.current[0] not in ("NEWLINE", "INDENT", "DEDENT", "EOF"):
+                self.advance()
+            if self.current[0] == "NEWLINE":
+                self.advance()
+        if self.current[0] == "INDENT":
+            self.advance()
+            return True
+        if self.pos == start:
+            # 한 토큰도 못 넘겼다 (문장 자리에 온 DEDENT 등): 같은 자리에서 맴돌지 않게 하나 버린다
+            self.advance()
+        return False
+
+    # production 을 현재 위치에서 파싱하되, 같은 (production, 위치) 를 이미 파싱했으면 그 결과를 쓴다
+    def _memoized(self, production: str, parse):
+        key = (production, self.pos)
+        hit = self._memo.get(key)
+        if hit is not None:
+            node, end = hit
+            self.memo_hits += 1
+            self.memo_tokens_saved += end - self.pos
+            self.pos = end
+            return node
+        node = parse()
+        self._memo[key] = (node, self.pos)
+        return node
     
     # ======================
     #  프로그램 시작점
     # ======================
 
     def parse_program(self) -> Program:
-        body = []
-        while self.current[0] != "EOF":
+        return self._finish_program(list(self.iter_statements()))
+
+    def iter_statements(self) -> Iterator[Stmt]:
+        """
+        최상위 문장을 파싱되는 대로 하나씩 내놓는다 (parse_program 은 이걸 리스트로 모은 것).
+
+        토큰 이터레이터로 만든 Parser 는 토큰을 최상위 문장 하나와 그 다음 토큰 하나만큼씩 창에 채운다.
+        받은 문장을 붙잡아 두지 않으면 메모리는 파일 크기가 아니라 가장 큰 최상위 문장 크기를 따른다.
+        """
+        body: list[Stmt] = []  # _parse_stmt_into 가 문장을 붙일 자리 (복구 모드면 안 붙을 수도 있다)
+        while True:
+            if self._stream is not None and self.pos >= len(self.tokens) - 1:
+                self._fill_window()
+            if self.current[0] == "EOF":
+                return
             # 빈 줄(NEWLINE)은 건너뜀
             if self.current[0] == "NEWLINE":
                 self.advance()
                 continue
+            if self._memo is not None:
+                # 되감기는 한 문장 안에서만 일어나므로 메모는 최상위 문장 단위로 충분하다
+                self._memo.clear()
             before = self.pos
-            stmt = self.parse_stmt()
+            self._parse_stmt_into(body)
             if self.pos == before:
                 near = self.tokens[self.pos:self.pos+10]
                 raise RuntimeError(f"[parser stuck] pos={self.pos}, current={self.current}, next10={near}")
-            body.append(stmt)
-        return Program(body=body)
+            if body:
+                if self._ranges is not None:
+                    self._ranges += array("I", (before, self.pos))
+                yield body.pop()
+
+    def _fill_window(self, keep: bool = False) -> None:
+        """
+        다음 최상위 문장 하나가 끝날 때까지 스트림에서 토큰을 창에 담고,
+        그 다음 문장의 첫 토큰 하나를 더 담는다. keep 이 아니면 이미 파싱한 앞부분은 버린다.
+
+        깊이 0 의 NEWLINE / DEDENT 다음에 INDENT 나 _STMT_CONTINUATION 이 아닌 토큰이 오면 문장 끝이다.
+        그걸 가리는 데 토큰 하나만 미리 보면 되고, 미리 본 토큰도 창에 있으니
+        파서는 리스트 때와 똑같이 current / peek(1) 를 본다.
+        """
+        if self._stream_done:
+            return
+        if keep:
+            tokens, spans = self.tokens, self.spans
+        else:
+            tokens = self.tokens[self.pos:]
+            spans = None if self.spans is None else self.spans[self.pos:]
+            self.tokens, self.spans, self.pos = tokens, spans, 0
+        stream, span_stream = self._stream, self._span_stream
+        depth = 0
+        closed = False  # 깊이 0 에서 줄이 끝났다
+        i = max(len(tokens) - 1, 0)  # 창의 마지막 토큰 (지난번에 미리 본 것) 부터 새 문장이다
+        while True:
+            if i < len(tokens):
+                tok = tokens[i]
+            else:
+                tok = next(stream, None)
+                if tok is None:
+                    self._stream_done = True
+                    break
+                tokens.append(tok)
+                if spans is not None:
+                    spans.append(next(span_stream))
+            i += 1
+            if closed:
+                if tok is not INDENT_TOKEN and tok not in _STMT_CONTINUATION:
+                    break  # tok 은 다음 문장의 첫 토큰
+                closed = False
+            if tok is INDENT_TOKEN:
+                depth += 1
+            elif tok is DEDENT_TOKEN:
+                depth -= 1
+                closed = depth <= 0
+            elif tok is NEWLINE_TOKEN:
+                closed = depth <= 0
+        if self._first_span is None and spans:
+            self._first_span = spans[0]
+
+    def _finish_program(self, body: list[Stmt]) -> Program:
+        if self._stream is None:
+            program = self.mark(Program(body=body), 0)
+        else:
+            # 창에는 마지막 문장만 남아 있으므로 시작 span 은 따로 기억해 둔 것을 쓴다
+            program = Program(body=body)
+            if self._first_span is not None and self.pos > 0:
+                program.span = join_spans(self._first_span, self.spans[self.pos - 1])
+        if self._ranges is not None:
+            # reparse_program 이 다음 편집 때 비교할 토큰과 문장 구간
+            program.incremental_state = (self.tokens, self.spans, self._ranges)
+        return program
     
     # =======================
     #  표현식 파싱 (우선순위)
@@ -84,420 +859,269 @@ class Parser:
     
     def parse_expr(self) -> Expr:
         """
-        expr ::= or_expr
-        """
-        return self.parse_namedexpr()
-    
-    def parse_namedexpr(self) -> Expr:
-        """
-        namedexpr ::= IDENT ':=' conditional_expr | conditional_expr
-        """
-        if self.current[0] == "IDENT" and self.peek(1) == ("SYMBOL", ":="):
-            _, name = self.expect("IDENT")
-            self.expect("SYMBOL", ":=")
-            value = self.parse_conditional()
-            return NamedExpr(target=Name(name), value=value)
-        return self.parse_conditional()
-    
-    def parse_conditional(self) -> Expr:
-        """
-        conditional_expr ::= or_expr ('만약' or_expr '그외' conditional_expr)?
-        (Python의 a if cond else b 를 'a 만약 cond 그외 b'로 지원)
-        """
-        body = self.parse_or()
-        if self.current[0] == "KEYWORD" and self.current[1] == "만약":
-            self.expect("KEYWORD", "만약")
-            test = self.parse_or()
-            self.expect("KEYWORD", "그외")
-            orelse = self.parse_conditional()
-            return IfExpr(body=body, test=test, orelse=orelse)
-        return body
-    
-    def parse_or(self) -> Expr:
-        """ or_expr ::= and_expr ("또는" and_expr)* """
-        left = self.parse_and()
-        while self.current[0] == "KEYWORD" and self.current[1] == "또는":
-            self.expect("KEYWORD", "또는")
-            right = self.parse_and()
-            left = BinOp(left=left, op="or", right=right)
-        return left
-    
-    def parse_and(self) -> Expr:
-        """
-        and_expr ::= not_expr ("그리고" not_expr)*
-        """
-        left = self.parse_not()
-        while self.current[0] == "KEYWORD" and self.current[1] == "그리고":
-            self.expect("KEYWORD", "그리고")
-            right = self.parse_not()
-            left = BinOp(left=left, op="and", right=right)
-        return left
-    
-    def parse_not(self) -> Expr:
-        """
-        not_expr ::= "아니다" not_expr | comparison
-        """
-        if self.current[0] == "KEYWORD" and self.current[1] == "아니다":
-            self.expect("KEYWORD", "아니다")
-            operand = self.parse_not()
-            return UnaryOp(op="not", operand=operand)
-        return self.parse_comparison()
-
-    def parse_comparison(self) -> Expr:
-        """
-        comparison ::= bitor ((comp_op | "안에" | "아니다 안에") bitor)*
-        비교 연산(<, >, <=, >=, ==, !=, in)은 비트연산(|,^)보다 우선순위가 낮다.
-        """
-        left = self.parse_bitor()
-
-        ops: list[str] = []
-        comparators: list[Expr] = []
+        expr        ::= namedexpr
+        namedexpr   ::= IDENT ':=' conditional | conditional
+        conditional ::= binary ('만약' binary '그외' conditional)?
+        binary      ::= or_expr ~ power (우선순위는 _BINARY_OPS / _COMPARE_OPS, _PREC_* 참고)
+                        or_expr    ::= and_expr ("또는" and_expr)*
+                        and_expr   ::= not_expr ("그리고" not_expr)*
+                        not_expr   ::= "아니다" not_expr | comparison
+                        comparison ::= bitor ((comp_op | "안에" | "아니다 안에") bitor)*
+                        bitor / bitxor / bitand / shift / sum / term ::= 한 단계 센 것 (op 그것)*
+                        factor     ::= ('+' | '-' | '~') factor | power
+                        power      ::= atom_expr ('**' factor)?     (오른쪽 결합)
+        atom_expr   ::= NUMBER | STRING | bool/none | IDENT | '(' expr ')' | list/tuple/set/dict
+                        (postfix: call/index/slice/attr)*
+
+        재귀 호출 없이 명시적인 스택(작업 목록)으로 파싱한다.
+        괄호/호출/인덱싱/연산자 안쪽의 식을 시작할 때마다 "그 식이 끝나면 무엇을 할지"를
+        프레임(_BinaryFrame, _CallFrame, ...)으로 쌓고, 식 하나가 끝나면 맨 위 프레임의 deliver 에
+        값을 넘겨 준다. deliver 는 다음 할 일 (새 식 시작 / 아래 프레임에 값 넘기기 / postfix) 을 돌려준다.
+        그래서 중첩이 아무리 깊어도(예: 10만 겹 괄호, 10만 개 '**') 파이썬 스택은 늘지 않는다.
+        """
+        tokens = self.tokens
+        n_tokens = len(tokens)
+        memo = self._memo
+        cons = self._cons
+        stack: list = []
+        # 지금 단계와 그 단계의 입력: _START 는 want / min_prec, _POSTFIX 는 node / node_start,
+        # _DELIVER 는 value (맨 위 프레임에 넘길 끝난 식)
+        phase = _START
+        want = _WANT_EXPR
+        min_prec = _PREC_OR
+        value: Expr | None = None
+        node: Expr | None = None
+        node_start = 0
+        # 지금 원자가 conditional 의 body 자리인지, 그 원자의 _BinaryFrame 을 아직 안 쌓았는지
+        cond = pending = False
 
         while True:
-            ttype, tvalue = self.current
-
-            # 0) "아니다 안에" (not in) - 비교 연산자로 취급
-            if ttype == "KEYWORD" and tvalue == "아니다":
-                nt, nv = self.peek(1)
-                if nt == "KEYWORD" and nv == "안에":
-                    # "아니다", "안에" 소비
+            if phase == _START:
+                # ---- 1) 새 식 시작: want 단계의 프레임을 쌓고 원자(atom) 하나를 읽는다
+                if want == _WANT_EXPR:
+                    start = self.pos
+                    if memo is not None:
+                        hit = memo.get((_MEMO_EXPR, start))
+                        if hit is not None:
+                            value, end = hit
+                            self.memo_hits += 1
+                            self.memo_tokens_saved += end - start
+                            self.pos = end
+                            if not stack:
+                                return value
+                            phase = _DELIVER
+                            continue
+                        # 메모에 넣을 끝 위치를 알아야 하므로 식마다 프레임을 둔다
+                        stack.append(_ExprFrame(start))
+                    tok = tokens[start] if start < n_tokens else EOF_TOKEN
+                    if tok[0] == "IDENT" and self.peek(1) == ("SYMBOL", ":="):
+                        self.advance()
+                        target = self.mark(Name(tok[1]), start)
+                        self.expect("SYMBOL", ":=")
+                        stack.append(_NamedFrame(start, target))
+                    want = _WANT_CONDITIONAL
+
+                # binary: 전위 연산자는 프레임만 쌓고 안쪽 피연산자를 다시 시작한다
+                # (conditional 은 body 뒤에 '만약' 이 올 때만 _ConditionalFrame 으로 바꾼다)
+                start = self.pos
+                cond = want == _WANT_CONDITIONAL
+                if cond:
+                    min_prec = _PREC_OR
+                tok = tokens[start] if start < n_tokens else EOF_TOKEN
+                if tok is _TOK_NOT and min_prec <= _PREC_NOT:
                     self.advance()
+                    stack.append(_BinaryFrame(start, min_prec, cond))
+                    stack.append(_UnaryFrame(start, "not"))
+                    want = _WANT_BINARY
+                    min_prec = _PREC_NOT
+                    continue
+                if tok in _UNARY_TOKENS:
                     self.advance()
-                    op = "not in"
-                else:
-                    break
-
-            # 1) "안에" (in)
-            elif ttype == "KEYWORD" and tvalue == "안에":
-                self.advance()
-                op = "in"
-
-            # 2) 기존 비교 연산자들
-            elif ttype == "SYMBOL" and tvalue in COMP_OPS:
-                op = tvalue
-                self.advance()
-            else:
-                break
-
-            right = self.parse_bitor()
-            ops.append(op)
-            comparators.append(right)
-
-        if not ops:
-            return left
-        
-        return Compare(left=left, ops=ops, comparators=comparators)
-    
-    def parse_bitor(self) -> Expr:
-        """
-        bitor ::= bitxor ('|' bitxor)*
-        """
-        left = self.parse_bitxor()
-        while self.current == ("SYMBOL", BITOR_OP):
-            self.advance()
-            right = self.parse_bitxor()
-            left = BinOp(left=left, op="|", right=right)
-        return left
-    
-    def parse_bitxor(self) -> Expr:
-        """
-        bitxor ::= bitand ('^' bitand)*
-        """
-        left = self.parse_bitand()
-        while self.current == ("SYMBOL", BITXOR_OP):
-            self.advance()
-            right = self.parse_bitand()
-            left = BinOp(left=left, op="^", right=right)
-        return left
-    
-    def parse_bitand(self) -> Expr:
-        """
-        bitand ::= shift ('&' shift)*
-        """
-        left = self.parse_shift()
-        while self.current == ("SYMBOL", BITAND_OP):
-            self.advance()
-            right = self.parse_shift()
-            left = BinOp(left=left, op="&", right=right)
-        return left
-
-    def parse_shift(self) -> Expr:
-        """
-        shift ::= sum (('<<' | '>>') sum)*
-        """
-        left = self.parse_sum()
-        while self.current[0] == "SYMBOL" and self.current[1] in SHIFT_OPS:
-            op = self.current[1]
-            self.advance()
-            right = self.parse_sum()
-            left = BinOp(left=left, op=op, right=right)
-        return left
-    
-    def parse_sum(self) -> Expr:
-        """
-        sum ::= term (('+' | '-') term)*
-        """
-        left = self.parse_term()
-        while self.current[0] == "SYMBOL" and self.current[1] in ADD_OPS:
-            op = self.current[1]
-            self.advance()
-            right = self.parse_term()
-            left = BinOp(left=left, op=op, right=right)
-        return left
-    
-    def parse_term(self) -> Expr:
-        """
-        term ::= factor (('*' | '/' | '//' | '%') factor)*
-        """
-        left = self.parse_factor()
-        while self.current[0] == "SYMBOL" and self.current[1] in MUL_OPS:
-            op = self.current[1]
-            self.advance()
-            right = self.parse_factor()
-            left = BinOp(left=left, op=op, right=right)
-        return left
-    
-    def parse_factor(self) -> Expr:
-        """
-        factor ::= ('+' | '-' | '~') factor | power
-        """
-        tok_type, tok_value = self.current 
-        if tok_type == "SYMBOL" and tok_value in ("+", "-", "~"):
-            self.advance()
-            operand = self.parse_factor()
-            return UnaryOp(op=tok_value, operand=operand)
-        return self.parse_power()
-    
-    def parse_power(self) -> Expr:
-        """
-        power ::= atom_expr ('**' factor)? (오른쪽 결합)
-        """
-        left = self.parse_atom_expr()
-        if self.current == ("SYMBOL", POW_OP):
-            self.advance()
-            right = self.parse_factor()
-            return BinOp(left=left, op="**", right=right)
-        return left
-    
-    def parse_atom_expr(self) -> Expr:
-        """
-        atom_expr ::= NUMBER | STRING | bool/none | IDENT | '(' expr ')' | list/tuple/set/dict
-                    (postfix: call/index/slice/attr)*
-        """
-        tok_type, tok_value = self.current
-        node: Expr
-        
-        # 숫자
-        if tok_type == "NUMBER":
-            self.advance()
-            if ("." in tok_value) or ("e" in tok_value) or ("E" in tok_value):
-                node = Number(float(tok_value), raw=tok_value)
-            else:
-                node = Number(int(tok_value), raw=tok_value)
-        
-        # 문자열
-        elif tok_type == "STRING":
-            self.advance()
-            node = String(tok_value)
-        
-        # 불리언 / None 리터럴
-        elif tok_type == "KEYWORD" and tok_value in ("참", "거짓", "없음"):
-            self.advance()
-            if tok_value == "참":
-                node = Bool(True)
-            elif tok_value == "거짓":
-                node = Bool(False)
-            else:
-                node = NoneLiteral()
-        
-        # 괄호식/튜플: (expr) / (a, b) / (a,) / ()
-        elif tok_type == "SYMBOL" and tok_value == "(":
-            self.advance() # '(' 소비
-
-            # 빈 튜플: ()
-            if self.current[0] == "SYMBOL" and self.current[1] == ")":
-                self.advance()
-                node = TupleLiteral(elements=[])
-            else:
-                first = self.parse_expr()
+                    stack.append(_BinaryFrame(start, min_prec, cond))
+                    stack.append(_UnaryFrame(start, tok[1]))
+                    want = _WANT_BINARY
+                    min_prec = _PREC_FACTOR
+                    continue
 
-                # 콤마가 있으면 튜플
-                if self.current[0] == "SYMBOL" and self.current[1] == ",":
-                    elements: list[Expr] = [first]
-                    while self.current[0] == "SYMBOL" and self.current[1] == ",":
-                        self.advance() # ',' 소비
-                        # trailing comma 허용: (a,)
-                        if self.current[0] == "SYMBOL" and self.current[1] == ")":
-                            break
-                        elements.append(self.parse_expr())
-                    self.expect("SYMBOL", ")")
-                    node = TupleLiteral(elements=elements)
+                # atom
+                tok_type, tok_value = tok
+                node_start = start
+                if tok_type == "NUMBER":
+                    if self._number_at is not None:
+                        number = self._number_at(start)
+                    else:
+                        number = number_value(tok_value)
+                    node = Number(number, raw=tok_value) if cons is None else cons.number(number, tok_value)
+                    self.advance()
+                elif tok_type == "STRING":
+                    self.advance()
+                    node = String(tok_value) if cons is None else cons.string(tok_value)
+                elif tok_type == "KEYWORD" and tok_value in ("참", "거짓", "없음"):
+                    self.advance()
+                    if tok_value == "없음":
+                        node = NoneLiteral() if cons is None else cons.none()
+                    else:
+                        flag = tok_value == "참"
+                        node = Bool(flag) if cons is None else cons.bool(flag)
+                elif tok_type == "IDENT":
+                    # 같은 자리를 대입 타겟으로 미리 파싱해 봤으면 (parse_stmt 의 되감기)
+                    # 그 Name/속성/인덱싱 사슬을 그대로 쓰고 뒤의 postfix 부터 이어 간다
+                    hit = memo.get((_MEMO_TARGET, start)) if memo is not None else None
+                    if hit is not None:
+                        node, end = hit
+                        self.memo_hits += 1
+                        self.memo_tokens_saved += end - start
+                        self.pos = end
+                    else:
+                        self.advance()
+                        node = Name(tok_value) if cons is None else cons.name(tok_value)
+                elif tok_type == "SYMBOL" and tok_value == "(":
+                    # 괄호식/튜플: (expr) / (a, b) / (a,) / ()
+                    self.advance()
+                    if self.current[0] == "SYMBOL" and self.current[1] == ")":
+                        self.advance()
+                        node = TupleLiteral(elements=[])
+                    else:
+                        stack.append(_BinaryFrame(start, min_prec, cond))
+                        stack.append(_ParenFrame(start))
+                        want = _WANT_EXPR
+                        continue
+                elif tok_type == "SYMBOL" and tok_value == "[":
+                    # 리스트 리터럴: [a, b, c]
+                    self.advance()
+                    if self.current[0] == "SYMBOL" and self.current[1] == "]":
+                        self.advance()
+                        node = ListLiteral(elements=[])
+                    else:
+                        stack.append(_BinaryFrame(start, min_prec, cond))
+                        stack.append(_ListFrame(start))
+                        want = _WANT_EXPR
+                        continue
+                elif tok_type == "SYMBOL" and tok_value == "{":
+                    # dict/set 리터럴: {k: v} / {a, b, c}
+                    self.advance()
+                    if self.current[0] == "SYMBOL" and self.current[1] == "}":
+                        self.advance()
+                        node = DictLiteral(items=[])
+                    else:
+                        stack.append(_BinaryFrame(start, min_prec, cond))
+                        stack.append(_BraceFrame(start))
+                        want = _WANT_EXPR
+                        continue
                 else:
-                    # 콤마가 없으면 그냥 괄호 그룹
-                    self.expect("SYMBOL", ")")
-                    node = first
-        
-        # 리스트 리터럴: [a, b, c]
-        elif tok_type == "SYMBOL" and tok_value == "[":
-            self.advance()
-            elements: list[Expr] = []
-
-            if not (self.current[0] == "SYMBOL" and self.current[1] == "]"):
+                    raise self.error(f"숫자/문자열/이름/괄호/리스트로 시작하는 표현식이 와야하는데 {self.current}를 만났습니다.")
+                # 원자 하나로 끝나는 식이 대부분이므로 _BinaryFrame 은 뒤에 연산자가 올 때만 쌓는다
+                pending = True
+                phase = _POSTFIX
+
+            if phase == _POSTFIX:
+                # ---- 2) node 뒤에 붙는 호출/인덱싱/속성접근 (안쪽 식이 필요하면 프레임을 쌓고 1) 로)
+                # 괄호 그룹 (a + b) 은 안쪽 식의 span 을 그대로 둔다. 공유 노드에는 기록하지 않는다
+                if node.span == 0 and (cons is None or not cons.owns(node)):
+                    self.mark(node, node_start)
+                phase = _DELIVER
                 while True:
-                    elements.append(self.parse_expr())
-                    if self.current[0] == "SYMBOL" and self.current[1] == ",":
+                    pos = self.pos
+                    tok = tokens[pos] if pos < n_tokens else EOF_TOKEN
+                    # 인덱싱/슬라이싱: x[0], x[1:3], x[:], x[::2]
+                    if tok is _TOK_LBRACKET:
+                        if pending:
+                            stack.append(_BinaryFrame(node_start, min_prec, cond))
+                            pending = False
                         self.advance()
-                        continue
-                    break
-
-            self.expect("SYMBOL", "]")
-            node = ListLiteral(elements=elements)
-
-        # dict/set 리터럴: {k: v} / {a, b, c}
-        elif tok_type == "SYMBOL" and tok_value == "{":
-            self.advance()
-
-            # 빈 dict: {}
-            if self.current[0] == "SYMBOL" and self.current[1] == "}":
-                self.advance()
-                node = DictLiteral(items=[])
-            else:
-                first = self.parse_expr()
+                        if self.current == ("SYMBOL", "]"):
+                            raise self.error("빈 인덱스는 허용되지 않습니다: x[]")
+                        stack.append(_SubscriptFrame(node_start, node))
+                        if self.current != ("SYMBOL", ":"):
+                            phase = _START
+                            want = _WANT_EXPR
+                        else:
+                            value = None  # x[:...] 는 첫 식 없이 바로 다음 단계로
+                        break
 
-                # dict: {key: value, ...}
-                if self.current[0] == "SYMBOL" and self.current[1] == ":":
-                    items: list[tuple[Expr, Expr]] = []
-                    while True:
-                        self.expect("SYMBOL", ":")
-                        value = self.parse_expr()
-                        items.append((first, value))
+                    # 속성 접근: x.y
+                    if tok is _TOK_DOT:
+                        self.advance()
+                        if self.current[0] != "IDENT":
+                            raise self.error(f"'.' 다음에는 IDENT(속성 이름)이 와야 합니다: {self.current}")
+                        _, attr = self.expect("IDENT")
+                        node = self.mark(Attribute(value=node, attr=attr), node_start)
+                        continue
 
-                        if self.current[0] == "SYMBOL" and self.current[1] == ",":
+                    # 함수/메서드 호출: f(...), obj.m(...)
+                    if tok is _TOK_LPAREN:
+                        if pending:
+                            stack.append(_BinaryFrame(node_start, min_prec, cond))
+                            pending = False
+                        self.advance()
+                        if self.current[0] == "SYMBOL" and self.current[1] == ")":
                             self.advance()
-                            # trailing comma 허용
-                            if self.current[0] == "SYMBOL" and self.current[1] == "}":
-                                break
-                            first = self.parse_expr()
+                            node = self.mark(Call(func=node, args=[], keywords=[]), node_start)
                             continue
+                        frame = _CallFrame(node_start, node)
+                        stack.append(frame)
+                        phase, want, min_prec = frame.start_arg(self)
                         break
 
-                    self.expect("SYMBOL", "}")
-                    node = DictLiteral(items=items)
-                else:
-                    # set: {a, b, c}
-                    elements: list[Expr] = [first]
-                    while self.current[0] == "SYMBOL" and self.current[1] == ",":
-                        self.advance()
-                        # trailing comma 허용
-                        if self.current[0] == "SYMBOL" and self.current[1] == "}":
-                            break
-                        elements.append(self.parse_expr())
-                    self.expect("SYMBOL", "}")
-                    node = SetLiteral(elements=elements)
-        
-        # 이름(변수 또는 함수호출)
-        elif tok_type == "IDENT":
-            ident_name = tok_value
-            self.advance()
-            node = Name(ident_name)
-        else:
-            raise SyntaxError(f"숫자/문자열/이름/괄호/리스트로 시작하는 표현식이 와야하는데 {self.current}를 만났습니다.")
-        
-        # postfix: 호출/인덱싱/속성접근을 연쇄로 지원
-        while True:
-            # 인덱싱/슬라이싱: x[0], x[1:3], x[:], x[::2]
-            if self.current[0] == "SYMBOL" and self.current[1] == "[":
-                self.advance()
-
-                if self.current == ("SYMBOL", "]"):
-                    raise SyntaxError("빈 인덱스는 허용되지 않습니다: x[]")
-                
-                # start / first
-                start = None
-                first = None
-                if self.current != ("SYMBOL", ":"):
-                    first = self.parse_expr()
-                
-                # ':'가 있으면 슬라이스, 아니면 인덱싱
-                if self.current == ("SYMBOL", ":"):
-                    start = first
-                    self.advance()
+                    value = node
+                    if pending:
+                        pending = False
+                        if tok in _EXPR_CONTINUATION:
+                            stack.append(_BinaryFrame(node_start, min_prec, cond))
+                        elif not stack:
+                            return value
+                    break
+                if phase == _START:
+                    continue
 
-                    # stop
-                    if self.current not in (("SYMBOL", ":"), ("SYMBOL", "]")):
-                        stop = self.parse_expr()
-                    else:
-                        stop = None
-                    
-                    # step(optional)
-                    step = None
-                    if self.current == ("SYMBOL", ":"):
-                        self.advance()
-                        if self.current != ("SYMBOL", "]"):
-                            step = self.parse_expr()
-                    
-                    self.expect("SYMBOL", "]")
-                    node = Slice(value=node, start=start, stop=stop, step=step)
-                else:
-                    if first is None:
-                        raise SyntaxError("인덱싱 표현식이 필요합니다.")
-                    self.expect("SYMBOL", "]")
-                    node = Index(value=node, index=first)
-                
-                continue
+            # ---- 3) 식 하나(value)가 끝났다: 맨 위 프레임에 넘겨 주고, 프레임이 돌려준 다음 할 일로 간다
+            while True:
+                phase, result, extra = stack[-1].deliver(self, stack, value)
+                if phase != _DELIVER:
+                    break
+                value = result
+                if not stack:
+                    return value
+            if phase == _START:
+                want, min_prec = result, extra
+            else:
+                node, node_start = result, extra
 
-            # 속성 접근: x.y
-            if self.current[0] == "SYMBOL" and self.current[1] == ".":
-                self.advance()
-                if self.current[0] != "IDENT":
-                    raise SyntaxError(f"'.' 다음에는 IDENT(속성 이름)이 와야 합니다: {self.current}")
-                
-                _, attr = self.expect("IDENT")
-                node = Attribute(value=node, attr=attr)
-                continue
+    # 현재 위치의 비교 연산자를 소비하고 Compare.ops 값을 돌려준다 (비교 연산자가 아니면 None)
+    def _compare_op(self) -> str | None:
+        tok = self.current
+        # "아니다 안에" (not in)
+        if tok is _TOK_NOT:
+            if self.peek(1) is not _TOK_IN:
+                return None
+            self.advance()
+            self.advance()
+            return "not in"
+        op = _COMPARE_OPS.get(tok)
+        if op is not None:
+            self.advance()
+        return op
 
-            # 함수/메서드 호출: f(...), obj.m(...)
-            if self.current[0] == "SYMBOL" and self.current[1] == "(":
-                self.advance()
-                args: list[Expr] = []
-                keywords: list[tuple[str, Expr]] = []
-                seen_kw = False
-                if not (self.current[0] == "SYMBOL" and self.current[1] == ")"):
-                    while True:
-                        if self.current[0] == "IDENT" and self.peek(1) == ("SYMBOL", "="):
-                            seen_kw = True
-                            _, key = self.expect("IDENT")
-                            self.expect("SYMBOL", "=")
-                            val = self.parse_expr()
-                            keywords.append((key, val))
-                        else:
-                            if seen_kw:
-                                raise SyntaxError("키워드 인자 뒤에는 위치 인자를 둘 수 없습니다.")
-                            args.append(self.parse_expr())
-                        
-                        if self.current[0] == "SYMBOL" and self.current[1] == ",":
-                            self.advance()
-                            if self.current[0] == "SYMBOL" and self.current[1] == ")":
-                                break
-                            continue
-                        break
-                self.expect("SYMBOL", ")")
-                node = Call(func=node, args=args, keywords=keywords)
-                continue
-            break
-        return node
-    
     def parse_target(self) -> Expr:
         """대입 타겟: Name ('.' IDENT | '[' expr ']')* (호출()은 금지)"""
+        if self._memo is not None:
+            return self._memoized(_MEMO_TARGET, self._parse_target)
+        return self._parse_target()
+
+    def _parse_target(self) -> Expr:
+        node_start = self.pos
         _, ident_value = self.expect("IDENT")
         node: Expr
-        node = Name(ident_value)
+        if self._cons is None:
+            node = self.mark(Name(ident_value), node_start)
+        else:
+            node = self._cons.name(ident_value)
 
         while True:
             if self.current[0] == "SYMBOL" and self.current[1] == "[":
                 self.advance()
                 if self.current == ("SYMBOL", "]"):
-                    raise SyntaxError("빈 인덱스는 허용되지 않습니다: x[]")
+                    raise self.error("빈 인덱스는 허용되지 않습니다: x[]")
                 
                 first = None
                 if self.current != ("SYMBOL", ":"):
@@ -522,20 +1146,20 @@ class Parser:
                             step = self.parse_expr()
                     
                     self.expect("SYMBOL", "]")
-                    node = Slice(value=node, start=start, stop=stop, step=step)
+                    node = self.mark(Slice(value=node, start=start, stop=stop, step=step), node_start)
                 else:
                     if first is None:
-                        raise SyntaxError("인덱싱 표현식이 필요합니다.")
+                        raise self.error("인덱싱 표현식이 필요합니다.")
                     self.expect("SYMBOL", "]")
-                    node = Index(value=node, index=first)
+                    node = self.mark(Index(value=node, index=first), node_start)
                 continue
 
             if self.current[0] == "SYMBOL" and self.current[1] == ".":
                 self.advance()
                 if self.current[0] != "IDENT":
-                    raise SyntaxError(f"'.' 다음에는 IDENT(속성 이름)이 와야 합니다: {self.current}")
+                    raise self.error(f"'.' 다음에는 IDENT(속성 이름)이 와야 합니다: {self.current}")
                 _, attr = self.expect("IDENT")
-                node = Attribute(value=node, attr=attr)
+                node = self.mark(Attribute(value=node, attr=attr), node_start)
                 continue
             
             break
@@ -550,7 +1174,7 @@ class Parser:
         target = self.parse_target()
         _, op_value = self.expect("SYMBOL")
         if op_value not in ("+", "-", "*", "/", "//", "%", "**", "<<", ">>", "&", "^", "|"):
-            raise SyntaxError(f"복합대입 연산자가 올바르지 않습니다: {op_value!r}")
+            raise self.error(f"복합대입 연산자가 올바르지 않습니다: {op_value!r}")
         self.expect("SYMBOL", "=")
         value_expr = self.parse_expr()
         return AugAssign(target=target, op=op_value, value=value_expr)
@@ -565,6 +1189,12 @@ class Parser:
         - a, b 같은 언패킹 타겟 지원
         - 1개면 그대로 반환, 2개 이상이면 TupleLiteral
         """
+        if self._memo is not None:
+            return self._memoized(_MEMO_TARGET_LIST, self._parse_target_list)
+        return self._parse_target_list()
+
+    def _parse_target_list(self) -> Expr:
+        start = self.pos
         first = self.parse_target()
         if self.current != ("SYMBOL", ','):
             return first
@@ -580,7 +1210,7 @@ class Parser:
 
             elements.append(self.parse_target())
 
-        return TupleLiteral(elements=elements)
+        return self.mark(TupleLiteral(elements=elements), start)
 
     def parse_expr_list(self, stop_symbols: set[str] | None = None) -> Expr:
         """
@@ -590,6 +1220,7 @@ class Parser:
         if stop_symbols is None:
             stop_symbols = set()
 
+        start = self.pos
         first = self.parse_expr()
         if self.current != ("SYMBOL", ","):
             return first
@@ -605,7 +1236,7 @@ class Parser:
 
             elements.append(self.parse_expr())
 
-        return TupleLiteral(elements=elements)
+        return self.mark(TupleLiteral(elements=elements), start)
 
     def parse_dotted_name(self) -> str:
         """
@@ -613,7 +1244,7 @@ class Parser:
         예: math / os.path / a.b.c
         """
         if self.current[0] != "IDENT":
-            raise SyntaxError(f"모듈/이름은 IDENT로 시작해야 합니다: {self.current}")
+            raise self.error(f"모듈/이름은 IDENT로 시작해야 합니다: {self.current}")
         _, first = self.expect("IDENT")
         parts = [first]
         while self.current == ("SYMBOL", "."):
@@ -668,7 +1299,7 @@ class Parser:
         
         while True:
             if self.current[0] != "IDENT":
-                raise SyntaxError(f"불러오기 뒤에는 IDENT 또는 * 가 와야 합니다: {self.current}")
+                raise self.error(f"불러오기 뒤에는 IDENT 또는 * 가 와야 합니다: {self.current}")
             _, name = self.expect("IDENT")
 
             asname: str | None = None
@@ -697,27 +1328,65 @@ class Parser:
             만약 값 < 10:
                 값 = 값 + 1
                 값 = 값 + 2
+
+        블록 문장(block_handlers) 안에서는 본문을 yield 로 받으므로 이 메서드를 부르지 않는다.
+        register_statement 로 등록한 처리 함수나 미뤄 둔 본문처럼 본문만 따로 파싱할 때 쓴다.
         """
-        # case 2: NEWLINE + INDENT -> 블록
-        if self.current[0] == "NEWLINE":
-            # 줄 끝
-            self.advance()
-            # 다음은 반드시 INDENT 여야 함
-            self.expect("INDENT")
-            body: list[Stmt] = []
-            while self.current[0] not in ("DEDENT", "EOF"):
-                if self.current[0] == "NEWLINE":
-                    self.advance()
-                    continue
-                body.append(self.parse_stmt())
-            # 블록 끝
-            self.expect("DEDENT")
-            return body
-        
-        # case 1: 같은 줄에 한 문장
-        stmt = self.parse_stmt()
-        return [stmt]
+        if self._block_depth < _RECURSIVE_BLOCKS:
+            return self._parse_body(self.recover)
+        holder: list[list[Stmt]] = []
+        self._parse_stmts([_Compound(_suite_steps(), None, holder)], None, self.recover)
+        return holder[0]
     
+    def _defer_suite(self, node: FunctionDef | ClassDef) -> FunctionDef | ClassDef:
+        """
+        ':' 뒤의 블록(NEWLINE INDENT ... DEDENT) 을 파싱하지 않고 짝 맞는 DEDENT 뒤로 건너뛴 다음,
+        그 토큰 구간을 나중에 파싱하도록 node 에 걸어 둔다.
+        한 줄짜리 본문이나 블록 모양이 아닌 것은 (에러도 제자리에서 나도록) 바로 파싱한다.
+        """
+        start = self.pos
+        end = self._block_end(start)
+        if end is None:
+            node.body = self.parse_suite()
+            return node
+        self.pos = end
+        node.defer_body(partial(self._parse_suite_at, start, end))
+        return node
+
+    def _block_end(self, start: int) -> int | None:
+        """start 의 NEWLINE INDENT 로 시작하는 블록을 닫는 DEDENT 바로 뒤 위치 (블록이 아니면 None)"""
+        tokens = self.tokens
+        if tokens[start:start + 2] != [NEWLINE_TOKEN, INDENT_TOKEN]:
+            return None
+        # INDENT/DEDENT 를 list.index 로 (C 루프에서) 찾아 가며 깊이를 센다
+        depth = 1
+        i = start + 2
+        while True:
+            try:
+                dedent = tokens.index(DEDENT_TOKEN, i)
+            except ValueError:
+                return None
+            try:
+                i = tokens.index(INDENT_TOKEN, i, dedent) + 1
+                depth += 1
+            except ValueError:
+                i = dedent + 1
+                depth -= 1
+                if depth == 0:
+                    return i
+
+    def _parse_suite_at(self, start: int, end: int) -> list[Stmt]:
+        """미뤄 둔 본문 [start, end) 를 지금 파싱한다 (파서의 현재 위치는 그대로 둔다)"""
+        saved = self.pos
+        self.pos = start
+        try:
+            body = self.parse_suite()
+            if self.pos != end:
+                raise self.error("미뤄 둔 본문이 블록 끝에서 끝나지 않았습니다.")
+            return body
+        finally:
+            self.pos = saved
+
     # ========================
     #  문장들 (if/while/for/def/return)
     # ========================
@@ -736,7 +1405,7 @@ class Parser:
         if isinstance(left, TupleLiteral):
             value_expr = self.parse_expr_list()
             if self.current == ("SYMBOL", "="):
-                raise SyntaxError("언패킹 대입에서는 연쇄 대입(a=b=...)을 지원하지 않습니다.")
+                raise self.error("언패킹 대입에서는 연쇄 대입(a=b=...)을 지원하지 않습니다.")
             return Assign(target=left, value=value_expr)
         
         # 연쇄 대입: a = b = c
@@ -760,7 +1429,11 @@ class Parser:
             return Assign(target=targets[0], value=value_expr)
         return ChainedAssign(targets=targets, value=value_expr)
 
-    def parse_if(self) -> If:
+    # ========================
+    #  블록 문장: 본문(suite) 자리에서 yield 하고 부른 쪽 (_parse_block 또는 _parse_stmts) 이 파싱한 본문을 받는다
+    # ========================
+
+    def _if_steps(self):
         """
         if문 : 
             만약 expr ':' suite
@@ -781,7 +1454,7 @@ class Parser:
         self.expect("SYMBOL", ":")
 
         # 4) then 블록
-        then_body = self.parse_suite()
+        then_body = yield
 
         # 루트 if 노드
         root_if = If(test=cond, body=then_body, orelse=None)
@@ -791,6 +1464,7 @@ class Parser:
         while self.current[0] == "KEYWORD" and self.current[1] == "아니면":
             
             # '아니면' 키워드 소비
+            elif_start = self.pos
             self.expect("KEYWORD", "아니면")
             
             # elif 조건식
@@ -800,10 +1474,10 @@ class Parser:
             self.expect("SYMBOL", ":")
             
             # elif 본문
-            elif_body = self.parse_suite()
+            elif_body = yield
             
             # 새 if 노드를 만들어서 현재 if의 orelse에 달아줌
-            new_if = If(test=elif_cond, body=elif_body, orelse=None)
+            new_if = self.mark(If(test=elif_cond, body=elif_body, orelse=None), elif_start)
             current_if.orelse = [new_if]
             current_if = new_if # 체인의 끝을 업데이트
 
@@ -811,12 +1485,12 @@ class Parser:
         if self.current[0] == "KEYWORD" and self.current[1] == "그외":
             self.expect("KEYWORD", "그외")
             self.expect("SYMBOL", ":")
-            else_body = self.parse_suite()
+            else_body = yield
             current_if.orelse = else_body
 
         return root_if
 
-    def parse_while(self) -> While:
+    def _while_steps(self):
         """
         While문:
             동안 expr ':' suite
@@ -834,11 +1508,11 @@ class Parser:
         self.expect("SYMBOL", ":")
         
         # 4) 본문 suite
-        body = self.parse_suite()
+        body = yield
 
         return While(test=cond, body=body)
     
-    def parse_for(self) -> For:
+    def _for_steps(self):
         """
         For문:
             반복 i 안에 expr: suite
@@ -862,11 +1536,11 @@ class Parser:
         self.expect("SYMBOL", ":")
 
         # 본문
-        body = self.parse_suite()
+        body = yield
         
         return For(target=target, iter=iter_expr, body=body)
     
-    def parse_class(self) -> ClassDef:
+    def _class_steps(self):
         """
         클래스 정의:
             클래스 이름:
@@ -895,10 +1569,12 @@ class Parser:
             self.expect("SYMBOL", ")")
 
         self.expect("SYMBOL", ":")
-        body = self.parse_suite()
+        if self.lazy_bodies:
+            return self._defer_suite(ClassDef(name=class_name, bases=bases, body=[]))
+        body = yield
         return ClassDef(name=class_name, bases=bases, body=body)
 
-    def parse_function(self) -> FunctionDef:
+    def _function_steps(self):
         """
         함수 정의:
             정의 이름(파라미터들): suite
@@ -916,12 +1592,13 @@ class Parser:
         params: list[Param] = []
         if not (self.current[0] == "SYMBOL" and self.current[1] == ")"):
             while True:
+                param_start = self.pos
                 _, param_name = self.expect("IDENT")
                 default_val: Expr | None = None
                 if self.current == ("SYMBOL", "="):
                     self.advance()
                     default_val = self.parse_expr()
-                params.append(Param(name=param_name, default=default_val))
+                params.append(self.mark(Param(name=param_name, default=default_val), param_start))
 
                 if self.current[0] == "SYMBOL" and self.current[1] == ",":
                     self.advance()
@@ -936,7 +1613,9 @@ class Parser:
         self.expect("SYMBOL", ":")
 
         # 함수 본문 suite (여러 문장 가능)
-        body = self.parse_suite()
+        if self.lazy_bodies:
+            return self._defer_suite(FunctionDef(name=func_name, args=params, body=[]))
+        body = yield
         
         return FunctionDef(name=func_name, args=params, body=body)
     
@@ -965,7 +1644,7 @@ class Parser:
         exc = self.parse_expr()
         return Raise(exc=exc)
     
-    def parse_try(self) -> Try:
+    def _try_steps(self):
         """
         예외 처리:
             시도: suite
@@ -975,7 +1654,7 @@ class Parser:
         """
         self.expect("KEYWORD", "시도")
         self.expect("SYMBOL", ":")
-        body = self.parse_suite()
+        body = yield
 
         handlers: list[ExceptHandler] = []
         orelse: list[Stmt] | None = None
@@ -983,6 +1662,7 @@ class Parser:
 
         # except handlers (0개 이상)
         while self.current == ("KEYWORD", "예외"):
+            handler_start = self.pos
             self.advance()
 
             exc_type: Expr | None = None
@@ -995,31 +1675,31 @@ class Parser:
             if self.current == ("KEYWORD", "별칭"):
                 self.advance()
                 if exc_type is None:
-                    raise SyntaxError("'예외 별칭 e' 형태는 지원하지 않습니다. (타입 없이 별칭 불가)")
+                    raise self.error("'예외 별칭 e' 형태는 지원하지 않습니다. (타입 없이 별칭 불가)")
                 _, exc_name = self.expect("IDENT")
 
             self.expect("SYMBOL", ":")
-            h_body = self.parse_suite()
-            handlers.append(ExceptHandler(type=exc_type, name=exc_name, body=h_body))
+            h_body = yield
+            handlers.append(self.mark(ExceptHandler(type=exc_type, name=exc_name, body=h_body), handler_start))
 
         # try-else
         if self.current == ("KEYWORD", "성공"):
             self.advance()
             self.expect("SYMBOL", ":")
-            orelse = self.parse_suite()
+            orelse = yield
 
         # finally
         if self.current == ("KEYWORD", "마침"):
             self.advance()
             self.expect("SYMBOL", ":")
-            finalbody = self.parse_suite()
+            finalbody = yield
 
         if not handlers and finalbody is None:
-            raise SyntaxError("시도 문에는 최소 1개의 예외 블록 또는 마침 블록이 필요합니다.")
+            raise self.error("시도 문에는 최소 1개의 예외 블록 또는 마침 블록이 필요합니다.")
         
         return Try(body=body, handlers=handlers, orelse=orelse, finalbody=finalbody)
 
-    def parse_with(self) -> With:
+    def _with_steps(self):
         """
         with문:
         함께 expr [별칭 target] (',' expr [별칭 target]* ':' suite)
@@ -1028,16 +1708,17 @@ class Parser:
 
         items: list[WithItem] = []
         while True:
+            item_start = self.pos
             ctx = self.parse_expr()
 
             opt: Expr | None = None
             if self.current == ("KEYWORD", "별칭"):
                 self.advance()
                 if self.current[0] != "IDENT":
-                    raise SyntaxError(f"'별칭' 뒤에는 IDENT 타겟이 와야 합니다: {self.current}")
+                    raise self.error(f"'별칭' 뒤에는 IDENT 타겟이 와야 합니다: {self.current}")
                 opt = self.parse_target()
 
-            items.append(WithItem(context_expr=ctx, optional_vars=opt))
+            items.append(self.mark(WithItem(context_expr=ctx, optional_vars=opt), item_start))
 
             if self.current == ("SYMBOL", ","):
                 self.advance()
@@ -1045,65 +1726,275 @@ class Parser:
             break
 
         self.expect("SYMBOL", ":")
-        body = self.parse_suite()
+        body = yield
         return With(items=items, body=body)
 
     def parse_stmt(self) -> Stmt:
-        ttype, tvalue = self.current
-
-        if ttype == "KEYWORD" and tvalue == "만약":
-            return self.parse_if()
-        elif ttype == "KEYWORD" and tvalue == "동안":
-            return self.parse_while()
-        elif ttype == "KEYWORD" and tvalue == "반복":
-            return self.parse_for()
-        elif ttype == "KEYWORD" and tvalue == "클래스":
-            return self.parse_class()
-        elif ttype == "KEYWORD" and tvalue == DEF_KEYWORD:
-            return self.parse_function()
-        elif ttype == "KEYWORD" and tvalue == "반환":
-            return self.parse_return()
-        elif ttype == "KEYWORD" and tvalue == "중단":
-            self.expect("KEYWORD", "중단")
-            return Break()
-        elif ttype == "KEYWORD" and tvalue == "계속":
-            self.expect("KEYWORD", "계속")
-            return Continue()
-        elif ttype == "KEYWORD" and tvalue == "통과":
-            self.expect("KEYWORD", "통과")
-            return Pass()
-        elif ttype == "KEYWORD" and tvalue == "불러오기":
-            return self.parse_import()
-        elif ttype == "KEYWORD" and tvalue == "꺼내기":
-            return self.parse_from_import()
-        elif ttype == "KEYWORD" and tvalue == "시도":
-            return self.parse_try()
-        elif ttype == "KEYWORD" and tvalue == "함께":
-            return self.parse_with()
-        elif ttype == "KEYWORD" and tvalue == "던지기":
-            return self.parse_raise()
-        elif ttype == "IDENT":
-            pos0 = self.pos
+        """문장 하나 (블록 문장이면 본문까지). 복구 모드여도 이 문장의 에러는 그대로 낸다."""
+        body: list[Stmt] = []
+        self._parse_stmt_into(body, False)
+        return body[0]
 
-            try:
-                _ = self.parse_target_list()
-                if self.current == ("SYMBOL", "="):
-                    self.pos = pos0
-                    return self.parse_assign()
-                
-                t1 = self.current
-                t2 = self.peek(1)
-                if t1[0] == "SYMBOL" and t1[1] in ("+", "-", "*", "/", "//", "%", "**", "<<", ">>", "&", "^", "|") and t2 == ("SYMBOL", "="):
-                    self.pos = pos0
-                    return self.parse_augassign()
-            except SyntaxError:
-                pass
+    def _parse_stmt(self) -> Stmt:
+        """블록이 없는 문장 하나 (블록 문장은 부른 쪽이 block_handlers 에서 먼저 찾는다)"""
+        tok = self.current
 
-            self.pos = pos0
-            expr = self.parse_expr()
-            return ExprStmt(value=expr)
+        # 가장 흔한 문장(대입/호출)이 이름으로 시작하므로 먼저 본다
+        if tok[0] == "IDENT":
+            return self.parse_simple_stmt()
+
+        # 키워드로 시작하는 문장은 표에서 처리 메서드를 바로 찾는다
+        handler = self.statement_handlers.get(tok)
+        if handler is not None:
+            return handler(self)
+
+        raise self.error(f"지원하지 않는 문장 시작 토큰: {self.current}")
+
+    def parse_simple_stmt(self) -> Stmt:
+        """
+        이름으로 시작하는 문장: 대입 / 복합 대입 / 식 문장
+        대상(target_list) 을 먼저 읽어 보고 '=' 이나 'op=' 가 뒤따르는지로 정한다.
+        """
+        pos0 = self.pos
 
-        raise SyntaxError(f"지원하지 않는 문장 시작 토큰: {self.current}")
+        self._speculating += 1
+        try:
+            _ = self.parse_target_list()
+            if self.current == ("SYMBOL", "="):
+                self.pos = pos0
+                return self.parse_assign()
+            
+            t1 = self.current
+            t2 = self.peek(1)
+            if t1[0] == "SYMBOL" and t1[1] in ("+", "-", "*", "/", "//", "%", "**", "<<", ">>", "&", "^", "|") and t2 == ("SYMBOL", "="):
+                self.pos = pos0
+                return self.parse_augassign()
+        except SyntaxError:
+            pass
+        finally:
+            self._speculating -= 1
+
+        self.pos = pos0
+        expr = self.parse_expr()
+        return ExprStmt(value=expr)
+
+    def parse_break(self) -> Break:
+        self.expect("KEYWORD", "중단")
+        return Break()
+
+    def parse_continue(self) -> Continue:
+        self.expect("KEYWORD", "계속")
+        return Continue()
+
+    def parse_pass(self) -> Pass:
+        self.expect("KEYWORD", "통과")
+        return Pass()
+
+    # 문장 시작 키워드 토큰 -> 처리 함수 handler(parser) -> Stmt
+    statement_handlers: dict[tuple[str, str], Callable[["Parser"], Stmt]] = {}
+
+    # 블록 문장 시작 키워드 토큰 -> 본문마다 yield 하는 제너레이터 함수 steps(parser)
+    # (본문을 send 로 받고, 끝나면 Stmt 를 return 한다)
+    block_handlers: dict[tuple[str, str], Callable[["Parser"], Generator[None, list[Stmt], Stmt]]] = {}
+
+    @classmethod
+    def register_statement(cls, py_keyword: str, handler: Callable[["Parser"], Stmt]) -> None:
+        """
+        mapping.PY_TO_HAN 의 키워드(파이썬 이름) 로 시작하는 문장을 handler 로 파싱하게 한다.
+        새 문장은 mapping.py 에 키워드를 추가하고 여기에 등록만 하면 된다 (_parse_stmt 는 그대로).
+        하위 클래스에서 등록하면 그 클래스의 표만 바뀐다.
+        handler 가 본문을 parse_suite 로 파싱하면 그 문장은 블록 스택 대신 재귀로 겹친다.
+        깊게 겹칠 수 있는 블록 문장은 register_block_statement 로 등록한다.
+        """
+        token = KEYWORD_TOKENS[PY_TO_HAN[py_keyword]]
+        cls._own_tables()
+        cls.statement_handlers[token] = handler
+        cls.block_handlers.pop(token, None)
+
+    @classmethod
+    def register_block_statement(
+            cls, py_keyword: str, steps: Callable[["Parser"], Generator[None, list[Stmt], Stmt]],
+    ) -> None:
+        """
+        register_statement 와 같지만 본문이 있는 문장용: steps(parser) 는 본문 자리마다
+        `body = yield` 로 본문을 받는 제너레이터 함수이고, 끝나면 문장 노드를 return 한다.
+        깊게 겹치면 본문은 _parse_stmts 의 블록 스택이 파싱하므로 이런 문장은 아무리 깊게 겹쳐도 된다.
+        """
+        token = KEYWORD_TOKENS[PY_TO_HAN[py_keyword]]
+        cls._own_tables()
+        cls.block_handlers[token] = steps
+        cls.statement_handlers.pop(token, None)
+
+    @classmethod
+    def _own_tables(cls) -> None:
+        if "statement_handlers" not in cls.__dict__:
+            cls.statement_handlers = dict(cls.statement_handlers)
+        if "block_handlers" not in cls.__dict__:
+            cls.block_handlers = dict(cls.block_handlers)
+
+def _suite_steps():
+    """parse_suite 용: 본문 하나를 받아 그대로 돌려준다"""
+    body = yield
+    return body
+
+# 기본 블록 문장들: 파이썬 키워드 -> 본문마다 yield 하는 메서드
+for _py_keyword, _steps in (
+    ("if", Parser._if_steps),
+    ("while", Parser._while_steps),
+    ("for", Parser._for_steps),
+    ("class", Parser._class_steps),
+    ("def", Parser._function_steps),
+    ("try", Parser._try_steps),
+    ("with", Parser._with_steps),
+):
+    Parser.register_block_statement(_py_keyword, _steps)
+
+# 기본 문장들: 파이썬 키워드 -> 처리 메서드
+for _py_keyword, _handler in (
+    ("return", Parser.parse_return),
+    ("break", Parser.parse_break),
+    ("continue", Parser.parse_continue),
+    ("pass", Parser.parse_pass),
+    ("import", Parser.parse_import),
+    ("from", Parser.parse_from_import),
+    ("raise", Parser.parse_raise),
+):
+    Parser.register_statement(_py_keyword, _handler)
+
+@dataclass
+class ProgramDiff:
+    """
+    reparse_program 한 번으로 바뀐 최상위 문장 구간.
+    previous.body[start:start + len(removed)] 를 inserted 로 바꾸면 새 Program.body 가 된다.
+    구간 밖의 문장은 이전 Stmt 객체 그대로다 (문장별로 캐시해 둔 생성 코드를 계속 쓸 수 있다).
+    """
+    start: int
+    removed: list[Stmt]
+    inserted: list[Stmt]
+
+# 문장이 끝난 뒤에도 파서가 들여다보는 토큰 수 (다음 줄의 아니면/그외/예외, "아니다 안에" 등)
+_STMT_LOOKAHEAD = 2
+
+def reparse_program(
+        previous: Program, tokens, spans=None, source: SourceMap | None = None, **options,
+) -> tuple[Program, ProgramDiff]:
+    """
+    편집된 새 토큰(tokens) 을 파싱하되, previous 의 최상위 문장 중 토큰이 그대로인 것은 다시 쓴다.
+    previous 는 Parser(..., incremental=True) 나 reparse_program 이 만든 Program 이어야 한다
+    (아니면 전부 다시 파싱한다). options 는 Parser 에 그대로 넘긴다 (memo / recover / lazy_bodies).
+
+    - 앞에서부터: 문장의 토큰과 그 뒤 _STMT_LOOKAHEAD 개까지 같으면 그 문장은 같게 파싱된다
+    - 뒤에서부터: 문장부터 파일 끝까지가 같으면 그 문장도 같다 (위치만 밀린다)
+    - 그 사이만 새로 파싱한다. 새로 파싱한 문장이 뒤쪽 문장의 시작을 넘어가면 그 문장도 바꾼다.
+    spans 를 주면 토큰 위치(span)도 같아야 (뒤쪽은 모두 같은 거리만큼 밀려 있어야) 다시 쓴다.
+    공백/주석만 바뀐 문장도 span 이 달라지므로 새로 파싱한다.
+
+    다시 쓰는 뒤쪽 문장은 노드의 span 을 제자리에서 새 위치로 옮기고, 미뤄 둔 본문(lazy_bodies) 은
+    새 파서에 다시 건다. 그러니 previous 는 이 호출 뒤로는 쓰지 않는다.
+    recover=True 일 때 diagnostics 는 새로 파싱한 구간의 것만 담긴다.
+    """
+    parser = Parser(tokens, spans, source, incremental=True, **options)
+    new = parser.tokens
+    state = getattr(previous, "incremental_state", None)
+    if state is None or (state[1] is None) != (spans is None):
+        program = parser.parse_program()
+        return program, ProgramDiff(0, list(previous.body), list(program.body))
+    old, old_spans, old_ranges = state
+    old_body = previous.body
+    count = len(old_body)
+
+    # 1) 앞쪽에서 그대로인 문장 수
+    front = 0
+    checked = 0  # old[:checked] == new[:checked] 확인 끝
+    while front < count:
+        end = old_ranges[2 * front + 1] + _STMT_LOOKAHEAD
+        if old[checked:end] != new[checked:end]:
+            break
+        if spans is not None and old_spans[checked:end] != parser.spans[checked:end]:
+            break
+        checked = end
+        front += 1
+    front_end = old_ranges[2 * front - 1] if front else 0
+
+    # 2) 뒤쪽에서 그대로인 문장 수 (문장 시작부터 파일 끝까지 같아야 한다)
+    shift = len(new) - len(old)
+    back = count
+    checked = len(old)  # old[checked:] == new[checked + shift:] 확인 끝
+    span_delta = None   # 뒤쪽 span 이 밀린 거리 (pack_span 단위)
+    while back > front:
+        start = old_ranges[2 * (back - 1)]
+        if start + shift < front_end or old[start:checked] != new[start + shift:checked + shift]:
+            break
+        if spans is not None:
+            deltas = set(map(sub, parser.spans[start + shift:checked + shift], old_spans[start:checked]))
+            if span_delta is not None:
+                deltas.add(span_delta)
+            # 길이는 그대로고 시작 위치만 모두 같은 만큼 밀렸어야 한다
+            if len(deltas) != 1 or next(iter(deltas)) % (1 << SPAN_SHIFT):
+                break
+            span_delta = deltas.pop()
+        checked = start
+        back -= 1
+
+    # 3) 그 사이를 새로 파싱 (앞쪽 문장의 구간은 그대로 옮겨 적는다)
+    body = old_body[:front]
+    ranges = parser._ranges
+    ranges += old_ranges[:2 * front]
+    parser.pos = front_end
+    while parser.current[0] != "EOF":
+        if back < count:
+            next_start = old_ranges[2 * back] + shift
+            if parser.pos > next_start:
+                back += 1  # 새로 파싱한 문장이 이 문장 자리까지 먹었다
+                continue
+            if parser.pos == next_start:
+                break
+        if parser.current[0] == "NEWLINE":
+            parser.advance()
+            continue
+        if parser._memo is not None:
+            parser._memo.clear()
+        before = parser.pos
+        n = len(body)
+        parser._parse_stmt_into(body)
+        if len(body) > n:
+            ranges += array("I", (before, parser.pos))
+    inserted = body[front:]
+
+    # 4) 뒤쪽 문장: 토큰 위치/원본 위치를 옮겨서 다시 쓴다
+    for i in range(back, count):
+        stmt = old_body[i]
+        if span_delta or parser.lazy_bodies:
+            _rebase(stmt, parser, shift, span_delta or 0)
+        body.append(stmt)
+        ranges += array("I", (old_ranges[2 * i] + shift, old_ranges[2 * i + 1] + shift))
+    if parser.lazy_bodies:
+        # 앞쪽 문장의 미뤄 둔 본문도 새 파서에 건다 (이전 파서를 놓아 줄 수 있게)
+        for stmt in body[:front]:
+            _rebase(stmt, parser, 0, 0)
+
+    parser.pos = len(new)  # Program 의 span 은 파일 전체
+    program = parser._finish_program(body)
+    return program, ProgramDiff(front, old_body[front:back], inserted)
+
+def _rebase(root: Stmt, parser: Parser, token_shift: int, span_delta: int) -> None:
+    """
+    다시 쓰는 문장 트리의 span 에 span_delta 를 더하고 (시작 위치만 옮긴다),
+    아직 파싱하지 않은 본문은 parser 의 (token_shift 만큼 옮긴) 구간을 파싱하도록 다시 건다.
+    미뤄 둔 본문은 건드리지 않는다 (인스턴스에 있는 값만 따라간다).
+    """
+    work: list = [root]
+    while work:
+        item = work.pop()
+        if isinstance(item, Node):
+            if span_delta and item.span:
+                item.span += span_delta
+            if isinstance(item, DeferredBody) and item.body_pending:
+                start, end = item._parse_body.args
+                item.defer_body(partial(parser._parse_suite_at, start + token_shift, end + token_shift))
+            work.extend(field_values(item))
+        elif isinstance(item, (list, tuple)):
+            work.extend(item)
 
 if __name__ == "__main__":
     # 1) 한글 코드
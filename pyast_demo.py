@@ -0,0 +1,361 @@
+# pyast_demo.py
+#
+# ast_demo 의 AST 를 파이썬 코드 문자열을 거치지 않고 CPython 의 ast 객체로 바로 내리는 백엔드
+#
+# gen_program 은 파이썬 코드 "문자열" 을 만들고, exec/compile 은 그 문자열을 다시 토큰화하고 파싱한다.
+# lower_program 은 Program 을 ast.Module 로 바로 만들어 compile() 에 넘기므로 그 두 번째 프런트엔드를 건너뛴다.
+# 노드마다 한글 소스의 위치(줄 번호, 칸)를 붙이므로 traceback 의 줄 번호가 곧 한글 소스의 줄 번호다.
+#
+# 만드는 트리는 ast.parse(gen_program(program)) 과 같다 (위치 정보만 다르다).
+# 파이썬 문법이 문자열 단계에서 막던 것(예약어 이름, 기본값 없는 인자가 기본값 있는 인자 뒤에 오는 것,
+# 대입할 수 없는 타겟)은 여기서 같은 SyntaxError 로 막는다.
+#
+# 사용 예:
+#     module = lower_program(program, source_map)
+#     exec(compile(module, source_map.filename, "exec"), env, env)
+
+import ast
+import gc
+from bisect import bisect_right
+from keyword import iskeyword
+from unicodedata import normalize
+
+from mapping import BUILTIN_HAN_TO_PY, SPECIAL_IDENT_HAN_TO_PY
+from lexer_demo import SourceMap, SPAN_SHIFT
+from ast_demo import (
+    NodeVisitor, Node, Program, Expr, Name, Param, WithItem, ExceptHandler,
+    Attribute, Index, Slice, TupleLiteral, ListLiteral,
+)
+
+_BIN_OPS = {
+    "+": ast.Add, "-": ast.Sub, "*": ast.Mult, "/": ast.Div, "//": ast.FloorDiv, "%": ast.Mod,
+    "**": ast.Pow, "<<": ast.LShift, ">>": ast.RShift, "&": ast.BitAnd, "|": ast.BitOr, "^": ast.BitXor,
+}
+_BOOL_OPS = {"and": ast.And, "or": ast.Or}
+_COMPARE_OPS = {
+    "<": ast.Lt, ">": ast.Gt, "<=": ast.LtE, ">=": ast.GtE, "==": ast.Eq, "!=": ast.NotEq,
+    "in": ast.In, "not in": ast.NotIn,
+}
+_UNARY_OPS = {"-": ast.USub, "+": ast.UAdd, "~": ast.Invert, "not": ast.Not}
+_CONSTANT_NAMES = {"None": None, "True": True, "False": False}
+_SPAN_MASK = (1 << SPAN_SHIFT) - 1
+
+# 파이썬 3.12 부터 함수/클래스 정의에 type_params 필드가 있다
+_TYPE_PARAMS = {"type_params": []} if "type_params" in ast.FunctionDef._fields else {}
+
+def lower_program(program: Program, source: SourceMap | None = None) -> ast.Module:
+    """
+    Program -> ast.Module (compile() 에 바로 넘길 수 있다)
+    source 를 주면 span 이 있는 노드마다 한글 소스의 줄/칸 위치를 붙인다.
+    span 이 없는 노드는 바깥 노드의 위치를 물려받는다 (source 가 없으면 전부 1번째 줄).
+    """
+    # ast 객체는 순환 GC 추적 대상이라, 수십만 개를 만드는 동안 GC 가 거듭 돌며 커진 힙을 훑는다.
+    # 만드는 동안만 끈다 (순환 참조는 만들지 않는다)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return ast.Module(body=_Lowering(source).body(program.body), type_ignores=[])
+    finally:
+        if enabled:
+            gc.enable()
+
+class _Lowering(NodeVisitor):
+    """
+    visit_X(node) -> 같은 뜻의 ast 노드 (식은 Load 문맥, 대입 타겟은 _store 로)
+    위치는 self.here (지금 노드의 lineno / col_offset / end_lineno / end_col_offset) 로 붙인다.
+    visit 가 span 있는 노드에 들어갈 때 바꾸고, span 없는 노드는 바깥 노드의 것을 그대로 쓴다.
+    visit 를 거치지 않고 만드는 ast 노드 (keyword, alias, Pass ...) 는 self._at 으로 붙인다.
+    """
+
+    def __init__(self, source: SourceMap | None):
+        self.source = source
+        self.here = {"lineno": 1, "col_offset": 0, "end_lineno": 1, "end_col_offset": 0}
+        # 바로 전에 찾은 줄 [시작, 다음 줄 시작) 과 줄 번호 (노드는 대개 앞 노드와 같은 줄에 있다)
+        self._line = (0, 0, 0)
+        self._text = source.text if source is not None else ""
+        self._names: dict[str, str] = {}
+
+    def visit(self, node):
+        method = self.visit_table.get(type(node)) or self.visit_method(type(node))
+        if node.span and self.source is not None:
+            outer = self.here
+            here = self.here = self._location(node.span)
+            result = method(self, node)
+            self.here = outer
+        else:
+            here = self.here
+            result = method(self, node)
+        result.__dict__.update(here)
+        return result
+
+    def _at(self, result: ast.AST, span: int = 0) -> ast.AST:
+        result.__dict__.update(self._location(span) if span and self.source is not None else self.here)
+        return result
+
+    def _location(self, span: int) -> dict[str, int]:
+        """span -> ast 위치 속성. ast 의 칸은 줄 시작부터의 UTF-8 바이트 수다"""
+        start = span >> SPAN_SHIFT
+        end = start + (span & _SPAN_MASK)
+        line_start, next_start, lineno = self._line
+        if not line_start <= start < next_start:
+            line_start, next_start, lineno = self._line = self._find_line(start)
+        text = self._text
+        before = text[line_start:start]
+        col = len(before) if before.isascii() else len(before.encode("utf-8"))
+        if end < next_start:
+            end_lineno = lineno
+        else:
+            line_start, _, end_lineno = self._find_line(end)
+        before = text[line_start:end]
+        end_col = len(before) if before.isascii() else len(before.encode("utf-8"))
+        return {"lineno": lineno, "col_offset": col, "end_lineno": end_lineno, "end_col_offset": end_col}
+
+    def _find_line(self, offset: int) -> tuple[int, int, int]:
+        """offset 이 있는 줄의 (시작, 다음 줄 시작, 줄 번호)"""
+        starts = self.source.line_starts
+        i = bisect_right(starts, offset) - 1
+        return starts[i], starts[i + 1] if i + 1 < len(starts) else offset + 1, i + 1
+
+    def _ident(self, name: str) -> str:
+        """파이썬 식별자로 (파이썬 파서처럼 NFKC 로 정규화, 예약어는 SyntaxError)"""
+        ident = self._names.get(name)
+        if ident is None:
+            ident = name if name.isascii() else normalize("NFKC", name)
+            if iskeyword(ident):
+                raise SyntaxError(f"파이썬 예약어는 이름으로 쓸 수 없습니다: {name}")
+            self._names[name] = ident
+        return ident
+
+    def body(self, stmts: list) -> list[ast.stmt]:
+        return [self.visit(s) for s in stmts]
+
+    def _suite(self, stmts: list | None) -> list[ast.stmt]:
+        """비어 있으면 pass 하나 (gen_program 의 empty="pass" 자리)"""
+        return self.body(stmts) if stmts else [self._at(ast.Pass())]
+
+    def _store(self, node: Expr) -> ast.expr:
+        """대입 타겟 (Store 문맥)"""
+        if isinstance(node, Name):
+            result = ast.Name(self._ident(SPECIAL_IDENT_HAN_TO_PY.get(node.id, node.id)), ast.Store())
+        elif isinstance(node, Attribute):
+            result = ast.Attribute(self.visit(node.value), self._ident(node.attr), ast.Store())
+        elif isinstance(node, Index):
+            result = ast.Subscript(self.visit(node.value), self.visit(node.index), ast.Store())
+        elif isinstance(node, Slice):
+            result = ast.Subscript(self.visit(node.value), self._slice(node), ast.Store())
+        elif isinstance(node, (TupleLiteral, ListLiteral)):
+            cls = ast.Tuple if isinstance(node, TupleLiteral) else ast.List
+            result = cls([self._store(e) for e in node.elements], ast.Store())
+        else:
+            raise SyntaxError(f"대입할 수 없는 타겟입니다: {node!r}")
+        return self._at(result, node.span)
+
+    def _slice(self, node: Slice) -> ast.Slice:
+        return self._at(ast.Slice(
+            None if node.start is None else self.visit(node.start),
+            None if node.stop is None else self.visit(node.stop),
+            None if node.step is None else self.visit(node.step),
+        ))
+
+    # ---- 식
+
+    def visit_Number(self, node) -> ast.expr:
+        return ast.Constant(node.value)
+
+    def visit_String(self, node) -> ast.expr:
+        return ast.Constant(node.value)
+
+    def visit_Bool(self, node) -> ast.expr:
+        return ast.Constant(bool(node.value))
+
+    def visit_NoneLiteral(self, node) -> ast.expr:
+        return ast.Constant(None)
+
+    def visit_Name(self, node) -> ast.expr:
+        return self._load_name(SPECIAL_IDENT_HAN_TO_PY.get(node.id, node.id))
+
+    def _load_name(self, name: str) -> ast.expr:
+        # 코드 문자열에서는 None / True / False 라는 이름이 상수로 읽힌다
+        if name in _CONSTANT_NAMES:
+            return ast.Constant(_CONSTANT_NAMES[name])
+        return ast.Name(self._ident(name), ast.Load())
+
+    def visit_BinOp(self, node) -> ast.expr:
+        op = _BIN_OPS.get(node.op)
+        if op is not None:
+            return ast.BinOp(self.visit(node.left), op(), self.visit(node.right))
+        op = _BOOL_OPS.get(node.op)
+        if op is None:
+            raise TypeError(f"지원하지 않는 연산자: {node.op!r}")
+        return ast.BoolOp(op(), [self.visit(node.left), self.visit(node.right)])
+
+    def visit_Compare(self, node) -> ast.expr:
+        ops = []
+        for op in node.ops:
+            if op not in _COMPARE_OPS:
+                raise TypeError(f"지원하지 않는 비교 연산자: {op!r}")
+            ops.append(_COMPARE_OPS[op]())
+        return ast.Compare(self.visit(node.left), ops, [self.visit(c) for c in node.comparators])
+
+    def visit_UnaryOp(self, node) -> ast.expr:
+        op = _UNARY_OPS.get(node.op)
+        if op is None:
+            raise TypeError(f"지원하지 않는 단항 연산자: {node.op!r}")
+        return ast.UnaryOp(op(), self.visit(node.operand))
+
+    def visit_IfExpr(self, node) -> ast.expr:
+        return ast.IfExp(self.visit(node.test), self.visit(node.body), self.visit(node.orelse))
+
+    def visit_NamedExpr(self, node) -> ast.expr:
+        return ast.NamedExpr(self._store(node.target), self.visit(node.value))
+
+    def visit_Call(self, node) -> ast.expr:
+        # gen_expr 처럼 이름으로 부르는 함수만 내장 함수 이름으로 바꾼다
+        if isinstance(node.func, Name):
+            func = self._at(self._load_name(BUILTIN_HAN_TO_PY.get(node.func.id, node.func.id)), node.func.span)
+        else:
+            func = self.visit(node.func)
+        keywords = [self._at(ast.keyword(self._ident(k), self.visit(v))) for k, v in node.keywords or ()]
+        return ast.Call(func, [self.visit(a) for a in node.args], keywords)
+
+    def visit_ListLiteral(self, node) -> ast.expr:
+        return ast.List([self.visit(e) for e in node.elements], ast.Load())
+
+    def visit_TupleLiteral(self, node) -> ast.expr:
+        return ast.Tuple([self.visit(e) for e in node.elements], ast.Load())
+
+    def visit_SetLiteral(self, node) -> ast.expr:
+        if not node.elements:
+            return ast.Call(self._at(ast.Name("set", ast.Load())), [], [])
+        return ast.Set([self.visit(e) for e in node.elements])
+
+    def visit_DictLiteral(self, node) -> ast.expr:
+        return ast.Dict([self.visit(k) for k, _ in node.items], [self.visit(v) for _, v in node.items])
+
+    def visit_Attribute(self, node) -> ast.expr:
+        return ast.Attribute(self.visit(node.value), self._ident(node.attr), ast.Load())
+
+    def visit_Index(self, node) -> ast.expr:
+        return ast.Subscript(self.visit(node.value), self.visit(node.index), ast.Load())
+
+    def visit_Slice(self, node) -> ast.expr:
+        return ast.Subscript(self.visit(node.value), self._slice(node), ast.Load())
+
+    # ---- 문장
+
+    def visit_ExprStmt(self, node) -> ast.stmt:
+        return ast.Expr(self.visit(node.value))
+
+    def visit_Assign(self, node) -> ast.stmt:
+        return ast.Assign([self._store(node.target)], self.visit(node.value))
+
+    def visit_ChainedAssign(self, node) -> ast.stmt:
+        return ast.Assign([self._store(t) for t in node.targets], self.visit(node.value))
+
+    def visit_AugAssign(self, node) -> ast.stmt:
+        op = _BIN_OPS.get(node.op)
+        if op is None:
+            raise SyntaxError(f"지원하지 않는 복합 대입 연산자: {node.op}=")
+        return ast.AugAssign(self._store(node.target), op(), self.visit(node.value))
+
+    def visit_If(self, node) -> ast.stmt:
+        return ast.If(self.visit(node.test), self.body(node.body), self.body(node.orelse or []))
+
+    def visit_While(self, node) -> ast.stmt:
+        return ast.While(self.visit(node.test), self.body(node.body), [])
+
+    def visit_For(self, node) -> ast.stmt:
+        return ast.For(self._store(node.target), self.visit(node.iter), self.body(node.body), [])
+
+    def visit_Break(self, node) -> ast.stmt:
+        return ast.Break()
+
+    def visit_Continue(self, node) -> ast.stmt:
+        return ast.Continue()
+
+    def visit_Pass(self, node) -> ast.stmt:
+        return ast.Pass()
+
+    def visit_Return(self, node) -> ast.stmt:
+        return ast.Return(None if node.value is None else self.visit(node.value))
+
+    def visit_FunctionDef(self, node) -> ast.stmt:
+        args: list[ast.arg] = []
+        defaults: list[ast.expr] = []
+        for p in node.args:
+            if not isinstance(p, Param):
+                raise TypeError(f"FunctionDef.args에는 Param만 들어갈 수 있습니다: {p!r}")
+            args.append(self._at(ast.arg(self._ident(SPECIAL_IDENT_HAN_TO_PY.get(p.name, p.name))), p.span))
+            if p.default is not None:
+                defaults.append(self.visit(p.default))
+            elif defaults:
+                raise SyntaxError("non-default argument follows default argument")
+        arguments = ast.arguments(
+            posonlyargs=[], args=args, vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=defaults,
+        )
+        return ast.FunctionDef(
+            self._ident(node.name), arguments, self._suite(node.body), [], None, **_TYPE_PARAMS,
+        )
+
+    def visit_ClassDef(self, node) -> ast.stmt:
+        bases = [self.visit(b) for b in node.bases]
+        return ast.ClassDef(self._ident(node.name), bases, [], self._suite(node.body), [], **_TYPE_PARAMS)
+
+    def visit_With(self, node) -> ast.stmt:
+        items: list[ast.withitem] = []
+        for it in node.items:
+            if not isinstance(it, WithItem):
+                raise TypeError(f"With.items에는 WithItem만 들어갈 수 있습니다: {it!r}")
+            optional_vars = None if it.optional_vars is None else self._store(it.optional_vars)
+            items.append(ast.withitem(self.visit(it.context_expr), optional_vars))
+        return ast.With(items, self._suite(node.body))
+
+    def visit_Import(self, node) -> ast.stmt:
+        return ast.Import([self._at(ast.alias(self._dotted(module), self._alias(asname))) for module, asname in node.names])
+
+    def visit_FromImport(self, node) -> ast.stmt:
+        names: list[ast.alias] = []
+        for name, asname in node.names:
+            if name == "*":
+                if asname:
+                    raise SyntaxError("from ... import * 는 별칭(as)을 붙일 수 없습니다.")
+                names.append(self._at(ast.alias("*")))
+            else:
+                names.append(self._at(ast.alias(self._ident(name), self._alias(asname))))
+        return ast.ImportFrom(self._dotted(node.module), names, 0)
+
+    def _dotted(self, name: str) -> str:
+        return ".".join(map(self._ident, name.split(".")))
+
+    def _alias(self, asname: str | None) -> str | None:
+        return self._ident(asname) if asname else None
+
+    def visit_Raise(self, node) -> ast.stmt:
+        return ast.Raise(None if node.exc is None else self.visit(node.exc), None)
+
+    def visit_Try(self, node) -> ast.stmt:
+        handlers: list[ast.excepthandler] = []
+        for h in node.handlers:
+            if not isinstance(h, ExceptHandler):
+                raise TypeError(f"Try.handlers에는 ExceptHandler만 들어갈 수 있습니다: {h!r}")
+            if h.name is not None and h.type is None:
+                raise SyntaxError("'예외 별칭 e' 형태는 지원하지 않습니다. (타입 없이 별칭 불가)")
+            handler = ast.ExceptHandler(
+                None if h.type is None else self.visit(h.type),
+                None if h.name is None else self._ident(h.name),
+                self._suite(h.body),
+            )
+            handlers.append(self._at(handler, h.span))
+        if node.orelse is not None and not handlers:
+            raise SyntaxError("expected 'except' or 'finally' block")  # 코드 문자열을 파싱할 때와 같은 에러
+        return ast.Try(
+            self._suite(node.body),
+            handlers,
+            [] if node.orelse is None else self._suite(node.orelse),
+            [] if node.finalbody is None else self._suite(node.finalbody),
+        )
+
+    def generic_visit(self, node):
+        if isinstance(node, Node) and not isinstance(node, Expr):
+            raise TypeError(f"지원하지 않는 Stmt 타입: {node!r}")
+        raise TypeError(f"지원하지 않는 Expr 타입: {node!r}")
@@ -1,21 +1,36 @@
 # run_korean.py
 #
 # 한글 코드 파일을 읽어서:
-# 1) 토큰화 (simple_lexer)
+# 1) 토큰화 (lex_with_spans, 토큰마다 원본 위치 포함)
 # 2) 파싱 (Parse)
 # 3) 파이썬 코드 생성 (gen_program)
 # 4) exec 로 실행
 #
 # 사용 예:
 # python run_korean.py example.han
+# python run_korean.py --check example.han   # 실행 없이 문법 에러를 전부 모아서 출력
+# python run_korean.py --no-exec -o out.py example.han   # 실행 없이 파이썬 코드로 옮기기 (문장 단위 스트리밍)
+#
+# 파일은 통째로 읽지 않고 mmap + 점진적 UTF-8 디코딩으로 한 줄씩 렉서에 넣는다. (run_korean_file)
 
 import argparse
+import os
 import sys
+import traceback
+from array import array
+from itertools import chain, tee
+from typing import TextIO
 
-from lexer_demo import simple_lexer
+from lexer_demo import (
+    lex_with_spans, iter_token_lines, iter_file_lines,
+    SourceMap, FileSourceMap, SOURCE_NAME, TokenStream, Interner, pack_span,
+)
 from parser_demo import Parser
-from codegen_demo import gen_program
-from ast_demo import print_program
+from parallel_demo import parse_parallel
+from codegen_demo import gen_program, gen_stmt
+from pyast_demo import lower_program
+from fold_demo import fold_constants
+from ast_demo import print_program, AST_FORMATS
 
 def run_korean_source(
         source: str,
@@ -24,28 +39,187 @@ def run_korean_source(
         show_ast: bool = False,
         show_python: bool = False,
         execute: bool = True,
+        filename: str = SOURCE_NAME,
+        direct_ast: bool = False,
+        ast_format: str = "tree",
+        constant_folding: bool = False,
 ):
-    """한글 소스 코드 한 덩어리를 실행하는 헬퍼 함수"""
+    """
+    한글 소스 코드 한 덩어리를 실행하는 헬퍼 함수
+
+    문법 에러는 한글 소스의 줄/칸 번호가 붙은 SyntaxError 로,
+    실행 중 에러는 해당 한글 줄을 가리키는 note 가 붙은 채로 올라간다.
+
+    direct_ast=True 면 파이썬 코드 문자열을 만들어 다시 파싱하는 대신 AST 를 ast.Module 로 바로 내려서
+    compile 한다 (pyast_demo.lower_program). traceback 의 파일 이름/줄 번호가 한글 소스 그대로다.
+    이때 돌려주는 코드 문자열은 show_python 일 때만 만들고, 아니면 None 이다.
+    ast_format 은 show_ast 로 보여 줄 AST 의 형식이다 (ast_demo.AST_FORMATS: tree, jsonl, sexp).
+    constant_folding=True 면 코드 생성 전에 상수 식을 미리 계산해 둔다 (fold_demo.fold_constants).
+    보여 주는 AST 는 접기 전 것이고, 생성 코드와 실행은 접은 AST 로 한다.
+    """
+    source_map = SourceMap(source, filename)
 
-    # 1) 렉싱
-    tokens = simple_lexer(source)
+    # 1) 렉싱 (토큰마다 원본 위치도 같이)
+    tokens, spans = lex_with_spans(source)
     if show_tokens:
         print("=== 토큰들 ===")
         for t in tokens:
             print(" ", t)
         print()
 
+    return _run_tokens(
+        tokens, spans, source_map,
+        show_ast=show_ast, show_python=show_python, execute=execute, direct_ast=direct_ast,
+        ast_format=ast_format, constant_folding=constant_folding,
+    )
+
+def run_korean_file(
+        path: str,
+        *,
+        show_tokens: bool = False,
+        show_ast: bool = False,
+        show_python: bool = False,
+        execute: bool = True,
+        chunk_size: int = 1 << 20,
+        jobs: int = 1,
+        direct_ast: bool = False,
+        ast_format: str = "tree",
+        constant_folding: bool = False,
+):
+    """
+    run_korean_source 와 같지만 파일 전체를 str 로 읽지 않는다.
+    - mmap 한 파일을 chunk_size 바이트씩 UTF-8 디코딩해서 한 줄씩 렉서에 넣고
+    - 토큰은 바로 TokenStream 에 압축해서 담는다 (show_tokens 면 흘러가는 대로 출력)
+    - 원문은 에러 위치를 보여줄 때만 다시 읽는다 (FileSourceMap)
+    - jobs > 1 이면 0 칸 줄 경계에서 조각내서 jobs 개 프로세스로 렉싱+파싱한다 (parallel_demo)
+      (토큰은 워커 안에서만 만들어지므로 show_tokens 와 함께면 직렬로 처리한다)
+    direct_ast 는 run_korean_source 와 같다 (줄 번호를 셀 때 원문을 한 번 읽는다). ast_format, constant_folding 도 같다.
+    """
+    source_map = FileSourceMap(path)
+
+    if jobs > 1 and not show_tokens:
+        # 워커마다 조각 4개 정도가 돌아가도록 나눈다 (파일 크기는 바이트라 글자 수보다 크게 잡힌다)
+        chunk_chars = max(os.path.getsize(path) // (jobs * 4), 1 << 16)
+        program_ast = parse_parallel(
+            iter_file_lines(path, chunk_size),
+            jobs=jobs, chunk_chars=chunk_chars, with_spans=True, filename=path,
+        )
+        return _run_program(
+            program_ast, source_map,
+            show_ast=show_ast, show_python=show_python, execute=execute, direct_ast=direct_ast,
+            ast_format=ast_format, constant_folding=constant_folding,
+        )
+
+    # 1) 렉싱 (논리 줄 단위로 바로 TokenStream / span 배열에 담는다)
+    tokens, spans = _lex_file(path, chunk_size, show_tokens)
+
+    return _run_tokens(
+        tokens, spans, source_map,
+        show_ast=show_ast, show_python=show_python, execute=execute, direct_ast=direct_ast,
+        ast_format=ast_format, constant_folding=constant_folding,
+    )
+
+def check_korean_file(path: str, *, chunk_size: int = 1 << 20):
+    """
+    실행하지 않고 문법만 검사한다 (채점처럼 파일을 많이 돌릴 때용).
+    첫 에러에서 멈추지 않고 파일 하나를 한 번만 파싱해서 문법 에러를 전부 모은다.
+    렉싱 에러(잘못된 이스케이프, 들여쓰기, 닫히지 않은 문자열)도 같은 리스트에 들어간다.
+    돌려주는 값: (성공한 문장만 담은 Program, 줄/칸 순서로 정렬한 SyntaxError 리스트)
+    """
+    source_map = FileSourceMap(path)
+    lex_errors: list[SyntaxError] = []
+    tokens, spans = _lex_file(path, chunk_size, show_tokens=False, errors=lex_errors)
+    for e in lex_errors:
+        e.filename = source_map.filename
+    parser = Parser(tokens, spans, source_map, recover=True)
+    program_ast = parser.parse_program()
+    diagnostics = sorted(lex_errors + parser.diagnostics, key=lambda e: (e.lineno, e.offset))
+    return program_ast, diagnostics
+
+# translate_korean_file 의 이름 인터닝 표 크기 상한
+_STREAM_NAMES = 4096
+
+def translate_korean_file(path: str, out: TextIO, *, chunk_size: int = 1 << 20) -> int:
+    """
+    실행하지 않고 파이썬 코드로만 옮겨 out 에 쓴다 (--no-exec 용).
+    렉싱 -> 파싱 -> 코드 생성을 최상위 문장 하나씩 흘려보낸다 (Parser.iter_statements):
+    문장 하나의 코드를 쓰고 나면 그 문장의 토큰과 AST 는 버려지므로,
+    메모리는 파일 크기가 아니라 가장 큰 최상위 문장 크기만큼만 든다.
+    쓰는 내용은 gen_program 결과와 글자 하나까지 같다 (끝 줄바꿈은 없다. 파일로 쓸 때는 부른 쪽이 붙인다).
+    돌려주는 값: 옮긴 최상위 문장 수
+    """
+    source_map = FileSourceMap(path)
+    # 이름 인터닝 표도 파일 전체의 어휘만큼 자라지 않게 크기를 묶는다
+    interner = Interner(limit=_STREAM_NAMES)
+    lines_a, lines_b = tee(iter_token_lines(iter_file_lines(path, chunk_size), interner))
+    tokens = chain.from_iterable(line_tokens for line_tokens, _ in lines_a)
+    spans = chain.from_iterable(line_spans for _, line_spans in lines_b)
+    count = 0
+    for stmt in Parser(tokens, spans, source_map).iter_statements():
+        if count:
+            out.write("\n")  # gen_program 처럼 문장 사이에만
+        out.write(gen_stmt(stmt))
+        count += 1
+    return count
+
+def _lex_file(path: str, chunk_size: int, show_tokens: bool, errors: list[SyntaxError] | None = None):
+    """
+    파일을 논리 줄 단위로 렉싱해서 (TokenStream, span 배열) 로 모은다.
+    errors 를 주면 렉싱 에러에서 멈추지 않고 거기에 모은다.
+    """
+    tokens = TokenStream()
+    spans = array("Q")
+    if show_tokens:
+        print("=== 토큰들 ===")
+    for line_tokens, line_spans in iter_token_lines(iter_file_lines(path, chunk_size), errors=errors):
+        tokens.extend(line_tokens)
+        spans.extend(line_spans)
+        if show_tokens:
+            for t in line_tokens:
+                print(" ", t)
+    if show_tokens:
+        print()
+    return tokens, spans
+
+def _run_tokens(
+        tokens, spans, source_map: SourceMap, *,
+        show_ast: bool, show_python: bool, execute: bool, direct_ast: bool, ast_format: str,
+        constant_folding: bool,
+):
+    """run_korean_source / run_korean_file 의 공통 뒷부분: 파싱 -> 코드 생성 -> 실행"""
+
     # 2) 파싱
-    parser = Parser(tokens)
+    parser = Parser(tokens, spans, source_map)
     program_ast = parser.parse_program()
+    return _run_program(
+        program_ast, source_map,
+        show_ast=show_ast, show_python=show_python, execute=execute, direct_ast=direct_ast,
+        ast_format=ast_format, constant_folding=constant_folding,
+    )
 
+def _run_program(
+        program_ast, source_map: SourceMap, *,
+        show_ast: bool, show_python: bool, execute: bool, direct_ast: bool = False, ast_format: str = "tree",
+        constant_folding: bool = False,
+):
+    """파싱이 끝난 Program 을 출력 -> 코드 생성 -> 실행"""
     if show_ast:
-        print("=== AST 구조 ===")
-        print_program(program_ast)
-        print()
+        # jsonl / sexp 는 도구가 읽을 수 있게 제목 없이 AST 줄만 쓴다
+        if ast_format == "tree":
+            print("=== AST 구조 ===")
+        print_program(program_ast, format=ast_format)
+        if ast_format == "tree":
+            print()
+
+    if constant_folding:
+        program_ast = fold_constants(program_ast)
 
-    # 3) 파이썬 코드 생성
-    py_code = gen_program(program_ast)
+    # 3) 파이썬 코드 생성 (direct_ast 면 보여 줄 때만)
+    line_map: list[int] | None = None
+    py_code = None
+    if show_python or not direct_ast:
+        line_map = []
+        py_code = gen_program(program_ast, line_map)
     if show_python:
         print("=== 생성된 파이썬 코드 ===")
         print(py_code)
@@ -54,10 +228,46 @@ def run_korean_source(
     # 4) 실행
     env = {}
     if execute:
-        exec(py_code, env, env)
+        if direct_ast:
+            # 코드 문자열을 다시 파싱하지 않고, 한글 소스 위치가 붙은 ast.Module 을 바로 컴파일한다
+            line_map = None
+            code_obj = compile(lower_program(program_ast, source_map), source_map.filename, "exec")
+        else:
+            code_obj = compile(py_code, _GENERATED_NAME, "exec")
+        try:
+            exec(code_obj, env, env)
+        except Exception as e:
+            _add_source_note(e, line_map, source_map)
+            raise
 
     return py_code, env
 
+# 생성된 파이썬 코드의 파일 이름 (traceback 에서 한글 소스 줄을 찾을 때 쓴다)
+_GENERATED_NAME = "<생성된 파이썬 코드>"
+
+def _add_source_note(exc: BaseException, line_map: list[int] | None, source_map: SourceMap) -> None:
+    """
+    exc 가 난 생성 코드 줄을 한글 소스 위치로 바꿔 note 로 붙인다.
+    line_map 이 None 이면 (direct_ast) 코드 객체의 줄 번호가 이미 한글 소스 줄 번호다.
+    """
+    filename = _GENERATED_NAME if line_map is not None else source_map.filename
+    lineno = None
+    for frame, frame_lineno in traceback.walk_tb(exc.__traceback__):
+        if frame.f_code.co_filename == filename:
+            lineno = frame_lineno  # 가장 안쪽(마지막) 프레임이 남는다
+    if lineno is None:
+        return
+    if line_map is None:
+        if not 1 <= lineno < len(source_map.line_starts):
+            return
+        line = source_map.line_text(lineno)
+        span = pack_span(source_map.line_starts[lineno - 1] + len(line) - len(line.lstrip()), 0)
+    elif not 1 <= lineno <= len(line_map) or not line_map[lineno - 1]:
+        return
+    else:
+        span = line_map[lineno - 1]
+    exc.add_note("한글 소스 위치: " + source_map.describe(span))
+
 def main(argv=None):
     parser = argparse.ArgumentParser(
         description="한글 미니 언어 실행기 (lexer -> parser -> codegen -> exec)"
@@ -76,6 +286,12 @@ def main(argv=None):
         action="store_true",
         help="AST 구조를 출력합니다.",
     )
+    parser.add_argument(
+        "--ast-format",
+        choices=AST_FORMATS,
+        help="AST 를 이 형식으로 출력합니다 (tree: 들여쓴 트리, jsonl: 최상위 문장마다 JSON 한 줄, "
+             "sexp: 최상위 문장마다 S-식 한 줄). 주면 --show-ast 를 켭니다.",
+    )
     parser.add_argument(
         "--show-python",
         action="store_true",
@@ -86,29 +302,83 @@ def main(argv=None):
         action="store_true",
         help="코드를 생성만 하고 실행은 하지 않습니다.",
     )
+    parser.add_argument(
+        "-o", "--output",
+        help="생성된 파이썬 코드를 이 파일에 씁니다. (--no-exec 와 함께면 최상위 문장 단위로 흘려 씁니다)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="렉싱/파싱에 쓸 프로세스 수 (큰 파일용 병렬 프런트엔드, 기본 1)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="실행하지 않고 문법 에러를 한 번에 전부 출력합니다.",
+    )
 
     args = parser.parse_args(argv)
 
-    # 파일 읽기 (UTF-8 가정)
+    # 파일 열기 확인 (내용은 run_korean_file 이 mmap 으로 조금씩 읽는다, UTF-8 가정)
     try:
-        with open(args.filename, "r", encoding="utf-8") as f:
-            source = f.read()
+        with open(args.filename, "rb"):
+            pass
     except OSError as e:
         print(f"파일을 열 수 없습니다: {e}", file=sys.stderr)
         return 1
     
+    if args.check:
+        try:
+            _, diagnostics = check_korean_file(args.filename)
+        except Exception as e:
+            print("검사 중 에러 발생:", repr(e), file=sys.stderr)
+            return 1
+        for e in diagnostics:
+            print(f"{e.filename} {e.lineno}번째 줄 {e.offset}칸: {e.msg}", file=sys.stderr)
+        print(f"문법 에러 {len(diagnostics)}개", file=sys.stderr)
+        return 1 if diagnostics else 0
+
+    if args.ast_format is not None:
+        args.show_ast = True
+
+    if args.no_exec and (args.output or args.show_python) and not (args.show_tokens or args.show_ast) and args.jobs == 1:
+        # 옮기기만: 파일 전체의 토큰/AST/코드 문자열을 만들지 않고 문장마다 바로 쓴다
+        try:
+            # 아래 실행 경로와 같은 내용을 쓴다 (파일은 코드 + 끝 줄바꿈, 화면은 print(코드) + 빈 줄)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as out:
+                    if translate_korean_file(args.filename, out):
+                        out.write("\n")
+            else:
+                print("=== 생성된 파이썬 코드 ===")
+                translate_korean_file(args.filename, sys.stdout)
+                print()
+                print()
+        except Exception as e:
+            print("변환 중 에러 발생:", repr(e), file=sys.stderr)
+            return 1
+        return 0
+
     # 실제 실행
     try:
-        run_korean_source(
-            source,
+        py_code, _ = run_korean_file(
+            args.filename,
             show_tokens=args.show_tokens,
             show_ast=args.show_ast,
+            ast_format=args.ast_format or "tree",
             show_python=args.show_python,
             execute=not args.no_exec,
+            jobs=args.jobs,
         )
     except Exception as e:
         print("실행 중 에러 발생:", repr(e), file=sys.stderr)
+        for note in getattr(e, "__notes__", ()):
+            print(" ", note, file=sys.stderr)
         return 1
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            out.write(py_code + "\n" if py_code else "")
     
     return 0
 
@@ -0,0 +1,8 @@
+# tests/conftest.py
+#
+# 데모 모듈들은 저장소 맨 위에 평평하게 있으므로, 어디서 pytest 를 돌려도 import 되도록 경로에 넣는다.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,92 @@
+# tests/test_arena.py
+#
+# AstArena 순회: 노드 번호만으로 하는 분석이 노드 객체 트리에서 한 것과 같다
+
+from array import array
+from collections import Counter
+
+import pytest
+
+from arena_demo import AstArena
+from ast_demo import Program, Call, Name, Attribute, FunctionDef, iter_child_nodes
+from lexer_demo import lex_with_spans
+from parser_demo import Parser
+
+SOURCE = """불러오기 수학
+정의 넓이(r):
+    반환 수학.pi * 수학.pow(r, 2)
+클래스 상자:
+    정의 크기(본인, 값=길이([1, 2])):
+        출력(값, 끝="")
+        반환 [넓이(값), 넓이(-값) 만약 값 그외 범위(값)]
+값 = {"키": 넓이(3), "값": 상자().크기(4)}
+만약 길이(값) > 1:
+    출력(넓이(2), 수학.pow(2, 10))
+"""
+
+def parse(source: str = SOURCE) -> Program:
+    return Parser(*lex_with_spans(source)).parse_program()
+
+def walk(program: Program):
+    """전위 순회로 모든 노드"""
+    work = list(reversed(program.body))
+    while work:
+        node = work.pop()
+        yield node
+        work += reversed(list(iter_child_nodes(node)))
+
+def callee(func) -> str:
+    return func.id if type(func) is Name else "." + func.attr if type(func) is Attribute else "?"
+
+def call_counts_tree(program: Program) -> Counter:
+    return Counter(callee(node.func) for node in walk(program) if type(node) is Call)
+
+def call_counts_arena(arena: AstArena) -> Counter:
+    counts = Counter()
+    for i in arena.find(Call):
+        func = arena.get(i, "func")
+        kind = arena.type(func)
+        counts["?" if kind not in (Name, Attribute) else
+               arena.get(func, "id") if kind is Name else "." + arena.get(func, "attr")] += 1
+    return counts
+
+@pytest.fixture(scope="module")
+def program() -> Program:
+    return parse()
+
+@pytest.fixture(scope="module")
+def arena(program) -> AstArena:
+    return AstArena.from_program(program)
+
+def test_call_counts_by_callee(program, arena):
+    counts = call_counts_arena(arena)
+    assert counts == call_counts_tree(program)
+    assert counts["넓이"] == 4 and counts[".pow"] == 2 and counts["길이"] == 2
+
+def test_calls_per_function(program, arena):
+    # 함수마다 그 안(서브트리 구간)의 호출 수: walk 는 번호 구간이라 find 의 start/end 로 그대로 쓴다
+    tree = {node.name: sum(type(n) is Call for n in walk(Program(body=[node])))
+            for node in walk(program) if type(node) is FunctionDef}
+    per_function = {}
+    for i in arena.find(FunctionDef):
+        nodes = arena.walk(i)
+        per_function[arena.get(i, "name")] = sum(1 for _ in arena.find(Call, nodes.start, nodes.stop))
+    assert per_function == tree
+
+def test_walk_and_children_follow_the_tree(program, arena):
+    nodes = list(walk(program))
+    ids = [j for i in arena.program_body() for j in arena.walk(i)]
+    assert ids == list(range(len(arena)))
+    assert [arena.type(i) for i in ids] == [type(node) for node in nodes]
+    for i, node in zip(ids, nodes):
+        kids = arena.children(i)
+        assert type(kids) is array
+        assert [arena.type(k) for k in kids] == [type(c) for c in iter_child_nodes(node)]
+        assert list(arena.walk(i)) == list(range(i, arena.subtree_end(i)))
+
+def test_node_list_field_is_array_slice(arena):
+    body = arena.program_body()
+    func = body[1]
+    stmts = arena.get(func, "body")
+    assert type(stmts) is array and len(stmts) == 1
+    assert arena.to_node(stmts[0]) == parse().body[1].body[0]
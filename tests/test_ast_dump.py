@@ -0,0 +1,164 @@
+# tests/test_ast_dump.py
+#
+# dump_ast 의 jsonl / sexp 출력: 다시 읽어서 노드를 만들면 원래 트리와 같다 (jsonl 은 span 까지)
+
+import io
+import json
+import re
+
+import pytest
+
+import ast_demo
+from arena_demo import NODE_TYPES
+from ast_demo import Program, BinOp, Name, Number, dump_ast, iter_child_nodes
+from lexer_demo import lex_with_spans, pack_span
+from parser_demo import Parser
+
+# ast_demo 의 모든 노드 종류가 한 번 이상 나오는 소스
+SOURCE = """불러오기 수학 별칭 m, 경로
+꺼내기 가.나 불러오기 다 별칭 라, 마
+클래스 상자(기본):
+    정의 __init__(본인, 값=없음, 크기=3):
+        가 = 나 = 본인.값 = 값 만약 값 그외 -1.5e3 + 0.0 + 123456789012345678901234567890
+        본인.크기 += 크기 ** 2
+        동안 참:
+            만약 (n := 길이(가)) > 10 그리고 n 아니다 안에 [1, 2]:
+                중단
+            아니면 n < 0:
+                계속
+            그외:
+                통과
+        반환 본인
+반복 i 안에 범위(10):
+    출력(i, 끝="")
+시도:
+    값 = 표[1:n:2][::-1].값 + {1, 2} - -x
+    사전 = {"키": [a, b], "값": (c,)}
+예외 값오류 별칭 e:
+    던지기 값오류(e.args[0], e.args[0:1])
+예외:
+    던지기
+마침:
+    함께 열기(이름[2:]) 별칭 f, 잠금:
+        통과
+"""
+
+def parse(source: str = SOURCE) -> Program:
+    return Parser(*lex_with_spans(source)).parse_program()
+
+def walk(program: Program):
+    """전위 순회로 모든 노드"""
+    work = list(reversed(program.body))
+    while work:
+        node = work.pop()
+        yield node
+        work += reversed(list(iter_child_nodes(node)))
+
+def dump(node, format: str) -> list[str]:
+    out = io.StringIO()
+    dump_ast(node, out, format)
+    text = out.getvalue()
+    assert text.endswith("\n")
+    return text.splitlines()
+
+# ======================
+#  jsonl 읽기
+# ======================
+
+def from_json(value, in_list: bool = False):
+    """json.loads 결과 -> 노드. 리스트 안의 리스트는 쌍(tuple) 이다 (keywords, items, names)"""
+    if isinstance(value, dict):
+        cls = getattr(ast_demo, value.pop("_type"))
+        span = value.pop("span", None)
+        node = cls(**{name: from_json(v) for name, v in value.items()})
+        if span is not None:
+            node.span = pack_span(*span)
+        return node
+    if isinstance(value, list):
+        items = [from_json(v, True) for v in value]
+        return tuple(items) if in_list else items
+    return value
+
+# ======================
+#  sexp 읽기
+# ======================
+
+_SEXP_TOKEN = re.compile(r'\s*(?:(\()|(\))|("(?:[^"\\]|\\.)*")|([^\s()]+))')
+_SEXP_ATOMS = {"nil": None, "#t": True, "#f": False}
+
+def from_sexp(line: str):
+    """S-식 한 줄 -> 노드. (이름 :필드 값 ...) 는 노드, (a . b) 는 쌍, 나머지 (...) 는 리스트"""
+    tokens = []
+    pos = 0
+    while pos < len(line):
+        m = _SEXP_TOKEN.match(line, pos)
+        pos = m.end()
+        tokens.append(m.group(1) or m.group(2) or m.group(3) or m.group(4))
+    stack: list[list] = [[]]
+    for tok in tokens:
+        if tok == "(":
+            stack.append([])
+        elif tok == ")":
+            items = stack.pop()
+            stack[-1].append(_sexp_group(items))
+        elif tok.startswith('"'):
+            stack[-1].append(json.loads(tok))
+        elif tok in _SEXP_ATOMS:
+            stack[-1].append(_SEXP_ATOMS[tok])
+        elif tok.startswith(":") or tok == "." or tok[0].isalpha():
+            stack[-1].append(_Symbol(tok))
+        else:
+            stack[-1].append(json.loads(tok) if tok.lstrip("-").isdigit() else float(tok))
+    [result] = stack[0]
+    return result
+
+class _Symbol(str):
+    """노드 이름, :필드, 쌍의 . (문자열 값과 구별한다)"""
+
+def _sexp_group(items: list):
+    if items and type(items[0]) is _Symbol:
+        cls = getattr(ast_demo, items[0])
+        names, values = items[1::2], items[2::2]
+        return cls(**{name[1:]: value for name, value in zip(names, values)})
+    if len(items) == 3 and type(items[1]) is _Symbol and items[1] == ".":
+        return (items[0], items[2])
+    return items
+
+# ======================
+#  테스트
+# ======================
+
+@pytest.fixture(scope="module")
+def program() -> Program:
+    return parse()
+
+def test_source_covers_every_node_type(program):
+    seen = {type(node) for node in walk(program)}
+    assert [cls.__name__ for cls in NODE_TYPES if cls not in seen] == []
+
+def test_jsonl_round_trip(program):
+    lines = dump(program, "jsonl")
+    assert len(lines) == len(program.body)
+    loaded = Program(body=[from_json(json.loads(line)) for line in lines])
+    assert loaded == program
+    assert [(type(n), n.span) for n in walk(loaded)] == [(type(n), n.span) for n in walk(program)]
+
+def test_jsonl_span_is_start_and_length():
+    node = Name(id="x")
+    node.span = pack_span(123456, 7)
+    assert json.loads(dump(node, "jsonl")[0])["span"] == [123456, 7]
+    node.span = 0
+    assert "span" not in json.loads(dump(node, "jsonl")[0])  # span 은 있을 때만
+
+def test_sexp_round_trip(program):
+    lines = dump(program, "sexp")
+    assert len(lines) == len(program.body)
+    assert Program(body=[from_sexp(line) for line in lines]) == program
+
+def test_deep_expression_round_trip():
+    # 재귀가 아니라 작업 목록으로 쓰므로 아주 깊은 식도 한 줄로 나온다
+    node = Number(0)
+    for i in range(1, 200):
+        node = BinOp(left=node, op="+", right=Number(i))
+    assert from_json(json.loads(dump(node, "jsonl")[0])) == node
+    assert from_sexp(dump(node, "sexp")[0]) == node
@@ -0,0 +1,222 @@
+# tests/test_astbin.py
+#
+# astbin_demo 바이너리 형식: 모든 노드 종류의 왕복, span, 공유 노드, 스트리밍, 깨진 입력 거부
+
+import io
+from math import copysign
+from zlib import crc32
+
+import pytest
+
+import astbin_demo
+from arena_demo import (
+    NODE_TYPES, NODE_SCHEMAS, FIELD_KINDS, FIELD_NODE, FIELD_OPT_NODE, FIELD_VALUE,
+    FIELD_NODE_LIST, FIELD_VALUE_LIST, FIELD_PAIR_LIST,
+)
+from ast_demo import (
+    Program, Assign, ExprStmt, Name, Number, String, Bool, NoneLiteral, ListLiteral, BinOp,
+    iter_child_nodes,
+)
+from astbin_demo import (
+    MAGIC, FORMAT_VERSION, SCHEMA_CRC, AstReader, AstWriter, dumps_program, loads_program,
+)
+from lexer_demo import lex_with_spans
+from parser_demo import Parser
+
+# ast_demo 의 모든 노드 종류가 한 번 이상 나오는 소스
+SOURCE = """불러오기 수학 별칭 m, 경로
+꺼내기 가.나 불러오기 다 별칭 라, 마
+클래스 상자(기본):
+    정의 __init__(본인, 값=없음, 크기=3):
+        가 = 나 = 본인.값 = 값 만약 값 그외 -1.5e3 + 0.0 + 123456789012345678901234567890
+        본인.크기 += 크기 ** 2
+        동안 참:
+            만약 (n := 길이(가)) > 10 그리고 n 아니다 안에 [1, 2]:
+                중단
+            아니면 n < 0:
+                계속
+            그외:
+                통과
+        반환 본인
+반복 i 안에 범위(10):
+    출력(i, 끝="")
+시도:
+    값 = 표[1:n:2][::-1].값 + {1, 2} - -x
+    사전 = {"키": [a, b], "값": (c,)}
+예외 값오류 별칭 e:
+    던지기 값오류(e.args[0], e.args[0:1])
+예외:
+    던지기
+마침:
+    함께 열기(이름[2:]) 별칭 f, 잠금:
+        통과
+"""
+
+def parse(source: str = SOURCE, **options) -> Program:
+    tokens, spans = lex_with_spans(source)
+    return Parser(tokens, spans, **options).parse_program()
+
+def walk(program: Program):
+    """전위 순회로 모든 노드 (iter_child_nodes 는 미뤄 둔 본문도 파싱한다)"""
+    work = list(reversed(program.body))
+    while work:
+        node = work.pop()
+        yield node
+        work += reversed(list(iter_child_nodes(node)))
+
+def shape(program: Program) -> list:
+    """== 가 보지 않는 span 까지 포함한 비교용 모양: (클래스, span) 들"""
+    return [(type(node), node.span) for node in walk(program)]
+
+def assert_same(loaded: Program, program: Program) -> None:
+    assert loaded == program
+    assert shape(loaded) == shape(program)
+    assert loaded.span == program.span
+
+@pytest.fixture(scope="module")
+def program() -> Program:
+    return parse()
+
+def test_source_covers_every_node_type(program):
+    seen = {type(node) for node in walk(program)}
+    assert [cls.__name__ for cls in NODE_TYPES if cls not in seen] == []
+
+@pytest.mark.parametrize("cls", NODE_TYPES, ids=lambda cls: cls.__name__)
+def test_round_trip_each_node_type(program, cls):
+    loaded = loads_program(dumps_program(program))
+    before = [(node, node.span) for node in walk(program) if type(node) is cls]
+    after = [(node, node.span) for node in walk(loaded) if type(node) is cls]
+    assert before and after == before
+
+def test_round_trip_program_with_spans(program):
+    assert any(span for _, span in shape(program))
+    assert_same(loads_program(dumps_program(program)), program)
+
+def test_round_trip_without_spans():
+    tokens, _ = lex_with_spans(SOURCE)
+    program = Parser(tokens).parse_program()
+    assert all(span == 0 for _, span in shape(program))
+    assert_same(loads_program(dumps_program(program)), program)
+
+def test_round_trip_hash_consed_nodes():
+    # 공유 노드는 span 이 없다 (0). 읽은 뒤에도 그 자리는 0 이어야 한다
+    program = parse(SOURCE * 2, hash_cons=True)
+    spans = shape(program)
+    assert any(span == 0 for _, span in spans) and any(span for _, span in spans)
+    assert_same(loads_program(dumps_program(program)), program)
+
+def test_values_keep_their_type():
+    values = [1, 1.0, True, False, 0.0, -0.0, -7, 2 ** 100, -(2 ** 100), 1e-300, "", "한글", "\ud800"]
+    program = Program(body=[
+        Assign(Name("x"), ListLiteral([Number(v) for v in values if type(v) is not bool]
+                                      + [Bool(v) for v in values if type(v) is bool]
+                                      + [String("한글"), String(""), NoneLiteral()])),
+    ])
+    loaded = loads_program(dumps_program(program))
+    assert loaded == program
+    got = [node.value for node in loaded.body[0].value.elements if type(node) in (Number, Bool)]
+    want = [v for v in values if type(v) is not bool] + [v for v in values if type(v) is bool]
+    assert [(type(v), copysign(1, v) if type(v) is float else v) for v in got] == \
+           [(type(v), copysign(1, v) if type(v) is float else v) for v in want]
+
+def test_deep_expression_round_trip():
+    # 노드의 == 는 재귀라 깊은 트리는 (클래스, span) 모양과 리터럴 값으로 비교한다
+    program = parse("x = " + " + ".join(map(str, range(20000))) + "\n")
+    loaded = loads_program(dumps_program(program))
+    assert shape(loaded) == shape(program)
+    assert [n.value for n in walk(loaded) if type(n) is Number] == list(range(20000))
+
+def test_streamed_writer_and_reader(program):
+    tokens, spans = lex_with_spans(SOURCE)
+    sink = io.BytesIO()
+    with AstWriter(sink) as writer:
+        for stmt in Parser(tokens, spans).iter_statements():
+            writer.write(stmt)
+    reader = AstReader(io.BytesIO(sink.getvalue()))
+    stmts = []
+    for stmt in reader:
+        stmts.append(stmt)
+    assert stmts == program.body
+    assert shape(Program(body=stmts)) == shape(program)
+    assert reader.span == 0  # with 문의 close() 는 Program span 없이 끝낸다
+
+def test_smaller_than_pickle(program):
+    import pickle
+    assert len(dumps_program(program)) < len(pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL))
+
+# ======================
+#  깨진 입력
+# ======================
+
+@pytest.fixture(scope="module")
+def data(program) -> bytes:
+    return dumps_program(program)
+
+def test_rejects_wrong_magic(data):
+    with pytest.raises(ValueError, match="바이너리 파일이 아닙니다"):
+        loads_program(b"XAST" + data[4:])
+
+def test_rejects_other_format_version(data):
+    with pytest.raises(ValueError, match="형식 버전"):
+        loads_program(data[:4] + bytes([FORMAT_VERSION + 1]) + data[5:])
+
+def test_rejects_schema_mismatch(data):
+    other = ((SCHEMA_CRC + 1) & 0xFFFFFFFF).to_bytes(4, "little")
+    with pytest.raises(ValueError, match="노드 정의가 바뀌어"):
+        loads_program(data[:5] + other + data[9:])
+
+def test_schema_crc_covers_field_kinds():
+    codes = (FIELD_NODE, FIELD_OPT_NODE, FIELD_VALUE, FIELD_NODE_LIST, FIELD_VALUE_LIST, FIELD_PAIR_LIST)
+    assert [FIELD_KINDS[code] for code in codes] == [
+        "node", "opt_node", "value", "node_list", "value_list", "pair_list",
+    ]
+    schemas = [(cls.__name__, schema) for cls, schema in zip(NODE_TYPES, NODE_SCHEMAS)]
+    assert SCHEMA_CRC == crc32(repr((list(enumerate(FIELD_KINDS)), schemas)).encode())
+    # 칸 종류 번호의 뜻만 바뀌어도 (예: 두 종류의 번호를 맞바꾸면) 지문이 달라진다
+    swapped = list(FIELD_KINDS)
+    swapped[FIELD_NODE], swapped[FIELD_VALUE] = swapped[FIELD_VALUE], swapped[FIELD_NODE]
+    assert SCHEMA_CRC != crc32(repr((list(enumerate(swapped)), schemas)).encode())
+
+def test_rejects_every_truncation():
+    data = dumps_program(parse("x = [1, 2.5, '셋']\n출력(x)\n"))
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            loads_program(data[:end])
+
+def test_rejects_trailing_bytes(data):
+    with pytest.raises(ValueError, match="끝부분"):
+        loads_program(data + b"\0")
+
+def test_rejects_every_single_byte_corruption():
+    data = dumps_program(parse("정의 f(a, b=1):\n    반환 a * b + -2\n값 = f(2, b=3) < 9\n"))
+    for i in range(len(data)):
+        corrupt = bytearray(data)
+        corrupt[i] ^= 0x5A
+        with pytest.raises(ValueError):
+            loads_program(bytes(corrupt))
+
+def _record(payload: bytes) -> bytes:
+    """crc32 까지 맞춘 문장 하나짜리 바이너리 (crc 를 지나 디코더 검사까지 가게)"""
+    out = bytearray(MAGIC + bytes([FORMAT_VERSION]) + SCHEMA_CRC.to_bytes(4, "little"))
+    astbin_demo._put_varint(out, len(payload))
+    out += payload + astbin_demo._CRC.pack(astbin_demo.crc32(payload))
+    tail = b"\0"  # Program span 없음
+    out += b"\0" + tail + astbin_demo._CRC.pack(astbin_demo.crc32(tail))
+    return bytes(out)
+
+def test_rejects_value_index_past_table():
+    # Name 노드, span 없음, 값 번호 5 (값 표는 비어 있으니 0 만 새 값일 수 있다)
+    with pytest.raises(ValueError, match="값 표 밖"):
+        loads_program(_record(bytes([NODE_TYPES.index(Name), 0, 5])))
+
+def test_rejects_child_count_mismatch():
+    # BinOp 은 자식 둘이 앞에 있어야 하는데 스택이 비어 있다
+    op = NODE_TYPES.index(BinOp)
+    with pytest.raises(ValueError):
+        loads_program(_record(bytes([op, 0, 0, astbin_demo._TAG_STR, 1]) + b"+"))
+
+def test_valid_crafted_record_loads():
+    # 위 두 검사가 crc 가 아니라 디코더에서 걸렸는지 확인: 같은 방식으로 만든 올바른 기록은 읽힌다
+    payload = bytes([NODE_TYPES.index(Name), 0, 0, astbin_demo._TAG_STR, 1]) + b"x"
+    payload += bytes([NODE_TYPES.index(ExprStmt), 0])
+    assert loads_program(_record(payload)) == Program(body=[ExprStmt(Name("x"))])
@@ -0,0 +1,128 @@
+# tests/test_lexed_document.py
+#
+# LexedDocument 증분 렉싱: 어떤 편집 뒤에도 tokens 가 simple_lexer(새 텍스트) 와 같고, TokenDiff 를 옛 토큰에 적용하면 새 토큰
+
+import random
+
+import pytest
+
+from lexer_demo import LexedDocument, simple_lexer
+
+SOURCE = """가 = 1
+정의 f(x, y=2):
+    만약 x > y:
+        반환 x
+    아니면 x == y:
+        통과
+    그외:
+        동안 참:
+            x -= 1
+            만약 x < 0: 중단
+    반환 [x,
+          y]
+클래스 상자:
+    크기 = \"\"\"여러
+줄\"\"\"  # 주석
+    정의 g(본인):
+        시도:
+            반환 본인.크기
+        예외:
+            반환 없음
+
+출력(f(가), 상자().g())
+"""
+
+# 들여쓰기, 블록 머리, 줄 끝, 괄호/문자열 열고 닫기처럼 렉서 상태를 바꾸는 조각들
+FRAGMENTS = [
+    "\n", "    ", "        ", "x", "값 = 1\n", "만약 a:\n    b\n", "정의 h():\n", "\n\n", "  y\n",
+    ":", "(", ")", "[", "]", '"', '"""', '"""a\nb"""', "#", "\\\n", "\t", "\r\n", "\r",
+]
+
+def line_start(text: str, row: int) -> int:
+    """row 번째 줄의 시작 위치"""
+    return sum(len(line) for line in text.splitlines(True)[:row])
+
+def random_edit(rng: random.Random, text: str) -> tuple[int, int, str]:
+    """(start, end, new_text): 아무 곳 / 여러 줄에 걸친 삭제 (블록 경계 넘기) / 줄 머리 들여쓰기 바꾸기"""
+    kind = rng.random()
+    if kind < 0.3 and text:
+        # 줄 머리에서 들여쓰기를 더하거나 빼기
+        start = line_start(text, rng.randrange(len(text.splitlines())))
+        if rng.random() < 0.5:
+            return start, start, rng.choice(["    ", "  ", "\t"])
+        return start, min(len(text), start + rng.choice([1, 2, 4, 8])), ""
+    start = rng.randint(0, len(text))
+    end = min(len(text), start + rng.choice([0, 0, 1, 3, 10, 40, 120]))
+    return start, end, rng.choice(FRAGMENTS) if rng.random() < 0.8 else ""
+
+def lex_or_none(text: str):
+    try:
+        return simple_lexer(text)
+    except SyntaxError:
+        return None
+
+def apply_edit(doc: LexedDocument, tokens: list, text: str, start: int, end: int, new_text: str):
+    """doc 에 편집을 걸고 확인한다. 돌려주는 것은 (새 텍스트, 새 토큰 또는 렉싱 에러면 None)"""
+    text = text[:start] + new_text + text[end:]
+    expected = lex_or_none(text)
+    if expected is None:
+        with pytest.raises(SyntaxError):
+            doc.edit(start, end, new_text)
+        assert doc.text == text  # 에러가 나도 텍스트 편집은 반영된다
+        return text, None
+    diff = doc.edit(start, end, new_text)
+    assert doc.text == text
+    assert doc.tokens == expected
+    if tokens is not None:
+        assert tokens[diff.start:diff.start + len(diff.removed)] == diff.removed
+        tokens[diff.start:diff.start + len(diff.removed)] = diff.inserted
+        assert tokens == expected
+    return text, list(expected)
+
+def test_initial_tokens():
+    assert LexedDocument(SOURCE).tokens == simple_lexer(SOURCE)
+    assert LexedDocument("").tokens == simple_lexer("")
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits(seed):
+    rng = random.Random(seed)
+    text = SOURCE
+    doc = LexedDocument(text)
+    tokens = list(doc.tokens)
+    for _ in range(40):
+        start, end, new_text = random_edit(rng, text)
+        text, tokens = apply_edit(doc, tokens, text, start, end, new_text)
+
+def test_edit_across_block_boundary():
+    # 만약 본문 끝부터 아니면 줄 중간까지 지운다: 블록이 합쳐지고 DEDENT/INDENT 가 바뀐다
+    doc = LexedDocument(SOURCE)
+    start = SOURCE.index("        반환 x\n") + len("        반환 x")
+    end = SOURCE.index("x == y")
+    apply_edit(doc, list(doc.tokens), SOURCE, start, end, " + ")
+
+def test_edit_changes_indentation_of_following_lines():
+    # 동안 블록을 한 단계 내어 쓰면 그 아래 줄들의 들여쓰기 토큰이 달라진다
+    doc = LexedDocument(SOURCE)
+    text, tokens = SOURCE, list(doc.tokens)
+    for row, line in enumerate(SOURCE.splitlines()):
+        if line.startswith("            "):
+            start = line_start(text, row)
+            text, tokens = apply_edit(doc, tokens, text, start, start + 4, "")
+    assert tokens is not None
+
+def test_lexer_error_then_fix():
+    doc = LexedDocument(SOURCE)
+    start = SOURCE.index("    아니면")
+    text, tokens = apply_edit(doc, list(doc.tokens), SOURCE, start, start, "  ")  # 어느 블록에도 안 맞는 내어쓰기
+    assert tokens is None
+    text, tokens = apply_edit(doc, None, text, start, start + 2, "")
+    assert tokens == simple_lexer(SOURCE)
+
+def test_carriage_return_meets_newline_at_edit_boundary():
+    # "\r" 과 "\n" 이 편집 경계 양쪽에서 만나면 한 줄 끝("\r\n")이 된다
+    doc = LexedDocument(SOURCE)
+    end_of_line = SOURCE.index("\n")
+    text, tokens = apply_edit(doc, list(doc.tokens), SOURCE, end_of_line, end_of_line, "\r")
+    text, tokens = apply_edit(doc, tokens, text, 0, 0, "나 = 2\r")
+    text, tokens = apply_edit(doc, tokens, text, len("나 = 2\r"), len("나 = 2\r"), "\n")
+    assert doc.lines[:2] == ["나 = 2\r\n", "가 = 1\r\n"]
@@ -0,0 +1,31 @@
+# tests/test_lexer_errors.py
+#
+# 렉서 에러의 위치 (줄/칸/줄 내용) 와 --check 의 렉서 에러 모으기
+
+import pytest
+
+from lexer_demo import lex_with_spans
+from run_korean import check_korean_file
+
+@pytest.mark.parametrize("source, lineno, offset, text", [
+    ('x = 1\ny = "ab\\N{nope}c"\n', 2, 8, 'y = "ab\\N{nope}c"'),
+    ("    a = '\\N{zz}'\n", 1, 10, "    a = '\\N{zz}'"),
+    ('a = """q\\N{x}"""\n', 1, 9, 'a = """q\\N{x}"""'),
+    ('가 = """abc\n  de\\N{zz}\nf"""\n', 2, 5, "  de\\N{zz}"),
+    ('가 = """끝""" + "\\N{zz}"\n', 1, 16, '가 = """끝""" + "\\N{zz}"'),
+    ('a = 1\nb = """abc\nde\n', 2, 5, 'b = """abc'),
+    ("만약 a:\n        x\n    y\n", 3, 5, "    y"),
+])
+def test_lexer_errors_have_location(source, lineno, offset, text):
+    with pytest.raises(SyntaxError) as info:
+        lex_with_spans(source)
+    e = info.value
+    assert (e.lineno, e.offset, e.text) == (lineno, offset, text)
+
+def test_check_collects_lexer_errors(tmp_path):
+    path = tmp_path / "bad.han"
+    path.write_text('가 = 1\n나 = "\\N{zz}"\n만약 가:\n        출력(가)\n    출력(나\n다 = """끝\n', encoding="utf-8")
+    program, diagnostics = check_korean_file(str(path))
+    assert [(e.lineno, e.offset) for e in diagnostics] == [(2, 6), (5, 5), (5, 9), (6, 5)]
+    assert {e.filename for e in diagnostics} == {str(path)}
+    assert len(program.body) == 4  # 만약 본문의 잘못된 문장만 빠진다
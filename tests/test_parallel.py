@@ -0,0 +1,90 @@
+# tests/test_parallel.py
+#
+# parallel_demo 조각별 파싱: 작은 조각으로 나눠도 직렬 파싱과 같은 결과, 이어지는 절 앞에서 안 자르기, 뒤 조각의 에러 위치
+
+import pytest
+
+from ast_demo import Program, If, Try, iter_child_nodes
+from lexer_demo import SourceMap, lex_with_spans, simple_lexer
+from parallel_demo import CONTINUATION_KEYWORDS, parse_parallel, split_top_level
+from parser_demo import Parser
+
+# 0 칸 줄마다 조각이 나뉠 수 있는 소스. 만약/시도 문의 이어지는 절도 0 칸 줄에서 시작한다
+SOURCE = """가 = 1
+정의 f(x):
+    반환 x + 1
+만약 가 > 0:
+    나 = f(가)
+아니면 가 < 0:
+    나 = 0
+그외:
+    나 = -1
+시도:
+    다 = 나 / 가
+예외 값오류:
+    다 = 0
+성공:
+    출력(다)
+마침:
+    출력("끝")
+클래스 상자:
+    크기 = [1, 2, 3]
+
+라 = 다 만약 다 그외 나
+"""
+
+def walk(program: Program):
+    """전위 순회로 모든 노드"""
+    work = list(reversed(program.body))
+    while work:
+        node = work.pop()
+        yield node
+        work += reversed(list(iter_child_nodes(node)))
+
+def shape(program: Program) -> list:
+    """== 가 보지 않는 span 까지 포함한 비교용 모양: (클래스, span) 들"""
+    return [(type(node), node.span) for node in walk(program)]
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("chunk_chars", [1, 16, 64, 1 << 18])
+def test_same_as_serial(jobs, chunk_chars):
+    program = parse_parallel(SOURCE.splitlines(True), jobs=jobs, chunk_chars=chunk_chars)
+    assert program == Parser(simple_lexer(SOURCE)).parse_program()
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("chunk_chars", [1, 16, 64, 1 << 18])
+def test_same_spans_as_serial(jobs, chunk_chars):
+    program = parse_parallel(SOURCE.splitlines(True), jobs=jobs, chunk_chars=chunk_chars, with_spans=True)
+    serial = Parser(*lex_with_spans(SOURCE)).parse_program()
+    assert program == serial
+    assert shape(program) == shape(serial)
+    assert program.span == serial.span
+
+def test_chunks_never_start_at_continuation_lines():
+    chunks = list(split_top_level(SOURCE.splitlines(True), 1))
+    assert "".join(text for _, _, text in chunks) == SOURCE
+    firsts = [simple_lexer(text)[0][1] for _, _, text in chunks]  # 조각의 첫 토큰
+    assert not CONTINUATION_KEYWORDS & set(firsts)
+    # 만약 ... 아니면 ... 그외 와 시도 ... 예외 ... 성공 ... 마침 은 각각 한 조각
+    assert firsts == ["가", "정의", "만약", "시도", "클래스", "라"]
+    program = parse_parallel(SOURCE.splitlines(True), jobs=1, chunk_chars=1)
+    assert [type(s) for s in program.body if type(s) in (If, Try)] == [If, Try]
+    assert len(program.body[2].orelse) == 1 and program.body[3].finalbody
+
+def test_chunk_rows_and_offsets():
+    lines = SOURCE.splitlines(True)
+    for row, offset, text in split_top_level(lines, 1):
+        assert lines[row] == text.splitlines(True)[0]
+        assert SOURCE[offset:offset + len(text)] == text
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_syntax_error_in_later_chunk_has_file_lineno(jobs):
+    source = SOURCE + "마 = (1 +\n" + "바 = 2\n"
+    with pytest.raises(SyntaxError) as serial:
+        Parser(*lex_with_spans(source), SourceMap(source, "큰파일.han")).parse_program()
+    with pytest.raises(SyntaxError) as info:
+        parse_parallel(source.splitlines(True), jobs=jobs, chunk_chars=16, filename="큰파일.han")
+    e = info.value
+    assert len(list(split_top_level(source.splitlines(True), 16))) > 2
+    assert (e.filename, e.lineno, e.offset) == ("큰파일.han", serial.value.lineno, serial.value.offset)
+    assert e.lineno > source.count("\n") - 2
@@ -0,0 +1,94 @@
+# tests/test_parser_depth.py
+#
+# 블록 본문을 명시적 스택으로 파싱한다: 아주 깊게 중첩된 블록과 그 안의 에러 복구
+
+import pytest
+
+from ast_demo import If, While, For, Pass, Assign, FunctionDef
+from lexer_demo import SourceMap, lex_with_spans, simple_lexer
+from parser_demo import Parser, _RECURSIVE_BLOCKS
+
+def depth(node) -> int:
+    """첫 문장의 본문을 따라 내려간 블록 깊이 (재귀 없이)"""
+    n = 0
+    while hasattr(node, "body"):
+        node = node.body[0]
+        n += 1
+    return n
+
+def test_one_line_nested_ifs():
+    program = Parser(simple_lexer("만약 x: " * 100_000 + "통과\n")).parse_program()
+    node = program.body[0]
+    assert depth(node) == 100_000
+    for _ in range(100_000):
+        assert type(node) is If
+        node = node.body[0]
+    assert type(node) is Pass
+
+def test_multi_line_nested_blocks():
+    n = 1000
+    lines = []
+    for i in range(n):
+        keyword = ("만약 x:", "동안 y:", "반복 i 안에 z:")[i % 3]
+        lines.append("    " * i + keyword)
+    lines.append("    " * n + "a = 1")
+    lines += ["    " * i + "b = 2" for i in range(n - 1, -1, -1)]
+    program = Parser(*lex_with_spans("\n".join(lines) + "\n")).parse_program()
+    assert len(program.body) == 2 and depth(program.body[0]) == n
+    node = program.body[0]
+    for i in range(n):
+        assert type(node) is (If, While, For)[i % 3]
+        assert len(node.body) == (2 if i < n - 1 else 1)
+        node = node.body[0]
+    assert type(node) is Assign
+
+def test_elif_else_and_lazy_bodies():
+    source = "정의 f():\n    만약 a:\n        반환 1\n    아니면 b:\n        반환 2\n    그외:\n        만약 c: 반환 3\n"
+    eager = Parser(*lex_with_spans(source)).parse_program()
+    lazy = Parser(*lex_with_spans(source), lazy_bodies=True).parse_program()
+    assert type(eager.body[0]) is FunctionDef
+    assert lazy == eager
+
+def test_recover_inside_deep_blocks():
+    n = 2000
+    source = "만약 x: " * n + "= 1\n정상 = 1\n"
+    parser = Parser(*lex_with_spans(source), recover=True)
+    program = parser.parse_program()
+    assert len(parser.diagnostics) == 1
+    assert [type(s).__name__ for s in program.body] == ["Assign"]  # 깨진 한 줄 전체가 빠진다
+
+def test_recover_keeps_going_after_broken_nested_statement():
+    n = 1000
+    lines = ["    " * i + "만약 x:" for i in range(n)]
+    lines += ["    " * n + "= 1", "    " * n + "b = 1", "c = 2"]
+    parser = Parser(*lex_with_spans("\n".join(lines) + "\n"), recover=True)
+    program = parser.parse_program()
+    assert len(parser.diagnostics) == 1
+    assert len(program.body) == 2 and depth(program.body[0]) == n
+    node = program.body[0]
+    for _ in range(n - 1):
+        node = node.body[0]
+    assert [s.target.id for s in node.body] == ["b"]  # 깨진 문장만 빠진다
+
+def test_unclosed_deep_block_is_a_syntax_error():
+    with pytest.raises(SyntaxError):
+        Parser(simple_lexer("만약 x: " * 5000 + "\n")).parse_program()
+
+@pytest.mark.parametrize("n", [_RECURSIVE_BLOCKS - 1, _RECURSIVE_BLOCKS, _RECURSIVE_BLOCKS + 1])
+def test_recursive_and_stack_blocks_meet(n):
+    # 재귀로 파싱하던 블록이 블록 스택으로 넘어가는 깊이 근처: 깨진 문장은 어느 쪽에서나 그 문장만 빠진다
+    lines = []
+    for i in range(n):
+        lines += ["    " * i + "만약 x:", "    " * (i + 1) + "= 1"]
+    lines += ["    " * n + "a = 1"]
+    lines += ["    " * i + "b = 2" for i in range(n - 1, -1, -1)]
+    source = "\n".join(lines) + "\n"
+    parser = Parser(*lex_with_spans(source), SourceMap(source), recover=True)
+    program = parser.parse_program()
+    assert [e.lineno for e in parser.diagnostics] == list(range(2, 2 * n + 1, 2))
+    assert len(program.body) == 2 and depth(program.body[0]) == n
+    node = program.body[0]
+    for i in range(n):
+        assert type(node) is If and len(node.body) == (2 if i < n - 1 else 1)
+        node = node.body[0]
+    assert type(node) is Assign and node.target.id == "a"
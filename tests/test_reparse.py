@@ -0,0 +1,174 @@
+# tests/test_reparse.py
+#
+# reparse_program 증분 파싱: 어떤 편집 뒤에도 처음부터 파싱한 Program 과 같고, ProgramDiff 를 옛 본문에 적용하면 새 본문
+
+import random
+
+import pytest
+
+from ast_demo import Program, iter_child_nodes
+from lexer_demo import lex_with_spans, simple_lexer
+from parser_demo import Parser, reparse_program
+
+SOURCE = """가 = 1
+정의 f(x, y=2):
+    만약 x > y:
+        반환 x
+    아니면 x == y:
+        통과
+    그외:
+        동안 참:
+            x -= 1
+            만약 x < 0: 중단
+    반환 [x, y]
+만약 가:
+    나 = 2
+그외:
+    나 = 3
+클래스 상자:
+    크기 = 3
+    정의 g(본인):
+        시도:
+            반환 본인.크기
+        예외:
+            반환 없음
+        마침:
+            출력(1)
+
+만약 나:
+    라 = 1
+다 = 가 만약 나 그외 f(가)
+출력(f(가), 상자().g())
+"""
+
+# 줄 단위로 끼워 넣는 문장/블록/이어지는 절 (최상위 문장 경계가 바뀐다)
+LINES = [
+    "값 = 1", "출력(x)", "통과", "반환 1", "x += 1", "d = [1, 2] 만약 e 그외 없음",
+    "만약 a:", "동안 c:", "정의 h():", "시도:",
+    "만약 a:\n    통과", "아니면 b:\n    x = 1", "그외:\n    통과", "예외:\n    통과", "성공:\n    통과", "마침:\n    통과",
+]
+
+# 글자 단위로 끼워 넣는 조각
+FRAGMENTS = ["\n", "    ", "x", " + 1", " 아니다 안에 y", ":", "(", ")", "#"]
+
+def random_edit(rng: random.Random, text: str) -> tuple[int, int, str]:
+    """
+    (start, end, new_text): 줄 끼워 넣기 / 여러 줄 지우기 (블록 경계 넘기) /
+    여러 줄 들여쓰기 바꾸기 / 아무 곳 글자 편집
+    """
+    lines = text.splitlines(True)
+    kind = rng.random()
+    if not lines or kind < 0.2:
+        start = rng.randint(0, len(text))
+        end = min(len(text), start + rng.choice([0, 0, 1, 3, 10]))
+        return start, end, rng.choice(FRAGMENTS) if rng.random() < 0.8 else ""
+    row = rng.randrange(len(lines))
+    start = sum(len(line) for line in lines[:row])
+    if kind < 0.55:
+        # 그 줄과 같은 깊이로, 또는 한 단계 더 들여서 한 줄 끼워 넣기
+        indent = len(lines[row]) - len(lines[row].lstrip(" ")) + rng.choice([0, 0, 4])
+        return start, start, "".join(" " * indent + line + "\n" for line in rng.choice(LINES).split("\n"))
+    count = rng.randint(1, 3)
+    if kind < 0.8:
+        return start, start + sum(map(len, lines[row:row + count])), ""
+    # 여러 줄을 한 단계 들이거나 내어 쓰기
+    block = lines[row:row + count]
+    if rng.random() < 0.5:
+        block = ["    " + line for line in block]
+    else:
+        block = [line[4:] if line.startswith("    ") else line for line in block]
+    return start, start + sum(map(len, lines[row:row + count])), "".join(block)
+
+def walk(program: Program):
+    """전위 순회로 모든 노드"""
+    work = list(reversed(program.body))
+    while work:
+        node = work.pop()
+        yield node
+        work += reversed(list(iter_child_nodes(node)))
+
+def shape(program: Program) -> list:
+    """== 가 보지 않는 span 까지 포함한 비교용 모양: (클래스, span) 들"""
+    return [(type(node), node.span) for node in walk(program)]
+
+def lex(text: str, with_spans: bool):
+    """(tokens, spans) 또는 렉싱 에러면 None"""
+    try:
+        return lex_with_spans(text) if with_spans else (simple_lexer(text), None)
+    except SyntaxError:
+        return None
+
+def parse_or_error(tokens, spans, **options):
+    try:
+        return Parser(tokens, spans, **options).parse_program()
+    except SyntaxError as e:
+        return e
+
+def check_reparse(previous: Program, tokens, spans, **options) -> Program | None:
+    """
+    previous 에서 증분 파싱한 결과가 처음부터 파싱한 것과 같은지 본다.
+    문법 에러면 둘 다 에러여야 하고 None (파싱 중에 난 에러라 previous 는 그대로 다시 쓸 수 있다).
+    """
+    old_body = list(previous.body)
+    expected = parse_or_error(tokens, spans, **options)
+    if isinstance(expected, SyntaxError):
+        with pytest.raises(SyntaxError):
+            reparse_program(previous, tokens, spans, **options)
+        assert previous.body == old_body
+        return None
+    program, diff = reparse_program(previous, tokens, spans, **options)
+    assert program == expected
+    if spans is not None:
+        assert shape(program) == shape(expected)
+        assert program.span == expected.span
+    # 구간 밖 문장은 옛 Stmt 객체 그대로다
+    old_body[diff.start:diff.start + len(diff.removed)] = diff.inserted
+    assert len(old_body) == len(program.body)
+    assert all(a is b for a, b in zip(old_body, program.body))
+    return program
+
+@pytest.mark.parametrize("with_spans", [False, True])
+@pytest.mark.parametrize("recover", [False, True])
+@pytest.mark.parametrize("seed", range(10))
+def test_random_edits(seed, recover, with_spans):
+    rng = random.Random(seed)
+    text = SOURCE
+    previous = Parser(*lex(text, with_spans), incremental=True, recover=recover).parse_program()
+    for _ in range(40):
+        start, end, new_text = random_edit(rng, text)
+        edited = text[:start] + new_text + text[end:]
+        lexed = lex(edited, with_spans)
+        if lexed is None:
+            continue  # 렉싱부터 안 되는 편집은 버린다 (파서가 받지 못한다)
+        program = check_reparse(previous, *lexed, recover=recover)
+        if program is not None:
+            # 파싱되는 편집만 이어 간다 (깨진 텍스트 위에 편집을 쌓지 않는다)
+            text, previous = edited, program
+
+@pytest.mark.parametrize("with_spans", [False, True])
+def test_edit_across_block_boundary(with_spans):
+    # 만약 문의 본문 끝부터 그외 절 끝까지 지운다: 블록 경계를 넘는 편집
+    previous = Parser(*lex(SOURCE, with_spans), incremental=True).parse_program()
+    start = SOURCE.index("    나 = 2\n") + len("    나 = 2")
+    end = SOURCE.index("    나 = 3\n") + len("    나 = 3")
+    text = SOURCE[:start] + SOURCE[end:]
+    assert check_reparse(previous, *lex(text, with_spans)) is not None
+
+@pytest.mark.parametrize("with_spans", [False, True])
+def test_edit_changes_indentation(with_spans):
+    # 클래스 본문을 0 칸으로 내어 쓰면 클래스 안의 문장들이 최상위 문장이 된다
+    previous = Parser(*lex(SOURCE, with_spans), incremental=True).parse_program()
+    lines = SOURCE.splitlines(True)
+    at, end = lines.index("    크기 = 3\n"), lines.index("\n")
+    text = "".join([*lines[:at], "    통과\n", *(line[4:] for line in lines[at:end]), *lines[end:]])
+    program = check_reparse(previous, *lex(text, with_spans))
+    assert len(program.body) > len(Parser(*lex(SOURCE, with_spans)).parse_program().body)
+
+@pytest.mark.parametrize("with_spans", [False, True])
+@pytest.mark.parametrize("clause", ["그외:\n    라 = 2\n", "아니면 다:\n    라 = 3\n"])
+def test_clause_added_after_unchanged_statement(with_spans, clause):
+    # 토큰이 그대로인 만약 문이라도 바로 뒤에 절이 붙으면 다시 파싱해야 한다
+    previous = Parser(*lex(SOURCE, with_spans), incremental=True).parse_program()
+    at = SOURCE.index("다 = 가")
+    program = check_reparse(previous, *lex(SOURCE[:at] + clause + SOURCE[at:], with_spans))
+    assert program.body[-3].orelse
@@ -0,0 +1,44 @@
+# tests/test_run_korean.py
+#
+# run_korean 의 --no-exec 옮기기: 문장 단위로 흘려 쓴 코드가 gen_program 결과와 글자 하나까지 같다
+
+import io
+
+import pytest
+
+from codegen_demo import gen_program
+from lexer_demo import simple_lexer
+from parser_demo import Parser
+from run_korean import main, translate_korean_file
+
+SOURCE = """가 = 1
+정의 더하기(x, y=2):
+    만약 x > y:
+        반환 x + y
+    그외:
+        반환 x - y
+
+클래스 상자:
+    크기 = 3
+출력(더하기(가), 상자.크기)
+"""
+
+@pytest.mark.parametrize("source", [SOURCE, "가 = 1\n", "", "\n\n"])
+def test_translate_matches_gen_program(tmp_path, source):
+    path = tmp_path / "a.han"
+    path.write_text(source, encoding="utf-8")
+    out = io.StringIO()
+    count = translate_korean_file(str(path), out)
+    program = Parser(simple_lexer(source)).parse_program()
+    assert out.getvalue() == gen_program(program)
+    assert count == len(program.body)
+
+def test_streamed_and_whole_file_outputs_match(tmp_path):
+    # --jobs 2 면 옮기기 전용 경로 대신 run_korean_file 로 파일 전체를 처리한다
+    path = tmp_path / "a.han"
+    path.write_text(SOURCE, encoding="utf-8")
+    streamed, whole = tmp_path / "streamed.py", tmp_path / "whole.py"
+    assert main(["--no-exec", "-o", str(streamed), str(path)]) == 0
+    assert main(["--no-exec", "--jobs", "2", "-o", str(whole), str(path)]) == 0
+    assert streamed.read_bytes() == whole.read_bytes()
+    assert streamed.read_text(encoding="utf-8") == gen_program(Parser(simple_lexer(SOURCE)).parse_program()) + "\n"
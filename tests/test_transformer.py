@@ -0,0 +1,62 @@
+# tests/test_transformer.py
+#
+# NodeTransformer / CopyTransformer: 바꾸기 규칙과 깊은 트리 (재귀 없음), 그 위의 상수 접기
+
+from ast_demo import (
+    Program, Assign, ExprStmt, Call, Name, Number, String, BinOp, NodeTransformer, CopyTransformer,
+)
+from fold_demo import fold_constants
+from lexer_demo import lex_with_spans
+from parser_demo import Parser
+
+def parse(source: str, **options) -> Program:
+    tokens, spans = lex_with_spans(source)
+    return Parser(tokens, spans, **options).parse_program()
+
+def chain(n: int) -> str:
+    return "x = " + " + ".join(["1"] * n) + "\n"
+
+class _Rename(NodeTransformer):
+    def visit_Name(self, node):
+        return Name(node.id + "_")
+
+    def visit_ExprStmt(self, node):
+        node = self.generic_visit(node)
+        if isinstance(node.value, Call) and not node.value.args:
+            return None           # 리스트에서 지운다
+        return [node, ExprStmt(String("뒤"))]  # 리스트에 펼쳐 넣는다
+
+def test_transformer_rules():
+    program = parse("가 = 나\n출력()\n출력(다)\n")
+    first = program.body[0]
+    result = _Rename().visit(program)
+    assert result is program and result.body[0] is first  # 제자리에서 바꾼다
+    assert result == Program(body=[
+        Assign(Name("가_"), Name("나_")),
+        ExprStmt(Call(Name("출력_"), [Name("다_")], [])),
+        ExprStmt(String("뒤")),
+    ])
+
+def test_transformer_deep_expression():
+    program = parse(chain(5000))
+    assert NodeTransformer().visit(program) is program
+    assert _Rename().visit(program).body[0].target == Name("x_")
+
+def test_copy_transformer_keeps_original():
+    class Double(CopyTransformer):
+        def visit_Number(self, node):
+            return Number(node.value * 2)
+
+    program = parse("x = 1 + y\nz = y\n", hash_cons=True)
+    before = repr(program)
+    result = Double().visit(program)
+    assert repr(program) == before
+    assert result.body[0].value == BinOp(Number(2), "+", Name("y"))
+    assert result.body[0].span == program.body[0].span
+    assert result.body[1] is program.body[1]  # 안 바뀐 서브트리는 같이 쓴다
+
+def test_fold_constants_deep_expression():
+    program = parse(chain(50000))
+    folded = fold_constants(program)
+    assert folded.body[0].value == Number(50000)
+    assert type(program.body[0].value) is BinOp
@@ -23,4 +23,8 @@ BITOR_OP: str = "|"
 
 POW_OP: str = "**"
 FLOORDIV_OP: str = "//"
-NOD_OP: str = "%"
\ No newline at end of file
+NOD_OP: str = "%"
+
+# 토큰 종류 이름 <-> 작은 정수 코드 (TokenStream 은 종류를 array('B')에 정수로 저장)
+TOKEN_KINDS: list[str] = ["NEWLINE", "INDENT", "DEDENT", "KEYWORD", "IDENT", "NUMBER", "STRING", "SYMBOL", "EOF"]
+KIND_CODES: dict[str, int] = {name: code for code, name in enumerate(TOKEN_KINDS)}